@@ -0,0 +1,808 @@
+"""
+The NES audio processing unit (2A03 APU), synthesising a block of samples at a time with NumPy.
+
+Writes to the APU's registers are recorded with the CPU cycle they happened on rather than acted on straight away. Once
+about a frame's worth of cycles has built up, the registers and the frame counter's envelope, sweep and length clocks
+split the block into stretches in which every channel's settings hold still. Each channel gives the times its output
+level changes in a stretch as arrays, and all of the changes are drawn into the block's samples at once as
+band-limited steps, which keeps the square waves free of aliasing without per-sample Python code.
+
+The channels' levels are mixed with the usual linear approximation of the NES's mixer, so a sample runs from 0.0 to a
+little under 1.0.
+"""
+import wave
+
+import numpy
+
+CPU_CLOCK = 1789773
+SAMPLE_RATE = 44100
+# About one NTSC frame of CPU cycles, so a block is about 735 samples
+CYCLES_PER_BLOCK = 29781
+
+LENGTH_TABLE = (10, 254, 20, 2, 40, 4, 80, 6, 160, 8, 60, 10, 14, 12, 26, 14,
+                12, 16, 24, 18, 48, 20, 96, 22, 192, 24, 72, 26, 16, 28, 32, 30)
+
+DUTY_SEQUENCES = numpy.array([[0, 1, 0, 0, 0, 0, 0, 0],
+                              [0, 1, 1, 0, 0, 0, 0, 0],
+                              [0, 1, 1, 1, 1, 0, 0, 0],
+                              [1, 0, 0, 1, 1, 1, 1, 1]], dtype=numpy.int64)
+
+TRIANGLE_SEQUENCE = numpy.array(list(range(15, -1, -1)) + list(range(16)), dtype=numpy.int64)
+
+# The noise and DMC timer periods, in CPU cycles
+NOISE_PERIODS = (4, 8, 16, 32, 64, 96, 128, 160, 202, 254, 380, 508, 762, 1016, 2034, 4068)
+DMC_RATES = (428, 380, 340, 320, 286, 254, 226, 214, 190, 160, 142, 128, 106, 84, 72, 54)
+
+# What the frame counter clocks at each step
+QUARTER_FRAME = 0x01
+HALF_FRAME = 0x02
+FRAME_IRQ = 0x04
+
+# The frame counter's steps, as (CPU cycles after the sequence starts, what's clocked), and how long a sequence lasts
+FOUR_STEP_SEQUENCE = ((7457, QUARTER_FRAME), (14913, QUARTER_FRAME | HALF_FRAME), (22371, QUARTER_FRAME),
+                      (29829, QUARTER_FRAME | HALF_FRAME | FRAME_IRQ))
+FOUR_STEP_PERIOD = 29830
+FIVE_STEP_SEQUENCE = ((7457, QUARTER_FRAME), (14913, QUARTER_FRAME | HALF_FRAME), (22371, QUARTER_FRAME),
+                      (37281, QUARTER_FRAME | HALF_FRAME))
+FIVE_STEP_PERIOD = 37282
+
+# $4015 bits
+STATUS_DMC_ACTIVE = 0x10
+STATUS_FRAME_IRQ = 0x40
+STATUS_DMC_IRQ = 0x80
+
+# How much one step of each channel's level moves the mixed output
+PULSE_WEIGHT = 0.00752
+TRIANGLE_WEIGHT = 0.00851
+NOISE_WEIGHT = 0.00494
+DMC_WEIGHT = 0.00335
+
+# Band-limited steps are drawn STEP_WIDTH samples wide, from a table of STEP_PHASES offsets within a sample
+STEP_PHASES = 64
+STEP_WIDTH = 16
+
+
+def _build_step_table():
+    """
+    Build the table of band-limited steps.
+
+    Returns:
+        A STEP_PHASES x STEP_WIDTH array. Row p holds how much of a step that happens p / STEP_PHASES of the way
+        through a sample is added to each of the next STEP_WIDTH samples' differences. Each row sums to 1, so a step
+        always settles at its full height, STEP_WIDTH / 2 samples late.
+    """
+    phases = numpy.arange(STEP_PHASES)[:, None] / STEP_PHASES
+    offsets = numpy.arange(STEP_WIDTH)[None, :] + 0.5 - STEP_WIDTH / 2 - phases
+    # A windowed sinc, cutting off a little below the Nyquist frequency
+    cutoff = 0.45
+    window = 0.42 + 0.5 * numpy.cos(2 * numpy.pi * offsets / STEP_WIDTH) + 0.08 * numpy.cos(
+        4 * numpy.pi * offsets / STEP_WIDTH)
+    window[numpy.abs(offsets) > STEP_WIDTH / 2] = 0.0
+    kernel = 2 * cutoff * numpy.sinc(2 * cutoff * offsets) * window
+    return kernel / kernel.sum(axis=1, keepdims=True)
+
+
+STEP_TABLE = _build_step_table()
+
+
+def _build_noise_sequence(tap):
+    """
+    Run the noise channel's shift register from power on until it repeats.
+
+    Args:
+        tap: The bit fed back with bit 0: 1 in the normal mode, 6 in the short mode
+
+    Returns:
+        A tuple of (the register's states in order, each state's position in that order or -1 if it never comes up)
+    """
+    states = []
+    positions = numpy.full(0x8000, -1, dtype=numpy.int64)
+    state = 0x0001
+
+    while positions[state] < 0:
+        positions[state] = len(states)
+        states.append(state)
+        feedback = (state ^ (state >> tap)) & 0x01
+        state = (state >> 1) | (feedback << 14)
+
+    return numpy.array(states, dtype=numpy.int64), positions
+
+
+# The noise channel is silent while bit 0 of its shift register is set. Indexed by the mode bit of $400E.
+NOISE_SEQUENCES = (_build_noise_sequence(1), _build_noise_sequence(6))
+
+
+class RingBuffer(object):
+    """
+    Holds the most recent samples for something else, such as an audio callback, to read out. When it's full the
+    oldest samples are dropped.
+    """
+
+    def __init__(self, capacity=SAMPLE_RATE):
+        """
+        Args:
+            capacity: The number of samples it holds
+        """
+        self.__samples = numpy.zeros(capacity, dtype=numpy.float32)
+        self.__start = 0
+        self.available = 0
+        self.dropped = 0
+
+    def write(self, samples):
+        capacity = len(self.__samples)
+
+        if len(samples) > capacity:
+            self.dropped += len(samples) - capacity
+            samples = samples[-capacity:]
+
+        overflow = self.available + len(samples) - capacity
+
+        if overflow > 0:
+            self.dropped += overflow
+            self.__start = (self.__start + overflow) % capacity
+            self.available -= overflow
+
+        positions = (self.__start + self.available + numpy.arange(len(samples))) % capacity
+        self.__samples[positions] = samples
+        self.available += len(samples)
+
+    def read(self, n_samples=None):
+        """
+        Take up to n_samples of the oldest samples out of the buffer.
+
+        Args:
+            n_samples: The most samples to take, or None for all of them
+
+        Returns:
+            A float32 array of samples
+        """
+        count = self.available if n_samples is None else min(n_samples, self.available)
+        positions = (self.__start + numpy.arange(count)) % len(self.__samples)
+        self.__start = (self.__start + count) % len(self.__samples)
+        self.available -= count
+        return self.__samples[positions]
+
+
+class WavWriter(object):
+    """
+    Writes samples to a mono 16-bit WAV file:
+
+        with WavWriter("out.wav") as output:
+            apu = Apu(ram, output)
+            ...
+    """
+
+    def __init__(self, path, sample_rate=SAMPLE_RATE):
+        self.__file = wave.open(path, "wb")
+        self.__file.setnchannels(1)
+        self.__file.setsampwidth(2)
+        self.__file.setframerate(sample_rate)
+
+    def write(self, samples):
+        self.__file.writeframes((numpy.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes())
+
+    def close(self):
+        self.__file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class _Channel(object):
+    """
+    What the pulse, triangle, noise and DMC channels share: a timer, a length counter and a volume envelope.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.length_counter = 0
+        self.halt = False
+        self.constant_volume = False
+        self.volume_period = 0
+        self.envelope_start = False
+        self.envelope_divider = 0
+        self.decay = 0
+        # CPU cycles until the timer next clocks the channel
+        self.timer = 1
+        self.position = 0
+        # The level the channel was last drawn at
+        self.output = 0
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+
+        if not enabled:
+            self.length_counter = 0
+
+    def load_length(self, value):
+        if self.enabled:
+            self.length_counter = LENGTH_TABLE[value >> 3]
+
+    def clock_length(self):
+        if self.length_counter and not self.halt:
+            self.length_counter -= 1
+
+    def clock_envelope(self):
+        if self.envelope_start:
+            self.envelope_start = False
+            self.decay = 15
+            self.envelope_divider = self.volume_period
+        elif self.envelope_divider:
+            self.envelope_divider -= 1
+        else:
+            self.envelope_divider = self.volume_period
+
+            if self.decay:
+                self.decay -= 1
+            elif self.halt:
+                # The length counter halt flag doubles as the envelope's loop flag
+                self.decay = 15
+
+    @property
+    def volume(self):
+        return self.volume_period if self.constant_volume else self.decay
+
+    def clock_times(self, start, end, period):
+        """
+        Find when the timer clocks the channel from start up to end, and move the timer on to end.
+
+        Returns:
+            An array of CPU cycles
+        """
+        first = start + self.timer
+
+        if first >= end:
+            self.timer = first - end
+            return numpy.empty(0, dtype=numpy.int64)
+
+        times = numpy.arange(first, end, period, dtype=numpy.int64)
+        self.timer = int(times[-1]) + period - end
+        return times
+
+    def sequence(self, start, end, period, length):
+        """
+        Step the channel's position through a sequence of length steps, once per timer clock.
+
+        Returns:
+            A tuple of (CPU cycles the position changes on, starting with start, the position from each of them on)
+        """
+        times = self.clock_times(start, end, period)
+        positions = (self.position + numpy.arange(len(times) + 1)) % length
+        self.position = int(positions[-1])
+        return numpy.concatenate(([start], times)), positions
+
+
+class _Pulse(_Channel):
+
+    def __init__(self, ones_complement):
+        """
+        Args:
+            ones_complement: True for the first pulse channel, whose sweep subtracts one more when it lowers the period
+        """
+        super(_Pulse, self).__init__()
+        self.ones_complement = ones_complement
+        self.duty = 0
+        self.period = 0
+        self.sweep_enabled = False
+        self.sweep_period = 0
+        self.sweep_negate = False
+        self.sweep_shift = 0
+        self.sweep_reload = False
+        self.sweep_divider = 0
+
+    def write(self, register, value):
+        if register == 0:
+            self.duty = value >> 6
+            self.halt = bool(value & 0x20)
+            self.constant_volume = bool(value & 0x10)
+            self.volume_period = value & 0x0F
+        elif register == 1:
+            self.sweep_enabled = bool(value & 0x80)
+            self.sweep_period = (value >> 4) & 0x07
+            self.sweep_negate = bool(value & 0x08)
+            self.sweep_shift = value & 0x07
+            self.sweep_reload = True
+        elif register == 2:
+            self.period = (self.period & 0x700) | value
+        else:
+            self.period = (self.period & 0xFF) | (value & 0x07) << 8
+            self.load_length(value)
+            self.position = 0
+            self.envelope_start = True
+
+    def __sweep_target(self):
+        change = self.period >> self.sweep_shift
+
+        if self.sweep_negate:
+            return self.period - change - (1 if self.ones_complement else 0)
+
+        return self.period + change
+
+    @property
+    def muted(self):
+        return self.length_counter == 0 or self.period < 8 or self.__sweep_target() > 0x7FF
+
+    def clock_sweep(self):
+        if (not self.sweep_divider and self.sweep_enabled and self.sweep_shift
+                and self.period >= 8 and self.__sweep_target() <= 0x7FF):
+            self.period = self.__sweep_target()
+
+        if not self.sweep_divider or self.sweep_reload:
+            self.sweep_divider = self.sweep_period
+            self.sweep_reload = False
+        else:
+            self.sweep_divider -= 1
+
+    def levels(self, start, end):
+        times, positions = self.sequence(start, end, 2 * (self.period + 1), 8)
+        volume = 0 if self.muted else self.volume
+        return times, DUTY_SEQUENCES[self.duty][positions] * volume
+
+
+class _Triangle(_Channel):
+
+    def __init__(self):
+        super(_Triangle, self).__init__()
+        self.output = int(TRIANGLE_SEQUENCE[0])
+        self.period = 0
+        self.linear_counter = 0
+        self.linear_reload_value = 0
+        self.linear_reload = False
+
+    def write(self, register, value):
+        if register == 0:
+            self.halt = bool(value & 0x80)
+            self.linear_reload_value = value & 0x7F
+        elif register == 2:
+            self.period = (self.period & 0x700) | value
+        elif register == 3:
+            self.period = (self.period & 0xFF) | (value & 0x07) << 8
+            self.load_length(value)
+            self.linear_reload = True
+
+    def clock_linear(self):
+        if self.linear_reload:
+            self.linear_counter = self.linear_reload_value
+        elif self.linear_counter:
+            self.linear_counter -= 1
+
+        # The length counter halt flag doubles as the linear counter's control flag
+        if not self.halt:
+            self.linear_reload = False
+
+    def levels(self, start, end):
+        # The sequence stops, holding its level, while either counter is zero. Periods below 2 are ultrasonic, so
+        # they're held too rather than drawn.
+        if self.length_counter == 0 or self.linear_counter == 0 or self.period < 2:
+            self.clock_times(start, end, self.period + 1)
+            return numpy.array([start]), TRIANGLE_SEQUENCE[[self.position]]
+
+        times, positions = self.sequence(start, end, self.period + 1, 32)
+        return times, TRIANGLE_SEQUENCE[positions]
+
+
+class _Noise(_Channel):
+
+    def __init__(self):
+        super(_Noise, self).__init__()
+        self.mode = 0
+        self.period_index = 0
+
+    def write(self, register, value):
+        if register == 0:
+            self.halt = bool(value & 0x20)
+            self.constant_volume = bool(value & 0x10)
+            self.volume_period = value & 0x0F
+        elif register == 2:
+            mode = value >> 7
+
+            if mode != self.mode:
+                # Carry on from the same shift register state in the other mode's sequence. The short sequence only
+                # covers a few states, so from any other state it starts over.
+                state = NOISE_SEQUENCES[self.mode][0][self.position]
+                self.position = max(int(NOISE_SEQUENCES[mode][1][state]), 0)
+                self.mode = mode
+
+            self.period_index = value & 0x0F
+        elif register == 3:
+            self.load_length(value)
+            self.envelope_start = True
+
+    def levels(self, start, end):
+        states = NOISE_SEQUENCES[self.mode][0]
+        times, positions = self.sequence(start, end, NOISE_PERIODS[self.period_index], len(states))
+        volume = 0 if self.length_counter == 0 else self.volume
+        return times, numpy.where(states[positions] & 0x01, 0, volume)
+
+
+class _Dmc(_Channel):
+
+    def __init__(self, memory):
+        super(_Dmc, self).__init__()
+        self.memory = memory
+        self.irq_enabled = False
+        self.irq = False
+        self.loop = False
+        self.rate_index = 0
+        self.level = 0
+        self.sample_address = 0xC000
+        self.sample_length = 1
+        self.current_address = 0xC000
+        self.bytes_remaining = 0
+        # Bits fetched but not played yet, oldest first
+        self.bits = numpy.empty(0, dtype=numpy.int64)
+
+    def write(self, register, value):
+        if register == 0:
+            self.irq_enabled = bool(value & 0x80)
+            self.loop = bool(value & 0x40)
+            self.rate_index = value & 0x0F
+
+            if not self.irq_enabled:
+                self.irq = False
+        elif register == 1:
+            self.level = value & 0x7F
+        elif register == 2:
+            self.sample_address = 0xC000 + value * 64
+        else:
+            self.sample_length = value * 16 + 1
+
+    def set_enabled(self, enabled):
+        if not enabled:
+            self.bytes_remaining = 0
+        elif self.bytes_remaining == 0:
+            self.restart()
+
+    def restart(self):
+        self.current_address = self.sample_address
+        self.bytes_remaining = self.sample_length
+
+    def __fetch_bits(self, count):
+        """
+        Read sample bytes from memory until there are count bits to play or the sample runs out.
+        """
+        sample_bytes = []
+
+        while len(self.bits) + 8 * len(sample_bytes) < count and self.bytes_remaining:
+            sample_bytes.append(self.memory.get_address(self.current_address))
+            # The sample address wraps from 0xFFFF to 0x8000
+            self.current_address = self.current_address + 1 if self.current_address < 0xFFFF else 0x8000
+            self.bytes_remaining -= 1
+
+            if self.bytes_remaining == 0:
+                if self.loop:
+                    self.restart()
+                elif self.irq_enabled:
+                    self.irq = True
+
+        if sample_bytes:
+            new_bits = numpy.unpackbits(numpy.array(sample_bytes, dtype=numpy.uint8), bitorder="little")
+            self.bits = numpy.concatenate((self.bits, new_bits))
+
+    def irq_cycle(self, start):
+        """
+        Predict the first CPU cycle after the sample's last byte is read, raising an IRQ.
+
+        Returns:
+            The cycle, or None if no IRQ is coming
+        """
+        if not self.irq_enabled or self.loop or not self.bytes_remaining:
+            return None
+
+        clocks = len(self.bits) + 8 * (self.bytes_remaining - 1)
+        return start + self.timer + clocks * DMC_RATES[self.rate_index] + 1
+
+    def levels(self, start, end):
+        times = self.clock_times(start, end, DMC_RATES[self.rate_index])
+        self.__fetch_bits(len(times))
+        played = self.bits[:len(times)]
+        self.bits = self.bits[len(played):]
+        # Once the sample runs out the level holds
+        times = times[:len(played)]
+        steps = numpy.where(played, 2, -2)
+        levels = self.level + numpy.cumsum(steps)
+
+        if len(levels) and (levels.min() < 0 or levels.max() > 127):
+            # Steps that would go past 0 or 127 are skipped, which a running sum can't do
+            level = self.level
+
+            for index, step in enumerate(steps):
+                if 0 <= level + step <= 127:
+                    level += step
+
+                levels[index] = level
+
+        start_level = self.level
+
+        if len(levels):
+            self.level = int(levels[-1])
+
+        return numpy.concatenate(([start], times)), numpy.concatenate(([start_level], levels))
+
+
+class Apu(object):
+    """
+    The APU's two pulse channels, triangle, noise and delta modulation channel (DMC), and the frame counter that clocks
+    their envelopes, sweeps and lengths.
+
+    The APU is kept to time by being told the CPU's cycle count with catch_up. It's a device the Scheduler can keep up
+    with the CPU, raising the frame counter and DMC IRQs:
+
+        apu = Apu(ram, WavWriter("out.wav"))
+        target_scheduler = Scheduler(target, ppu, [apu])
+        apu.map_into(target_scheduler)
+
+    Samples go to output as they're made, a block at a time. Call flush to have everything up to the last catch_up
+    made, such as before closing a WAV file.
+    """
+
+    def __init__(self, memory, output=None, sample_rate=SAMPLE_RATE):
+        """
+        Args:
+            memory: The NesMemory.NesMemory the DMC reads its samples from. It's needed even if the program never
+                    plays a sample, since the DMC can be started by any write to $4015.
+            output: Anything with a write method taking an array of float samples, such as a RingBuffer or
+                    WavWriter. None gives a RingBuffer holding a second of samples.
+            sample_rate: Samples per second
+        """
+        self.output = RingBuffer(sample_rate) if output is None else output
+        self.pulses = (_Pulse(ones_complement=True), _Pulse(ones_complement=False))
+        self.triangle = _Triangle()
+        self.noise = _Noise()
+        self.dmc = _Dmc(memory)
+        self.__channels = self.pulses + (self.triangle, self.noise, self.dmc)
+        self.__weights = (PULSE_WEIGHT, PULSE_WEIGHT, TRIANGLE_WEIGHT, NOISE_WEIGHT, DMC_WEIGHT)
+
+        # The CPU cycle the APU has been told it's up to, and the one it has made samples up to
+        self.cycles = 0
+        self.__synthesised_cycles = 0
+        # Register writes not synthesised yet, as (cycle, address, value)
+        self.__writes = []
+
+        self.__five_step = False
+        self.__irq_inhibit = False
+        self.__frame_irq = False
+        self.__frame_start = 0
+        self.__frame_step = 0
+
+        self.__samples_per_cycle = sample_rate / CPU_CLOCK
+        self.__sample_index = 0
+        # The triangle starts at the top of its sequence rather than 0
+        self.__level = TRIANGLE_WEIGHT * self.triangle.output
+        # Differences already drawn into samples that haven't been made yet
+        self.__carry = numpy.zeros(STEP_WIDTH + 1)
+        self.__step_times = []
+        self.__step_heights = []
+
+    def map_into(self, memory):
+        """
+        Map the APU's registers into the CPU's address space: 0x4000 to 0x4013, 0x4015 and 0x4017.
+
+        Args:
+            memory: A NesMemory.NesMemory, or a Scheduler.Scheduler to have the APU caught up before each access
+        """
+        memory.map_region(0x4000, 0x4013, write_func=self.write_register)
+        memory.map_region(0x4015, 0x4015, self.read_register, self.write_register)
+        # Reading 0x4017 reads the second controller
+        memory.map_region(0x4017, 0x4017, write_func=self.write_register)
+
+    @property
+    def irq(self):
+        """
+        True while the frame counter or DMC is asking for an IRQ
+        """
+        return self.__frame_irq or self.dmc.irq
+
+    def read_register(self, address):
+        """
+        Read $4015: which channels are still sounding and which IRQs are pending. Reading it clears the frame IRQ.
+        """
+        self.__synthesise(self.cycles)
+        status = 0x00
+
+        for bit, channel in enumerate(self.__channels[:4]):
+            if channel.length_counter:
+                status |= 1 << bit
+
+        if self.dmc.bytes_remaining:
+            status |= STATUS_DMC_ACTIVE
+
+        if self.__frame_irq:
+            status |= STATUS_FRAME_IRQ
+
+        if self.dmc.irq:
+            status |= STATUS_DMC_IRQ
+
+        self.__frame_irq = False
+        return status
+
+    def write_register(self, address, value):
+        """
+        Record a write to one of the APU's registers, to take effect at the current cycle.
+
+        Channel registers are left until the next block is made. $4010 to $4017 can change when the next IRQ is due,
+        so they're acted on straight away.
+        """
+        self.__writes.append((self.cycles, address, value))
+
+        if address >= 0x4010:
+            self.__synthesise(self.cycles)
+
+    def catch_up(self, cycles):
+        """
+        Move the APU on to a CPU cycle, making samples once a block's worth of cycles has passed or an IRQ is due.
+        """
+        self.cycles = cycles
+        next_event = self.next_event_cycle()
+
+        if cycles - self.__synthesised_cycles >= CYCLES_PER_BLOCK or (next_event is not None and cycles >= next_event):
+            self.__synthesise(cycles)
+
+    def next_event_cycle(self):
+        """
+        Predict the CPU cycle of the next IRQ, from the frame counter or the DMC.
+
+        Returns:
+            The cycle, or None if neither will raise one
+        """
+        event = None
+
+        if not self.__five_step and not self.__irq_inhibit and not self.__frame_irq:
+            # The IRQ is the four step sequence's last step, and __frame_start is the start of the sequence it's in
+            event = self.__frame_start + FOUR_STEP_SEQUENCE[-1][0]
+
+        if not self.dmc.irq:
+            dmc_event = self.dmc.irq_cycle(self.__synthesised_cycles)
+
+            if dmc_event is not None and (event is None or dmc_event < event):
+                event = dmc_event
+
+        return event
+
+    def flush(self):
+        """
+        Make every sample up to the cycle the APU was last caught up to.
+        """
+        self.__synthesise(self.cycles)
+
+    def __synthesise(self, end_cycles):
+        """
+        Play the channels from where they were left up to end_cycles, acting on the writes and frame counter steps
+        in between, and send the samples to output.
+        """
+        writes = self.__writes
+        write_index = 0
+
+        while True:
+            frame_cycle = self.__frame_start + self.__frame_sequence[self.__frame_step][0]
+            write_cycle = writes[write_index][0] if write_index < len(writes) else None
+
+            if write_cycle is not None and write_cycle <= frame_cycle and write_cycle <= end_cycles:
+                self.__play(write_cycle)
+                self.__write(*writes[write_index])
+                write_index += 1
+            elif frame_cycle <= end_cycles:
+                self.__play(frame_cycle)
+                self.__clock_frame_counter()
+            else:
+                break
+
+        del writes[:write_index]
+        self.__play(end_cycles)
+        self.__render(end_cycles)
+
+    @property
+    def __frame_sequence(self):
+        return FIVE_STEP_SEQUENCE if self.__five_step else FOUR_STEP_SEQUENCE
+
+    def __play(self, end_cycles):
+        """
+        Gather the steps in every channel's level from the last cycle played up to end_cycles.
+        """
+        start_cycles = self.__synthesised_cycles
+
+        if end_cycles <= start_cycles:
+            return
+
+        for channel, weight in zip(self.__channels, self.__weights):
+            times, levels = channel.levels(start_cycles, end_cycles)
+            heights = numpy.diff(levels, prepend=channel.output)
+            channel.output = int(levels[-1])
+            changed = heights != 0
+
+            if changed.any():
+                self.__step_times.append(times[changed])
+                self.__step_heights.append(heights[changed] * weight)
+
+        self.__synthesised_cycles = end_cycles
+
+    def __render(self, end_cycles):
+        """
+        Draw the gathered steps into samples up to end_cycles and send them to output.
+        """
+        end_sample = int(end_cycles * self.__samples_per_cycle)
+        n_samples = end_sample - self.__sample_index
+
+        if n_samples <= 0:
+            return
+
+        differences = numpy.zeros(n_samples + STEP_WIDTH + 1)
+        differences[:STEP_WIDTH + 1] = self.__carry
+
+        if self.__step_times:
+            positions = numpy.concatenate(self.__step_times) * self.__samples_per_cycle - self.__sample_index
+            heights = numpy.concatenate(self.__step_heights)
+            phases = numpy.floor(positions * STEP_PHASES).astype(numpy.int64)
+            # Add up the steps that start in the same sample at the same phase, then draw each sample's steps with one
+            # product against the step table. The noise channel can step several times a sample.
+            heights = numpy.bincount(phases, weights=heights, minlength=(n_samples + 1) * STEP_PHASES)
+            drawn = heights[:(n_samples + 1) * STEP_PHASES].reshape(n_samples + 1, STEP_PHASES).dot(STEP_TABLE)
+
+            for offset in range(STEP_WIDTH):
+                differences[offset:offset + n_samples + 1] += drawn[:, offset]
+            self.__step_times = []
+            self.__step_heights = []
+
+        output = self.__level + numpy.cumsum(differences[:n_samples])
+        self.__level = output[-1]
+        self.__carry = differences[n_samples:]
+        self.__sample_index = end_sample
+        self.output.write(output.astype(numpy.float32))
+
+    def __write(self, cycles, address, value):
+        if address < 0x4008:
+            self.pulses[(address >> 2) & 0x01].write(address & 0x03, value)
+        elif address < 0x400C:
+            self.triangle.write(address & 0x03, value)
+        elif address < 0x4010:
+            self.noise.write(address & 0x03, value)
+        elif address < 0x4014:
+            self.dmc.write(address & 0x03, value)
+        elif address == 0x4015:
+            for bit, channel in enumerate(self.__channels):
+                channel.set_enabled(bool(value & (1 << bit)))
+
+            self.dmc.irq = False
+        elif address == 0x4017:
+            self.__five_step = bool(value & 0x80)
+            self.__irq_inhibit = bool(value & 0x40)
+
+            if self.__irq_inhibit:
+                self.__frame_irq = False
+
+            self.__frame_start = cycles
+            self.__frame_step = 0
+
+            if self.__five_step:
+                self.__clock_channels(QUARTER_FRAME | HALF_FRAME)
+
+    def __clock_frame_counter(self):
+        sequence = self.__frame_sequence
+        clocks = sequence[self.__frame_step][1]
+        self.__clock_channels(clocks)
+
+        if clocks & FRAME_IRQ and not self.__irq_inhibit:
+            self.__frame_irq = True
+
+        self.__frame_step += 1
+
+        if self.__frame_step == len(sequence):
+            self.__frame_step = 0
+            self.__frame_start += FIVE_STEP_PERIOD if self.__five_step else FOUR_STEP_PERIOD
+
+    def __clock_channels(self, clocks):
+        if clocks & QUARTER_FRAME:
+            self.pulses[0].clock_envelope()
+            self.pulses[1].clock_envelope()
+            self.noise.clock_envelope()
+            self.triangle.clock_linear()
+
+        if clocks & HALF_FRAME:
+            for channel in self.__channels[:4]:
+                channel.clock_length()
+
+            self.pulses[0].clock_sweep()
+            self.pulses[1].clock_sweep()
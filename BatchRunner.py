@@ -0,0 +1,202 @@
+"""
+Run a suite of test ROMs headlessly, spread over a pool of worker processes, and report the results as JSON.
+
+Each ROM is run from its reset vector until it halts, reports a result or uses up its cycle budget. ROMs that follow
+the blargg test ROM convention report their result at 0x6000: 0x80 while running and then a result code, 0x00 for a
+pass, once the signature DE B0 61 is at 0x6001. ROMs that don't are reported as halted or timed out.
+
+Each ROM runs with a PPU kept up with the CPU by a Scheduler, as it would interactively, so ROMs that wait for vertical
+blank or NMIs run as they would on hardware, and the runner needs NumPy as the PPU does. There's no APU, so ROMs that
+wait on its frame counter or DMC time out.
+
+Run with: python BatchRunner.py roms/*.nes --output results.json
+"""
+import argparse
+import concurrent.futures
+import hashlib
+import json
+import sys
+
+import Chip6502 as chip
+import NesMemory as memory
+import NesRom as nes_rom
+import Ppu as ppu
+import Scheduler as scheduler
+
+DEFAULT_MAX_CYCLES = 50000000
+
+# How many cycles to run between checks of the result address
+CHECK_INTERVAL = 100000
+
+RESULT_ADDRESS = 0x6000
+RESULT_RUNNING = 0x80
+RESULT_SIGNATURE = bytes([0xDE, 0xB0, 0x61])
+
+PASSED = "passed"
+FAILED = "failed"
+HALTED = "halted"
+TIMEOUT = "timeout"
+ERROR = "error"
+
+# The machine a worker process reuses for every ROM it runs. See _reset_machine.
+_machine = None
+
+
+def _initialise_worker():
+    """
+    Build the machine a worker runs its ROMs on. The chip's dispatch tables are built when Chip6502 is imported, so
+    they're shared by every job the worker runs.
+    """
+    global _machine
+    ram = memory.NesMemory(0x10000)
+    target = chip.Chip6502(ram)
+    _machine = (target, target.snapshot(), ram.snapshot())
+
+
+def _reset_machine():
+    """
+    Put the worker's machine back to power-on, with nothing mapped, and return its chip.
+    """
+    if _machine is None:
+        _initialise_worker()
+
+    target, chip_state, memory_pages = _machine
+    target.memory.unmap_region(0x0000, 0xFFFF)
+    target.memory.restore(memory_pages)
+    target.restore(chip_state)
+    return target
+
+
+def _read_result(ram):
+    """
+    Get the result a blargg-style test ROM has reported, or None if it hasn't reported one.
+    """
+    signature = bytes(ram.get_address(RESULT_ADDRESS + offset) for offset in range(1, 4))
+
+    if signature != RESULT_SIGNATURE:
+        return None
+
+    result = ram.get_address(RESULT_ADDRESS)
+    return None if result == RESULT_RUNNING else result
+
+
+def run_rom(path, max_cycles=DEFAULT_MAX_CYCLES):
+    """
+    Run one ROM until it halts, reports a result or has run for max_cycles cycles.
+
+    Args:
+        path: The path to the ROM file
+        max_cycles: The cycle budget for the ROM
+
+    Returns:
+        A dict of the ROM's path, its status (passed, failed, halted, timeout or error), the final registers and cycle
+        count, the result code it reported and a SHA-256 hash of memory. A ROM that can't be loaded or that raises an
+        exception other than InvalidOpcodeException has the error status and the exception as its message.
+    """
+    result = {"rom": path, "status": ERROR, "result_code": None, "message": None}
+    target = _reset_machine()
+    ram = target.memory
+
+    try:
+        with nes_rom.NesRom.load(path) as rom:
+            rom.map_into(ram)
+            target.reset()
+            target_scheduler = scheduler.Scheduler(target, ppu.Ppu.for_rom(rom))
+
+            try:
+                while target.cycles < max_cycles and _read_result(ram) is None:
+                    target_scheduler.run_cycles(min(CHECK_INTERVAL, max_cycles - target.cycles))
+            except chip.InvalidOpcodeException as exception:
+                result["message"] = str(exception)
+
+            result["result_code"] = _read_result(ram)
+
+            if result["result_code"] is not None:
+                result["status"] = PASSED if result["result_code"] == 0x00 else FAILED
+            elif result["message"] is not None:
+                result["status"] = HALTED
+            else:
+                result["status"] = TIMEOUT
+
+            result.update(accumulator=target.accumulator,
+                          x_register=target.x_register,
+                          y_register=target.y_register,
+                          status_register=target.status,
+                          stack_pointer=target.stack_pointer,
+                          program_counter=target.program_counter,
+                          cycles=target.cycles,
+                          memory_hash=hashlib.sha256(ram.ram).hexdigest())
+    except (OSError, nes_rom.InvalidRomException, nes_rom.UnsupportedMapperException) as exception:
+        result["message"] = str(exception)
+    except Exception as exception:
+        # Anything else is a bug in the emulator or a file it couldn't cope with. Report it against this ROM rather
+        # than letting it take the rest of the batch's results down with it.
+        result["message"] = "{name}: {exception}".format(name=type(exception).__name__, exception=exception)
+
+    return result
+
+
+def _run_rom_job(job):
+    return run_rom(*job)
+
+
+def run_batch(paths, max_cycles=DEFAULT_MAX_CYCLES, workers=None):
+    """
+    Run every ROM in paths, spread over a pool of worker processes.
+
+    Each worker builds one machine and reuses it for every ROM it's given, so the cost of starting a worker is paid
+    once per process rather than once per ROM.
+
+    Args:
+        paths: The paths of the ROM files
+        max_cycles: The cycle budget for each ROM
+        workers: The number of worker processes. Defaults to the number of CPUs.
+
+    Returns:
+        A list of the results of run_rom, in the same order as paths
+    """
+    jobs = [(path, max_cycles) for path in paths]
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_initialise_worker) as executor:
+        return list(executor.map(_run_rom_job, jobs))
+
+
+def summarise(results):
+    """
+    Count the results with each status.
+
+    Returns:
+        A dict of status to count, with the total under "total"
+    """
+    summary = {status: 0 for status in [PASSED, FAILED, HALTED, TIMEOUT, ERROR]}
+
+    for result in results:
+        summary[result["status"]] += 1
+
+    summary["total"] = len(results)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run test ROMs headlessly and report the results as JSON.")
+    parser.add_argument("roms", nargs="+", help="The ROM files to run")
+    parser.add_argument("--max-cycles", type=int, default=DEFAULT_MAX_CYCLES, help="The cycle budget for each ROM")
+    parser.add_argument("--workers", type=int, default=None, help="The number of worker processes")
+    parser.add_argument("--output", help="The file to write the JSON results to, instead of standard output")
+    args = parser.parse_args(argv)
+
+    results = run_batch(args.roms, args.max_cycles, args.workers)
+    report = {"summary": summarise(results), "results": results}
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+
+    return 0 if report["summary"][PASSED] == report["summary"]["total"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
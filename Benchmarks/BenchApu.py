@@ -0,0 +1,78 @@
+"""
+Measure how fast the APU makes samples with every channel playing, against making one pulse channel's samples one at a
+time in Python.
+
+Run with: python -m Benchmarks.BenchApu
+"""
+import Apu as apu
+import NesMemory as memory
+import Benchmarks.BenchUtil as bench
+
+# Every channel playing, with the noise at its fastest and the DMC looping a sample at its fastest rate
+WRITES = [(0x4015, 0x1F), (0x4017, 0x40),
+          (0x4000, 0xBF), (0x4002, 0xFD), (0x4003, 0x08),
+          (0x4004, 0x7F), (0x4006, 0x7E), (0x4007, 0x08),
+          (0x4008, 0xFF), (0x400A, 0x7E), (0x400B, 0x08),
+          (0x400C, 0x3F), (0x400E, 0x00), (0x400F, 0x08),
+          (0x4010, 0x4F), (0x4012, 0x00), (0x4013, 0x10), (0x4015, 0x1F)]
+
+
+def make_busy_apu():
+    ram = memory.NesMemory(0x10000)
+
+    for address in range(0xC000, 0xC200):
+        ram.set_address(address, (address * 37) & 0xFF)
+
+    target = apu.Apu(ram)
+
+    for address, value in WRITES:
+        target.write_register(address, value)
+
+    return target
+
+
+def make_pulse_samples_one_at_a_time(n_samples, period=253):
+    """
+    Make a pulse channel's samples the straightforward way: run its timer a CPU cycle at a time.
+    """
+    samples = []
+    cycles_per_sample = apu.CPU_CLOCK / apu.SAMPLE_RATE
+    timer = period
+    position = 0
+    cycle = 0.0
+
+    for _ in range(n_samples):
+        cycle += cycles_per_sample
+
+        while cycle >= 1.0:
+            cycle -= 1.0
+
+            if timer == 0:
+                timer = 2 * (period + 1) - 1
+                position = (position + 1) % 8
+            else:
+                timer -= 1
+
+        samples.append(apu.DUTY_SEQUENCES[2][position] * 15 * apu.PULSE_WEIGHT)
+
+    return samples
+
+
+def main():
+    target = make_busy_apu()
+
+    def synthesise_frame():
+        target.catch_up(target.cycles + apu.CYCLES_PER_BLOCK)
+        target.output.read()
+
+    frame_time = bench.best_time(synthesise_frame, number=60)
+    bench.report_rate("Apu, all five channels", 1, frame_time, "frames")
+    print("  {speed:.0f}x real time".format(speed=(apu.CYCLES_PER_BLOCK / apu.CPU_CLOCK) / frame_time))
+
+    samples_per_frame = apu.SAMPLE_RATE // 60
+    loop_time = bench.best_time(lambda: make_pulse_samples_one_at_a_time(samples_per_frame), number=5)
+    bench.report_rate("One pulse channel, a CPU cycle at a time", 1, loop_time, "frames")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Compare running a program through BlockCache against interpreting it with Chip6502.run.
+
+Run with: python -m Benchmarks.BenchBlockCache
+"""
+import time
+
+import BlockCache as block_cache
+import Chip6502 as chip
+import NesMemory as memory
+import Benchmarks.BenchUtil as bench
+import Benchmarks.BenchChip6502 as bench_chip
+
+
+def measure_block_cache_throughput(seconds=2.0):
+    ram = memory.NesMemory(0x10000)
+    target = chip.Chip6502(ram)
+    cache = block_cache.BlockCache(target)
+    block_length = bench_chip.load_program(ram, 1000)
+
+    executed = 0
+    start = time.perf_counter()
+
+    while time.perf_counter() - start < seconds:
+        target.program_counter = bench_chip.PROGRAM_START
+        cache.run(block_length)
+        executed += block_length
+
+    return executed, time.perf_counter() - start, cache
+
+
+def main():
+    executed, elapsed = bench_chip.measure_throughput()
+    bench.report_rate("Chip6502.run", executed, elapsed, "instructions")
+
+    executed, elapsed, cache = measure_block_cache_throughput()
+    bench.report_rate("BlockCache.run", executed, elapsed, "instructions")
+    print("block cache: {hits} hits, {misses} misses, {rate:.1%} hit rate"
+          .format(hits=cache.hits, misses=cache.misses, rate=cache.hit_rate))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Measure a tight DEX/BNE loop, the shape of the delay and copy loops that dominate real ROMs.
+
+Run with: python -m Benchmarks.BenchBranchLoop
+"""
+import time
+
+import BlockCache as block_cache
+import Chip6502 as chip
+import NesMemory as memory
+import Benchmarks.BenchUtil as bench
+
+PROGRAM_START = 0x8000
+
+# An outer loop around 255 passes of DEX/BNE, so the program never runs out
+LOOP = [0xA2, 0xFF,        # outer: LDX #$FF
+        0xCA,              # inner: DEX
+        0xD0, 0xFD,        # BNE inner
+        0x4C, 0x00, 0x80]  # JMP outer
+
+
+def make_chip():
+    ram = memory.NesMemory(0x10000)
+
+    for offset, value in enumerate(LOOP):
+        ram.set_address(PROGRAM_START + offset, value)
+
+    target = chip.Chip6502(ram)
+    target.program_counter = PROGRAM_START
+    return target
+
+
+def measure(run_instructions, seconds=2.0):
+    executed = 0
+    start = time.perf_counter()
+
+    while time.perf_counter() - start < seconds:
+        run_instructions(10000)
+        executed += 10000
+
+    return executed, time.perf_counter() - start
+
+
+def main():
+    target = make_chip()
+    executed, elapsed = measure(target.run)
+    bench.report_rate("DEX/BNE loop, Chip6502.run", executed, elapsed, "instructions")
+    bench.report_rate("DEX/BNE loop, Chip6502.run (emulated)", target.cycles, elapsed, "cycles")
+
+    target = make_chip()
+    cache = block_cache.BlockCache(target)
+    executed, elapsed = measure(cache.run)
+    bench.report_rate("DEX/BNE loop, BlockCache.run", executed, elapsed, "instructions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Measure how many instructions per second Chip6502.run can execute.
+
+Run with: python -m Benchmarks.BenchChip6502
+"""
+import time
+
+import Chip6502 as chip
+import NesMemory as memory
+import Benchmarks.BenchUtil as bench
+
+PROGRAM_START = 0x8000
+
+# A straight-line mix of loads, stores, arithmetic and increments in several addressing modes.
+INSTRUCTION_MIX = [
+    [0xA9, 0x01],        # LDA #$01
+    [0x18],              # CLC
+    [0x65, 0x10],        # ADC $10
+    [0x9D, 0x00, 0x02],  # STA $0200,X
+    [0xE8],              # INX
+    [0xA4, 0x11],        # LDY $11
+    [0xB1, 0x20],        # LDA ($20),Y
+    [0xE6, 0x12],        # INC $12
+    [0x38],              # SEC
+    [0xE9, 0x01],        # SBC #$01
+    [0x8D, 0x00, 0x03],  # STA $0300
+    [0xCA],              # DEX
+]
+
+
+def load_program(ram, repeats):
+    """
+    Write INSTRUCTION_MIX into memory repeats times, starting at PROGRAM_START.
+
+    Returns:
+        The number of instructions written
+    """
+    address = PROGRAM_START
+
+    for _ in range(repeats):
+        for instruction in INSTRUCTION_MIX:
+            for value in instruction:
+                ram.set_address(address, value)
+                address += 1
+
+    return repeats * len(INSTRUCTION_MIX)
+
+
+def measure_throughput(seconds=2.0, ram=None):
+    """
+    Run INSTRUCTION_MIX for about the given number of seconds.
+
+    Args:
+        seconds: How long to run for
+        ram: The NesMemory to run in. A new one is made if this isn't given.
+
+    Returns:
+        A tuple of (the number of instructions executed, the time taken to execute them)
+    """
+    ram = ram or memory.NesMemory(0x10000)
+    target = chip.Chip6502(ram)
+    block_length = load_program(ram, 1000)
+
+    executed = 0
+    start = time.perf_counter()
+
+    while time.perf_counter() - start < seconds:
+        target.program_counter = PROGRAM_START
+        target.run(block_length)
+        executed += block_length
+
+    return executed, time.perf_counter() - start
+
+
+def main():
+    executed, elapsed = measure_throughput()
+    bench.report_rate("Chip6502.run, mixed instructions", executed, elapsed, "instructions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Measure what it costs to create a Chip6502 and how many Python calls each instruction makes.
+
+Fuzzing creates thousands of chips, so instantiation cost matters as much as the per-instruction cost.
+
+Run with: python -m Benchmarks.BenchChip6502Calls
+"""
+import sys
+
+import Chip6502 as chip
+import NesMemory as memory
+import Benchmarks.BenchUtil as bench
+
+
+def count_calls(func, *args):
+    """
+    Call func and count the Python-level calls it makes.
+
+    Returns:
+        A tuple of (the number of calls made, the deepest nesting of calls below func)
+    """
+    calls = 0
+    depth = 0
+    max_depth = 0
+
+    def profile(frame, event, arg):
+        nonlocal calls, depth, max_depth
+
+        if event == "call":
+            calls += 1
+            depth += 1
+            max_depth = max(max_depth, depth)
+        elif event == "return":
+            depth -= 1
+
+    sys.setprofile(profile)
+
+    try:
+        func(*args)
+    finally:
+        sys.setprofile(None)
+
+    # The outermost call is func itself
+    return calls - 1, max_depth - 1
+
+
+def main():
+    ram = memory.NesMemory(0x10000)
+    bench.report("Chip6502()", bench.best_time(lambda: chip.Chip6502(ram), number=10000))
+
+    target = chip.Chip6502(ram)
+    ram.set_address(0x10, 0x34)
+    ram.set_address(0x11, 0x02)
+
+    operations = [("lda_immediate", target.lda_immediate, (0x01,)),
+                  ("lda_absolute", target.lda_absolute, (0x10,)),
+                  ("lda_absolute_indexed", target.lda_absolute_indexed, (0x10, "X")),
+                  ("lda_absolute_x", target.lda_absolute_x, (0x10,)),
+                  ("sta_indexed_indirect", target.sta_indexed_indirect, (0x10,)),
+                  ("adc_immediate", target.adc_immediate, (0x01,)),
+                  ("adc_indirect_indexed", target.adc_indirect_indexed, (0x10,)),
+                  ("inc_absolute_indexed", target.inc_absolute_indexed, (0x10, "X")),
+                  ("inc_x_register", target.inc_x_register, ())]
+
+    for name, operation, args in operations:
+        calls, depth = count_calls(operation, *args)
+        seconds = bench.best_time(lambda: operation(*args), number=20000)
+        bench.report("{name}: {calls} calls, depth {depth}".format(name=name, calls=calls, depth=depth), seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Compare looking flags up in the precomputed tables in FlagTables against working them out with comparisons, and
+measure the instructions and Chip6502.run with each, using Chip6502.use_flag_tables to switch.
+
+A lookup is a few bytecodes shorter than the comparisons, but each instruction also makes two or three NesMemory calls,
+which cost several times more, so the end to end difference is small. The end to end runs alternate between the two
+modes so drift in the machine's speed doesn't favour either.
+
+Run with: python -m Benchmarks.BenchFlagTables
+"""
+import Chip6502 as chip
+import FlagTables as flag_tables
+import NesMemory as memory
+import Benchmarks.BenchUtil as bench
+import Benchmarks.BenchChip6502 as bench_chip
+
+REPEATS = 5
+
+
+def bench_flags():
+    values = list(range(0x100))
+    nz_flags = flag_tables.NZ_FLAGS
+    adc_results = flag_tables.ADC_RESULTS
+
+    def nz_comparisons():
+        for value in values:
+            (0x00 if value else 0x02) | (value & 0x80)
+
+    def nz_table():
+        for value in values:
+            nz_flags[value]
+
+    def adc_comparisons():
+        for value in values:
+            the_sum = 0x40 + value + 0x01
+            result = the_sum & 0xFF
+            ((the_sum > 0xFF) | (~(0x40 ^ value) & (0x40 ^ result) & 0x80) >> 1 | (0x00 if result else 0x02)
+             | (result & 0x80))
+
+    def adc_table():
+        for value in values:
+            adc_results[(0x01 << 16) | (0x40 << 8) | value]
+
+    return {"NZ flags": (bench.best_time(nz_comparisons, number=2000) / len(values),
+                         bench.best_time(nz_table, number=2000) / len(values)),
+            "ADC result and flags": (bench.best_time(adc_comparisons, number=2000) / len(values),
+                                     bench.best_time(adc_table, number=2000) / len(values))}
+
+
+def bench_instructions(target):
+    values = list(range(0x100))
+
+    def inc_dec():
+        for value in values:
+            target.inc_immediate(value)
+            target.dec_immediate(value)
+
+    def adc_sbc():
+        for value in values:
+            target.adc_immediate(value)
+            target.sbc_immediate(value)
+
+    return {"INC + DEC": bench.best_time(inc_dec, number=200) / len(values),
+            "ADC + SBC": bench.best_time(adc_sbc, number=200) / len(values)}
+
+
+def bench_run():
+    # The best of REPEATS runs in each mode, alternating between the modes
+    results = {False: [], True: []}
+
+    for _ in range(REPEATS):
+        for enabled in [False, True]:
+            chip.Chip6502.use_flag_tables(enabled)
+            results[enabled].append(bench_chip.measure_throughput(0.5))
+
+    return {enabled: max(runs, key=lambda result: result[0] / result[1]) for enabled, runs in results.items()}
+
+
+def main():
+    for name, (comparisons, table) in bench_flags().items():
+        bench.report(name + ", comparisons", comparisons)
+        bench.report(name + ", flag tables", table, comparisons)
+
+    target = chip.Chip6502(memory.NesMemory(0x10000))
+    results = {}
+
+    try:
+        for enabled in [False, True]:
+            chip.Chip6502.use_flag_tables(enabled)
+            results[enabled] = bench_instructions(target)
+
+        runs = bench_run()
+    finally:
+        chip.Chip6502.use_flag_tables(True)
+
+    for name, seconds in results[True].items():
+        bench.report(name + ", comparisons", results[False][name])
+        bench.report(name + ", flag tables", seconds, results[False][name])
+
+    for enabled in [False, True]:
+        executed, elapsed = runs[enabled]
+        bench.report_rate("Chip6502.run, " + ("flag tables" if enabled else "comparisons"), executed, elapsed,
+                          "instructions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Compare building indirect addressing pointers with NesMemory.read_word against the string-formatting code it replaced.
+
+Run with: python -m Benchmarks.BenchIndirectAddressing
+"""
+import Chip6502 as chip
+import NesMemory as memory
+import Benchmarks.BenchUtil as bench
+
+
+def combine_two_consecutive_address_values(ram, first_address):
+    """
+    The original pointer fetch, kept here as the baseline to measure against.
+    """
+    get_hex_digits = lambda hex_value: str(hex_value).split('x')[1].zfill(2)
+
+    address1 = ram.get_address(first_address)
+    address2 = ram.get_address(first_address + 0x01)
+    hex_address = "0x{first_digit}{second_digit}".format(first_digit=get_hex_digits(hex(address2)),
+                                                        second_digit=get_hex_digits(hex(address1)))
+    return int(hex_address, 0)
+
+
+def main():
+    ram = memory.NesMemory(0x10000)
+    pointers = list(range(0x00, 0xFE, 0x02))
+
+    for pointer in pointers:
+        ram.set_address(pointer, pointer)
+        ram.set_address(pointer + 1, 0x03)
+
+    def string_pointers():
+        for pointer in pointers:
+            ram.get_address(combine_two_consecutive_address_values(ram, pointer) + 0x01)
+
+    def read_word_pointers():
+        for pointer in pointers:
+            ram.get_address(ram.get_indirect_indexed_memory_address(pointer, 0x01))
+
+    string_time = bench.best_time(string_pointers, number=200) / len(pointers)
+    read_word_time = bench.best_time(read_word_pointers, number=200) / len(pointers)
+    bench.report("(indirect),Y load, string pointer", string_time)
+    bench.report("(indirect),Y load, read_word", read_word_time, string_time)
+
+    target = chip.Chip6502(ram)
+    target.y_register = 0x01
+
+    def lda_indirect_indexed():
+        for pointer in pointers:
+            target.lda_indirect_indexed(pointer)
+
+    def adc_indexed_indirect():
+        for pointer in pointers:
+            target.adc_indexed_indirect(pointer)
+
+    bench.report("lda_indirect_indexed", bench.best_time(lda_indirect_indexed, number=200) / len(pointers))
+    bench.report("adc_indexed_indirect", bench.best_time(adc_indexed_indirect, number=200) / len(pointers))
+
+
+if __name__ == "__main__":
+    main()
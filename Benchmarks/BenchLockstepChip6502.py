@@ -0,0 +1,53 @@
+"""
+Measure the aggregate instructions per second of LockstepChip6502 at several lane counts, against Chip6502.run.
+
+Run with: python -m Benchmarks.BenchLockstepChip6502
+"""
+import time
+
+import numpy
+
+import LockstepChip6502 as lockstep_chip
+import Benchmarks.BenchUtil as bench
+import Benchmarks.BenchChip6502 as bench_chip
+
+LANE_COUNTS = [1, 64, 1024, 4096]
+REPEATS = 100
+
+
+def measure_lockstep_throughput(n_lanes, seconds=2.0):
+    """
+    Run INSTRUCTION_MIX on n_lanes lanes, each with a different starting accumulator, for about the given number of
+    seconds.
+
+    Returns:
+        A tuple of (the number of instructions executed across all the lanes, the time taken to execute them)
+    """
+    target = lockstep_chip.LockstepChip6502(n_lanes)
+    program = [value for instruction in bench_chip.INSTRUCTION_MIX for value in instruction] * REPEATS
+    target.load_program(bench_chip.PROGRAM_START, program)
+    n_steps = len(bench_chip.INSTRUCTION_MIX) * REPEATS
+
+    executed = 0
+    start = time.perf_counter()
+
+    while time.perf_counter() - start < seconds:
+        target.program_counter[:] = bench_chip.PROGRAM_START
+        target.accumulator[:] = numpy.arange(n_lanes) & 0xFF
+        executed += target.run(n_steps)
+
+    return executed, time.perf_counter() - start
+
+
+def main():
+    executed, elapsed = bench_chip.measure_throughput()
+    bench.report_rate("Chip6502.run", executed, elapsed, "instructions")
+
+    for n_lanes in LANE_COUNTS:
+        executed, elapsed = measure_lockstep_throughput(n_lanes)
+        bench.report_rate("LockstepChip6502.run, {lanes} lanes".format(lanes=n_lanes), executed, elapsed,
+                          "instructions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Check that attaching devices with NesMemory.map_region doesn't slow down code that only touches plain RAM.
+
+Run with: python -m Benchmarks.BenchMemoryMap
+"""
+import NesMemory as memory
+import Benchmarks.BenchUtil as bench
+import Benchmarks.BenchChip6502 as bench_chip
+
+
+def attach_devices(ram):
+    """
+    Map stand-in PPU, APU/IO and cartridge devices where the NES has them.
+    """
+    registers = bytearray(0x20)
+
+    def read_register(address):
+        return registers[address & 0x1F]
+
+    def write_register(address, value):
+        registers[address & 0x1F] = value
+
+    ram.map_region(0x2000, 0x3FFF, lambda address: read_register(address & 0x07), write_register)
+    ram.map_region(0x4000, 0x401F, read_register, write_register)
+    ram.map_region(0x6000, 0x7FFF, write_func=write_register)
+
+
+def bench_ram_access(ram):
+    addresses = list(range(0x0000, 0x2000, 0x11)) + list(range(0x8000, 0x9000, 0x11))
+
+    def access():
+        for address in addresses:
+            ram.set_address(address, 0x42)
+            ram.get_address(address)
+
+    return bench.best_time(access, number=50) / len(addresses)
+
+
+def main():
+    plain = memory.NesMemory(0x10000)
+    with_devices = memory.NesMemory(0x10000)
+    attach_devices(with_devices)
+
+    plain_time = bench_ram_access(plain)
+    bench.report("RAM set_address + get_address, no devices", plain_time)
+    bench.report("RAM set_address + get_address, devices mapped", bench_ram_access(with_devices), plain_time)
+
+    for name, ram in [("no devices", plain), ("devices mapped", with_devices)]:
+        executed, elapsed = bench_chip.measure_throughput(ram=ram)
+        bench.report_rate("Chip6502.run, " + name, executed, elapsed, "instructions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Compare the bytearray-backed NesMemory against the list-backed implementation it replaced, and copying a page with
+write_block and read_block against a loop of set_address and get_address calls.
+
+Run with: python -m Benchmarks.BenchNesMemory
+"""
+import NesMemory as memory
+import Benchmarks.BenchUtil as bench
+
+
+class ListNesMemory(object):
+    """
+    The original list-backed memory, kept here as the baseline to measure against.
+    """
+
+    def __init__(self, memory_size):
+        self.memory_size = memory_size
+        self.ram = []
+
+        for i in range(self.memory_size):
+            self.ram.append(0x00)
+
+    def set_address(self, address, value):
+        address_should_be_mirrored_upward = lambda: 0x00 <= address <= 0x7FF
+        address_should_be_mirrored_downward = lambda: 0x801 <= address <= 0x2000
+
+        if value > 0xFF:
+            raise memory.MemorySlotOverflowException
+
+        self.ram[address] = value
+
+        if address_should_be_mirrored_upward(): self.ram[address + 0x801] = value
+        if address_should_be_mirrored_downward(): self.ram[address - 0x801] = value
+
+    def get_address(self, address):
+        return self.ram[address]
+
+
+def bench_construction(memory_class):
+    return bench.best_time(lambda: memory_class(0xFFFF), number=20)
+
+
+def bench_access(memory_class):
+    target = memory_class(0xFFFF)
+    set_address = target.set_address
+    get_address = target.get_address
+
+    # A mix of mirrored and unmirrored addresses, as a program touching zero page and ROM would produce.
+    addresses = [0x0010, 0x01FF, 0x0300, 0x0810, 0x8000, 0xC123] * 100
+
+    def access():
+        for address in addresses:
+            set_address(address, 0x42)
+            get_address(address)
+
+    return bench.best_time(access, number=20) / len(addresses)
+
+
+def bench_page_copy():
+    target = memory.NesMemory(0x10000)
+    page = bytes(range(0x100))
+    set_address = target.set_address
+    get_address = target.get_address
+
+    def copy_one_at_a_time():
+        for offset, value in enumerate(page):
+            set_address(0x0200 + offset, value)
+
+        return bytes(get_address(0x0200 + offset) for offset in range(0x100))
+
+    def copy_block():
+        target.write_block(0x0200, page)
+        return target.read_block(0x0200, 0x100)
+
+    return bench.best_time(copy_one_at_a_time, number=200), bench.best_time(copy_block, number=200)
+
+
+def main():
+    list_construction = bench_construction(ListNesMemory)
+    bytearray_construction = bench_construction(memory.NesMemory)
+    bench.report("construction, list", list_construction)
+    bench.report("construction, bytearray", bytearray_construction, list_construction)
+
+    list_access = bench_access(ListNesMemory)
+    bytearray_access = bench_access(memory.NesMemory)
+    bench.report("set_address + get_address, list", list_access)
+    bench.report("set_address + get_address, bytearray", bytearray_access, list_access)
+
+    loop_copy, block_copy = bench_page_copy()
+    bench.report("page write and read, set_address/get_address", loop_copy)
+    bench.report("page write and read, write_block/read_block", block_copy, loop_copy)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Measure how many frames per second the PPU renders headless, a whole frame at a time and a scanline at a time, and
+how often rendering finds its tiles already decoded.
+
+Run with: python -m Benchmarks.BenchPpu
+"""
+import numpy
+
+import Ppu as ppu
+import Benchmarks.BenchUtil as bench
+
+
+def make_busy_ppu(seed=0):
+    """
+    Make a PPU with random patterns, nametables and sprites, so every scanline has background and sprites to draw.
+    """
+    randomiser = numpy.random.RandomState(seed)
+    target = ppu.Ppu()
+    target.pattern_tables[:] = randomiser.randint(0, 0x100, 0x2000)
+    target.nametables[:] = randomiser.randint(0, 0x100, 0x1000)
+    target.oam[:] = randomiser.randint(0, 0x100, 0x100)
+    target.palette[:] = numpy.arange(0x20)
+    target.mask = ppu.MASK_BACKGROUND | ppu.MASK_SPRITES | ppu.MASK_LEFT_BACKGROUND | ppu.MASK_LEFT_SPRITES
+    return target
+
+
+def main():
+    target = make_busy_ppu()
+    frame_time = bench.best_time(target.run_frame, number=30)
+    bench.report_rate("Ppu.run_frame, background and sprites", 1, frame_time, "frames")
+
+    def run_frame_by_scanline():
+        for _ in range(ppu.SCANLINES_PER_FRAME):
+            target.run_scanlines(1)
+
+    scanline_time = bench.best_time(run_frame_by_scanline, number=5)
+    bench.report_rate("Ppu.run_scanlines(1) x 262", 1, scanline_time, "frames")
+
+    def run_frame_rewriting_a_tile():
+        # Games with CHR RAM rewrite a few tiles a frame, e.g. for animation
+        for address in range(0x0100, 0x0110):
+            target.write_vram(address, target.read_vram(address) ^ 0xFF)
+
+        target.run_frame()
+
+    rewrite_time = bench.best_time(run_frame_rewriting_a_tile, number=30)
+    bench.report_rate("Ppu.run_frame, one CHR RAM tile rewritten a frame", 1, rewrite_time, "frames")
+
+    cache = target.tile_cache
+    print("tile cache: {hits} hits, {misses} misses, {invalidations} invalidations, {rate:.1%} hit rate".format(
+        hits=cache.hits, misses=cache.misses, invalidations=cache.invalidations, rate=cache.hit_rate))
+
+    target.mask = ppu.MASK_BACKGROUND | ppu.MASK_LEFT_BACKGROUND
+    bench.report_rate("Ppu.run_frame, background only", 1, bench.best_time(target.run_frame, number=30), "frames")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""
+Measure Chip6502.run with the profiler in use and after it's stopped, to show that stopping it puts the unprofiled
+speed back, and print the profile.
+
+Run with: python -m Benchmarks.BenchProfiler
+"""
+import Profiler as profiler
+import Benchmarks.BenchUtil as bench
+import Benchmarks.BenchChip6502 as bench_chip
+
+
+def main():
+    executed, elapsed = bench_chip.measure_throughput()
+    bench.report_rate("Chip6502.run, never profiled", executed, elapsed, "instructions")
+
+    with profiler.Profiler() as instruction_profiler:
+        executed, elapsed = bench_chip.measure_throughput()
+        bench.report_rate("Chip6502.run, profiled", executed, elapsed, "instructions")
+
+    executed, elapsed = bench_chip.measure_throughput()
+    bench.report_rate("Chip6502.run, after profiling", executed, elapsed, "instructions")
+
+    print()
+    print(instruction_profiler.format_table(limit=10))
+
+
+if __name__ == "__main__":
+    main()
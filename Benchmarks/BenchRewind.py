@@ -0,0 +1,53 @@
+"""
+Measure the memory a rewind history of 600 frames takes, and how fast frames are recorded and rewound.
+
+Each frame runs a slice of the benchmark program, which writes a handful of zero page addresses, and also writes a
+few bytes of a sprite table and work RAM, roughly what a game changes in a frame.
+
+Run with: python -m Benchmarks.BenchRewind
+"""
+import time
+
+import Rewind as rewind
+import Benchmarks.BenchUtil as bench
+import Benchmarks.BenchSaveState as bench_save_state
+import Benchmarks.BenchChip6502 as bench_chip
+
+N_FRAMES = 600
+
+
+def run_frame(target, frame):
+    ram = target.memory
+    target.program_counter = bench_chip.PROGRAM_START
+    target.run(500)
+
+    for sprite in range(0, 0x100, 0x10):
+        ram.set_address(0x0200 + sprite, (frame + sprite) & 0xFF)
+
+    ram.set_address(0x6000 + (frame & 0xFF), frame & 0xFF)
+
+
+def main():
+    target = bench_save_state.make_machine()
+    buffer = rewind.RewindBuffer(target, max_frames=N_FRAMES)
+
+    record_seconds = 0.0
+
+    for frame in range(N_FRAMES + 1):
+        run_frame(target, frame)
+        start = time.perf_counter()
+        buffer.record()
+        record_seconds += time.perf_counter() - start
+
+    full_size = N_FRAMES * (len(target.snapshot()) + len(target.memory.ram))
+    print("{frames} frames of history: {size:,} bytes of deltas, against {full:,} for full snapshots"
+          .format(frames=len(buffer), size=buffer.size_bytes, full=full_size))
+    bench.report("RewindBuffer.record", record_seconds / (N_FRAMES + 1))
+
+    start = time.perf_counter()
+    rewound = buffer.rewind(N_FRAMES)
+    bench.report("RewindBuffer.rewind (per frame)", (time.perf_counter() - start) / rewound)
+
+
+if __name__ == "__main__":
+    main()
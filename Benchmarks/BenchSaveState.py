@@ -0,0 +1,66 @@
+"""
+Measure how fast save states can be taken and restored, and how much memory a run of them uses.
+
+Each save state is taken after running a slice of the benchmark program, which writes a handful of zero page
+addresses, so most pages are shared with the previous save state.
+
+Run with: python -m Benchmarks.BenchSaveState
+"""
+import copy
+
+import Chip6502 as chip
+import NesMemory as memory
+import SaveState as save_state
+import Benchmarks.BenchUtil as bench
+import Benchmarks.BenchChip6502 as bench_chip
+
+N_SAVE_STATES = 1000
+
+
+def make_machine():
+    ram = memory.NesMemory(0x10000)
+    target = chip.Chip6502(ram)
+    bench_chip.load_program(ram, 100)
+    target.program_counter = bench_chip.PROGRAM_START
+    return target
+
+
+def take_save_states(target, count, instructions_between):
+    save_states = []
+
+    for _ in range(count):
+        target.run(instructions_between)
+        target.program_counter = bench_chip.PROGRAM_START
+        save_states.append(save_state.SaveState.take(target))
+
+    return save_states
+
+
+def bytes_per_save_state(save_states):
+    """
+    Work out the average memory used per save state, counting each shared page once.
+    """
+    unique_pages = {id(page): len(page) for state in save_states for page in state.memory_pages}
+    page_tuples = sum(len(state.memory_pages) * 8 for state in save_states)
+    cpu_states = sum(len(state.cpu_state) for state in save_states)
+
+    return (sum(unique_pages.values()) + page_tuples + cpu_states) / len(save_states)
+
+
+def main():
+    target = make_machine()
+    ram = target.memory
+
+    state = save_state.SaveState.take(target)
+    bench.report("deepcopy of the bytearray", bench.best_time(lambda: copy.deepcopy(ram.ram.obj), 100))
+    bench.report("SaveState.take", bench.best_time(lambda: save_state.SaveState.take(target), 100))
+    bench.report("SaveState.restore_into", bench.best_time(lambda: state.restore_into(target), 100))
+    bench.report("SaveState.to_bytes", bench.best_time(state.to_bytes, 100))
+
+    save_states = take_save_states(target, N_SAVE_STATES, 50)
+    print("{count} save states: {size:,.0f} bytes each, against {full:,} for a full copy"
+          .format(count=N_SAVE_STATES, size=bytes_per_save_state(save_states), full=len(state.to_bytes())))
+
+
+if __name__ == "__main__":
+    main()
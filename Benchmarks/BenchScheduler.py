@@ -0,0 +1,117 @@
+"""
+Compare running the PPU after every instruction with letting the Scheduler catch it up only when it's needed.
+
+Both run a loop that spends the frame counting and an NMI handler that reads PPUSTATUS and writes the scroll, with the
+background and sprites switched on. The rendering is the same for both, so the difference is the cost of keeping the
+PPU in step.
+
+Run with: python -m Benchmarks.BenchScheduler
+"""
+import time
+
+import Chip6502 as chip
+import NesMemory as memory
+import Ppu as ppu
+import Scheduler as scheduler
+import Benchmarks.BenchPpu as bench_ppu
+import Benchmarks.BenchUtil as bench
+
+PROGRAM_START = 0x8000
+NMI_HANDLER = 0x9000
+
+PROGRAM = [0xA9, 0x80,        # LDA #$80
+           0x8D, 0x00, 0x20,  # STA $2000
+           0xE8,              # loop: INX
+           0xC8,              # INY
+           0x65, 0x00,        # ADC $00
+           0x4C, 0x05, 0x80]  # JMP loop
+
+NMI_PROGRAM = [0xE6, 0x10,        # INC $10
+               0xAD, 0x02, 0x20,  # LDA $2002
+               0xA5, 0x10,        # LDA $10
+               0x8D, 0x05, 0x20,  # STA $2005
+               0x8D, 0x05, 0x20,  # STA $2005
+               0x40]              # RTI
+
+
+def make_machine():
+    ram = memory.NesMemory(0x10000)
+
+    for offset, value in enumerate(PROGRAM):
+        ram.set_address(PROGRAM_START + offset, value)
+
+    for offset, value in enumerate(NMI_PROGRAM):
+        ram.set_address(NMI_HANDLER + offset, value)
+
+    ram.set_address(chip.NMI_VECTOR, NMI_HANDLER & 0xFF)
+    ram.set_address(chip.NMI_VECTOR + 1, NMI_HANDLER >> 8)
+
+    target = chip.Chip6502(ram)
+    target.program_counter = PROGRAM_START
+    return target, bench_ppu.make_busy_ppu()
+
+
+def run_lockstep_frames(n_frames):
+    """
+    Run the PPU after every instruction for n_frames frames.
+
+    Returns:
+        The number of times the PPU was brought up to date
+    """
+    target, target_ppu = make_machine()
+    nmis = []
+    target_ppu.nmi_func = lambda: nmis.append(True)
+    target_ppu.map_into(target.memory)
+    line_end_dot = ppu.DOTS_PER_SCANLINE
+    syncs = 0
+
+    while target_ppu.frame_count < n_frames:
+        if nmis:
+            nmis.pop()
+            target.nmi()
+
+        target.step()
+        syncs += 1
+
+        while target.cycles * 3 >= line_end_dot:
+            target_ppu.run_scanlines(1)
+            line_end_dot += ppu.DOTS_PER_SCANLINE
+
+    return syncs
+
+
+def run_scheduled_frames(n_frames):
+    """
+    Run the Scheduler for n_frames frames.
+
+    Returns:
+        The number of times the PPU was brought up to date
+    """
+    target, target_ppu = make_machine()
+    target_scheduler = scheduler.Scheduler(target, target_ppu)
+
+    for _ in range(n_frames):
+        target_scheduler.run_frame()
+
+    return target_scheduler.syncs
+
+
+def main():
+    n_frames = 30
+
+    start = time.perf_counter()
+    syncs = run_lockstep_frames(n_frames)
+    lockstep_time = (time.perf_counter() - start) / n_frames
+    bench.report_rate("PPU run after every instruction", 1, lockstep_time, "frames")
+    print("  {syncs:,.0f} syncs/frame".format(syncs=syncs / n_frames))
+
+    start = time.perf_counter()
+    syncs = run_scheduled_frames(n_frames)
+    scheduled_time = (time.perf_counter() - start) / n_frames
+    bench.report_rate("Scheduler.run_frame", 1, scheduled_time, "frames")
+    print("  {syncs:,.1f} syncs/frame".format(syncs=syncs / n_frames))
+    bench.report("Scheduler frame time", scheduled_time, lockstep_time)
+
+
+if __name__ == "__main__":
+    main()
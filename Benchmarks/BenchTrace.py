@@ -0,0 +1,70 @@
+"""
+Compare the cost of tracing with TraceRecorder against writing a text line per instruction.
+
+Run with: python -m Benchmarks.BenchTrace
+"""
+import os
+import tempfile
+import time
+
+import Chip6502 as chip
+import NesMemory as memory
+import Trace as trace
+import Benchmarks.BenchUtil as bench
+import Benchmarks.BenchChip6502 as bench_chip
+
+REPEATS = 1000
+
+
+def make_chip():
+    ram = memory.NesMemory(0x10000)
+    target = chip.Chip6502(ram)
+    return target, bench_chip.load_program(ram, REPEATS)
+
+
+def run_untraced(target, n_instructions):
+    target.run(n_instructions)
+
+
+def run_with_text_trace(target, n_instructions, trace_file):
+    for _ in range(n_instructions):
+        record = trace.TraceRecord(target.program_counter, target.memory.get_address(target.program_counter),
+                                   target.accumulator, target.x_register, target.y_register, target.status,
+                                   target.stack_pointer, target.cycles)
+        trace_file.write(trace.format_nestest(record) + "\n")
+        target.step()
+
+
+def measure(run_program, seconds=2.0):
+    target, n_instructions = make_chip()
+    executed = 0
+    start = time.perf_counter()
+
+    while time.perf_counter() - start < seconds:
+        target.program_counter = bench_chip.PROGRAM_START
+        run_program(target, n_instructions)
+        executed += n_instructions
+
+    return executed, time.perf_counter() - start
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        executed, elapsed = measure(run_untraced)
+        bench.report_rate("Chip6502.run, untraced", executed, elapsed, "instructions")
+
+        with open(os.path.join(directory, "trace.log"), "w") as trace_file:
+            executed, elapsed = measure(lambda target, n: run_with_text_trace(target, n, trace_file))
+            bench.report_rate("text line per instruction", executed, elapsed, "instructions")
+
+        with open(os.path.join(directory, "trace.bin"), "wb") as trace_file:
+            def run_with_binary_trace(target, n_instructions):
+                with trace.TraceRecorder(target, trace_file) as recorder:
+                    recorder.run(n_instructions)
+
+            executed, elapsed = measure(run_with_binary_trace)
+            bench.report_rate("TraceRecorder.run", executed, elapsed, "instructions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import timeit
+
+
+def best_time(func, number, repeat=5):
+    """
+    Time func and return the best per-call time in seconds.
+
+    The best of several runs is used because slower runs are usually caused by something else on the machine rather
+    than by the code being measured.
+
+    Args:
+        func: A function taking no arguments
+        number: How many times to call func per run
+        repeat: How many runs to make
+
+    Returns:
+        The per-call time of the fastest run, in seconds
+    """
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def report(name, seconds, baseline_seconds=None):
+    """
+    Print one line of benchmark results.
+
+    Args:
+        name: What was measured
+        seconds: The per-call time in seconds
+        baseline_seconds: If given, the per-call time to compare against
+    """
+    line = "{name:<48} {usec:>12.3f} us".format(name=name, usec=seconds * 1e6)
+
+    if baseline_seconds is not None:
+        line += "  ({speedup:.1f}x)".format(speedup=baseline_seconds / seconds)
+
+    print(line)
+
+
+def report_rate(name, count, seconds, unit="ops"):
+    """
+    Print one line of throughput results.
+
+    Args:
+        name: What was measured
+        count: How many things were done
+        seconds: How long doing them took
+        unit: What the things are called
+    """
+    print("{name:<48} {rate:>12,.0f} {unit}/s".format(name=name, rate=count / seconds, unit=unit))
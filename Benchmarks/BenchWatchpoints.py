@@ -0,0 +1,54 @@
+"""
+Measure Chip6502.run with no watchpoints, with watchpoints on pages the program doesn't touch and with watchpoints on
+pages it does. Each is the best of several short runs, as throughput on a busy machine is noisy.
+
+Run with: python -m Benchmarks.BenchWatchpoints
+"""
+import Chip6502 as chip
+import NesMemory as memory
+import Watchpoints as watchpoints
+import Benchmarks.BenchUtil as bench
+import Benchmarks.BenchChip6502 as bench_chip
+
+REPEATS = 5
+
+
+def ignore(*args):
+    pass
+
+
+def measure(name, set_watchpoints, baseline_rate=None):
+    ram = memory.NesMemory(0x10000)
+    target = chip.Chip6502(ram)
+    set_watchpoints(watchpoints.Watchpoints(target))
+
+    executed, elapsed = max((bench_chip.measure_throughput(0.5, ram) for _ in range(REPEATS)),
+                            key=lambda result: result[0] / result[1])
+    bench.report_rate(name, executed, elapsed, "instructions")
+
+    if baseline_rate is not None:
+        print("{name:<48} {ratio:>12.2f}x baseline".format(name="", ratio=executed / elapsed / baseline_rate))
+
+    return executed / elapsed
+
+
+def main():
+    baseline_rate = measure("no watchpoints (baseline)", ignore)
+
+    def set_and_clear(target):
+        target.watch_reads(0x0000, 0x00FF, ignore)
+        target.watch_execution(0x8000, 0x80FF, ignore)
+        target.clear()
+
+    measure("watchpoints set then cleared", set_and_clear, baseline_rate)
+    measure("read/write watchpoints on unused pages",
+            lambda target: (target.watch_reads(0x6000, 0x60FF, ignore), target.watch_writes(0x6000, 0x60FF, ignore)),
+            baseline_rate)
+    measure("read watchpoint on the zero page", lambda target: target.watch_reads(0x0010, 0x0010, ignore),
+            baseline_rate)
+    measure("execution watchpoint on an unused page", lambda target: target.watch_execution(0xF000, 0xF0FF, ignore),
+            baseline_rate)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+import Chip6502 as chip
+import OpcodeTable as op
+
+# Instructions that can move the program counter somewhere other than the next instruction. A block ends after one.
+BLOCK_ENDING_OPCODES = frozenset(opcode for opcode, instruction in op.OPCODES.items()
+                                 if instruction.mode == op.RELATIVE
+                                 or instruction.mnemonic in ("BRK", "JMP", "JSR", "RTI", "RTS"))
+
+MAX_BLOCK_LENGTH = 32
+
+
+class BlockCache(object):
+    """
+    Runs a Chip6502 a basic block at a time instead of an instruction at a time.
+
+    A basic block is a straight run of instructions ending at a branch or jump. The first time a block's start address
+    is reached its instructions are decoded and compiled into a single Python function that calls each instruction's
+    handler in turn. The function is cached by start address, so the next time the block runs there are no opcode
+    fetches or dispatch table lookups.
+
+    Writes to RAM holding a cached block remove it from the cache, so self-modifying code is retranslated. A block
+    that modifies its own later instructions will still run the old instructions until it finishes. Pages with a
+    device handling their writes, such as PRG ROM, aren't watched, since writes there don't change the code; call clear
+    when a mapper switches the bank under them.
+
+    Blocks don't fetch their opcodes, so code on pages with an execution watch is stepped an instruction at a time
+    instead, and so is everything while Chip6502's profiler is in use. Adding or removing a device or watch anywhere
+    drops every cached block, since the blocks' own write watches may have gone with it.
+    """
+
+    def __init__(self, target):
+        """
+        Args:
+            target: The Chip6502 to run
+        """
+        self.__chip = target
+        self.__memory = target.memory
+        self.__blocks = {}
+        self.__blocks_by_page = {}
+        self.__watched_pages = set()
+        # The memory's watch_version the blocks were translated against, and the pages with execution watches and
+        # write devices then
+        self.__watch_version = None
+        self.__execution_watched_pages = frozenset()
+        self.__write_device_pages = frozenset()
+        # Kept so the same function can be given to remove_watch
+        self.__invalidate_func = self.__invalidate
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def run(self, n_instructions):
+        """
+        Execute n_instructions instructions, starting at the program counter.
+
+        Whole blocks are run while they fit in the instructions left. The remainder is stepped one instruction at a
+        time, so this executes exactly n_instructions, the same as Chip6502.run.
+
+        Args:
+            n_instructions: The number of instructions to execute
+        """
+        target = self.__chip
+
+        if target.profiler is not None:
+            target.run(n_instructions)
+            return
+
+        memory = self.__memory
+        blocks = self.__blocks
+
+        while n_instructions > 0:
+            if memory.watch_version != self.__watch_version:
+                self.__reset_watches()
+
+            block = blocks.get(target.program_counter)
+
+            if block is None:
+                block = self.__translate(target.program_counter)
+            else:
+                self.hits += 1
+
+            if block is None or block.instruction_count > n_instructions:
+                target.step()
+                n_instructions -= 1
+            else:
+                block(target)
+                n_instructions -= block.instruction_count
+
+    def run_cycles(self, n_cycles):
+        """
+        Execute whole blocks until at least n_cycles cycles have passed.
+
+        Args:
+            n_cycles: The number of cycles to run for
+
+        Returns:
+            The number of cycles that were actually run
+        """
+        target = self.__chip
+
+        if target.profiler is not None:
+            return target.run_cycles(n_cycles)
+
+        memory = self.__memory
+        blocks = self.__blocks
+        start_cycles = target.cycles
+        end_cycles = start_cycles + n_cycles
+
+        while target.cycles < end_cycles:
+            if memory.watch_version != self.__watch_version:
+                self.__reset_watches()
+
+            block = blocks.get(target.program_counter)
+
+            if block is None:
+                block = self.__translate(target.program_counter)
+            else:
+                self.hits += 1
+
+            if block is None:
+                target.step()
+            else:
+                block(target)
+
+        return target.cycles - start_cycles
+
+    def clear(self):
+        """
+        Drop every cached block. Call this after changing code without writing through NesMemory, such as switching
+        ROM banks.
+        """
+        self.__blocks.clear()
+        self.__blocks_by_page.clear()
+
+    @property
+    def hit_rate(self):
+        """
+        The fraction of block lookups that found a cached block
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __translate(self, start_address):
+        """
+        Decode and compile the block starting at start_address, and cache it.
+
+        Returns:
+            The compiled block, or None if the instruction at start_address isn't valid or has an execution watch on it
+        """
+        self.misses += 1
+        get_address = self.__memory.get_address
+        decode_opcode = chip.Chip6502.decode_opcode
+        execution_watched_pages = self.__execution_watched_pages
+
+        handlers = []
+        pages = set()
+        source = ["def block(chip):"]
+        address = start_address
+        total_cycles = 0
+
+        while len(handlers) < MAX_BLOCK_LENGTH:
+            if address >> 8 in execution_watched_pages:
+                break
+
+            opcode = get_address(address)
+            decoded = decode_opcode(opcode)
+
+            if decoded is None:
+                break
+
+            handler, length, cycles = decoded
+            source.append("    chip.program_counter = {operand_address}".format(operand_address=(address + 1) & 0xFFFF))
+            source.append("    handler_{index}(chip)".format(index=len(handlers)))
+            handlers.append(handler)
+            pages.update({address >> 8, ((address + length - 1) & 0xFFFF) >> 8})
+            total_cycles += cycles
+            address = (address + length) & 0xFFFF
+
+            if opcode in BLOCK_ENDING_OPCODES:
+                break
+
+        if not handlers:
+            return None
+
+        # Cycles are added up front, as step adds them before running the handler.
+        source.insert(1, "    chip.cycles += {cycles}".format(cycles=total_cycles))
+
+        namespace = {"handler_{index}".format(index=index): handler for index, handler in enumerate(handlers)}
+        exec(compile("\n".join(source), "<block {address}>".format(address=hex(start_address)), "exec"), namespace)
+
+        block = namespace["block"]
+        block.instruction_count = len(handlers)
+        self.__blocks[start_address] = block
+
+        for page in pages:
+            self.__blocks_by_page.setdefault(self.__canonical_page(page), set()).add(start_address)
+            self.__watch_page(page)
+
+        return block
+
+    def __watch_page(self, page):
+        canonical_page = self.__canonical_page(page)
+
+        if canonical_page not in self.__watched_pages and page not in self.__write_device_pages:
+            self.__watched_pages.add(canonical_page)
+            self.__memory.watch_writes(page << 8, (page << 8) | 0xFF, self.__invalidate_func)
+            self.__watch_version = self.__memory.watch_version
+
+    def __reset_watches(self):
+        """
+        Drop every block and write watch, and note which pages have execution watches or write devices, after the
+        memory's devices or watches have changed.
+        """
+        memory = self.__memory
+        memory.remove_watch(self.__invalidate_func)
+        self.clear()
+        self.__watched_pages.clear()
+        self.__execution_watched_pages = memory.execution_watched_pages()
+        self.__write_device_pages = memory.write_device_pages()
+        self.__watch_version = memory.watch_version
+
+    def __invalidate(self, address, value):
+        start_addresses = self.__blocks_by_page.pop(self.__canonical_page(address >> 8), None)
+
+        if start_addresses:
+            for start_address in start_addresses:
+                if self.__blocks.pop(start_address, None) is not None:
+                    self.invalidations += 1
+
+    def __canonical_page(self, page):
+        # Internal RAM is mirrored every 0x800 bytes, so its mirrored pages hold the same code
+        if page < 0x20:
+            return page & 0x07
+
+        return page
@@ -1,80 +1,530 @@
+import linecache
+import re
+import struct
+import textwrap
+import time
+
+import FlagTables as flag_tables
+import OpcodeTable as op
+
+
+def _build_opcode_tables(opcodes):
+    """
+    Build the 256-entry tables that step uses to go from an opcode byte to the function that executes it, the
+    instruction's length and the number of cycles it takes.
+
+    This runs once, when the Chip6502 class is created, so every chip shares the tables.
+
+    Args:
+        opcodes: A dict of opcode byte to a tuple of (a function taking the chip, the instruction's length in bytes,
+                 the instruction's base cycle count)
+
+    Returns:
+        A tuple of (the dispatch table, the length table, the cycle table), all lists indexed by opcode. Opcodes that
+        aren't in opcodes raise InvalidOpcodeException and have a length of 0.
+    """
+    def invalid_opcode(chip):
+        raise InvalidOpcodeException("Invalid opcode {opcode} at {address}"
+                                     .format(opcode=hex(chip.memory.get_address((chip.program_counter - 1) & 0xFFFF)),
+                                             address=hex((chip.program_counter - 1) & 0xFFFF)))
+
+    dispatch_table = [invalid_opcode] * 0x100
+    length_table = [0] * 0x100
+    cycle_table = [0] * 0x100
+
+    for opcode, (handler, length, cycles) in opcodes.items():
+        dispatch_table[opcode] = handler
+        length_table[opcode] = length
+        cycle_table[opcode] = cycles
+
+    return dispatch_table, length_table, cycle_table
+
+
+# The addresses the 6502 reads its interrupt handlers' addresses from
+NMI_VECTOR = 0xFFFA
+RESET_VECTOR = 0xFFFC
+IRQ_VECTOR = 0xFFFE
+
+
+# The opcode handlers are generated from OpcodeTable when this module is imported, so each opcode gets a function that
+# does exactly the work its instruction and addressing mode need, with no calls between them. The templates below are
+# written as the body of a Chip6502 method. Private attributes are spelled self.__name and mangled when a handler is
+# compiled, because the handlers are compiled outside the class. NZ(value) stands for the zero and negative flags of
+# value, worked out the way the chip's flag mode says.
+
+# Work out the address an instruction operates on, moving the program counter past the operand
+_ADDRESS_TEMPLATES = {
+    op.ZERO_PAGE: """
+        address = ram.get_address(self.program_counter)
+        self.program_counter = (self.program_counter + 1) & 0xFFFF
+    """,
+    op.ZERO_PAGE_X: """
+        address = (ram.get_address(self.program_counter) + self.__x_register) & 0xFF
+        self.program_counter = (self.program_counter + 1) & 0xFFFF
+    """,
+    op.ZERO_PAGE_Y: """
+        address = (ram.get_address(self.program_counter) + self.__y_register) & 0xFF
+        self.program_counter = (self.program_counter + 1) & 0xFFFF
+    """,
+    op.ABSOLUTE: """
+        address = ram.read_word(self.program_counter)
+        self.program_counter = (self.program_counter + 2) & 0xFFFF
+    """,
+    op.ABSOLUTE_X: """
+        base_address = ram.read_word(self.program_counter)
+        self.program_counter = (self.program_counter + 2) & 0xFFFF
+        address = (base_address + self.__x_register) & 0xFFFF
+    """,
+    op.ABSOLUTE_Y: """
+        base_address = ram.read_word(self.program_counter)
+        self.program_counter = (self.program_counter + 2) & 0xFFFF
+        address = (base_address + self.__y_register) & 0xFFFF
+    """,
+    # The 6502 doesn't carry into the pointer's high byte, so JMP ($10FF) reads its high byte from 0x1000
+    op.INDIRECT: """
+        pointer = ram.read_word(self.program_counter)
+        self.program_counter = (self.program_counter + 2) & 0xFFFF
+        address = ram.get_address(pointer) | ram.get_address((pointer & 0xFF00) | ((pointer + 1) & 0xFF)) << 8
+    """,
+    op.INDEXED_INDIRECT: """
+        address = ram.read_word((ram.get_address(self.program_counter) + self.__x_register) & 0xFF)
+        self.program_counter = (self.program_counter + 1) & 0xFFFF
+    """,
+    op.INDIRECT_INDEXED: """
+        base_address = ram.read_word(ram.get_address(self.program_counter))
+        self.program_counter = (self.program_counter + 1) & 0xFFFF
+        address = (base_address + self.__y_register) & 0xFFFF
+    """,
+}
+
+# Added after the address of instructions that take an extra cycle when indexing crosses a page
+_PAGE_CROSSING_TEMPLATE = """
+    if (base_address ^ address) & 0xFF00:
+        self.cycles += 1
+"""
+
+_IMMEDIATE_VALUE_TEMPLATE = """
+    value = ram.get_address(self.program_counter)
+    self.program_counter = (self.program_counter + 1) & 0xFFFF
+"""
+
+_ADDRESS_VALUE_TEMPLATE = """
+    value = ram.get_address(address)
+"""
+
+# Instructions that read a value from their operand
+_READ_TEMPLATES = {
+    "LDA": """
+        self.__accumulator = value
+        self.__status = (self.__status & 0x7D) | NZ(value)
+    """,
+    "LDX": """
+        self.__x_register = value
+        self.__status = (self.__status & 0x7D) | NZ(value)
+    """,
+    "LDY": """
+        self.__y_register = value
+        self.__status = (self.__status & 0x7D) | NZ(value)
+    """,
+    "AND": """
+        value &= self.__accumulator
+        self.__accumulator = value
+        self.__status = (self.__status & 0x7D) | NZ(value)
+    """,
+    "ORA": """
+        value |= self.__accumulator
+        self.__accumulator = value
+        self.__status = (self.__status & 0x7D) | NZ(value)
+    """,
+    "EOR": """
+        value ^= self.__accumulator
+        self.__accumulator = value
+        self.__status = (self.__status & 0x7D) | NZ(value)
+    """,
+    # The compares set the carry flag when the register is at least the value. 0x7C clears the carry too.
+    "CMP": """
+        result = (self.__accumulator - value) & 0xFF
+        self.__status = (self.__status & 0x7C) | (self.__accumulator >= value) | NZ(result)
+    """,
+    "CPX": """
+        result = (self.__x_register - value) & 0xFF
+        self.__status = (self.__status & 0x7C) | (self.__x_register >= value) | NZ(result)
+    """,
+    "CPY": """
+        result = (self.__y_register - value) & 0xFF
+        self.__status = (self.__status & 0x7C) | (self.__y_register >= value) | NZ(result)
+    """,
+    # BIT copies bits seven and six of the value into the negative and overflow flags
+    "BIT": """
+        self.__status = (self.__status & 0x3D) | (value & 0xC0) | (0x00 if self.__accumulator & value else 0x02)
+    """,
+}
+
+# ADC and SBC, per flag mode. See the instruction methods for how the flags are worked out.
+_ARITHMETIC_TEMPLATES = {
+    True: {
+        "ADC": """
+            entry = ADC_RESULTS[((self.__status & 0x01) << 16) | (self.__accumulator << 8) | value]
+            self.__accumulator = entry & 0xFF
+            self.__status = (self.__status & 0x3C) | (entry >> 8)
+        """,
+        "SBC": """
+            entry = SBC_RESULTS[((self.__status & 0x01) << 16) | (self.__accumulator << 8) | value]
+            self.__accumulator = entry & 0xFF
+            self.__status = (self.__status & 0x3C) | (entry >> 8)
+        """,
+    },
+    False: {
+        "ADC": """
+            the_sum = self.__accumulator + value + (self.__status & 0x01)
+            result = the_sum & 0xFF
+            self.__status = ((self.__status & 0x3C) | (the_sum > 0xFF)
+                             | (~(self.__accumulator ^ value) & (self.__accumulator ^ result) & 0x80) >> 1 | NZ(result))
+            self.__accumulator = result
+        """,
+        "SBC": """
+            the_sum = self.__accumulator - value - (1 - (self.__status & 0x01))
+            result = the_sum & 0xFF
+            self.__status = ((self.__status & 0x3C) | (the_sum >= 0)
+                             | ((self.__accumulator ^ value) & (self.__accumulator ^ result) & 0x80) >> 1 | NZ(result))
+            self.__accumulator = result
+        """,
+    },
+}
+
+# Instructions that store a register at their operand's address
+_WRITE_TEMPLATES = {
+    "STA": "ram.set_address(address, self.__accumulator)",
+    "STX": "ram.set_address(address, self.__x_register)",
+    "STY": "ram.set_address(address, self.__y_register)",
+}
+
+# Instructions that turn value into result, in the accumulator or in memory
+_MODIFY_TEMPLATES = {
+    "ASL": """
+        result = (value << 1) & 0xFF
+        self.__status = (self.__status & 0x7C) | (value >> 7) | NZ(result)
+    """,
+    "LSR": """
+        result = value >> 1
+        self.__status = (self.__status & 0x7C) | (value & 0x01) | NZ(result)
+    """,
+    "ROL": """
+        result = ((value << 1) | (self.__status & 0x01)) & 0xFF
+        self.__status = (self.__status & 0x7C) | (value >> 7) | NZ(result)
+    """,
+    "ROR": """
+        result = (value >> 1) | (self.__status & 0x01) << 7
+        self.__status = (self.__status & 0x7C) | (value & 0x01) | NZ(result)
+    """,
+    "INC": """
+        result = (value + 1) & 0xFF
+        self.__status = (self.__status & 0x7D) | NZ(result)
+    """,
+    "DEC": """
+        result = (value - 1) & 0xFF
+        self.__status = (self.__status & 0x7D) | NZ(result)
+    """,
+}
+
+_MODIFY_ACCUMULATOR_TEMPLATES = ("value = self.__accumulator", "self.__accumulator = result")
+_MODIFY_MEMORY_TEMPLATES = ("value = ram.get_address(address)", "ram.set_address(address, result)")
+
+# Instructions that go to their operand's address
+_JUMP_TEMPLATES = {
+    "JMP": "self.program_counter = address",
+    "JSR": "self.jsr(address)",
+}
+
+_IMPLIED_TEMPLATES = {
+    "CLC": "self.__status &= 0xFE",
+    "SEC": "self.__status |= 0x01",
+    "CLI": "self.__status &= 0xFB",
+    "SEI": "self.__status |= 0x04",
+    "CLD": "self.__status &= 0xF7",
+    "SED": "self.__status |= 0x08",
+    "CLV": "self.__status &= 0xBF",
+    "INX": """
+        value = (self.__x_register + 1) & 0xFF
+        self.__x_register = value
+        self.__status = (self.__status & 0x7D) | NZ(value)
+    """,
+    "INY": """
+        value = (self.__y_register + 1) & 0xFF
+        self.__y_register = value
+        self.__status = (self.__status & 0x7D) | NZ(value)
+    """,
+    "DEX": """
+        value = (self.__x_register - 1) & 0xFF
+        self.__x_register = value
+        self.__status = (self.__status & 0x7D) | NZ(value)
+    """,
+    "DEY": """
+        value = (self.__y_register - 1) & 0xFF
+        self.__y_register = value
+        self.__status = (self.__status & 0x7D) | NZ(value)
+    """,
+    "TAX": """
+        value = self.__accumulator
+        self.__x_register = value
+        self.__status = (self.__status & 0x7D) | NZ(value)
+    """,
+    "TAY": """
+        value = self.__accumulator
+        self.__y_register = value
+        self.__status = (self.__status & 0x7D) | NZ(value)
+    """,
+    "TXA": """
+        value = self.__x_register
+        self.__accumulator = value
+        self.__status = (self.__status & 0x7D) | NZ(value)
+    """,
+    "TYA": """
+        value = self.__y_register
+        self.__accumulator = value
+        self.__status = (self.__status & 0x7D) | NZ(value)
+    """,
+    "TSX": """
+        value = self.stack_pointer
+        self.__x_register = value
+        self.__status = (self.__status & 0x7D) | NZ(value)
+    """,
+    "TXS": "self.stack_pointer = self.__x_register",
+    "PHA": "self.push(self.__accumulator)",
+    "PLA": """
+        value = self.pull()
+        self.__accumulator = value
+        self.__status = (self.__status & 0x7D) | NZ(value)
+    """,
+    "PHP": "self.php()",
+    "PLP": "self.plp()",
+    "RTS": "self.rts()",
+    "RTI": "self.rti()",
+    "BRK": "self.brk()",
+    "NOP": "pass",
+}
+
+# The status bit each branch tests, and whether it branches when the bit is set
+_BRANCH_CONDITIONS = {
+    "BPL": (0x80, False), "BMI": (0x80, True),
+    "BVC": (0x40, False), "BVS": (0x40, True),
+    "BCC": (0x01, False), "BCS": (0x01, True),
+    "BNE": (0x02, False), "BEQ": (0x02, True),
+}
+
+_BRANCH_TEMPLATE = """
+    if self.__status & {bit}:
+        {when_set}
+    else:
+        {when_clear}
+"""
+
+_PRIVATE_NAME = re.compile(r"self\.__(\w+)")
+_NZ = re.compile(r"NZ\((\w+)\)")
+
+
+def _handler_body(instruction, flag_tables_enabled):
+    """
+    Put together the source of the body of the handler for one opcode.
+
+    Args:
+        instruction: An OpcodeTable.Instruction
+        flag_tables_enabled: True to work the flags out with FlagTables, False with comparisons
+
+    Returns:
+        The body's source, not indented
+    """
+    mnemonic = instruction.mnemonic
+    mode = instruction.mode
+    parts = []
+
+    if mode in _ADDRESS_TEMPLATES:
+        parts.append(_ADDRESS_TEMPLATES[mode])
+
+        if instruction.page_penalty:
+            parts.append(_PAGE_CROSSING_TEMPLATE)
+
+    if mnemonic in _READ_TEMPLATES or mnemonic in _ARITHMETIC_TEMPLATES[flag_tables_enabled]:
+        parts.append(_IMMEDIATE_VALUE_TEMPLATE if mode == op.IMMEDIATE else _ADDRESS_VALUE_TEMPLATE)
+        parts.append(_READ_TEMPLATES.get(mnemonic) or _ARITHMETIC_TEMPLATES[flag_tables_enabled][mnemonic])
+    elif mnemonic in _WRITE_TEMPLATES:
+        parts.append(_WRITE_TEMPLATES[mnemonic])
+    elif mnemonic in _MODIFY_TEMPLATES:
+        load, store = _MODIFY_ACCUMULATOR_TEMPLATES if mode == op.ACCUMULATOR else _MODIFY_MEMORY_TEMPLATES
+        parts.extend([load, _MODIFY_TEMPLATES[mnemonic], store])
+    elif mnemonic in _JUMP_TEMPLATES:
+        parts.append(_JUMP_TEMPLATES[mnemonic])
+    elif mnemonic in _BRANCH_CONDITIONS:
+        bit, branch_when_set = _BRANCH_CONDITIONS[mnemonic]
+        take, skip = "self.__take_branch()", "self.program_counter = (self.program_counter + 1) & 0xFFFF"
+        parts.append(_BRANCH_TEMPLATE.format(bit="0x{bit:02X}".format(bit=bit),
+                                             when_set=take if branch_when_set else skip,
+                                             when_clear=skip if branch_when_set else take))
+    else:
+        parts.append(_IMPLIED_TEMPLATES[mnemonic])
+
+    body = "\n".join(textwrap.dedent(part).strip("\n") for part in parts)
+
+    if "ram." in body:
+        body = "ram = self.__ram\n" + body
+
+    if flag_tables_enabled:
+        body = _NZ.sub(r"NZ_FLAGS[\1]", body)
+    else:
+        body = _NZ.sub(r"(0x00 if \1 else 0x02) | (\1 & 0x80)", body)
+
+    return _PRIVATE_NAME.sub(r"self._Chip6502__\1", body)
+
+
+def _generate_handlers(flag_tables_enabled):
+    """
+    Compile a handler for every opcode in OpcodeTable.
+
+    Each handler is named after its instruction and addressing mode, such as lda_immediate, and its source is added to
+    linecache so tracebacks through it show the generated code.
+
+    Args:
+        flag_tables_enabled: True to work the flags out with FlagTables, False with comparisons
+
+    Returns:
+        A dict of opcode byte to (handler, length, cycles), as _build_opcode_tables takes
+    """
+    namespace = {
+        "NZ_FLAGS": flag_tables.NZ_FLAGS,
+        "ADC_RESULTS": flag_tables.ADC_RESULTS,
+        "SBC_RESULTS": flag_tables.SBC_RESULTS,
+    }
+    handlers = {}
+
+    for opcode, instruction in op.OPCODES.items():
+        name = "{mnemonic}_{mode}".format(mnemonic=instruction.mnemonic.lower(), mode=instruction.mode)
+        source = "def {name}(self):\n{body}\n".format(
+            name=name, body=textwrap.indent(_handler_body(instruction, flag_tables_enabled), "    "))
+        filename = "<Chip6502 {name} {mode}>".format(name=name, mode="tables" if flag_tables_enabled else "branches")
+        linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+
+        exec(compile(source, filename, "exec"), namespace)
+        handler = namespace.pop(name)
+        handler.__qualname__ = "Chip6502." + name
+        handlers[opcode] = (handler, instruction.length, instruction.cycles)
+
+    return handlers
+
+
 class Chip6502(object):
 
+    # Every instruction is a method on the class rather than a closure made per chip, so creating a chip only sets
+    # these fields.
+    __slots__ = ('__accumulator',
+                 '__x_register',
+                 '__y_register',
+                 '__status',
+                 'program_counter',
+                 'stack_pointer',
+                 'cycles',
+                 '__ram')
+
     def __init__(self, memory):
         """
         Initialise the state of the chip
         """
         self.__accumulator = 0x0
-        self.carry_flag = 0x0
-        self.overflow_flag = 0x0
-        self.zero_flag = 0x0
-        self.negative_flag = 0x0
+        self.__status = 0x0
         self.__x_register = 0x0
         self.__y_register = 0x0
+        self.program_counter = 0x0
+        # The stack is page 0x01 and grows down. It's 0x00 at power on, and the reset sequence moves it down three to
+        # 0xFD.
+        self.stack_pointer = 0x00
+        self.cycles = 0
         self.__ram = memory
 
-        self.lda_immediate = lambda val: self.__load_register_immediate(val, self.__set_accumulator)
-        self.ldx_immediate = lambda val: self.__load_register_immediate(val, self.__set_x_register)
-        self.ldy_immediate = lambda val: self.__load_register_immediate(val, self.__set_y_register)
-
-        # See my unit test for sta_immediate_or_absolute: either I misunderstand or one of these two doesn't exist.
-        self.sta_immediate = lambda addr: self.__store_register_immediate(addr, self.__get_accumulator)
-        self.stx_immediate = lambda addr: self.__store_register_immediate(addr, self.__get_x_register)
-        self.sty_immediate = lambda addr: self.__store_register_immediate(addr, self.__get_y_register)
-
-        self.lda_absolute = lambda addr: self.__load_register_absolute(addr, self.__set_accumulator)
-        self.ldx_absolute = lambda addr: self.__load_register_absolute(addr, self.__set_x_register)
-        self.ldy_absolute = lambda addr: self.__load_register_absolute(addr, self.__set_y_register)
-
-        self.sta_absolute = lambda addr: self.__store_register_immediate(addr, self.__get_accumulator)
-        self.stx_absolute = lambda addr: self.__store_register_immediate(addr, self.__get_x_register)
-        self.sty_absolute = lambda addr: self.__store_register_immediate(addr, self.__get_y_register)
-
-        self.ldx_indexed_indirect = lambda addr: self.__load_indexed_indirect_register(addr, self.__set_x_register)
-        self.ldy_indexed_indirect = lambda addr: self.__load_indexed_indirect_register(addr, self.__set_y_register)
-        self.lda_indexed_indirect = lambda addr: self.__load_indexed_indirect_register(addr, self.__set_accumulator)
-
-        self.sta_indexed_indirect = lambda addr: self.__store_indexed_indirect_register(addr, self.__get_accumulator)
-        self.sty_indexed_indirect = lambda addr: self.__store_indexed_indirect_register(addr, self.__get_y_register)
-
-        self.lda_indirect_indexed = lambda addr: self.__load_indirect_indexed_register(addr, self.__set_accumulator)
-        self.ldx_indirect_indexed = lambda addr: self.__load_indirect_indexed_register(addr, self.__set_x_register)
-        self.ldy_indirect_indexed = lambda addr: self.__load_indirect_indexed_register(addr, self.__set_y_register)
-
-        self.sta_indirect_indexed = lambda addr: self.__store_indirect_indexed_register(addr, self.__get_accumulator)
-        self.stx_indirect_indexed = lambda addr: self.__store_indirect_indexed_register(addr, self.__get_x_register)
-
-        self.__get_accumulator = lambda: self.accumulator
-        self.__get_x_register = lambda: self.x_register
-        self.__get_y_register = lambda: self.y_register
-
-        self.adc_absolute = lambda address: self.__add_to_accumulator(self.__ram.get_address(address))
-        self.adc_immediate = lambda operand: self.__add_to_accumulator(operand)
-        self.adc_indexed_indirect = lambda addr: self.__add_to_accumulator(
-            self.__ram.get_address(self.__ram.get_indexed_indirect_memory_address(addr, self.__get_x_register())))
-        self.adc_indirect_indexed = lambda addr: self.__add_to_accumulator(
-            self.__ram.get_address(self.__ram.get_indirect_indexed_memory_address(addr, self.__get_y_register())))
-
-        self.sbc_immediate = lambda operand: self.__subtract_from_accumulator(operand)
-        self.sbc_absolute = lambda addr: self.__subtract_from_accumulator(self.__ram.get_address(addr))
-        self.sbc_indexed_indirect = lambda addr: self.__subtract_from_accumulator(
-            self.__ram.get_address(self.__ram.get_indexed_indirect_memory_address(addr, self.__get_x_register())))
-        self.sbc_indirect_indexed = lambda addr: self.__subtract_from_accumulator(
-            self.__ram.get_address(self.__ram.get_indirect_indexed_memory_address(addr, self.__get_y_register())))
-
-        self.inc_immediate = lambda addr: self.__increment_memory_value(addr)
-        self.inc_absolute = lambda addr: self.__increment_memory_value(self.__ram.get_address(addr))
-        self.inc_indexed_indirect = lambda addr: self.__increment_memory_value(
-            self.__ram.get_address(self.__ram.get_indexed_indirect_memory_address(addr, self.__get_x_register())))
-        self.inc_indirect_indexed = lambda addr: self.__increment_memory_value(
-            self.__ram.get_address(self.__ram.get_indirect_indexed_memory_address(addr, self.__get_y_register())))
-
-        self.dec_immediate = lambda addr: self.__decrement_memory_value(addr)
-        self.dec_absolute = lambda addr: self.__decrement_memory_value(self.__ram.get_address(addr))
-        self.dec_indexed_indirect = lambda addr: self.__decrement_memory_value(
-            self.__ram.get_address(self.__ram.get_indexed_indirect_memory_address(addr, self.__get_x_register())))
-        self.dec_indirect_indexed = lambda addr: self.__decrement_memory_value(
-            self.__ram.get_address(self.__ram.get_indirect_indexed_memory_address(addr, self.__get_y_register())))
+    @property
+    def memory(self):
+        """
+        The memory the chip reads its program and data from
+        """
+        return self.__ram
+
+    @property
+    def status(self):
+        """
+        The processor status (P) register.
+
+        Every flag lives in this one byte, laid out as NV-BDIZC (see FlagTables for the bits). The named flag
+        properties below are views onto it, so pushing, pulling, saving and comparing the flags is a single integer.
+
+        Returns:
+               The current value of the processor status register
+        """
+        return self.__status
+
+    @status.setter
+    def status(self, val):
+        if val > 0xFF:
+            raise RegisterOverflowException
+
+        self.__status = val
+
+    def __flag_property(bit, doc):
+        """
+        Make a property that reads and writes one bit of the processor status register as 0x0 or 0x1.
+
+        Args:
+            bit: The status register bit the flag is stored in
+            doc: The property's docstring
+        """
+        def get_flag(self):
+            return 0x01 if self.__status & bit else 0x00
+
+        def set_flag(self, val):
+            if val:
+                self.__status |= bit
+            else:
+                self.__status &= ~bit
+
+        return property(get_flag, set_flag, doc=doc)
+
+    carry_flag = __flag_property(flag_tables.CARRY_FLAG, "Set when an operation carries out of bit seven")
+    zero_flag = __flag_property(flag_tables.ZERO_FLAG, "Set when the result of an operation is zero")
+    interrupt_disable_flag = __flag_property(flag_tables.INTERRUPT_DISABLE_FLAG, "Set to ignore maskable interrupts")
+    decimal_flag = __flag_property(flag_tables.DECIMAL_FLAG, "Set to put ADC and SBC into decimal mode")
+    break_flag = __flag_property(flag_tables.BREAK_FLAG, "Set when the status register was pushed by BRK or PHP")
+    overflow_flag = __flag_property(flag_tables.OVERFLOW_FLAG, "Set when arithmetic changes the accumulator's sign bit")
+    negative_flag = __flag_property(flag_tables.NEGATIVE_FLAG, "Set when bit seven of the result of an operation is 1")
+
+    # The layout of the blob made by snapshot: A, X, Y, P, SP, PC, cycles
+    __snapshot_format = struct.Struct("<BBBBBHQ")
+
+    def snapshot(self):
+        """
+        Take a copy of the chip's registers, flags, stack pointer, program counter and cycle count.
+
+        Returns:
+            A bytes object that restore can put back
+        """
+        return self.__snapshot_format.pack(self.__accumulator,
+                                           self.__x_register,
+                                           self.__y_register,
+                                           self.__status,
+                                           self.stack_pointer,
+                                           self.program_counter,
+                                           self.cycles)
+
+    def restore(self, state):
+        """
+        Put the chip's registers, flags and cycle count back to what they were when snapshot returned state.
+
+        Args:
+            state: A bytes object returned by snapshot
+        """
+        (self.__accumulator,
+         self.__x_register,
+         self.__y_register,
+         self.__status,
+         self.stack_pointer,
+         self.program_counter,
+         self.cycles) = self.__snapshot_format.unpack(state)
 
     @property
     def accumulator(self):
@@ -86,24 +536,47 @@ class Chip6502(object):
         """
         return self.__accumulator
 
-    @accumulator.setter
-    def accumulator(self, val):
+    def __set_accumulator_with_tables(self, val):
         """
         Set the accumulator.
 
-        Register setters call self.__set_register in order to set their values. This is so processor status flags can
-        be set based on the new value.
+        The following status flags are set as a result of this operation:
+
+            * zero_flag is set if val is zero -- it is cleared otherwise.
+            * negative_flag if the seventh bit of val is 1
+
+        The register setters repeat this rather than sharing a helper so that setting a register is a single call.
+
+        Raises:
+            RegisterOverflowException: val is longer than two bytes (0xFF)
         """
+        if val > 0xFF:
+            raise RegisterOverflowException
 
-        def set_register():
-            self.__accumulator = val
+        self.__accumulator = val
+        # 0x7D clears the zero and negative flags
+        self.__status = (self.__status & 0x7D) | flag_tables.NZ_FLAGS[val]
 
-        self.__set_register(val, set_register)
+    def __set_accumulator_with_branches(self, val):
+        # The same as __set_accumulator_with_tables, working the flags out with comparisons.
+        if val > 0xFF:
+            raise RegisterOverflowException
 
-    # We have private get/set functions in addition to the property getter/setters.
-    # These are used as parameters to the set/load register functions.
-    def __set_accumulator(self, val):
-        self.accumulator = val
+        self.__accumulator = val
+        self.__set_nz_flags_with_branches(val)
+
+    accumulator = accumulator.setter(__set_accumulator_with_tables)
+
+    def __set_nz_flags_with_branches(self, val):
+        status = self.__status & ~(flag_tables.ZERO_FLAG | flag_tables.NEGATIVE_FLAG)
+
+        if val == 0x0:
+            status |= flag_tables.ZERO_FLAG
+
+        if val & 0x80:
+            status |= flag_tables.NEGATIVE_FLAG
+
+        self.__status = status
 
     @property
     def x_register(self):
@@ -115,17 +588,22 @@ class Chip6502(object):
         """
         return self.__x_register
 
-    @x_register.setter
-    def x_register(self, val):
-        # set the x-register
+    def __set_x_register_with_tables(self, val):
+        # Set the x-register. See the accumulator setter for the flags this affects.
+        if val > 0xFF:
+            raise RegisterOverflowException
 
-        def set_register():
-            self.__x_register = val
+        self.__x_register = val
+        self.__status = (self.__status & 0x7D) | flag_tables.NZ_FLAGS[val]
 
-        self.__set_register(val, set_register)
+    def __set_x_register_with_branches(self, val):
+        if val > 0xFF:
+            raise RegisterOverflowException
 
-    def __set_x_register(self, val):
-        self.x_register = val
+        self.__x_register = val
+        self.__set_nz_flags_with_branches(val)
+
+    x_register = x_register.setter(__set_x_register_with_tables)
 
     @property
     def y_register(self):
@@ -137,149 +615,155 @@ class Chip6502(object):
         """
         return self.__y_register
 
-    @y_register.setter
-    def y_register(self, val):
-        #Set the y-register
+    def __set_y_register_with_tables(self, val):
+        # Set the y-register. See the accumulator setter for the flags this affects.
+        if val > 0xFF:
+            raise RegisterOverflowException
 
-        def set_register():
-            self.__y_register = val
+        self.__y_register = val
+        self.__status = (self.__status & 0x7D) | flag_tables.NZ_FLAGS[val]
 
-        self.__set_register(val, set_register)
+    def __set_y_register_with_branches(self, val):
+        if val > 0xFF:
+            raise RegisterOverflowException
 
-    def __set_y_register(self, val):
-        self.y_register = val
+        self.__y_register = val
+        self.__set_nz_flags_with_branches(val)
 
-    def __set_register(self, val, set_reg_func):
-        """
-        Set a register.
+    y_register = y_register.setter(__set_y_register_with_tables)
 
-        The following status flags are set as a result of this operation:
-
-            * zero_flag is set if val is zero -- it is cleared otherwise.
-            * negative_flag if the seventh bit of val is 1
-
-        Args:
-            val: The value to set the register to
-            set_reg_func: A function that sets the register. It should close off its value as this method
-                          won't provide it.
-
-        Raises:
-            RegisterOverflowException: val is longer than two bytes (0xFF)
-        """
-        def check_overflow():
-            if val > 0xFF:
-                raise RegisterOverflowException
-
-        def set_zero_flag():
-            if val == 0x0:
-                self.zero_flag = 0x01
-            else:
-                self.zero_flag = 0x00
-
-        def set_negative_flag():
-            if val & 0xFF == 0xFF:
-                self.negative_flag = 0x01
-            else:
-                self.negative_flag = 0x00
-
-        check_overflow()
-        set_reg_func()
-        set_zero_flag()
-        set_negative_flag()
-
-    def __load_register_immediate(self, value, set_register_func):
+    def lda_immediate(self, val):
         """
         Loading a register using immediate addressing loads the register with the value given.
 
         E.g. LDA 0x01 loads the value 0x01 into the accumulator
 
         Args:
-            value: The value to load into the register
-            set_register_func: A function to use to set the value of the register
+            val: The value to load into the register
         """
-        set_register_func(value)
+        self.accumulator = val
+
+    def ldx_immediate(self, val):
+        self.x_register = val
+
+    def ldy_immediate(self, val):
+        self.y_register = val
 
-    def __store_register_immediate(self, address, get_register_func):
+    # See my unit test for sta_immediate_or_absolute: either I misunderstand or one of these two doesn't exist.
+    def sta_immediate(self, addr):
         """
         Storing a register using immediate addressing stores the value of the register into the memory address provided
 
         E.g. STA 0x01 causes the accumulator to be stored to memory location 0x01
 
         Args:
-            address: The memory address to store the contents of the register to
-            get_register_func: A function by which the contents of the register can be retrieved
+            addr: The memory address to store the contents of the register to
         """
-        self.__ram.set_address(address, get_register_func())
+        self.__ram.set_address(addr, self.__accumulator)
+
+    def stx_immediate(self, addr):
+        self.__ram.set_address(addr, self.__x_register)
 
-    def __load_register_absolute(self, address, set_register_func):
+    def sty_immediate(self, addr):
+        self.__ram.set_address(addr, self.__y_register)
+
+    def lda_absolute(self, addr):
         """
         Loading a register using absolute addressing stores the value at the memory address specified into the register
 
         Args:
-            address: The memory address whose value is to be loaded into the register
-            set_register_func: A function to use to set the value of the register
+            addr: The memory address whose value is to be loaded into the register
         """
-        set_register_func(self.__ram.get_address(address))
+        self.accumulator = self.__ram.get_address(addr)
+
+    def ldx_absolute(self, addr):
+        self.x_register = self.__ram.get_address(addr)
+
+    def ldy_absolute(self, addr):
+        self.y_register = self.__ram.get_address(addr)
+
+    def sta_absolute(self, addr):
+        self.__ram.set_address(addr, self.__accumulator)
+
+    def stx_absolute(self, addr):
+        self.__ram.set_address(addr, self.__x_register)
+
+    def sty_absolute(self, addr):
+        self.__ram.set_address(addr, self.__y_register)
 
     def lda_absolute_indexed(self, address, register):
-        self.__load_absolute_indexed_register(address, register, self.__set_accumulator)
+        address = self.__absolute_indexed_addresses[register](self, address)
+        self.accumulator = self.__ram.get_address(address)
 
     def ldx_absolute_indexed(self, address, register):
-        self.__load_absolute_indexed_register(address, register, self.__set_x_register)
+        address = self.__absolute_indexed_addresses[register](self, address)
+        self.x_register = self.__ram.get_address(address)
 
     def ldy_absolute_indexed(self, address, register):
-        self.__load_absolute_indexed_register(address, register, self.__set_y_register)
+        address = self.__absolute_indexed_addresses[register](self, address)
+        self.y_register = self.__ram.get_address(address)
+
+    # The same loads with the index register chosen by the method rather than an argument
+    def lda_absolute_x(self, address):
+        self.accumulator = self.__ram.get_address((address + self.__x_register) & 0xFFFF)
+
+    def lda_absolute_y(self, address):
+        self.accumulator = self.__ram.get_address((address + self.__y_register) & 0xFFFF)
+
+    def ldx_absolute_y(self, address):
+        self.x_register = self.__ram.get_address((address + self.__y_register) & 0xFFFF)
+
+    def ldy_absolute_x(self, address):
+        self.y_register = self.__ram.get_address((address + self.__x_register) & 0xFFFF)
 
-    def __load_absolute_indexed_register(self, address, register, set_register_func):
-        offset_function = self.__get_y_register
-        if register == "X":
-            offset_function = self.__get_x_register
+    def __absolute_x_address(self, address):
+        return (address + self.__x_register) & 0xFFFF
 
-        address_to_load = self.__ram.get_absolute_indexed_address(address, offset_function)
-        set_register_func(self.__ram.get_address(address_to_load))
+    def __absolute_y_address(self, address):
+        return (address + self.__y_register) & 0xFFFF
 
-    def __load_indexed_indirect_register(self, address, set_register_func):
-        addr = self.__ram.get_indexed_indirect_memory_address(address, self.x_register)
-        set_register_func(self.__ram.get_address(addr))
+    # The *_absolute_indexed methods take the index register's letter. It picks one of these resolvers, so indexing
+    # doesn't compare strings.
+    __absolute_indexed_addresses = {"X": __absolute_x_address, "Y": __absolute_y_address}
 
-    def __store_indexed_indirect_register(self, address, get_register_func):
-        addr = self.__ram.get_indexed_indirect_memory_address(address, self.x_register)
-        self.__ram.set_address(addr, get_register_func())
+    def lda_indexed_indirect(self, addr):
+        self.accumulator = self.__ram.get_address(self.__indexed_indirect_address(addr))
 
-    def __load_indirect_indexed_register(self, address, set_register_func):
-        addr = self.__ram.get_indirect_indexed_memory_address(address, self.y_register)
-        set_register_func(self.__ram.get_address(addr))
+    def ldx_indexed_indirect(self, addr):
+        self.x_register = self.__ram.get_address(self.__indexed_indirect_address(addr))
 
-    def __store_indirect_indexed_register(self, address, get_register_func):
-        addr = self.__ram.get_indirect_indexed_memory_address(address, self.y_register)
-        self.__ram.set_address(addr, get_register_func())
+    def ldy_indexed_indirect(self, addr):
+        self.y_register = self.__ram.get_address(self.__indexed_indirect_address(addr))
 
-    def __combine_two_consecutive_address_values(self, first_address):
+    def sta_indexed_indirect(self, addr):
+        self.__ram.set_address(self.__indexed_indirect_address(addr), self.__accumulator)
 
-        def get_two_consecutive_address_values(first_address):
-            return (self.__ram.get_address(first_address), self.__ram.get_address(first_address+0x01))
+    def stx_indexed_indirect(self, addr):
+        self.__ram.set_address(self.__indexed_indirect_address(addr), self.__x_register)
 
-        def combine_two_hex_addresses(address1, address2):
-            """
-            Combine two 8-bit hex numbers into a 16 bit little-endian hex number
+    def sty_indexed_indirect(self, addr):
+        self.__ram.set_address(self.__indexed_indirect_address(addr), self.__y_register)
 
-            e.g: self.__combine_two_hex_addresses(0x02, 0x22) gives 0x2202
+    def lda_indirect_indexed(self, addr):
+        self.accumulator = self.__ram.get_address(self.__indirect_indexed_address(addr))
 
-            Args:
-                address1: The first hex number
-                address2: The second hex number
+    def ldx_indirect_indexed(self, addr):
+        self.x_register = self.__ram.get_address(self.__indirect_indexed_address(addr))
 
-            Returns:
-                The two numbers combined into a 16-bit number as described above
-            """
-            get_hex_digits = lambda hex_value: str(hex_value).split('x')[1].zfill(2)
+    def ldy_indirect_indexed(self, addr):
+        self.y_register = self.__ram.get_address(self.__indirect_indexed_address(addr))
 
-            hex_address = "0x{first_digit}{second_digit}".format(first_digit=get_hex_digits(hex(address2)),
-                                                                second_digit=get_hex_digits(hex(address1)))
-            return int(hex_address, 0)
+    def sta_indirect_indexed(self, addr):
+        self.__ram.set_address(self.__indirect_indexed_address(addr), self.__accumulator)
 
-        contents1, contents2 = get_two_consecutive_address_values(first_address)
-        return combine_two_hex_addresses(contents1, contents2)
+    def stx_indirect_indexed(self, addr):
+        self.__ram.set_address(self.__indirect_indexed_address(addr), self.__x_register)
+
+    def __indexed_indirect_address(self, addr):
+        return self.__ram.get_indexed_indirect_memory_address(addr, self.__x_register)
+
+    def __indirect_indexed_address(self, addr):
+        return self.__ram.get_indirect_indexed_memory_address(addr, self.__y_register)
 
     def clc(self):
         """
@@ -289,7 +773,7 @@ class Chip6502(object):
 
         Addressing modes: Implied addressing only.
         """
-        self.carry_flag = 0x0
+        self.__status &= ~flag_tables.CARRY_FLAG
 
     def sec(self):
         """
@@ -299,109 +783,500 @@ class Chip6502(object):
 
         Addressing modes: Implied addressing only.
         """
-        self.carry_flag = 0x1
+        self.__status |= flag_tables.CARRY_FLAG
+
+    def cli(self):
+        """
+        Clear the interrupt disable flag, so IRQs are taken.
+        """
+        self.__status &= ~flag_tables.INTERRUPT_DISABLE_FLAG
+
+    def sei(self):
+        """
+        Set the interrupt disable flag, so IRQs are ignored.
+        """
+        self.__status |= flag_tables.INTERRUPT_DISABLE_FLAG
+
+    def cld(self):
+        self.__status &= ~flag_tables.DECIMAL_FLAG
+
+    def sed(self):
+        self.__status |= flag_tables.DECIMAL_FLAG
+
+    def clv(self):
+        self.__status &= ~flag_tables.OVERFLOW_FLAG
+
+    def push(self, value):
+        """
+        Push a byte onto the stack.
+
+        The stack lives in page 0x01 of memory. The stack pointer holds the low byte of the next free address and
+        wraps around within the page.
+
+        Args:
+            value: The eight-bit value to push
+        """
+        self.__ram.set_address(0x100 | self.stack_pointer, value)
+        self.stack_pointer = (self.stack_pointer - 0x01) & 0xFF
+
+    def pull(self):
+        """
+        Pull a byte off the stack.
+
+        Returns:
+            The byte at the top of the stack
+        """
+        self.stack_pointer = (self.stack_pointer + 0x01) & 0xFF
+        return self.__ram.get_address(0x100 | self.stack_pointer)
+
+    def pha(self):
+        self.push(self.__accumulator)
+
+    def pla(self):
+        self.accumulator = self.pull()
+
+    def php(self):
+        """
+        Push the status register. The copy pushed has the break flag and unused bit set, as it does on the 6502.
+        """
+        self.push(self.__status | flag_tables.BREAK_FLAG | flag_tables.UNUSED_FLAG)
+
+    def plp(self):
+        """
+        Pull the status register. The break flag and unused bit aren't real flags, so they keep their current values.
+        """
+        self.__status = (self.pull() & 0xCF) | (self.__status & 0x30)
+
+    def tsx(self):
+        self.x_register = self.stack_pointer
+
+    def txs(self):
+        # Unlike the other transfers, TXS doesn't change the flags
+        self.stack_pointer = self.__x_register
+
+    def jmp(self, address):
+        self.program_counter = address
+
+    def jsr(self, address):
+        """
+        Jump to a subroutine.
+
+        The address of the last byte of the JSR instruction (one less than the return address) is pushed, high byte
+        first, and RTS adds the one back.
+
+        Args:
+            address: The address of the subroutine
+        """
+        return_address = (self.program_counter - 0x01) & 0xFFFF
+        self.push(return_address >> 8)
+        self.push(return_address & 0xFF)
+        self.program_counter = address
+
+    def rts(self):
+        """
+        Return from a subroutine called with JSR.
+        """
+        low_byte = self.pull()
+        self.program_counter = ((self.pull() << 8 | low_byte) + 0x01) & 0xFFFF
+
+    def rti(self):
+        """
+        Return from an interrupt, pulling the status register and then the program counter.
+        """
+        self.plp()
+        low_byte = self.pull()
+        self.program_counter = self.pull() << 8 | low_byte
+
+    def brk(self):
+        """
+        Software interrupt. Jumps through the IRQ vector with the break flag set in the pushed status.
+
+        BRK is a two byte instruction whose second byte is skipped, so the return address is two past the opcode.
+        """
+        self.program_counter = (self.program_counter + 0x01) & 0xFFFF
+        self.__interrupt(IRQ_VECTOR, flag_tables.BREAK_FLAG)
+
+    def reset(self):
+        """
+        Run the reset sequence: start executing at the address in the reset vector, with interrupts disabled.
+
+        Nothing is pushed, but the stack pointer moves down three as if it had been, so a chip reset from power on has
+        a stack pointer of 0xFD. The unused status bit always reads as set, so P is 0x24 after a reset from power on.
+        """
+        self.stack_pointer = (self.stack_pointer - 0x03) & 0xFF
+        self.__status |= flag_tables.INTERRUPT_DISABLE_FLAG | flag_tables.UNUSED_FLAG
+        self.program_counter = self.__ram.read_word(RESET_VECTOR)
+        self.cycles += 7
+
+    def nmi(self):
+        """
+        Take a non-maskable interrupt, such as the one the PPU raises at the start of vertical blank.
+        """
+        self.__interrupt(NMI_VECTOR, 0x00)
+        self.cycles += 7
+
+    def irq(self):
+        """
+        Take a maskable interrupt, unless the interrupt disable flag is set.
+
+        Returns:
+            True if the interrupt was taken
+        """
+        if self.__status & flag_tables.INTERRUPT_DISABLE_FLAG:
+            return False
+
+        self.__interrupt(IRQ_VECTOR, 0x00)
+        self.cycles += 7
+        return True
+
+    def __interrupt(self, vector, break_flag):
+        # Push the program counter and status, then jump through vector with interrupts disabled
+        self.push(self.program_counter >> 8)
+        self.push(self.program_counter & 0xFF)
+        self.push((self.__status & ~flag_tables.BREAK_FLAG) | break_flag | flag_tables.UNUSED_FLAG)
+        self.__status |= flag_tables.INTERRUPT_DISABLE_FLAG
+        self.program_counter = self.__ram.read_word(vector)
+
+    def adc_immediate(self, operand):
+        self.__add_to_accumulator(operand)
+
+    def adc_absolute(self, address):
+        self.__add_to_accumulator(self.__ram.get_address(address))
 
     def adc_absolute_indexed(self, address, register):
-        get_register_func = self.__get_register_func_from_register_letter(register)
-        self.__add_to_accumulator(self.__ram.get_address(address + get_register_func()))
+        address = self.__absolute_indexed_addresses[register](self, address)
+        self.__add_to_accumulator(self.__ram.get_address(address))
 
-    def sbc_absolute_indexed(self, address, register):
-        get_register_func = self.__get_register_func_from_register_letter(register)
-        self.__subtract_from_accumulator(self.__ram.get_address(address + get_register_func()))
+    def adc_absolute_x(self, address):
+        self.__add_to_accumulator(self.__ram.get_address((address + self.__x_register) & 0xFFFF))
 
-    def __get_register_func_from_register_letter(self, register_letter):
-        get_register_func = self.__get_y_register
+    def adc_absolute_y(self, address):
+        self.__add_to_accumulator(self.__ram.get_address((address + self.__y_register) & 0xFFFF))
 
-        if register_letter == 'X':
-            get_register_func = self.__get_x_register
+    def adc_indexed_indirect(self, addr):
+        self.__add_to_accumulator(self.__ram.get_address(self.__indexed_indirect_address(addr)))
 
-        return get_register_func
+    def adc_indirect_indexed(self, addr):
+        self.__add_to_accumulator(self.__ram.get_address(self.__indirect_indexed_address(addr)))
 
-    def __add_to_accumulator(self, operand):
-        arithmetic_func = lambda: self.__accumulator + operand + self.carry_flag
+    def sbc_immediate(self, operand):
+        self.__subtract_from_accumulator(operand)
 
-        def carry_flag_func(sum_value):
-            if sum_value > 0xFF:
-                self.carry_flag = 0x01
-            else:
-                self.carry_flag = 0x00
+    def sbc_absolute(self, addr):
+        self.__subtract_from_accumulator(self.__ram.get_address(addr))
 
-        self.__perform_accumulator_arithmetic(arithmetic_func, carry_flag_func)
+    def sbc_absolute_indexed(self, address, register):
+        address = self.__absolute_indexed_addresses[register](self, address)
+        self.__subtract_from_accumulator(self.__ram.get_address(address))
 
-    def __subtract_from_accumulator(self, operand):
-        arithmetic_func = lambda: self.__get_accumulator() - operand - (1 - self.carry_flag)
+    def sbc_absolute_x(self, address):
+        self.__subtract_from_accumulator(self.__ram.get_address((address + self.__x_register) & 0xFFFF))
 
-        def carry_flag_func(sum_value):
-            if sum_value >= 0:
-                self.carry_flag = 0x01
-            else:
-                self.carry_flag = 0x0
+    def sbc_absolute_y(self, address):
+        self.__subtract_from_accumulator(self.__ram.get_address((address + self.__y_register) & 0xFFFF))
+
+    def sbc_indexed_indirect(self, addr):
+        self.__subtract_from_accumulator(self.__ram.get_address(self.__indexed_indirect_address(addr)))
 
-        self.__perform_accumulator_arithmetic(arithmetic_func, carry_flag_func)
+    def sbc_indirect_indexed(self, addr):
+        self.__subtract_from_accumulator(self.__ram.get_address(self.__indirect_indexed_address(addr)))
 
-    def __perform_accumulator_arithmetic(self, arithmetic_func, carry_flag_func):
-        the_sum = arithmetic_func()
+    def __add_to_accumulator_with_tables(self, operand):
+        status = self.__status
+        entry = flag_tables.ADC_RESULTS[((status & 0x01) << 16) | (self.__accumulator << 8) | operand]
 
-        carry_flag_func(the_sum)
-        the_sum = min(0xFF, the_sum)
+        # See FlagTables for how entry is packed. 0x3C clears the carry, zero, overflow and negative flags.
+        self.__accumulator = entry & 0xFF
+        self.__status = (status & 0x3C) | (entry >> 8)
 
-        accumulator_seventh_bit = 0x80 & self.__get_accumulator()
-        result_seventh_bit = 0x80 & the_sum
+    def __subtract_from_accumulator_with_tables(self, operand):
+        status = self.__status
+        entry = flag_tables.SBC_RESULTS[((status & 0x01) << 16) | (self.__accumulator << 8) | operand]
+        self.__accumulator = entry & 0xFF
+        self.__status = (status & 0x3C) | (entry >> 8)
 
-        if accumulator_seventh_bit != result_seventh_bit:
+    def __add_to_accumulator_with_branches(self, operand):
+        the_sum = self.__accumulator + operand + (self.__status & flag_tables.CARRY_FLAG)
+        self.carry_flag = the_sum > 0xFF
+        self.__set_arithmetic_result(the_sum & 0xFF, ~(self.__accumulator ^ operand) & (self.__accumulator ^ the_sum))
+
+    def __subtract_from_accumulator_with_branches(self, operand):
+        the_sum = self.__accumulator - operand - (1 - (self.__status & flag_tables.CARRY_FLAG))
+        self.carry_flag = the_sum >= 0
+        self.__set_arithmetic_result(the_sum & 0xFF, (self.__accumulator ^ operand) & (self.__accumulator ^ the_sum))
+
+    def __set_arithmetic_result(self, the_sum, overflow):
+        """
+        Store the result of ADC or SBC in the accumulator.
+
+        The overflow flag is set if the arithmetic overflowed as signed numbers: ADC when both operands have the same
+        sign and the result's differs, SBC when the operands' signs differ and the result's differs from the
+        accumulator's.
+
+        Args:
+            the_sum: The result of the arithmetic, already wrapped to eight bits
+            overflow: Bit 7 is set if the arithmetic overflowed
+        """
+        if overflow & 0x80:
             self.overflow_flag = 0x01
         else:
             self.overflow_flag = 0x00
 
-        self.__set_accumulator(the_sum)
+        self.accumulator = the_sum
+
+    __add_to_accumulator = __add_to_accumulator_with_tables
+    __subtract_from_accumulator = __subtract_from_accumulator_with_tables
+
+    def inc_immediate(self, addr):
+        self.__increment_memory_value(addr)
+
+    def inc_absolute(self, addr):
+        self.__increment_memory_value(self.__ram.get_address(addr))
 
     def inc_absolute_indexed(self, address, register):
-        get_register_func = self.__get_register_func_from_register_letter(register)
-        self.__increment_memory_value(self.__ram.get_address(address + get_register_func()))
+        address = self.__absolute_indexed_addresses[register](self, address)
+        self.__increment_memory_value(self.__ram.get_address(address))
+
+    def inc_absolute_x(self, address):
+        self.__increment_memory_value(self.__ram.get_address((address + self.__x_register) & 0xFFFF))
+
+    def inc_indexed_indirect(self, addr):
+        self.__increment_memory_value(self.__ram.get_address(self.__indexed_indirect_address(addr)))
+
+    def inc_indirect_indexed(self, addr):
+        self.__increment_memory_value(self.__ram.get_address(self.__indirect_indexed_address(addr)))
+
+    def dec_immediate(self, addr):
+        self.__decrement_memory_value(addr)
+
+    def dec_absolute(self, addr):
+        self.__decrement_memory_value(self.__ram.get_address(addr))
 
     def dec_absolute_indexed(self, address, register):
-        get_register_func = self.__get_register_func_from_register_letter(register)
-        self.__decrement_memory_value(self.__ram.get_address(address + get_register_func()))
+        address = self.__absolute_indexed_addresses[register](self, address)
+        self.__decrement_memory_value(self.__ram.get_address(address))
+
+    def dec_absolute_x(self, address):
+        self.__decrement_memory_value(self.__ram.get_address((address + self.__x_register) & 0xFFFF))
+
+    def dec_indexed_indirect(self, addr):
+        self.__decrement_memory_value(self.__ram.get_address(self.__indexed_indirect_address(addr)))
+
+    def dec_indirect_indexed(self, addr):
+        self.__decrement_memory_value(self.__ram.get_address(self.__indirect_indexed_address(addr)))
 
     def __increment_memory_value(self, address):
-        address_value = self.__ram.get_address(address)
-        f = lambda: self.__ram.set_address(address, address_value + 0x01)
-        self.__increment_or_decrement_memory_value(address, f)
+        self.__store_memory_value(address, (self.__ram.get_address(address) + 0x01) & 0xFF)
 
     def __decrement_memory_value(self, address):
-        address_value = self.__ram.get_address(address)
-        f = lambda: self.__ram.set_address(address, address_value - 0x01)
-        self.__increment_or_decrement_memory_value(address, f)
+        self.__store_memory_value(address, (self.__ram.get_address(address) - 0x01) & 0xFF)
 
-    def __increment_or_decrement_memory_value(self, address, inc_dec_func):
-        address_value = self.__ram.get_address(address)
-        inc_dec_func()
-        self.__set_negative_flag(self.__ram.get_address(address))
-        self.__set_zero_flag(self.__ram.get_address(address))
+    def __store_memory_value_with_tables(self, address, value):
+        # INC and DEC set the zero and negative flags from the value they store
+        self.__ram.set_address(address, value)
+        self.__status = (self.__status & 0x7D) | flag_tables.NZ_FLAGS[value]
 
-    def __set_zero_flag(self, val):
-        if val == 0x0:
-            self.zero_flag = 0x01
-        else:
-            self.zero_flag = 0x00
+    def __store_memory_value_with_branches(self, address, value):
+        self.__ram.set_address(address, value)
+        self.__set_nz_flags_with_branches(value)
 
-    def __set_negative_flag(self, val):
-        if val & 0x80 == 0x80:
-            self.negative_flag = 0x01
-        else:
-            self.negative_flag = 0x00
+    __store_memory_value = __store_memory_value_with_tables
 
     def inc_x_register(self):
-        self.__set_x_register(self.__get_x_register() + 0x01)
+        self.x_register = (self.__x_register + 0x01) & 0xFF
 
     def dec_x_register(self):
-        self.__set_x_register(self.__get_x_register() - 0x01)
+        self.x_register = (self.__x_register - 0x01) & 0xFF
 
     def inc_y_register(self):
-        self.__set_y_register(self.__get_y_register() + 0x01)
+        self.y_register = (self.__y_register + 0x01) & 0xFF
 
     def dec_y_register(self):
-        self.__set_y_register(self.__get_y_register() - 0x01)
+        self.y_register = (self.__y_register - 0x01) & 0xFF
+
+    flag_tables_enabled = True
+
+    @classmethod
+    def use_flag_tables(cls, enabled):
+        """
+        Choose how every chip works out its processor status flags.
+
+        With flag tables the zero, negative, carry and overflow flags come from the precomputed tables in FlagTables.
+        Without them they are worked out with comparisons. Both give the same results; this exists so the two can be
+        benchmarked against each other.
+
+        The switch swaps the methods and the opcode handlers on the class, so neither mode pays for checking which mode
+        it is in.
+
+        Args:
+            enabled: True to use flag tables, False to use comparisons
+        """
+        mode = "with_tables" if enabled else "with_branches"
+
+        cls.accumulator = cls.accumulator.setter(getattr(cls, "_Chip6502__set_accumulator_" + mode))
+        cls.x_register = cls.x_register.setter(getattr(cls, "_Chip6502__set_x_register_" + mode))
+        cls.y_register = cls.y_register.setter(getattr(cls, "_Chip6502__set_y_register_" + mode))
+        cls.__add_to_accumulator = getattr(cls, "_Chip6502__add_to_accumulator_" + mode)
+        cls.__subtract_from_accumulator = getattr(cls, "_Chip6502__subtract_from_accumulator_" + mode)
+        cls.__store_memory_value = getattr(cls, "_Chip6502__store_memory_value_" + mode)
+        cls.__dispatch_table = cls.__opcode_tables[enabled][0]
+        cls.flag_tables_enabled = enabled
+
+    @classmethod
+    def decode_opcode(cls, opcode):
+        """
+        Look an opcode up in the tables step uses.
+
+        Args:
+            opcode: The opcode byte
+
+        Returns:
+            A tuple of (the function that executes the instruction, its length in bytes, its base cycle count), or None
+            if opcode isn't a valid instruction. The function takes the chip and expects the program counter to point
+            just past the opcode.
+        """
+        if cls.__length_table[opcode] == 0:
+            return None
+
+        return cls.__dispatch_table[opcode], cls.__length_table[opcode], cls.__cycle_table[opcode]
+
+    def step(self):
+        """
+        Execute the instruction at the program counter.
+
+        The opcode is fetched from memory and looked up in the dispatch table. Its handler fetches any operands, moves
+        the program counter past them and carries out the instruction. The instruction's cycles are added to
+        self.cycles.
+
+        Raises:
+            InvalidOpcodeException: There's no instruction for the opcode at the program counter
+        """
+        opcode = self.__ram.fetch_opcode(self.program_counter)
+        self.program_counter = (self.program_counter + 1) & 0xFFFF
+        self.cycles += self.__cycle_table[opcode]
+        self.__dispatch_table[opcode](self)
+
+    def run(self, n_instructions):
+        """
+        Execute n_instructions instructions, starting at the program counter.
+
+        This does the same as calling step n_instructions times, without the overhead of a method call per instruction.
+
+        Args:
+            n_instructions: The number of instructions to execute
+        """
+        fetch_opcode = self.__ram.fetch_opcode
+        dispatch_table = self.__dispatch_table
+        cycle_table = self.__cycle_table
+
+        for _ in range(n_instructions):
+            opcode = fetch_opcode(self.program_counter)
+            self.program_counter = (self.program_counter + 1) & 0xFFFF
+            self.cycles += cycle_table[opcode]
+            dispatch_table[opcode](self)
+
+    def run_cycles(self, n_cycles):
+        """
+        Execute instructions until at least n_cycles cycles have passed.
+
+        This lets a scheduler give the CPU a batch of cycles to run between PPU and APU updates. Instructions aren't
+        split, so the last one may take the chip past n_cycles. The scheduler should take the overshoot off the next
+        batch.
+
+        Args:
+            n_cycles: The number of cycles to run for
+
+        Returns:
+            The number of cycles that were actually run
+        """
+        fetch_opcode = self.__ram.fetch_opcode
+        dispatch_table = self.__dispatch_table
+        cycle_table = self.__cycle_table
+        start_cycles = self.cycles
+        end_cycles = start_cycles + n_cycles
+
+        while self.cycles < end_cycles:
+            opcode = fetch_opcode(self.program_counter)
+            self.program_counter = (self.program_counter + 1) & 0xFFFF
+            self.cycles += cycle_table[opcode]
+            dispatch_table[opcode](self)
+
+        return self.cycles - start_cycles
+
+    # The profiler that the profiled versions of step, run and run_cycles report to. See use_profiler.
+    profiler = None
+
+    @classmethod
+    def use_profiler(cls, profiler):
+        """
+        Start or stop profiling every chip.
+
+        While a profiler is in use, step, run and run_cycles are replaced with versions that time each instruction and
+        pass it to profiler.record. Stopping puts the original methods back, so a chip that isn't being profiled
+        doesn't check whether it should be.
+
+        Args:
+            profiler: An object with a record(address, opcode, cycles, nanoseconds, next_address) method, such as a
+                      Profiler.Profiler, or None to stop profiling
+        """
+        cls.profiler = profiler
+
+        if profiler is None:
+            cls.step = cls.__step_unprofiled
+            cls.run = cls.__run_unprofiled
+            cls.run_cycles = cls.__run_cycles_unprofiled
+        else:
+            cls.step = cls.__step_profiled
+            cls.run = cls.__run_profiled
+            cls.run_cycles = cls.__run_cycles_profiled
+
+    __step_unprofiled = step
+    __run_unprofiled = run
+    __run_cycles_unprofiled = run_cycles
+
+    def __step_profiled(self):
+        address = self.program_counter
+        start_cycles = self.cycles
+        opcode = self.__ram.fetch_opcode(address)
+        self.program_counter = (self.program_counter + 1) & 0xFFFF
+        self.cycles += self.__cycle_table[opcode]
+
+        start = time.perf_counter_ns()
+        self.__dispatch_table[opcode](self)
+        nanoseconds = time.perf_counter_ns() - start
+
+        self.profiler.record(address, opcode, self.cycles - start_cycles, nanoseconds, self.program_counter)
+
+    def __run_profiled(self, n_instructions):
+        for _ in range(n_instructions):
+            self.__step_profiled()
+
+    def __run_cycles_profiled(self, n_cycles):
+        start_cycles = self.cycles
+        end_cycles = start_cycles + n_cycles
+
+        while self.cycles < end_cycles:
+            self.__step_profiled()
+
+        return self.cycles - start_cycles
+
+    # Branch handlers only fetch the offset when the branch is taken; otherwise the program counter just skips it.
+    # Taking a branch costs a cycle, and another if it lands in a different page.
+    def __take_branch(self):
+        offset = self.__ram.get_address(self.program_counter)
+        program_counter = (self.program_counter + 1) & 0xFFFF
+        # (offset ^ 0x80) - 0x80 turns the unsigned byte into a signed offset
+        target = (program_counter + (offset ^ 0x80) - 0x80) & 0xFFFF
+        self.program_counter = target
+        self.cycles += 2 if (program_counter ^ target) & 0xFF00 else 1
+
+    # Every opcode's handler is generated from OpcodeTable. There's a set for each way of working out the flags, and
+    # use_flag_tables swaps between them along with the instruction methods above.
+    __opcode_tables = {enabled: _build_opcode_tables(_generate_handlers(enabled)) for enabled in (True, False)}
+    __dispatch_table, __length_table, __cycle_table = __opcode_tables[True]
 
 class RegisterOverflowException(Exception):
     pass
+
+class InvalidOpcodeException(Exception):
+    pass
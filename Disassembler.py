@@ -0,0 +1,90 @@
+"""
+Turn 6502 machine code back into assembly, using the same opcode table Chip6502 runs from.
+"""
+import OpcodeTable as op
+
+# How the operand of each addressing mode is written. {byte} is a one byte operand, {word} a two byte one and {target}
+# a branch's destination.
+OPERAND_FORMATS = {
+    op.IMPLIED: "",
+    op.ACCUMULATOR: "A",
+    op.IMMEDIATE: "#${byte:02X}",
+    op.ZERO_PAGE: "${byte:02X}",
+    op.ZERO_PAGE_X: "${byte:02X},X",
+    op.ZERO_PAGE_Y: "${byte:02X},Y",
+    op.ABSOLUTE: "${word:04X}",
+    op.ABSOLUTE_X: "${word:04X},X",
+    op.ABSOLUTE_Y: "${word:04X},Y",
+    op.INDIRECT: "(${word:04X})",
+    op.INDEXED_INDIRECT: "(${byte:02X},X)",
+    op.INDIRECT_INDEXED: "(${byte:02X}),Y",
+    op.RELATIVE: "${target:04X}",
+}
+
+
+def disassemble(memory, address):
+    """
+    Disassemble the instruction at address.
+
+    Bytes that aren't an official opcode are written as a .byte directive one byte long, so disassembly can carry on
+    past data.
+
+    Args:
+        memory: Anything with a get_address method, such as NesMemory
+        address: The address of the opcode
+
+    Returns:
+        A tuple of (the instruction's assembly, such as "LDA $0200,X", its length in bytes)
+    """
+    opcode = memory.get_address(address)
+    instruction = op.OPCODES.get(opcode)
+
+    if instruction is None:
+        return ".byte ${opcode:02X}".format(opcode=opcode), 1
+
+    byte = memory.get_address((address + 1) & 0xFFFF) if instruction.length > 1 else 0
+    word = byte | memory.get_address((address + 2) & 0xFFFF) << 8 if instruction.length > 2 else 0
+    # (byte ^ 0x80) - 0x80 turns the unsigned offset into a signed one
+    target = (address + 2 + (byte ^ 0x80) - 0x80) & 0xFFFF
+
+    operand = OPERAND_FORMATS[instruction.mode].format(byte=byte, word=word, target=target)
+
+    if not operand:
+        return instruction.mnemonic, instruction.length
+
+    return "{mnemonic} {operand}".format(mnemonic=instruction.mnemonic, operand=operand), instruction.length
+
+
+def disassemble_range(memory, start, end):
+    """
+    Disassemble the instructions from start up to end.
+
+    Args:
+        memory: Anything with a get_address method, such as NesMemory
+        start: The address of the first opcode
+        end: The address to stop at. An instruction that starts before end is included even if it runs past it.
+
+    Yields:
+        Tuples of (address, the instruction's bytes, its assembly)
+    """
+    address = start
+
+    while address < end:
+        text, length = disassemble(memory, address)
+        instruction_bytes = bytes(memory.get_address((address + offset) & 0xFFFF) for offset in range(length))
+        yield address, instruction_bytes, text
+        address += length
+
+
+def format_listing(memory, start, end):
+    """
+    Disassemble the instructions from start up to end as a listing with their addresses and bytes, one per line, e.g.
+    "C000  4C F5 C5  JMP $C5F5".
+    """
+    lines = []
+
+    for address, instruction_bytes, text in disassemble_range(memory, start, end):
+        lines.append("{address:04X}  {bytes:<8}  {text}".format(
+            address=address, bytes=" ".join("{byte:02X}".format(byte=byte) for byte in instruction_bytes), text=text))
+
+    return "\n".join(lines)
@@ -0,0 +1,74 @@
+"""
+Processor status bits and precomputed flag results.
+
+Register writes, INC/DEC and ADC/SBC run on nearly every instruction. Looking their flags up here takes one indexed
+load instead of a comparison per flag.
+"""
+from array import array
+
+# The bits of the processor status (P) register
+CARRY_FLAG = 0x01
+ZERO_FLAG = 0x02
+INTERRUPT_DISABLE_FLAG = 0x04
+DECIMAL_FLAG = 0x08
+BREAK_FLAG = 0x10
+UNUSED_FLAG = 0x20
+OVERFLOW_FLAG = 0x40
+NEGATIVE_FLAG = 0x80
+
+# NZ_FLAGS[value] holds the zero and negative status bits that writing value to a register or memory produces.
+NZ_FLAGS = tuple((ZERO_FLAG if value == 0x0 else 0x00) | (value & NEGATIVE_FLAG) for value in range(0x100))
+
+
+def arithmetic_index(accumulator, operand, carry_flag):
+    """
+    Get the index of an ADC or SBC result in ADC_RESULTS or SBC_RESULTS.
+
+    Args:
+        accumulator: The value of the accumulator before the operation
+        operand: The eight-bit operand
+        carry_flag: The value of the carry flag before the operation
+    """
+    return (carry_flag << 16) | (accumulator << 8) | operand
+
+
+def _build_arithmetic_results(arithmetic_func, carries_func, overflows_func):
+    """
+    Build a table of packed ADC or SBC results for every accumulator, operand and carry flag.
+
+    Bits 0-7 of each entry hold the eight-bit result. Bits 8-15 hold the carry, zero, overflow and negative status bits
+    that the result produces, ready to be combined with the rest of the status register.
+
+    Args:
+        arithmetic_func: Takes (accumulator, operand, carry_flag) and returns the unwrapped result
+        carries_func: Takes the unwrapped result and returns whether the carry flag should be set
+        overflows_func: Takes (accumulator, operand, eight-bit result) and returns whether the overflow flag should be
+                        set
+    """
+    results = array('H')
+
+    for carry_flag in range(2):
+        for accumulator in range(0x100):
+            for operand in range(0x100):
+                the_sum = arithmetic_func(accumulator, operand, carry_flag)
+                result = the_sum & 0xFF
+                status = (NZ_FLAGS[result]
+                          | (CARRY_FLAG if carries_func(the_sum) else 0x00)
+                          | (OVERFLOW_FLAG if overflows_func(accumulator, operand, result) else 0x00))
+                results.append(result | status << 8)
+
+    return results
+
+
+# ADC_RESULTS[arithmetic_index(a, m, c)] and SBC_RESULTS[arithmetic_index(a, m, c)] are packed as described in
+# _build_arithmetic_results. The overflow flag is signed overflow: ADC overflows when both operands have the same sign
+# and the result's sign differs from them, and SBC when the operands' signs differ and the result's differs from the
+# accumulator's.
+ADC_RESULTS = _build_arithmetic_results(lambda accumulator, operand, carry_flag: accumulator + operand + carry_flag,
+                                        lambda the_sum: the_sum > 0xFF,
+                                        lambda accumulator, operand, result: ~(accumulator ^ operand)
+                                        & (accumulator ^ result) & 0x80)
+SBC_RESULTS = _build_arithmetic_results(
+    lambda accumulator, operand, carry_flag: accumulator - operand - (1 - carry_flag),
+    lambda the_sum: the_sum >= 0,
+    lambda accumulator, operand, result: (accumulator ^ operand) & (accumulator ^ result) & 0x80)
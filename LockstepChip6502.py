@@ -0,0 +1,327 @@
+"""
+Many independent 6502 states running the same program in lockstep, with NumPy.
+
+Fuzzing runs one program over thousands of starting states. Running each state through its own Chip6502 pays the
+interpreter's overhead once per state per instruction. Here each register is a NumPy array with one element per state
+(a lane) and memory is an array with one row per lane, so an instruction is decoded once and carried out on every lane
+with a handful of array operations.
+"""
+import numpy
+
+import Chip6502 as chip
+import FlagTables as flag_tables
+import OpcodeTable as opcode_table
+from OpcodeTable import (IMMEDIATE, ZERO_PAGE, ZERO_PAGE_X, ZERO_PAGE_Y, ABSOLUTE, ABSOLUTE_X, INDEXED_INDIRECT,
+                         INDIRECT_INDEXED)
+
+# Every lane has a full 64KB address space
+MEMORY_SIZE = 0x10000
+
+# The instructions the lockstep engine supports. There are no branches or jumps: every lane runs straight through the
+# program.
+SUPPORTED_MNEMONICS = frozenset(["LDA", "LDX", "LDY", "STA", "STX", "STY", "ADC", "SBC", "INC", "DEC", "INX", "INY",
+                                 "DEX", "DEY", "CLC", "SEC", "NOP"])
+
+# The instruction and addressing mode of every opcode the lockstep engine supports, from OpcodeTable. Lengths and cycle
+# counts come from Chip6502, so the two can't disagree.
+OPCODES = {opcode: (instruction.mnemonic.lower(), instruction.mode)
+           for opcode, instruction in opcode_table.OPCODES.items() if instruction.mnemonic in SUPPORTED_MNEMONICS}
+
+# True for the opcodes of real instructions the lockstep engine doesn't support, such as branches and JMP, which step
+# rejects rather than halting on as it does on opcodes that aren't instructions at all
+_UNSUPPORTED = numpy.array([opcode in opcode_table.OPCODES and opcode not in OPCODES for opcode in range(0x100)])
+
+_NZ_FLAGS = numpy.array(flag_tables.NZ_FLAGS, dtype=numpy.uint8)
+_ADC_RESULTS = numpy.frombuffer(flag_tables.ADC_RESULTS, dtype=numpy.uint16)
+_SBC_RESULTS = numpy.frombuffer(flag_tables.SBC_RESULTS, dtype=numpy.uint16)
+
+
+def _build_opcode_table(operations):
+    """
+    Build the table LockstepChip6502 decodes opcodes with.
+
+    Args:
+        operations: A dict of instruction name (as used in OPCODES) to the method that carries it out
+
+    Returns:
+        A list with one entry per opcode: (operation, addressing mode, length, cycles), or None for opcodes that halt
+        the lane
+    """
+    table = [None] * 0x100
+
+    for opcode, (name, mode) in OPCODES.items():
+        handler, length, cycles = chip.Chip6502.decode_opcode(opcode)
+        table[opcode] = (operations[name], mode, length, cycles)
+
+    return table
+
+
+class LockstepChip6502(object):
+    """
+    n_lanes 6502s running the same program, each with its own registers and memory.
+
+    Each step finds the lowest program counter among the lanes still running and executes the instruction there on
+    every lane that has that program counter. Lanes whose program counters have diverged wait, masked out, until the
+    others catch up with them, so lanes that take different paths through a program run together again once the
+    paths rejoin. Lanes that disagree about the opcode at the same address (because the program was modified
+    differently in each) are executed a group at a time.
+
+    Instructions behave exactly as they do in Chip6502, including its flag results, which come from the same tables.
+    Only the instructions in OPCODES are supported, which leaves out branches, JMP, JSR, RTS and everything else that
+    changes the program counter, so every lane runs straight through its program. step raises
+    UnsupportedInstructionException when a lane reaches any other instruction, and a lane that reaches an opcode that
+    isn't an instruction at all halts, as Chip6502 raises InvalidOpcodeException.
+
+    memory is 64KB of plain RAM, a row per lane, with addresses below 0x2000 mirrored every 0x800 bytes as NesMemory does. As
+    with NesMemory.ram, mirrored addresses are stored in their canonical cell (address & 0x7FF).
+    """
+
+    def __init__(self, n_lanes):
+        """
+        Args:
+            n_lanes: The number of CPU states to run
+        """
+        self.n_lanes = n_lanes
+        self.accumulator = numpy.zeros(n_lanes, dtype=numpy.uint8)
+        self.x_register = numpy.zeros(n_lanes, dtype=numpy.uint8)
+        self.y_register = numpy.zeros(n_lanes, dtype=numpy.uint8)
+        self.status = numpy.zeros(n_lanes, dtype=numpy.uint8)
+        self.program_counter = numpy.zeros(n_lanes, dtype=numpy.int64)
+        self.cycles = numpy.zeros(n_lanes, dtype=numpy.int64)
+        self.halted = numpy.zeros(n_lanes, dtype=bool)
+        self.memory = numpy.zeros((n_lanes, MEMORY_SIZE), dtype=numpy.uint8)
+
+        # Lane lane's address is element lane * MEMORY_SIZE + address of the flattened memory, so one fancy index
+        # reads or writes a different address in every lane.
+        self.__flat_memory = self.memory.reshape(-1)
+        self.__lane_offsets = numpy.arange(n_lanes, dtype=numpy.int64) * MEMORY_SIZE
+
+    def load_program(self, address, program):
+        """
+        Copy program into every lane's memory, starting at address.
+        """
+        self.memory[:, address:address + len(program)] = numpy.frombuffer(bytes(program), dtype=numpy.uint8)
+
+    def step(self):
+        """
+        Execute one instruction on every running lane whose program counter is the lowest.
+
+        Returns:
+            The number of lanes that executed an instruction (or halted on an invalid one)
+
+        Raises:
+            UnsupportedInstructionException if any of the lanes is at an instruction not in OPCODES, before any lane
+            executes anything
+        """
+        running = numpy.flatnonzero(~self.halted)
+
+        if running.size == 0:
+            return 0
+
+        program_counters = self.program_counter[running]
+        program_counter = int(program_counters.min())
+        lanes = running[program_counters == program_counter]
+        opcodes = self.__read(lanes, program_counter)
+        unsupported = _UNSUPPORTED[opcodes]
+
+        if unsupported.any():
+            opcode = int(opcodes[unsupported][0])
+            raise UnsupportedInstructionException(
+                "{mnemonic} (${opcode:02X}) at ${address:04X} isn't supported by LockstepChip6502"
+                .format(mnemonic=opcode_table.OPCODES[opcode].mnemonic, opcode=opcode, address=program_counter))
+
+        if opcodes.min() == opcodes.max():
+            self.__execute(int(opcodes[0]), lanes, program_counter)
+        else:
+            for opcode in numpy.unique(opcodes):
+                self.__execute(int(opcode), lanes[opcodes == opcode], program_counter)
+
+        return lanes.size
+
+    def run(self, n_steps):
+        """
+        Call step n_steps times, stopping early if every lane has halted.
+
+        Returns:
+            The total number of instructions executed across all the lanes
+        """
+        executed = 0
+
+        for _ in range(n_steps):
+            lanes = self.step()
+
+            if lanes == 0:
+                break
+
+            executed += lanes
+
+        return executed
+
+    def __execute(self, opcode, lanes, program_counter):
+        entry = self.__opcode_table[opcode]
+
+        if entry is None:
+            self.halted[lanes] = True
+            return
+
+        operation, mode, length, cycles = entry
+        self.cycles[lanes] += cycles
+        # The program counter wraps at 0xFFFF. Past it, a lane would read the next lane's memory.
+        self.program_counter[lanes] = (program_counter + length) & 0xFFFF
+        operation(self, lanes, mode, program_counter)
+
+    def __read(self, lanes, addresses):
+        addresses = numpy.where(addresses < 0x2000, addresses & 0x7FF, addresses)
+        return self.__flat_memory[self.__lane_offsets[lanes] + addresses]
+
+    def __write(self, lanes, addresses, values):
+        addresses = numpy.where(addresses < 0x2000, addresses & 0x7FF, addresses)
+        self.__flat_memory[self.__lane_offsets[lanes] + addresses] = values
+
+    def __address(self, lanes, mode, program_counter, reading):
+        """
+        Work out each lane's operand address for an addressing mode.
+
+        Args:
+            lanes: The indices of the lanes executing the instruction
+            mode: The addressing mode
+            program_counter: The address of the instruction's opcode
+            reading: True if the instruction only reads the address, so crossing a page costs a cycle
+        """
+        low_byte = self.__read(lanes, (program_counter + 1) & 0xFFFF).astype(numpy.int64)
+
+        if mode == ZERO_PAGE:
+            return low_byte
+
+        if mode == ZERO_PAGE_X:
+            return (low_byte + self.x_register[lanes]) & 0xFF
+
+        if mode == ZERO_PAGE_Y:
+            return (low_byte + self.y_register[lanes]) & 0xFF
+
+        if mode == INDEXED_INDIRECT:
+            pointer = (low_byte + self.x_register[lanes]) & 0xFF
+            return self.__read_zero_page_word(lanes, pointer)
+
+        if mode == INDIRECT_INDEXED:
+            base_address = self.__read_zero_page_word(lanes, low_byte)
+            index = self.y_register[lanes]
+        else:
+            base_address = low_byte | (self.__read(lanes, (program_counter + 2) & 0xFFFF).astype(numpy.int64) << 8)
+
+            if mode == ABSOLUTE:
+                return base_address
+
+            index = self.x_register[lanes] if mode == ABSOLUTE_X else self.y_register[lanes]
+
+        address = (base_address + index) & 0xFFFF
+
+        if reading:
+            self.cycles[lanes] += ((base_address ^ address) & 0xFF00) != 0
+
+        return address
+
+    def __read_zero_page_word(self, lanes, pointer):
+        return (self.__read(lanes, pointer).astype(numpy.int64)
+                | (self.__read(lanes, (pointer + 1) & 0xFF).astype(numpy.int64) << 8))
+
+    def __operand(self, lanes, mode, program_counter):
+        if mode == IMMEDIATE:
+            return self.__read(lanes, (program_counter + 1) & 0xFFFF)
+
+        page_crossing = mode in opcode_table.PAGE_CROSSING_MODES
+        return self.__read(lanes, self.__address(lanes, mode, program_counter, page_crossing))
+
+    def __set_nz_flags(self, lanes, values):
+        # 0x7D clears the zero and negative flags
+        self.status[lanes] = (self.status[lanes] & 0x7D) | _NZ_FLAGS[values]
+
+    def __lda(self, lanes, mode, program_counter):
+        values = self.__operand(lanes, mode, program_counter)
+        self.accumulator[lanes] = values
+        self.__set_nz_flags(lanes, values)
+
+    def __ldx(self, lanes, mode, program_counter):
+        values = self.__operand(lanes, mode, program_counter)
+        self.x_register[lanes] = values
+        self.__set_nz_flags(lanes, values)
+
+    def __ldy(self, lanes, mode, program_counter):
+        values = self.__operand(lanes, mode, program_counter)
+        self.y_register[lanes] = values
+        self.__set_nz_flags(lanes, values)
+
+    def __sta(self, lanes, mode, program_counter):
+        self.__write(lanes, self.__address(lanes, mode, program_counter, False), self.accumulator[lanes])
+
+    def __stx(self, lanes, mode, program_counter):
+        self.__write(lanes, self.__address(lanes, mode, program_counter, False), self.x_register[lanes])
+
+    def __sty(self, lanes, mode, program_counter):
+        self.__write(lanes, self.__address(lanes, mode, program_counter, False), self.y_register[lanes])
+
+    def __adc(self, lanes, mode, program_counter):
+        self.__arithmetic(lanes, self.__operand(lanes, mode, program_counter), _ADC_RESULTS)
+
+    def __sbc(self, lanes, mode, program_counter):
+        self.__arithmetic(lanes, self.__operand(lanes, mode, program_counter), _SBC_RESULTS)
+
+    def __arithmetic(self, lanes, operands, results):
+        # See FlagTables for how the results are indexed and packed. 0x3C clears the carry, zero, overflow and
+        # negative flags.
+        status = self.status[lanes]
+        entries = results[((status.astype(numpy.int64) & 0x01) << 16)
+                          | (self.accumulator[lanes].astype(numpy.int64) << 8)
+                          | operands]
+        self.accumulator[lanes] = entries & 0xFF
+        self.status[lanes] = (status & 0x3C) | (entries >> 8)
+
+    def __inc(self, lanes, mode, program_counter):
+        self.__modify(lanes, mode, program_counter, 1)
+
+    def __dec(self, lanes, mode, program_counter):
+        self.__modify(lanes, mode, program_counter, -1)
+
+    def __modify(self, lanes, mode, program_counter, delta):
+        addresses = self.__address(lanes, mode, program_counter, False)
+        values = (self.__read(lanes, addresses).astype(numpy.int64) + delta) & 0xFF
+        self.__write(lanes, addresses, values)
+        self.__set_nz_flags(lanes, values)
+
+    def __inx(self, lanes, mode, program_counter):
+        self.x_register[lanes] += 1
+        self.__set_nz_flags(lanes, self.x_register[lanes])
+
+    def __iny(self, lanes, mode, program_counter):
+        self.y_register[lanes] += 1
+        self.__set_nz_flags(lanes, self.y_register[lanes])
+
+    def __dex(self, lanes, mode, program_counter):
+        self.x_register[lanes] -= 1
+        self.__set_nz_flags(lanes, self.x_register[lanes])
+
+    def __dey(self, lanes, mode, program_counter):
+        self.y_register[lanes] -= 1
+        self.__set_nz_flags(lanes, self.y_register[lanes])
+
+    def __clc(self, lanes, mode, program_counter):
+        self.status[lanes] &= ~numpy.uint8(flag_tables.CARRY_FLAG)
+
+    def __sec(self, lanes, mode, program_counter):
+        self.status[lanes] |= flag_tables.CARRY_FLAG
+
+    def __nop(self, lanes, mode, program_counter):
+        pass
+
+    __opcode_table = _build_opcode_table({
+        "lda": __lda, "ldx": __ldx, "ldy": __ldy,
+        "sta": __sta, "stx": __stx, "sty": __sty,
+        "adc": __adc, "sbc": __sbc,
+        "inc": __inc, "dec": __dec,
+        "inx": __inx, "iny": __iny, "dex": __dex, "dey": __dey,
+        "clc": __clc, "sec": __sec, "nop": __nop,
+    })
+
+
+class UnsupportedInstructionException(Exception):
+    pass
@@ -2,12 +2,36 @@ class NesMemory(object):
 
     def __init__(self, memory_size):
         self.memory_size = memory_size
-        self.ram = []
-        self.__init_memory()
+        self.__memory = bytearray(memory_size)
 
-    def __init_memory(self):
-        for i in range(self.memory_size):
-            self.ram.append(0x00)
+        # A zero-copy view of the backing store. Mirrored addresses are only stored in their canonical cell, so use
+        # get_address when the mirrors matter.
+        self.ram = memoryview(self.__memory)
+
+        # One entry per 256-byte page. None means the page is plain RAM; anything else is the function that handles
+        # reads or writes for the device mapped there, with any watches on the page in front of it. See map_region
+        # and watch_reads.
+        self.__read_handlers = [None] * 0x100
+        self.__write_handlers = [None] * 0x100
+        self.__read_devices = [None] * 0x100
+        self.__write_devices = [None] * 0x100
+
+        # Per page lists of (start address, end address, watch function), or None for unwatched pages
+        self.__read_watches = [None] * 0x100
+        self.__write_watches = [None] * 0x100
+        self.__execute_watches = [None] * 0x100
+
+        # What Chip6502 fetches opcodes with. It's get_address itself unless an execution watch is set.
+        self.fetch_opcode = self.get_address
+
+        # Goes up by one whenever a device or watch is added or removed, so anything that caches what's mapped where,
+        # like BlockCache, can tell when to look again
+        self.watch_version = 0
+
+        # The pages of the last snapshot taken or restored, and a flag per page that's set when the page is written
+        # after it. Only dirty pages are copied by the next snapshot. See snapshot.
+        self.__snapshot_pages = None
+        self.__dirty_pages = bytearray(b"\x01" * 0x100)
 
     def set_address(self, address, value):
         """
@@ -15,51 +39,516 @@ class NesMemory(object):
 
         Address locations can store an eight-bit value, so valid values are from 0x00 to 0xFF.
 
-        Addresses 0x00 to 0x7FF inclusive are mirrored in addresses 0x801 to 0x2000. Setting an address in one range
-        results in the corresponding address in the other range being set to the same value.
+        Addresses 0x00 to 0x7FF inclusive are mirrored three times in addresses 0x800 to 0x1FFF. Mirrored addresses
+        share one canonical cell (address & 0x7FF), so setting an address in one range is seen by all of its mirrors
+        without any extra writes.
+
+        Writes to pages with a device mapped by map_region go to that device instead.
+
+        The page written is marked dirty, so the next snapshot copies it. Writing straight to ram isn't tracked.
 
         Args:
-            address: The memory address to set. Valid values are from 0x00 to self.__memory_size
+            address: The memory address to set. Valid values are from 0x00 to self.memory_size
             value: The eight-bit value to set the address to.
 
         Raises:
             MemorySlotOverflowException if the length of value is > 0xFF.
         """
+        if value > 0xFF:
+            raise MemorySlotOverflowException
+
+        write_handler = self.__write_handlers[address >> 8]
+
+        if write_handler is None:
+            if address < 0x2000:
+                address &= 0x7FF
+
+            self.__memory[address] = value
+            self.__dirty_pages[address >> 8] = 1
+        else:
+            write_handler(address, value)
+
+    def get_address(self, address):
+        read_handler = self.__read_handlers[address >> 8]
+
+        if read_handler is None:
+            if address < 0x2000:
+                address &= 0x7FF
+
+            return self.__memory[address]
+
+        return read_handler(address)
+
+    def peek(self, address):
+        """
+        Read an address without setting off the watches on it, for debuggers and tracers that look at memory without
+        being part of the program.
+
+        Plain RAM is read from the backing store, following internal RAM's mirrors. An address with a device mapped on
+        it, such as a cartridge's PRG ROM, is still read from the device, since that's the only place its value is, so
+        peeking at a device register with read side effects (like PPUSTATUS) still has them.
+        """
+        read_device = self.__read_devices[address >> 8]
 
-        address_should_be_mirrored_upward = lambda: 0x00 <= address <= 0x7FF
-        address_should_be_mirrored_downward = lambda: 0x801 <= address <= 0x2000
+        if read_device is None:
+            if address < 0x2000:
+                address &= 0x7FF
 
+            return self.__memory[address]
+
+        return read_device(address)
+
+    def read_block(self, start_address, length):
+        """
+        Read length bytes starting at start_address, as get_address would read them one at a time.
+
+        Runs of plain RAM are copied with one slice each, so only the pages with a device or watch on them are read a
+        byte at a time. Internal RAM's mirrors are followed: read_block(0x07FE, 4) reads 0x07FE, 0x07FF, 0x0000 and
+        0x0001.
+
+        Args:
+            start_address: The first address to read
+            length: The number of bytes to read. The block mustn't run past the end of memory.
+
+        Returns:
+            The bytes read, as bytes
+        """
+        block = bytearray(length)
+        read_handlers = self.__read_handlers
+        offset = 0
+
+        while offset < length:
+            address = start_address + offset
+            count = self.__plain_run(address, length - offset, read_handlers)
+
+            if count:
+                source = address & 0x7FF if address < 0x2000 else address
+                block[offset:offset + count] = self.__memory[source:source + count]
+                offset += count
+            else:
+                # The rest of a page with a device or watch on it, a byte at a time
+                read_handler = read_handlers[address >> 8]
+                page_end = min((address | 0xFF) + 1, start_address + length)
+
+                for address in range(address, page_end):
+                    block[offset] = read_handler(address)
+                    offset += 1
+
+        return bytes(block)
+
+    def write_block(self, start_address, data):
+        """
+        Write data to memory starting at start_address, as set_address would write it one byte at a time.
+
+        Runs of plain RAM are written with one slice assignment each and marked dirty; pages with a device or watch on
+        them are written a byte at a time, so the device or watch sees every write. Internal RAM's mirrors are
+        followed, as they are by read_block.
+
+        Args:
+            start_address: The first address to write
+            data: A bytes-like object of the values to write. It mustn't run past the end of memory.
+        """
+        data = memoryview(data).cast("B")
+        write_handlers = self.__write_handlers
+        length = len(data)
+        offset = 0
+
+        while offset < length:
+            address = start_address + offset
+            count = self.__plain_run(address, length - offset, write_handlers)
+
+            if count:
+                target = address & 0x7FF if address < 0x2000 else address
+                first_page = target >> 8
+                last_page = (target + count - 1) >> 8
+                self.__memory[target:target + count] = data[offset:offset + count]
+                self.__dirty_pages[first_page:last_page + 1] = b"\x01" * (last_page - first_page + 1)
+                offset += count
+            else:
+                write_handler = write_handlers[address >> 8]
+                page_end = min((address | 0xFF) + 1, start_address + length)
+
+                for address in range(address, page_end):
+                    write_handler(address, data[offset])
+                    offset += 1
+
+    def fill(self, start_address, end_address, value):
+        """
+        Set every address from start_address to end_address inclusive to value.
+
+        e.g. fill(0x0200, 0x02FF, 0xFF) clears a page of sprites to off screen
+
+        Args:
+            start_address: The first address to set
+            end_address: The last address to set
+            value: The eight-bit value to set them to
+
+        Raises:
+            MemorySlotOverflowException if value is > 0xFF.
+        """
         if value > 0xFF:
             raise MemorySlotOverflowException
 
-        self.ram[address] = value
+        self.write_block(start_address, bytes([value]) * (end_address - start_address + 1))
 
-        if address_should_be_mirrored_upward(): self.ram[address + 0x801] = value
-        if address_should_be_mirrored_downward(): self.ram[address - 0x801] = value
+    @staticmethod
+    def __plain_run(address, length, handlers):
+        """
+        Count how many of the length bytes from address can be copied straight to or from the backing store: the run
+        of pages without a handler, stopping at the end of internal RAM's 0x800 byte mirror.
+        """
+        end_address = address + length
 
-    def get_address(self, address):
-        return self.ram[address]
+        if address < 0x2000:
+            end_address = min(end_address, (address | 0x7FF) + 1)
+
+        run_end = address
+
+        while run_end < end_address and handlers[run_end >> 8] is None:
+            run_end = (run_end | 0xFF) + 1
+
+        return min(run_end, end_address) - address
+
+    def __read_ram(self, address):
+        if address < 0x2000:
+            address &= 0x7FF
+
+        return self.__memory[address]
+
+    def __write_ram(self, address, value):
+        if address < 0x2000:
+            address &= 0x7FF
+
+        self.__memory[address] = value
+        self.__dirty_pages[address >> 8] = 1
+
+    def map_region(self, start_address, end_address, read_func=None, write_func=None):
+        """
+        Attach a device to the addresses from start_address to end_address inclusive.
+
+        Reads in the region call read_func(address) and use what it returns. Writes call write_func(address, value).
+        Either function can be left out, in which case those accesses carry on to whatever the region covered before.
+        The functions are given the address that was accessed, so a device whose registers are mirrored (such as the
+        PPU's eight registers repeated from 0x2000 to 0x3FFF) masks the address itself.
+
+        Devices are looked up by 256-byte page, so plain RAM pays nothing for them. A region that only covers part of a
+        page puts a range check in front of the device for that page alone.
+
+        e.g. map_region(0x2000, 0x3FFF, ppu.read_register, ppu.write_register)
+
+        Args:
+            start_address: The first address the device handles
+            end_address: The last address the device handles
+            read_func: A function taking an address and returning an eight-bit value
+            write_func: A function taking an address and an eight-bit value
+        """
+        for page in range(start_address >> 8, (end_address >> 8) + 1):
+            if read_func is not None:
+                self.__read_devices[page] = self.__region_handler(page, start_address, end_address, read_func,
+                                                                  self.__read_devices[page] or self.__read_ram)
+
+            if write_func is not None:
+                self.__write_devices[page] = self.__region_handler(page, start_address, end_address, write_func,
+                                                                   self.__write_devices[page] or self.__write_ram)
+
+            self.__update_handlers(page)
+
+    def watch_reads(self, start_address, end_address, watch_func):
+        """
+        Call watch_func(address, value) after every read of the addresses from start_address to end_address, with the
+        value that was read.
+
+        Like map_region this works a page at a time, so only the watched pages pay for it. Watching internal RAM also
+        watches its mirrors, so a read of 0x0B00 is seen by a watch on 0x0300.
+
+        Args:
+            start_address: The first address to watch
+            end_address: The last address to watch. It must be in the same 0x800 byte block of internal RAM as
+                         start_address if start_address is in internal RAM.
+            watch_func: A function taking an address and an eight-bit value
+        """
+        self.__add_watch(self.__read_watches, start_address, end_address, watch_func)
+
+    def watch_writes(self, start_address, end_address, watch_func):
+        """
+        Call watch_func(address, value) before every write to the addresses from start_address to end_address.
+
+        The write then carries on to whatever the region holds, RAM or a device. See watch_reads.
+
+        Args:
+            start_address: The first address to watch
+            end_address: The last address to watch
+            watch_func: A function taking an address and an eight-bit value
+        """
+        self.__add_watch(self.__write_watches, start_address, end_address, watch_func)
+
+    def watch_execution(self, start_address, end_address, watch_func):
+        """
+        Call watch_func(address, opcode) whenever a Chip6502 fetches an opcode from the addresses from start_address to
+        end_address, before the instruction runs.
+
+        Opcodes are fetched with fetch_opcode. Until an execution watch is set that's get_address itself, so a chip
+        whose memory has no execution watches pays nothing for them. See watch_reads.
+
+        Args:
+            start_address: The first address to watch
+            end_address: The last address to watch
+            watch_func: A function taking an address and an eight-bit opcode
+        """
+        self.__add_watch(self.__execute_watches, start_address, end_address, watch_func)
+
+    def execution_watched_pages(self):
+        """
+        Get the pages with an execution watch on them.
+
+        Returns:
+            A frozenset of page numbers (address >> 8)
+        """
+        return frozenset(page for page, watches in enumerate(self.__execute_watches) if watches is not None)
+
+    def write_device_pages(self):
+        """
+        Get the pages with a device mapped to handle their writes, such as a cartridge's PRG ROM. Writes to every other
+        page go to plain RAM.
+
+        Returns:
+            A frozenset of page numbers (address >> 8)
+        """
+        return frozenset(page for page, device in enumerate(self.__write_devices) if device is not None)
+
+    def remove_watch(self, watch_func):
+        """
+        Remove every read, write and execution watch that calls watch_func.
+        """
+        for watches in [self.__read_watches, self.__write_watches, self.__execute_watches]:
+            for page in range(0x100):
+                if watches[page] is not None:
+                    remaining = [watch for watch in watches[page] if watch[2] is not watch_func]
+                    watches[page] = remaining or None
+                    self.__update_handlers(page)
+
+    def __add_watch(self, watches, start_address, end_address, watch_func):
+        if end_address < 0x2000:
+            ranges = [((start_address & 0x7FF) + mirror, (end_address & 0x7FF) + mirror)
+                      for mirror in range(0x0000, 0x2000, 0x800)]
+        else:
+            ranges = [(start_address, end_address)]
+
+        for range_start, range_end in ranges:
+            for page in range(range_start >> 8, (range_end >> 8) + 1):
+                watches[page] = (watches[page] or []) + [(range_start, range_end, watch_func)]
+                self.__update_handlers(page)
+
+    def __update_handlers(self, page):
+        """
+        Work out the functions that handle reads and writes to page from the devices and watches on it.
+        """
+        read_device = self.__read_devices[page]
+        write_device = self.__write_devices[page]
+        read_watches = self.__read_watches[page]
+        write_watches = self.__write_watches[page]
+
+        if read_watches is None:
+            self.__read_handlers[page] = read_device
+        else:
+            read = read_device or self.__read_ram
+
+            def read_then_watch(address):
+                value = read(address)
+
+                for start_address, end_address, watch_func in read_watches:
+                    if start_address <= address <= end_address:
+                        watch_func(address, value)
+
+                return value
+
+            self.__read_handlers[page] = read_then_watch
+
+        if write_watches is None:
+            self.__write_handlers[page] = write_device
+        else:
+            write = write_device or self.__write_ram
+
+            def watch_then_write(address, value):
+                for start_address, end_address, watch_func in write_watches:
+                    if start_address <= address <= end_address:
+                        watch_func(address, value)
+
+                write(address, value)
+
+            self.__write_handlers[page] = watch_then_write
+
+        self.watch_version += 1
+
+        if any(self.__execute_watches):
+            self.fetch_opcode = self.__fetch_watched_opcode
+        else:
+            self.fetch_opcode = self.get_address
+
+    def __fetch_watched_opcode(self, address):
+        opcode = self.get_address(address)
+        execute_watches = self.__execute_watches[address >> 8]
+
+        if execute_watches is not None:
+            for start_address, end_address, watch_func in execute_watches:
+                if start_address <= address <= end_address:
+                    watch_func(address, opcode)
+
+        return opcode
+
+    def unmap_region(self, start_address, end_address):
+        """
+        Turn every page from start_address to end_address back into plain RAM, removing any devices mapped there and any
+        watches on them.
+        """
+        for page in range(start_address >> 8, (end_address >> 8) + 1):
+            self.__read_devices[page] = None
+            self.__write_devices[page] = None
+            self.__read_watches[page] = None
+            self.__write_watches[page] = None
+            self.__execute_watches[page] = None
+            self.__update_handlers(page)
+
+    def __region_handler(self, page, start_address, end_address, handler, previous_handler):
+        """
+        Get the function that handles accesses to page for a region from start_address to end_address.
+
+        If the region covers the whole page then that's handler itself. Otherwise it's a function that passes addresses
+        inside the region to handler and everything else to previous_handler.
+        """
+        page_start = page << 8
+        page_end = page_start | 0xFF
+
+        if start_address <= page_start and page_end <= end_address:
+            return handler
+
+        def handle_part_of_page(address, *value):
+            if start_address <= address <= end_address:
+                return handler(address, *value)
+
+            return previous_handler(address, *value)
+
+        return handle_part_of_page
+
+    def snapshot(self):
+        """
+        Take a copy of the contents of memory.
+
+        The copy is a tuple of immutable 256-byte pages. Only pages written through set_address since the last
+        snapshot taken or restored are copied; the rest are the same bytes objects as in that snapshot, so a run of
+        snapshots only pays for the pages that changed between them.
+
+        Only the memory itself is copied. Devices mapped with map_region keep their own state. Writes made straight to
+        ram aren't seen unless mark_dirty is called for them.
+
+        Returns:
+            A tuple of bytes, one per page
+        """
+        ram = self.ram
+        dirty_pages = self.__dirty_pages
+        pages = self.__snapshot_pages
 
-    def get_absolute_indexed_address(self, base_address, get_offset_func):
+        if pages is None:
+            pages = tuple(ram[start:start + 0x100].tobytes() for start in range(0, len(ram), 0x100))
+        elif any(dirty_pages):
+            pages = list(pages)
+
+            for index in range(len(pages)):
+                if dirty_pages[index]:
+                    start = index << 8
+                    pages[index] = ram[start:start + 0x100].tobytes()
+
+            pages = tuple(pages)
+
+        dirty_pages[:] = bytes(0x100)
+        self.__snapshot_pages = pages
+        return pages
+
+    def restore(self, pages):
+        """
+        Put memory back to the contents it had when snapshot returned pages.
+
+        Writes made by restoring don't go through set_address, so anything watching writes won't see them.
+
+        Args:
+            pages: A tuple of pages returned by snapshot
+        """
+        self.__memory[:] = b"".join(pages)
+        self.__dirty_pages[:] = bytes(0x100)
+        self.__snapshot_pages = tuple(pages)
+
+    def mark_dirty(self, start_address, end_address):
+        """
+        Mark the pages from start_address to end_address as changed, so the next snapshot copies them. Only needed
+        after writing straight to ram.
+        """
+        for page in range(start_address >> 8, (end_address >> 8) + 1):
+            self.__dirty_pages[page & 0x07 if page < 0x20 else page] = 1
+
+    def read_word(self, address):
+        """
+        Read the 16-bit little-endian word that starts at address.
+
+        e.g. If 0x10 contains 0x02 and 0x11 contains 0x22 then read_word(0x10) gives 0x2202.
+
+        Pointers in the zero page wrap around within it, as they do on the 6502: read_word(0xFF) takes its high byte
+        from 0x00 rather than 0x100.
+
+        Args:
+            address: The address of the word's low byte
+
+        Returns:
+            The word as a number from 0x0000 to 0xFFFF
+        """
+        if address < 0x100:
+            if self.__read_handlers[0x00] is None:
+                memory = self.__memory
+                return memory[address] | (memory[(address + 0x01) & 0xFF] << 8)
+
+            return self.get_address(address) | (self.get_address((address + 0x01) & 0xFF) << 8)
+
+        return self.get_address(address) | (self.get_address((address + 0x01) & 0xFFFF) << 8)
+
+    def get_zero_page_indexed_address(self, address, index):
         """
-        Get the memory address that is the base address plus the value retrieved by executing an offset function.
+        Get the address used by zero page X and zero page Y addressing: address plus the index register, wrapped around
+        to stay inside the zero page.
 
-        The offset function is intended to retrieve the value of the chip's X or Y register.
+        e.g. LDA $F0,X when the X-register contains 0x20 reads from 0x0010, not 0x0110.
 
-        e.g. If address given is 0x01 and the X-register contains 0x04, then the following call:
+        Args:
+            address: The zero page address in the operand
+            index: The value of the X or Y register
+        """
+        return (address + index) & 0xFF
 
-        get_absolute_indexed_address(0x01, get_x_register)
+    def get_absolute_indexed_address(self, base_address, index):
+        """
+        Get the address used by absolute X and absolute Y addressing: base_address plus the index register, wrapped
+        around at the top of memory.
 
-        Where get_x_register returns a valu of 0x02 will result 0x01 + 0x02 = 0x03 being returned.
+        e.g. If base_address is 0x01 and the X-register contains 0x02 then the address is 0x01 + 0x02 = 0x03.
 
         Args:
             base_address: The memory address to begin from
-            get_offset_func: A function that returns the offset to add to base_address
+            index: The value of the X or Y register
 
         Returns:
-            The absolute indexed memory address in relation to base_address and the result of get_offset_func
+            The absolute indexed memory address
         """
-        return base_address + get_offset_func()
+        return (base_address + index) & 0xFFFF
+
+    def get_indirect_address(self, pointer):
+        """
+        Get the address JMP ($nnnn) jumps to: the word at pointer.
+
+        The 6502 doesn't carry into the pointer's high byte when it fetches the second byte of the word, so JMP ($10FF)
+        takes its low byte from 0x10FF and its high byte from 0x1000.
+
+        Args:
+            pointer: The address in the operand
+        """
+        return self.get_address(pointer) | self.get_address((pointer & 0xFF00) | ((pointer + 0x01) & 0xFF)) << 8
 
     def get_indexed_indirect_memory_address(self, address, x_register):
         """
@@ -78,11 +567,12 @@ class NesMemory(object):
 
         So 0x37 is the value to be loaded in to the accumulator.
 
+        The pointer is always read from the zero page, so address + X wraps around to stay inside it.
+
         Args:
             address: The address that should have the X register added to it to begin the above process.
         """
-        first_address = address + x_register
-        return self.__combine_two_consecutive_address_values(first_address)
+        return self.read_word((address + x_register) & 0xFF)
 
     def get_indirect_indexed_memory_address(self, address, y_register):
         """
@@ -106,35 +596,7 @@ class NesMemory(object):
 
         Supposing 0x1203 contains 0xFE then load 0xFE into the accumulator.
         """
-        combined_address = self.__combine_two_consecutive_address_values(address)        
-        return combined_address + y_register
-
-    def __combine_two_consecutive_address_values(self, first_address):
-
-        def get_two_consecutive_address_values(first_address):
-            return (self.get_address(first_address), self.get_address(first_address+0x01))
-
-        def combine_two_hex_addresses(address1, address2):
-            """
-            Combine two 8-bit hex numbers into a 16 bit little-endian hex number
-
-            e.g: self.__combine_two_hex_addresses(0x02, 0x22) gives 0x2202
-
-            Args:
-                address1: The first hex number
-                address2: The second hex number
-
-            Returns:
-                The two numbers combined into a 16-bit number as described above
-            """
-            get_hex_digits = lambda hex_value: str(hex_value).split('x')[1].zfill(2)
-
-            hex_address = "0x{first_digit}{second_digit}".format(first_digit=get_hex_digits(hex(address2)),
-                                                                second_digit=get_hex_digits(hex(address1)))
-            return int(hex_address, 0)
-
-        contents1, contents2 = get_two_consecutive_address_values(first_address)
-        return combine_two_hex_addresses(contents1, contents2)
+        return (self.read_word(address) + y_register) & 0xFFFF
 
 class MemorySlotOverflowException(Exception):
     pass
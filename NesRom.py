@@ -0,0 +1,175 @@
+import mmap
+
+PRG_BANK_SIZE = 0x4000
+CHR_BANK_SIZE = 0x2000
+TRAINER_SIZE = 0x200
+TRAINER_ADDRESS = 0x7000
+HEADER_SIZE = 0x10
+
+
+class NesRom(object):
+    """
+    A cartridge image in iNES or NES 2.0 format.
+
+    The PRG and CHR banks are memoryview slices of the image rather than copies, so loading a ROM costs the same
+    whatever its size. Use NesRom.load to map a ROM file into memory with mmap.
+    """
+
+    def __init__(self, image):
+        """
+        Parse the header of a ROM image and slice it into banks.
+
+        Args:
+            image: The whole ROM file as a bytes-like object
+
+        Raises:
+            InvalidRomException: image isn't an iNES file or is shorter than its header says
+        """
+        self.__image = memoryview(image)
+        self.__mmap = None
+        self.trainer = None
+        self.prg_rom = None
+        self.chr_rom = None
+        self.prg_banks = []
+        self.chr_banks = []
+
+        header = bytes(self.__image[:HEADER_SIZE])
+
+        if len(header) < HEADER_SIZE or header[:4] != b"NES\x1A":
+            self.close()
+            raise InvalidRomException("Not an iNES ROM image")
+
+        self.is_nes2 = header[7] & 0x0C == 0x08
+        self.mapper = (header[7] & 0xF0) | (header[6] >> 4)
+        self.vertical_mirroring = bool(header[6] & 0x01)
+        self.has_battery = bool(header[6] & 0x02)
+        self.four_screen = bool(header[6] & 0x08)
+
+        prg_size = header[4] * PRG_BANK_SIZE
+        chr_size = header[5] * CHR_BANK_SIZE
+
+        if self.is_nes2:
+            self.mapper |= (header[8] & 0x0F) << 8
+            prg_size = self.__nes2_rom_size(header[4], header[9] & 0x0F, PRG_BANK_SIZE)
+            chr_size = self.__nes2_rom_size(header[5], header[9] >> 4, CHR_BANK_SIZE)
+
+        offset = HEADER_SIZE
+
+        if header[6] & 0x04:
+            self.trainer = self.__image[offset:offset + TRAINER_SIZE]
+            offset += TRAINER_SIZE
+
+        if len(self.__image) < offset + prg_size + chr_size:
+            self.close()
+            raise InvalidRomException("ROM image is shorter than its header says")
+
+        self.prg_rom = self.__image[offset:offset + prg_size]
+        self.chr_rom = self.__image[offset + prg_size:offset + prg_size + chr_size]
+
+        self.prg_banks = [self.prg_rom[start:start + PRG_BANK_SIZE] for start in range(0, prg_size, PRG_BANK_SIZE)]
+        self.chr_banks = [self.chr_rom[start:start + CHR_BANK_SIZE] for start in range(0, chr_size, CHR_BANK_SIZE)]
+
+    @classmethod
+    def load(cls, path):
+        """
+        Map a ROM file into memory and parse it.
+
+        The file is mapped read-only with mmap, so none of it is read until an address in it is used. Call close (or use
+        the ROM as a context manager) when finished with it to unmap the file.
+
+        Args:
+            path: The path to an iNES or NES 2.0 file
+
+        Returns:
+            The NesRom
+        """
+        with open(path, "rb") as rom_file:
+            image = mmap.mmap(rom_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            rom = cls(image)
+        except InvalidRomException:
+            image.close()
+            raise
+
+        rom.__mmap = image
+        return rom
+
+    def __nes2_rom_size(self, size_lsb, size_msb, bank_size):
+        """
+        Work out a PRG or CHR ROM size from a NES 2.0 header.
+
+        If the most significant nibble is 0xF, the least significant byte holds an exponent and multiplier instead of
+        a bank count.
+        """
+        if size_msb == 0x0F:
+            return (2 ** (size_lsb >> 2)) * ((size_lsb & 0x03) * 2 + 1)
+
+        return ((size_msb << 8) | size_lsb) * bank_size
+
+    def map_into(self, memory):
+        """
+        Map this cartridge's PRG ROM into the CPU's address space.
+
+        Reads from 0x8000 to 0xFFFF come straight from the PRG banks, with a single 16KB bank mirrored into both halves.
+        Writes there are ignored, as they are for ROM. If the cartridge has a trainer it is copied into PRG RAM at 0x7000,
+        where the program can go on to overwrite it as it would on hardware.
+
+        Only mapper 0 (NROM) is supported, because other mappers switch banks in response to writes.
+
+        Args:
+            memory: The NesMemory to map the cartridge into
+
+        Raises:
+            UnsupportedMapperException: The cartridge uses a mapper other than NROM
+            InvalidRomException: The cartridge's PRG ROM isn't 16KB or 32KB, the only sizes NROM comes in
+        """
+        if self.mapper != 0:
+            raise UnsupportedMapperException("Mapper {mapper} is not supported".format(mapper=self.mapper))
+
+        prg_rom = self.prg_rom
+
+        if len(prg_rom) not in (PRG_BANK_SIZE, 2 * PRG_BANK_SIZE):
+            raise InvalidRomException("NROM PRG ROM must be 16KB or 32KB, not {size} bytes".format(size=len(prg_rom)))
+
+        # Both sizes are powers of two, so masking mirrors a 16KB bank into both halves
+        prg_mask = len(prg_rom) - 1
+
+        def read_prg_rom(address):
+            return prg_rom[address & prg_mask]
+
+        def ignore_write(address, value):
+            pass
+
+        memory.map_region(0x8000, 0xFFFF, read_prg_rom, ignore_write)
+
+        if self.trainer is not None:
+            memory.write_block(TRAINER_ADDRESS, self.trainer)
+
+    def close(self):
+        """
+        Release the ROM's banks and unmap its file. The ROM can't be used after this.
+        """
+        for view in self.prg_banks + self.chr_banks:
+            view.release()
+
+        for view in [self.trainer, self.prg_rom, self.chr_rom, self.__image]:
+            if view is not None:
+                view.release()
+
+        if self.__mmap is not None:
+            self.__mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class InvalidRomException(Exception):
+    pass
+
+
+class UnsupportedMapperException(Exception):
+    pass
@@ -0,0 +1,165 @@
+"""
+Every official 6502 instruction, described once.
+
+Chip6502 generates its opcode handlers from this table, the disassembler formats instructions with it and the tests
+check the chip's lengths and cycle counts against it. Adding an opcode here is all it takes to add it everywhere.
+"""
+import collections
+
+# Addressing modes
+IMPLIED = "implied"
+ACCUMULATOR = "accumulator"
+IMMEDIATE = "immediate"
+ZERO_PAGE = "zero_page"
+ZERO_PAGE_X = "zero_page_x"
+ZERO_PAGE_Y = "zero_page_y"
+ABSOLUTE = "absolute"
+ABSOLUTE_X = "absolute_x"
+ABSOLUTE_Y = "absolute_y"
+INDIRECT = "indirect"
+INDEXED_INDIRECT = "indexed_indirect"
+INDIRECT_INDEXED = "indirect_indexed"
+RELATIVE = "relative"
+
+# The number of bytes an instruction takes in each mode, including the opcode
+MODE_LENGTHS = {
+    IMPLIED: 1, ACCUMULATOR: 1,
+    IMMEDIATE: 2, ZERO_PAGE: 2, ZERO_PAGE_X: 2, ZERO_PAGE_Y: 2, INDEXED_INDIRECT: 2, INDIRECT_INDEXED: 2, RELATIVE: 2,
+    ABSOLUTE: 3, ABSOLUTE_X: 3, ABSOLUTE_Y: 3, INDIRECT: 3,
+}
+
+# The status flags each instruction can change, as letters of NV-BDIZC
+FLAGS_AFFECTED = {
+    "ADC": "NVZC", "AND": "NZ", "ASL": "NZC", "BCC": "", "BCS": "", "BEQ": "", "BIT": "NVZ", "BMI": "", "BNE": "",
+    "BPL": "", "BRK": "BI", "BVC": "", "BVS": "", "CLC": "C", "CLD": "D", "CLI": "I", "CLV": "V", "CMP": "NZC",
+    "CPX": "NZC", "CPY": "NZC", "DEC": "NZ", "DEX": "NZ", "DEY": "NZ", "EOR": "NZ", "INC": "NZ", "INX": "NZ",
+    "INY": "NZ", "JMP": "", "JSR": "", "LDA": "NZ", "LDX": "NZ", "LDY": "NZ", "LSR": "NZC", "NOP": "", "ORA": "NZ",
+    "PHA": "", "PHP": "", "PLA": "NZ", "PLP": "NVBDIZC", "ROL": "NZC", "ROR": "NZC", "RTI": "NVBDIZC", "RTS": "",
+    "SBC": "NVZC", "SEC": "C", "SED": "D", "SEI": "I", "STA": "", "STX": "", "STY": "", "TAX": "NZ", "TAY": "NZ",
+    "TSX": "NZ", "TXA": "NZ", "TXS": "", "TYA": "NZ",
+}
+
+# Instructions that take an extra cycle when indexing in one of PAGE_CROSSING_MODES carries into the high byte of the
+# address. Stores and read-modify-writes always take that cycle, so it's part of their base cycle count instead.
+PAGE_CROSSING_MNEMONICS = frozenset(["ADC", "AND", "CMP", "EOR", "LDA", "LDX", "LDY", "ORA", "SBC"])
+PAGE_CROSSING_MODES = frozenset([ABSOLUTE_X, ABSOLUTE_Y, INDIRECT_INDEXED])
+
+Instruction = collections.namedtuple("Instruction", ["opcode", "mnemonic", "mode", "length", "cycles", "flags",
+                                                     "page_penalty"])
+
+
+def _build_table(rows):
+    """
+    Fill in the columns of each row that follow from its mnemonic and mode.
+
+    Args:
+        rows: A list of (opcode, mnemonic, mode, base cycle count) tuples
+
+    Returns:
+        A dict of opcode byte to Instruction
+    """
+    table = {}
+
+    for opcode, mnemonic, mode, cycles in rows:
+        if opcode in table:
+            raise ValueError("Opcode {opcode} is in the table twice".format(opcode=hex(opcode)))
+
+        table[opcode] = Instruction(opcode, mnemonic, mode, MODE_LENGTHS[mode], cycles, FLAGS_AFFECTED[mnemonic],
+                                    mnemonic in PAGE_CROSSING_MNEMONICS and mode in PAGE_CROSSING_MODES)
+
+    return table
+
+
+OPCODES = _build_table([
+    (0x69, "ADC", IMMEDIATE, 2), (0x65, "ADC", ZERO_PAGE, 3), (0x75, "ADC", ZERO_PAGE_X, 4),
+    (0x6D, "ADC", ABSOLUTE, 4), (0x7D, "ADC", ABSOLUTE_X, 4), (0x79, "ADC", ABSOLUTE_Y, 4),
+    (0x61, "ADC", INDEXED_INDIRECT, 6), (0x71, "ADC", INDIRECT_INDEXED, 5),
+
+    (0x29, "AND", IMMEDIATE, 2), (0x25, "AND", ZERO_PAGE, 3), (0x35, "AND", ZERO_PAGE_X, 4),
+    (0x2D, "AND", ABSOLUTE, 4), (0x3D, "AND", ABSOLUTE_X, 4), (0x39, "AND", ABSOLUTE_Y, 4),
+    (0x21, "AND", INDEXED_INDIRECT, 6), (0x31, "AND", INDIRECT_INDEXED, 5),
+
+    (0x0A, "ASL", ACCUMULATOR, 2), (0x06, "ASL", ZERO_PAGE, 5), (0x16, "ASL", ZERO_PAGE_X, 6),
+    (0x0E, "ASL", ABSOLUTE, 6), (0x1E, "ASL", ABSOLUTE_X, 7),
+
+    (0x90, "BCC", RELATIVE, 2), (0xB0, "BCS", RELATIVE, 2), (0xF0, "BEQ", RELATIVE, 2), (0x30, "BMI", RELATIVE, 2),
+    (0xD0, "BNE", RELATIVE, 2), (0x10, "BPL", RELATIVE, 2), (0x50, "BVC", RELATIVE, 2), (0x70, "BVS", RELATIVE, 2),
+
+    (0x24, "BIT", ZERO_PAGE, 3), (0x2C, "BIT", ABSOLUTE, 4),
+
+    (0x00, "BRK", IMPLIED, 7),
+
+    (0x18, "CLC", IMPLIED, 2), (0xD8, "CLD", IMPLIED, 2), (0x58, "CLI", IMPLIED, 2), (0xB8, "CLV", IMPLIED, 2),
+
+    (0xC9, "CMP", IMMEDIATE, 2), (0xC5, "CMP", ZERO_PAGE, 3), (0xD5, "CMP", ZERO_PAGE_X, 4),
+    (0xCD, "CMP", ABSOLUTE, 4), (0xDD, "CMP", ABSOLUTE_X, 4), (0xD9, "CMP", ABSOLUTE_Y, 4),
+    (0xC1, "CMP", INDEXED_INDIRECT, 6), (0xD1, "CMP", INDIRECT_INDEXED, 5),
+
+    (0xE0, "CPX", IMMEDIATE, 2), (0xE4, "CPX", ZERO_PAGE, 3), (0xEC, "CPX", ABSOLUTE, 4),
+
+    (0xC0, "CPY", IMMEDIATE, 2), (0xC4, "CPY", ZERO_PAGE, 3), (0xCC, "CPY", ABSOLUTE, 4),
+
+    (0xC6, "DEC", ZERO_PAGE, 5), (0xD6, "DEC", ZERO_PAGE_X, 6), (0xCE, "DEC", ABSOLUTE, 6),
+    (0xDE, "DEC", ABSOLUTE_X, 7),
+
+    (0xCA, "DEX", IMPLIED, 2), (0x88, "DEY", IMPLIED, 2),
+
+    (0x49, "EOR", IMMEDIATE, 2), (0x45, "EOR", ZERO_PAGE, 3), (0x55, "EOR", ZERO_PAGE_X, 4),
+    (0x4D, "EOR", ABSOLUTE, 4), (0x5D, "EOR", ABSOLUTE_X, 4), (0x59, "EOR", ABSOLUTE_Y, 4),
+    (0x41, "EOR", INDEXED_INDIRECT, 6), (0x51, "EOR", INDIRECT_INDEXED, 5),
+
+    (0xE6, "INC", ZERO_PAGE, 5), (0xF6, "INC", ZERO_PAGE_X, 6), (0xEE, "INC", ABSOLUTE, 6),
+    (0xFE, "INC", ABSOLUTE_X, 7),
+
+    (0xE8, "INX", IMPLIED, 2), (0xC8, "INY", IMPLIED, 2),
+
+    (0x4C, "JMP", ABSOLUTE, 3), (0x6C, "JMP", INDIRECT, 5),
+
+    (0x20, "JSR", ABSOLUTE, 6),
+
+    (0xA9, "LDA", IMMEDIATE, 2), (0xA5, "LDA", ZERO_PAGE, 3), (0xB5, "LDA", ZERO_PAGE_X, 4),
+    (0xAD, "LDA", ABSOLUTE, 4), (0xBD, "LDA", ABSOLUTE_X, 4), (0xB9, "LDA", ABSOLUTE_Y, 4),
+    (0xA1, "LDA", INDEXED_INDIRECT, 6), (0xB1, "LDA", INDIRECT_INDEXED, 5),
+
+    (0xA2, "LDX", IMMEDIATE, 2), (0xA6, "LDX", ZERO_PAGE, 3), (0xB6, "LDX", ZERO_PAGE_Y, 4),
+    (0xAE, "LDX", ABSOLUTE, 4), (0xBE, "LDX", ABSOLUTE_Y, 4),
+
+    (0xA0, "LDY", IMMEDIATE, 2), (0xA4, "LDY", ZERO_PAGE, 3), (0xB4, "LDY", ZERO_PAGE_X, 4),
+    (0xAC, "LDY", ABSOLUTE, 4), (0xBC, "LDY", ABSOLUTE_X, 4),
+
+    (0x4A, "LSR", ACCUMULATOR, 2), (0x46, "LSR", ZERO_PAGE, 5), (0x56, "LSR", ZERO_PAGE_X, 6),
+    (0x4E, "LSR", ABSOLUTE, 6), (0x5E, "LSR", ABSOLUTE_X, 7),
+
+    (0xEA, "NOP", IMPLIED, 2),
+
+    (0x09, "ORA", IMMEDIATE, 2), (0x05, "ORA", ZERO_PAGE, 3), (0x15, "ORA", ZERO_PAGE_X, 4),
+    (0x0D, "ORA", ABSOLUTE, 4), (0x1D, "ORA", ABSOLUTE_X, 4), (0x19, "ORA", ABSOLUTE_Y, 4),
+    (0x01, "ORA", INDEXED_INDIRECT, 6), (0x11, "ORA", INDIRECT_INDEXED, 5),
+
+    (0x48, "PHA", IMPLIED, 3), (0x08, "PHP", IMPLIED, 3), (0x68, "PLA", IMPLIED, 4), (0x28, "PLP", IMPLIED, 4),
+
+    (0x2A, "ROL", ACCUMULATOR, 2), (0x26, "ROL", ZERO_PAGE, 5), (0x36, "ROL", ZERO_PAGE_X, 6),
+    (0x2E, "ROL", ABSOLUTE, 6), (0x3E, "ROL", ABSOLUTE_X, 7),
+
+    (0x6A, "ROR", ACCUMULATOR, 2), (0x66, "ROR", ZERO_PAGE, 5), (0x76, "ROR", ZERO_PAGE_X, 6),
+    (0x6E, "ROR", ABSOLUTE, 6), (0x7E, "ROR", ABSOLUTE_X, 7),
+
+    (0x40, "RTI", IMPLIED, 6), (0x60, "RTS", IMPLIED, 6),
+
+    (0xE9, "SBC", IMMEDIATE, 2), (0xE5, "SBC", ZERO_PAGE, 3), (0xF5, "SBC", ZERO_PAGE_X, 4),
+    (0xED, "SBC", ABSOLUTE, 4), (0xFD, "SBC", ABSOLUTE_X, 4), (0xF9, "SBC", ABSOLUTE_Y, 4),
+    (0xE1, "SBC", INDEXED_INDIRECT, 6), (0xF1, "SBC", INDIRECT_INDEXED, 5),
+
+    (0x38, "SEC", IMPLIED, 2), (0xF8, "SED", IMPLIED, 2), (0x78, "SEI", IMPLIED, 2),
+
+    (0x85, "STA", ZERO_PAGE, 3), (0x95, "STA", ZERO_PAGE_X, 4), (0x8D, "STA", ABSOLUTE, 4),
+    (0x9D, "STA", ABSOLUTE_X, 5), (0x99, "STA", ABSOLUTE_Y, 5), (0x81, "STA", INDEXED_INDIRECT, 6),
+    (0x91, "STA", INDIRECT_INDEXED, 6),
+
+    (0x86, "STX", ZERO_PAGE, 3), (0x96, "STX", ZERO_PAGE_Y, 4), (0x8E, "STX", ABSOLUTE, 4),
+
+    (0x84, "STY", ZERO_PAGE, 3), (0x94, "STY", ZERO_PAGE_X, 4), (0x8C, "STY", ABSOLUTE, 4),
+
+    (0xAA, "TAX", IMPLIED, 2), (0xA8, "TAY", IMPLIED, 2), (0xBA, "TSX", IMPLIED, 2), (0x8A, "TXA", IMPLIED, 2),
+    (0x9A, "TXS", IMPLIED, 2), (0x98, "TYA", IMPLIED, 2),
+])
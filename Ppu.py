@@ -0,0 +1,513 @@
+"""
+The NES picture processing unit (2C02), rendering with NumPy a scanline at a time.
+
+The PPU is attached to the CPU through its eight registers, mirrored from 0x2000 to 0x3FFF. It is run a scanline at a
+time: every visible scanline is rendered as a whole, background and sprites, into a preallocated 256x240 frame buffer
+of NES colour indices. Consecutive scanlines that nothing has written to the PPU between are rendered together, as one
+set of array operations. Pattern table tiles are decoded whole into a TileCache and copied out of it, so there are no
+per-pixel Python loops.
+
+Timing is scanline accurate rather than dot accurate. Scroll and register writes take effect from the next scanline
+rendered, which is enough for status bars and split scrolling done at the start of a line.
+"""
+import numpy
+
+from TileCache import TileCache
+
+# Scanlines in a frame. 0 to 239 are visible, 241 starts vertical blank and 261 is the pre-render line.
+VISIBLE_SCANLINES = 240
+VBLANK_SCANLINE = 241
+PRE_RENDER_SCANLINE = 261
+SCANLINES_PER_FRAME = 262
+DOTS_PER_SCANLINE = 341
+
+FRAME_WIDTH = 256
+FRAME_HEIGHT = 240
+
+# How the four logical nametables map onto the PPU's own 2KB of nametable memory, or the cartridge's 4KB
+HORIZONTAL_MIRRORING = (0, 0, 1, 1)
+VERTICAL_MIRRORING = (0, 1, 0, 1)
+SINGLE_SCREEN_MIRRORING = (0, 0, 0, 0)
+FOUR_SCREEN_MIRRORING = (0, 1, 2, 3)
+
+# PPUCTRL ($2000) bits
+CTRL_INCREMENT_32 = 0x04
+CTRL_SPRITE_PATTERN_TABLE = 0x08
+CTRL_BACKGROUND_PATTERN_TABLE = 0x10
+CTRL_TALL_SPRITES = 0x20
+CTRL_NMI = 0x80
+
+# PPUMASK ($2001) bits
+MASK_GRAYSCALE = 0x01
+MASK_LEFT_BACKGROUND = 0x02
+MASK_LEFT_SPRITES = 0x04
+MASK_BACKGROUND = 0x08
+MASK_SPRITES = 0x10
+
+# PPUSTATUS ($2002) bits
+STATUS_SPRITE_OVERFLOW = 0x20
+STATUS_SPRITE_ZERO_HIT = 0x40
+STATUS_VBLANK = 0x80
+
+MAX_SPRITES_PER_SCANLINE = 8
+
+
+_TILE_COLUMNS = numpy.arange(33)
+
+
+class Ppu(object):
+    """
+    A 2C02 PPU with its pattern tables, nametables, palette and object attribute memory (OAM).
+
+    Attach it to the CPU's memory with map_into and run it with run_scanlines or run_frame:
+
+        ppu = Ppu.for_rom(rom, nmi_func=target.nmi)
+        ppu.map_into(ram)
+        frame = ppu.run_frame()
+
+    frame holds NES colour indices (0x00 to 0x3F), one byte per pixel. Nothing here draws it; that's left to whatever
+    displays or saves the frames, so the PPU runs the same headless.
+    """
+
+    def __init__(self, chr_memory=None, mirroring=HORIZONTAL_MIRRORING, nmi_func=None):
+        """
+        Args:
+            chr_memory: The cartridge's CHR ROM, as a bytes-like object. None gives the PPU 8KB of CHR RAM instead,
+                        which the CPU fills through PPUDATA.
+            mirroring: One of the *_MIRRORING tuples
+            nmi_func: A function taking no arguments, called when vertical blank starts with NMIs enabled. Usually
+                      the Chip6502's nmi.
+        """
+        if chr_memory is None or len(chr_memory) == 0:
+            self.pattern_tables = numpy.zeros(0x2000, dtype=numpy.uint8)
+            self.chr_writable = True
+        else:
+            # A copy, so the PPU doesn't hold the ROM's memoryview open
+            self.pattern_tables = numpy.array(memoryview(chr_memory)[:0x2000], dtype=numpy.uint8)
+            self.chr_writable = False
+
+        self.tile_cache = TileCache(self.pattern_tables)
+        self.nametables = numpy.zeros(0x1000, dtype=numpy.uint8)
+        self.palette = numpy.zeros(0x20, dtype=numpy.uint8)
+        self.oam = numpy.zeros(0x100, dtype=numpy.uint8)
+        self.frame = numpy.zeros((FRAME_HEIGHT, FRAME_WIDTH), dtype=numpy.uint8)
+        self.nmi_func = nmi_func
+        self.set_mirroring(mirroring)
+
+        self.ctrl = 0x00
+        self.mask = 0x00
+        self.status = 0x00
+        self.oam_address = 0x00
+
+        # The internal scroll registers: the current VRAM address v, the temporary address t, the fine X scroll and
+        # the first/second write toggle shared by PPUSCROLL and PPUADDR
+        self.vram_address = 0x0000
+        self.temporary_address = 0x0000
+        self.fine_x = 0x00
+        self.write_toggle = False
+
+        self.__read_buffer = 0x00
+        # The last value written to any register, which is what reading a write-only register gives
+        self.__latch = 0x00
+
+        self.scanline = 0
+        self.frame_count = 0
+
+        # Scratch space for sprites, reused for every block of scanlines
+        self.__sprite_layer = numpy.zeros((FRAME_HEIGHT, FRAME_WIDTH + 8), dtype=numpy.uint8)
+        self.__sprite_behind = numpy.zeros((FRAME_HEIGHT, FRAME_WIDTH + 8), dtype=bool)
+
+    @classmethod
+    def for_rom(cls, rom, nmi_func=None):
+        """
+        Make a PPU with a cartridge's CHR ROM (or CHR RAM if it has none) and nametable mirroring.
+
+        Args:
+            rom: A NesRom.NesRom
+            nmi_func: See __init__
+        """
+        if rom.four_screen:
+            mirroring = FOUR_SCREEN_MIRRORING
+        elif rom.vertical_mirroring:
+            mirroring = VERTICAL_MIRRORING
+        else:
+            mirroring = HORIZONTAL_MIRRORING
+
+        return cls(rom.chr_rom, mirroring, nmi_func)
+
+    def set_mirroring(self, mirroring):
+        """
+        Change how the four logical nametables map onto nametable memory. Mappers that switch mirroring call this.
+
+        Args:
+            mirroring: One of the *_MIRRORING tuples
+        """
+        self.mirroring = tuple(mirroring)
+        self.__nametable_offsets = numpy.array([table * 0x400 for table in mirroring], dtype=numpy.intp)
+
+    def map_into(self, memory):
+        """
+        Map the PPU's registers into the CPU's address space at 0x2000 to 0x3FFF.
+
+        Args:
+            memory: A NesMemory.NesMemory
+        """
+        memory.map_region(0x2000, 0x3FFF, self.read_register, self.write_register)
+
+    @property
+    def rendering_enabled(self):
+        """
+        True when the background or sprites are shown. The scroll registers only move while rendering.
+        """
+        return bool(self.mask & (MASK_BACKGROUND | MASK_SPRITES))
+
+    def read_register(self, address):
+        """
+        Read one of the PPU's registers, as the CPU does. The address is masked to the eight registers.
+        """
+        register = address & 0x07
+
+        if register == 0x02:
+            value = (self.status & 0xE0) | (self.__latch & 0x1F)
+            self.status &= ~STATUS_VBLANK
+            self.write_toggle = False
+            return value
+
+        if register == 0x04:
+            return int(self.oam[self.oam_address])
+
+        if register == 0x07:
+            address = self.vram_address & 0x3FFF
+
+            if address >= 0x3F00:
+                # Palette reads aren't buffered, but the nametable byte underneath them still goes into the buffer
+                value = (int(self.palette[self.__palette_index(address)]) & 0x3F) | (self.__latch & 0xC0)
+                self.__read_buffer = self.read_vram(address - 0x1000)
+            else:
+                value = self.__read_buffer
+                self.__read_buffer = self.read_vram(address)
+
+            self.__increment_vram_address()
+            return value
+
+        return self.__latch
+
+    def write_register(self, address, value):
+        """
+        Write one of the PPU's registers, as the CPU does. The address is masked to the eight registers.
+        """
+        register = address & 0x07
+        self.__latch = value
+
+        if register == 0x00:
+            nmi_was_enabled = self.ctrl & CTRL_NMI
+            self.ctrl = value
+            self.temporary_address = (self.temporary_address & 0xF3FF) | (value & 0x03) << 10
+
+            # Enabling NMIs during vertical blank raises one straight away
+            if not nmi_was_enabled and value & CTRL_NMI and self.status & STATUS_VBLANK:
+                self.__raise_nmi()
+        elif register == 0x01:
+            self.mask = value
+        elif register == 0x03:
+            self.oam_address = value
+        elif register == 0x04:
+            self.oam[self.oam_address] = value
+            self.oam_address = (self.oam_address + 1) & 0xFF
+        elif register == 0x05:
+            if self.write_toggle:
+                self.temporary_address = ((self.temporary_address & 0x8C1F) | (value & 0x07) << 12
+                                          | (value & 0xF8) << 2)
+            else:
+                self.fine_x = value & 0x07
+                self.temporary_address = (self.temporary_address & 0xFFE0) | value >> 3
+
+            self.write_toggle = not self.write_toggle
+        elif register == 0x06:
+            if self.write_toggle:
+                self.temporary_address = (self.temporary_address & 0xFF00) | value
+                self.vram_address = self.temporary_address
+            else:
+                self.temporary_address = (self.temporary_address & 0x00FF) | (value & 0x3F) << 8
+
+            self.write_toggle = not self.write_toggle
+        elif register == 0x07:
+            self.write_vram(self.vram_address & 0x3FFF, value)
+            self.__increment_vram_address()
+
+    def oam_dma(self, data):
+        """
+        Copy a page of CPU memory into OAM, as OAM DMA ($4014) does: the same as 256 writes to OAMDATA, so the copy
+        starts at OAMADDR and wraps around.
+
+        Args:
+            data: The 256 bytes to copy
+        """
+        self.oam[:] = numpy.roll(numpy.frombuffer(data, dtype=numpy.uint8), self.oam_address)
+
+    def __increment_vram_address(self):
+        self.vram_address = (self.vram_address + (32 if self.ctrl & CTRL_INCREMENT_32 else 1)) & 0x7FFF
+
+    def read_vram(self, address):
+        """
+        Read a byte of the PPU's own address space: pattern tables, nametables and palette.
+        """
+        address &= 0x3FFF
+
+        if address < 0x2000:
+            return int(self.pattern_tables[address])
+
+        if address < 0x3F00:
+            return int(self.nametables[self.__nametable_index(address)])
+
+        return int(self.palette[self.__palette_index(address)])
+
+    def write_vram(self, address, value):
+        """
+        Write a byte of the PPU's own address space. Writes to CHR ROM are ignored.
+        """
+        address &= 0x3FFF
+
+        if address < 0x2000:
+            if self.chr_writable:
+                self.pattern_tables[address] = value
+                self.tile_cache.invalidate(address)
+        elif address < 0x3F00:
+            self.nametables[self.__nametable_index(address)] = value
+        else:
+            self.palette[self.__palette_index(address)] = value & 0x3F
+
+    def __nametable_index(self, address):
+        # 0x3000 to 0x3EFF mirror 0x2000 to 0x2EFF
+        return self.__nametable_offsets[(address >> 10) & 0x03] + (address & 0x3FF)
+
+    @staticmethod
+    def __palette_index(address):
+        # The sprite palettes' background entries (0x3F10, 0x3F14, 0x3F18 and 0x3F1C) mirror the background palettes'
+        index = address & 0x1F
+        return index & 0x0F if index & 0x13 == 0x10 else index
+
+    def run_scanlines(self, n_scanlines):
+        """
+        Run the PPU for n_scanlines scanlines, rendering the visible ones into frame.
+
+        Args:
+            n_scanlines: The number of scanlines to run
+        """
+        while n_scanlines > 0:
+            scanline = self.scanline
+
+            if scanline < VISIBLE_SCANLINES:
+                count = min(n_scanlines, VISIBLE_SCANLINES - scanline)
+                self.__render_scanlines(scanline, count)
+            else:
+                count = 1
+
+                if scanline == VBLANK_SCANLINE:
+                    self.status |= STATUS_VBLANK
+
+                    if self.ctrl & CTRL_NMI:
+                        self.__raise_nmi()
+                elif scanline == PRE_RENDER_SCANLINE:
+                    self.status &= ~(STATUS_VBLANK | STATUS_SPRITE_ZERO_HIT | STATUS_SPRITE_OVERFLOW)
+
+                    if self.rendering_enabled:
+                        self.vram_address = self.temporary_address
+
+            n_scanlines -= count
+            self.scanline = scanline + count
+
+            if self.scanline == SCANLINES_PER_FRAME:
+                self.scanline = 0
+                self.frame_count += 1
+
+    def run_frame(self):
+        """
+        Run the PPU until the start of the next frame.
+
+        Returns:
+            The frame buffer, holding the frame that was just rendered
+        """
+        self.run_scanlines(SCANLINES_PER_FRAME - self.scanline)
+        return self.frame
+
+    def __raise_nmi(self):
+        if self.nmi_func is not None:
+            self.nmi_func()
+
+    def __render_scanlines(self, first, count):
+        """
+        Render count visible scanlines starting at first, moving the scroll registers on as the PPU would.
+        """
+        vram_addresses = numpy.empty(count, dtype=numpy.intp)
+        vram_address = self.vram_address
+        rendering = self.rendering_enabled
+        horizontal_bits = self.temporary_address & 0x041F
+
+        # The PPU copies the horizontal scroll from t into v at the end of every line. Doing it at the start of the
+        # next line instead means a scroll written between two scanline runs is used from the next line on.
+        for line in range(count):
+            if rendering:
+                vram_address = (vram_address & ~0x041F) | horizontal_bits
+
+            vram_addresses[line] = vram_address
+
+            if rendering:
+                vram_address = self.__next_line_address(vram_address)
+
+        self.vram_address = vram_address
+
+        if self.mask & MASK_BACKGROUND:
+            background = self.__render_background(vram_addresses)
+        else:
+            background = numpy.zeros((count, FRAME_WIDTH), dtype=numpy.uint8)
+
+        if self.mask & MASK_SPRITES:
+            background = self.__render_sprites(first, count, background)
+
+        colours = self.palette[background]
+
+        if self.mask & MASK_GRAYSCALE:
+            colours &= 0x30
+
+        self.frame[first:first + count] = colours
+
+    @staticmethod
+    def __next_line_address(vram_address):
+        # Move v down a line: fine Y, then coarse Y, which wraps at row 29 into the nametable below
+        if vram_address & 0x7000 != 0x7000:
+            return vram_address + 0x1000
+
+        vram_address &= 0x0FFF
+        coarse_y = (vram_address >> 5) & 0x1F
+
+        if coarse_y == 29:
+            return (vram_address & ~0x03E0) ^ 0x0800
+
+        if coarse_y == 31:
+            return vram_address & ~0x03E0
+
+        return vram_address + 0x20
+
+    def __render_background(self, vram_addresses):
+        """
+        Render the background of one scanline per VRAM address.
+
+        Returns:
+            A (scanlines, 256) array of palette indices. 0 is a transparent pixel.
+        """
+        coarse_x = (vram_addresses & 0x1F)[:, None]
+        coarse_y = ((vram_addresses >> 5) & 0x1F)[:, None]
+        nametable = ((vram_addresses >> 10) & 0x03)[:, None]
+        fine_y = (vram_addresses >> 12)[:, None]
+
+        # 33 tiles cover 256 pixels at any fine X scroll. Running off the right of a nametable moves into the next one.
+        columns = coarse_x + _TILE_COLUMNS
+        nametable = nametable ^ ((columns >> 5) & 0x01)
+        columns &= 0x1F
+        nametable_offsets = self.__nametable_offsets[nametable]
+
+        tiles = self.nametables[nametable_offsets + (coarse_y << 5) + columns]
+        attributes = self.nametables[nametable_offsets + 0x3C0 + ((coarse_y >> 2) << 3) + (columns >> 2)]
+        palettes = (attributes >> (((coarse_y & 0x02) << 1) | (columns & 0x02))) & 0x03
+
+        tile_numbers = tiles.astype(numpy.intp)
+
+        if self.ctrl & CTRL_BACKGROUND_PATTERN_TABLE:
+            tile_numbers += 0x100
+
+        self.tile_cache.lookup(tile_numbers)
+        pixels = self.tile_cache.rows[(tile_numbers << 3) + fine_y]
+        indices = numpy.where(pixels != 0, pixels | (palettes << 2)[:, :, None], 0).astype(numpy.uint8)
+        indices = indices.reshape(len(vram_addresses), 33 * 8)[:, self.fine_x:self.fine_x + FRAME_WIDTH]
+
+        if not self.mask & MASK_LEFT_BACKGROUND:
+            indices[:, :8] = 0
+
+        return indices
+
+    def __render_sprites(self, first, count, background):
+        """
+        Draw the sprites on count scanlines from first over their background.
+
+        Each sprite is drawn on all of its lines in the block at once.
+
+        Returns:
+            The scanlines' palette indices with the sprites drawn in
+        """
+        height = 16 if self.ctrl & CTRL_TALL_SPRITES else 8
+        sprites = self.oam.reshape(64, 4).astype(numpy.intp)
+        # Sprites are drawn a line below their Y coordinate
+        rows = numpy.arange(first, first + count)[None, :] - (sprites[:, 0:1] + 1)
+        on_line = (rows >= 0) & (rows < height)
+        # Only the first eight sprites on a line are drawn
+        drawn = on_line & (numpy.cumsum(on_line, axis=0) <= MAX_SPRITES_PER_SCANLINE)
+
+        if on_line.sum(axis=0).max() > MAX_SPRITES_PER_SCANLINE:
+            self.status |= STATUS_SPRITE_OVERFLOW
+
+        layer = self.__sprite_layer[:count]
+        behind = self.__sprite_behind[:count]
+        layer[:] = 0
+        behind[:] = False
+        sprite_zero = None
+
+        # Lower numbered sprites are drawn last, so they're in front
+        for sprite in numpy.nonzero(drawn.any(axis=1))[0][::-1]:
+            tile, attributes, x = sprites[sprite, 1:4]
+            lines = numpy.nonzero(drawn[sprite])[0]
+            pixels = self.__sprite_rows(tile, attributes, rows[sprite, lines], height)
+            opaque = pixels != 0
+            columns = slice(x, x + 8)
+            palette_index = 0x10 | (attributes & 0x03) << 2
+            layer[lines, columns] = numpy.where(opaque, pixels | palette_index, layer[lines, columns])
+            behind[lines, columns] = numpy.where(opaque, bool(attributes & 0x20), behind[lines, columns])
+
+            if sprite == 0:
+                sprite_zero = (lines, x, opaque)
+
+        layer = layer[:, :FRAME_WIDTH]
+        behind = behind[:, :FRAME_WIDTH]
+
+        if not self.mask & MASK_LEFT_SPRITES:
+            layer[:, :8] = 0
+
+        if sprite_zero is not None and self.mask & MASK_BACKGROUND:
+            self.__check_sprite_zero_hit(background, *sprite_zero)
+
+        shown = (layer != 0) & (~behind | (background == 0))
+        return numpy.where(shown, layer, background)
+
+    def __sprite_rows(self, tile, attributes, rows, height):
+        """
+        Decode the rows of a sprite that fall on some scanlines.
+
+        Returns:
+            A (len(rows), 8) array of two-bit pixels
+        """
+        if attributes & 0x80:
+            rows = height - 1 - rows
+
+        if height == 16:
+            # The bottom half of a tall sprite is the next tile
+            tile_numbers = (tile & 0x01) << 8 | (tile & 0xFE) | rows >> 3
+        else:
+            tile_numbers = numpy.full(len(rows), (0x100 if self.ctrl & CTRL_SPRITE_PATTERN_TABLE else 0x000) | tile)
+
+        self.tile_cache.lookup(tile_numbers)
+        pixels = self.tile_cache.rows[(tile_numbers << 3) + (rows & 0x07)]
+        return pixels[:, ::-1] if attributes & 0x40 else pixels
+
+    def __check_sprite_zero_hit(self, background, lines, x, opaque):
+        # Sprite zero hits where an opaque sprite zero pixel lands on an opaque background pixel, except at x=255
+        # and in the leftmost eight pixels when either layer is clipped there
+        columns = x + numpy.arange(8)
+        hits = opaque & (columns < 255)
+
+        if not self.mask & MASK_LEFT_BACKGROUND or not self.mask & MASK_LEFT_SPRITES:
+            hits &= columns >= 8
+
+        columns = numpy.minimum(columns, FRAME_WIDTH - 1)
+
+        if (hits & (background[lines[:, None], columns] != 0)).any():
+            self.status |= STATUS_SPRITE_ZERO_HIT
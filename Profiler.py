@@ -0,0 +1,179 @@
+import Chip6502 as chip
+
+# Opcodes that enter and leave a routine, used to keep track of the 6502 call stack
+CALL_OPCODES = frozenset([0x20])          # JSR
+RETURN_OPCODES = frozenset([0x40, 0x60])  # RTI, RTS
+
+# The columns the tables can be sorted by
+COUNT = "count"
+CYCLES = "cycles"
+NANOSECONDS = "nanoseconds"
+
+
+def handler_name(opcode):
+    """
+    Get a readable name for the handler Chip6502 runs for opcode, such as lda_immediate.
+    """
+    decoded = chip.Chip6502.decode_opcode(opcode)
+
+    if decoded is None:
+        return "invalid_{opcode:02x}".format(opcode=opcode)
+
+    return decoded[0].__name__
+
+
+class Profiler(object):
+    """
+    Counts the instructions every Chip6502 executes, and how long they take, by opcode and by address.
+
+    For each opcode and each address it counts executions and emulated cycles. For each opcode it also measures the
+    host nanoseconds spent in its handler, which shows which handlers the emulator spends its time in. Host time is
+    also gathered by 6502 call stack, following JSR and RTS, for flame graphs.
+
+    Profiling starts when the profiler is used as a context manager, or when start is called:
+
+        with Profiler() as profiler:
+            target.run(100000)
+
+        print(profiler.format_table())
+
+    Instructions run by Chip6502's step, run and run_cycles are profiled, and so are those run through a BlockCache,
+    which interprets while a profiler is in use rather than running its compiled blocks.
+
+    Profiling swaps step, run and run_cycles on the Chip6502 class, not on one chip, so while a profiler is in use every
+    chip in the process reports to it and runs the slower profiled methods. Call stop, or leave the with block, to put
+    the unprofiled methods back for every chip.
+    """
+
+    def __init__(self):
+        self.opcode_counts = [0] * 0x100
+        self.opcode_cycles = [0] * 0x100
+        self.opcode_nanoseconds = [0] * 0x100
+        self.address_counts = {}
+        self.address_cycles = {}
+        self.stack_nanoseconds = {}
+
+        # The start addresses of the routines the chip is in, outermost first
+        self.__call_stack = ()
+
+    def start(self):
+        """
+        Start profiling every Chip6502. Only one profiler can be in use at a time.
+        """
+        chip.Chip6502.use_profiler(self)
+
+    def stop(self):
+        """
+        Stop profiling, putting Chip6502's unprofiled methods back.
+        """
+        chip.Chip6502.use_profiler(None)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def record(self, address, opcode, cycles, nanoseconds, next_address):
+        """
+        Count one executed instruction. Chip6502 calls this while the profiler is in use.
+
+        Args:
+            address: The address of the instruction's opcode
+            opcode: The opcode
+            cycles: The cycles the instruction took, including any page crossing penalty
+            nanoseconds: The host time spent in the instruction's handler
+            next_address: The program counter after the instruction
+        """
+        self.opcode_counts[opcode] += 1
+        self.opcode_cycles[opcode] += cycles
+        self.opcode_nanoseconds[opcode] += nanoseconds
+        self.address_counts[address] = self.address_counts.get(address, 0) + 1
+        self.address_cycles[address] = self.address_cycles.get(address, 0) + cycles
+
+        stack = (self.__call_stack, opcode)
+        self.stack_nanoseconds[stack] = self.stack_nanoseconds.get(stack, 0) + nanoseconds
+
+        if opcode in CALL_OPCODES:
+            self.__call_stack += (next_address,)
+        elif opcode in RETURN_OPCODES and self.__call_stack:
+            self.__call_stack = self.__call_stack[:-1]
+
+    def reset(self):
+        """
+        Forget everything counted so far.
+        """
+        self.__init__()
+
+    def opcode_table(self, sort_by=NANOSECONDS):
+        """
+        Get the counters for every opcode that was executed, hottest first.
+
+        Args:
+            sort_by: COUNT, CYCLES or NANOSECONDS
+
+        Returns:
+            A list of (opcode, handler name, count, cycles, nanoseconds) tuples
+        """
+        rows = [(opcode, handler_name(opcode), self.opcode_counts[opcode], self.opcode_cycles[opcode],
+                 self.opcode_nanoseconds[opcode])
+                for opcode in range(0x100) if self.opcode_counts[opcode]]
+
+        column = {COUNT: 2, CYCLES: 3, NANOSECONDS: 4}[sort_by]
+        return sorted(rows, key=lambda row: row[column], reverse=True)
+
+    def address_table(self, sort_by=CYCLES):
+        """
+        Get the counters for every address an instruction was executed at, hottest first.
+
+        Args:
+            sort_by: COUNT or CYCLES
+
+        Returns:
+            A list of (address, count, cycles) tuples
+        """
+        rows = [(address, count, self.address_cycles[address]) for address, count in self.address_counts.items()]
+
+        column = {COUNT: 1, CYCLES: 2}[sort_by]
+        return sorted(rows, key=lambda row: row[column], reverse=True)
+
+    def format_table(self, sort_by=NANOSECONDS, limit=20):
+        """
+        Format the hottest opcodes and addresses as text tables.
+
+        Args:
+            sort_by: The column to sort the opcodes by. Addresses are sorted by cycles unless this is COUNT.
+            limit: The number of rows to show in each table, or None for all of them
+        """
+        lines = ["{opcode:<8}{handler:<32}{count:>12}{cycles:>14}{nanoseconds:>16}{average:>10}"
+                 .format(opcode="opcode", handler="handler", count="count", cycles="cycles",
+                         nanoseconds="host ns", average="ns/op")]
+
+        for opcode, name, count, cycles, nanoseconds in self.opcode_table(sort_by)[:limit]:
+            lines.append("{opcode:<8}{handler:<32}{count:>12,}{cycles:>14,}{nanoseconds:>16,}{average:>10,.0f}"
+                         .format(opcode="${opcode:02X}".format(opcode=opcode), handler=name, count=count,
+                                 cycles=cycles, nanoseconds=nanoseconds, average=nanoseconds / count))
+
+        lines.append("")
+        lines.append("{address:<8}{count:>12}{cycles:>14}".format(address="address", count="count", cycles="cycles"))
+
+        for address, count, cycles in self.address_table(COUNT if sort_by == COUNT else CYCLES)[:limit]:
+            lines.append("{address:<8}{count:>12,}{cycles:>14,}"
+                         .format(address="${address:04X}".format(address=address), count=count, cycles=cycles))
+
+        return "\n".join(lines)
+
+    def write_collapsed(self, collapsed_file):
+        """
+        Write host time by 6502 call stack in the collapsed stack format read by flamegraph.pl and speedscope.
+
+        Each line is the routines the chip was in, outermost first, then the handler that ran, then the nanoseconds
+        spent in it. e.g. "$8000;$C123;lda_immediate 5200"
+
+        Args:
+            collapsed_file: A file opened for writing text
+        """
+        for (call_stack, opcode), nanoseconds in sorted(self.stack_nanoseconds.items()):
+            frames = ["${address:04X}".format(address=address) for address in call_stack] + [handler_name(opcode)]
+            collapsed_file.write("{stack} {nanoseconds}\n".format(stack=";".join(frames), nanoseconds=nanoseconds))
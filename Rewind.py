@@ -0,0 +1,165 @@
+import collections
+import re
+
+# Runs of bytes that changed between two frames. Everything between them XORs to zero.
+_CHANGED_RUN = re.compile(b"[^\x00]+")
+
+
+class RewindBuffer(object):
+    """
+    A bounded history of recent frames that a Chip6502 and its NesMemory can be stepped back through.
+
+    Only the newest frame is kept whole. Each older frame is stored as the difference between it and the frame after
+    it: the CPU state, plus for each page of memory that changed the page XORed with its newer contents and run-length
+    encoded. A frame's pages mostly XOR to zeros, so the delta is usually a few bytes. Pages to compare are found with
+    NesMemory's dirty page tracking, so pages that weren't written aren't looked at.
+
+    When the history holds more than max_frames frames or its deltas take more than max_bytes, the oldest frames are
+    dropped. Because deltas lead backwards from the newest frame, dropping the oldest never needs the others rewritten.
+    """
+
+    def __init__(self, target, max_frames=600, max_bytes=4 * 1024 * 1024):
+        """
+        Args:
+            target: The Chip6502 to record
+            max_frames: The most frames to keep to rewind to
+            max_bytes: The most bytes of deltas to keep. Older frames are dropped to stay under it.
+        """
+        self.__chip = target
+        self.__memory = target.memory
+        self.max_frames = max_frames
+        self.max_bytes = max_bytes
+
+        self.__frames = collections.deque()
+        self.__current = None
+        self.size_bytes = 0
+
+    def __len__(self):
+        """
+        The number of frames that can be rewound
+        """
+        return len(self.__frames)
+
+    def record(self):
+        """
+        Save the chip and memory as they are now as the newest frame.
+        """
+        cpu_state = self.__chip.snapshot()
+        pages = self.__memory.snapshot()
+
+        if self.__current is not None:
+            previous_cpu_state, previous_pages = self.__current
+            delta = self.__delta(previous_pages, pages)
+            self.__frames.append((previous_cpu_state, delta))
+            self.size_bytes += self.__frame_size(previous_cpu_state, delta)
+            self.__evict()
+
+        self.__current = (cpu_state, pages)
+
+    def rewind(self, n_frames=1):
+        """
+        Put the chip and memory back to how they were n_frames frames before the newest one.
+
+        The frames rewound past are dropped, so recording again carries on from the restored frame. If the history
+        holds fewer than n_frames frames, it goes back to the oldest one.
+
+        Args:
+            n_frames: The number of frames to step back
+
+        Returns:
+            The number of frames actually stepped back
+        """
+        if self.__current is None:
+            return 0
+
+        cpu_state, pages = self.__current
+        pages = list(pages)
+        rewound = 0
+
+        while rewound < n_frames and self.__frames:
+            cpu_state, delta = self.__frames.pop()
+            self.size_bytes -= self.__frame_size(cpu_state, delta)
+
+            for index, encoded in delta:
+                pages[index] = self.__apply(pages[index], encoded)
+
+            rewound += 1
+
+        self.__current = (cpu_state, tuple(pages))
+        self.__chip.restore(cpu_state)
+        self.__memory.restore(self.__current[1])
+
+        return rewound
+
+    def clear(self):
+        """
+        Forget every recorded frame.
+        """
+        self.__frames.clear()
+        self.__current = None
+        self.size_bytes = 0
+
+    def __evict(self):
+        frames = self.__frames
+
+        while frames and (len(frames) > self.max_frames or self.size_bytes > self.max_bytes):
+            cpu_state, delta = frames.popleft()
+            self.size_bytes -= self.__frame_size(cpu_state, delta)
+
+    def __delta(self, older_pages, newer_pages):
+        """
+        Get the run-length encoded XOR of every page that differs between older_pages and newer_pages.
+
+        Returns:
+            A tuple of (page index, encoded XOR) pairs
+        """
+        delta = []
+
+        for index, (older, newer) in enumerate(zip(older_pages, newer_pages)):
+            if older is not newer:
+                encoded = self.__encode(older, newer)
+
+                if encoded:
+                    delta.append((index, encoded))
+
+        return tuple(delta)
+
+    def __encode(self, older, newer):
+        """
+        XOR two pages and run-length encode the result.
+
+        The encoding is a list of runs of changed bytes. Each run is one byte giving the number of unchanged bytes
+        before it, one byte giving its length less one, then the XORed bytes themselves.
+        """
+        length = len(older)
+        xor = (int.from_bytes(older, "little") ^ int.from_bytes(newer, "little")).to_bytes(length, "little")
+        encoded = bytearray()
+        position = 0
+
+        for run in _CHANGED_RUN.finditer(xor):
+            encoded.append(run.start() - position)
+            encoded.append(run.end() - run.start() - 1)
+            encoded += run.group()
+            position = run.end()
+
+        return bytes(encoded)
+
+    def __apply(self, page, encoded):
+        """
+        Undo __encode: XOR page with the decoded runs to get the other page back.
+        """
+        xor = bytearray(len(page))
+        position = 0
+        offset = 0
+
+        while offset < len(encoded):
+            position += encoded[offset]
+            run_length = encoded[offset + 1] + 1
+            xor[position:position + run_length] = encoded[offset + 2:offset + 2 + run_length]
+            position += run_length
+            offset += 2 + run_length
+
+        return (int.from_bytes(page, "little") ^ int.from_bytes(xor, "little")).to_bytes(len(page), "little")
+
+    def __frame_size(self, cpu_state, delta):
+        return len(cpu_state) + sum(len(encoded) + 1 for index, encoded in delta)
@@ -0,0 +1,82 @@
+import struct
+
+# The header of a serialised save state: the lengths of the CPU state and of the memory that follow it
+_HEADER = struct.Struct("<HI")
+
+
+class SaveState(object):
+    """
+    A snapshot of a Chip6502 and its NesMemory that can be restored later.
+
+    Memory is held as the tuple of pages returned by NesMemory.snapshot, so save states taken one after another share
+    every page that didn't change between them. Rewinding thousands of times only costs the pages that were written.
+    """
+
+    def __init__(self, cpu_state, memory_pages):
+        """
+        Args:
+            cpu_state: The bytes returned by Chip6502.snapshot
+            memory_pages: The tuple of pages returned by NesMemory.snapshot
+        """
+        self.cpu_state = cpu_state
+        self.memory_pages = memory_pages
+
+    @classmethod
+    def take(cls, target):
+        """
+        Take a save state of a chip and the memory it's attached to.
+
+        Args:
+            target: The Chip6502 to save
+
+        Returns:
+            The SaveState
+        """
+        return cls(target.snapshot(), target.memory.snapshot())
+
+    def restore_into(self, target):
+        """
+        Put a chip and the memory it's attached to back to this save state.
+
+        Args:
+            target: The Chip6502 to restore. Its memory must be the same size as the memory that was saved.
+        """
+        target.restore(self.cpu_state)
+        target.memory.restore(self.memory_pages)
+
+    def to_bytes(self):
+        """
+        Serialise the save state into a single compact bytes object, for writing to disk or sending to another process.
+        """
+        memory = b"".join(self.memory_pages)
+        return _HEADER.pack(len(self.cpu_state), len(memory)) + self.cpu_state + memory
+
+    @classmethod
+    def from_bytes(cls, blob):
+        """
+        Load a save state serialised by to_bytes.
+
+        Args:
+            blob: The bytes returned by to_bytes
+
+        Returns:
+            The SaveState
+        """
+        cpu_length, memory_length = _HEADER.unpack_from(blob)
+        cpu_start = _HEADER.size
+        memory_start = cpu_start + cpu_length
+
+        cpu_state = bytes(blob[cpu_start:memory_start])
+        memory_pages = tuple(bytes(blob[start:min(start + 0x100, memory_start + memory_length)])
+                             for start in range(memory_start, memory_start + memory_length, 0x100))
+
+        return cls(cpu_state, memory_pages)
+
+    def __eq__(self, other):
+        if not isinstance(other, SaveState):
+            return NotImplemented
+
+        return self.cpu_state == other.cpu_state and self.memory_pages == other.memory_pages
+
+    def __hash__(self):
+        return hash((self.cpu_state, self.memory_pages))
@@ -0,0 +1,188 @@
+"""
+Run the CPU freely and only bring the PPU and other devices up to date when something needs them to be.
+
+Stepping every device after every instruction costs several Python calls per instruction. The scheduler instead lets
+the CPU run until the next event it predicts a device will raise, such as the vertical blank NMI, and catches the
+devices up then. Reading or writing a device's registers catches every device up first, so the CPU always sees the same
+state it would have if the devices had been stepped alongside it. Anything the CPU can only see through a register,
+like the sprite zero hit flag, needs no prediction: the read that looks for it is what catches the PPU up.
+
+The PPU runs a scanline at a time, so it's caught up to the last scanline the CPU has run past the end of. There are
+three PPU dots to a CPU cycle and 341 dots to a scanline.
+"""
+from Ppu import CTRL_NMI, DOTS_PER_SCANLINE, SCANLINES_PER_FRAME, STATUS_VBLANK, VBLANK_SCANLINE
+
+PPU_DOTS_PER_CYCLE = 3
+
+# How long OAM DMA halts the CPU for. It takes one more cycle when it starts on an odd cycle.
+OAM_DMA_CYCLES = 513
+
+
+class Scheduler(object):
+    """
+    Runs a Chip6502 with a PPU and any other devices its program talks to:
+
+        scheduler = Scheduler(target, ppu)
+        frame = scheduler.run_frame()
+
+    The scheduler maps the PPU's registers and OAM DMA ($4014) itself and takes over the PPU's nmi_func, so NMIs are
+    taken between instructions. Other devices are given as devices and their registers mapped with map_region.
+
+    A device other than the PPU is clocked by the CPU. It has:
+        catch_up(cycles): Run the device up to CPU cycle cycles
+        next_event_cycle(): The CPU cycle of the next interrupt the device will raise, or None if it won't raise one
+        irq: True while the device is asking for an IRQ
+    """
+
+    def __init__(self, chip, ppu, devices=()):
+        """
+        Args:
+            chip: The Chip6502 to run
+            ppu: The Ppu.Ppu to keep up with it. It's taken to be at the start of its current scanline.
+            devices: The other devices to keep up with it, such as the APU
+        """
+        self.__chip = chip
+        self.__ppu = ppu
+        self.__devices = list(devices)
+        # The PPU dot the PPU's next scanline ends on, counting from dot 0 at CPU cycle 0
+        self.__line_end_dot = chip.cycles * PPU_DOTS_PER_CYCLE + DOTS_PER_SCANLINE
+        self.__nmi_pending = False
+        ppu.nmi_func = self.__request_nmi
+
+        # How many times the devices have been caught up, in all and during the last frame the PPU finished
+        self.syncs = 0
+        self.frame_syncs = 0
+        self.frames = 0
+        self.__syncs_this_frame = 0
+
+        self.map_region(0x2000, 0x3FFF, ppu.read_register, ppu.write_register)
+        self.map_region(0x4014, 0x4014, write_func=self.__oam_dma)
+
+    def map_region(self, start_address, end_address, read_func=None, write_func=None):
+        """
+        Map a device's registers into the CPU's memory, catching every device up before each access.
+
+        Takes the same arguments as NesMemory.map_region.
+        """
+        synced_read = None
+        synced_write = None
+
+        if read_func is not None:
+            def synced_read(address):
+                self.sync()
+                return read_func(address)
+
+        if write_func is not None:
+            def synced_write(address, value):
+                self.sync()
+                write_func(address, value)
+
+        self.__chip.memory.map_region(start_address, end_address, synced_read, synced_write)
+
+    @property
+    def syncs_per_frame(self):
+        """
+        The average number of times the devices were caught up per frame
+        """
+        return self.syncs / self.frames if self.frames else 0.0
+
+    def sync(self):
+        """
+        Catch every device up to the CPU's cycle count.
+        """
+        cycles = self.__chip.cycles
+        dots = cycles * PPU_DOTS_PER_CYCLE
+        self.syncs += 1
+        self.__syncs_this_frame += 1
+
+        if dots >= self.__line_end_dot:
+            ppu = self.__ppu
+            lines = (dots - self.__line_end_dot) // DOTS_PER_SCANLINE + 1
+            frame_count = ppu.frame_count
+            ppu.run_scanlines(lines)
+            self.__line_end_dot += lines * DOTS_PER_SCANLINE
+
+            if ppu.frame_count != frame_count:
+                self.frames += ppu.frame_count - frame_count
+                self.frame_syncs = self.__syncs_this_frame
+                self.__syncs_this_frame = 0
+
+        for device in self.__devices:
+            device.catch_up(cycles)
+
+    def run_cycles(self, n_cycles):
+        """
+        Run the CPU for at least n_cycles cycles, taking interrupts as the devices raise them.
+
+        As with Chip6502.run_cycles, the last instruction may take the CPU past n_cycles. The devices are caught up to
+        wherever the CPU stops.
+
+        Returns:
+            The number of cycles that were actually run
+        """
+        chip = self.__chip
+        start_cycles = chip.cycles
+        end_cycles = start_cycles + n_cycles
+
+        while chip.cycles < end_cycles:
+            self.__take_interrupt()
+            # Always run at least one instruction, so a device whose event is overdue can't stall the CPU
+            chip.run_cycles(max(min(end_cycles, self.__next_event_cycle()) - chip.cycles, 1))
+            self.sync()
+
+        return chip.cycles - start_cycles
+
+    def run_frame(self):
+        """
+        Run until the PPU starts its next frame.
+
+        Returns:
+            The PPU's frame buffer, holding the frame that was just finished
+        """
+        self.sync()
+        frame_end_dot = self.__line_end_dot + (SCANLINES_PER_FRAME - 1 - self.__ppu.scanline) * DOTS_PER_SCANLINE
+        self.run_cycles(self.__dot_cycle(frame_end_dot) - self.__chip.cycles)
+        return self.__ppu.frame
+
+    def __oam_dma(self, address, value):
+        # Copy page value of CPU memory into OAM. The CPU is halted while the copy runs.
+        chip = self.__chip
+        self.__ppu.oam_dma(chip.memory.read_block(value << 8, 0x100))
+        chip.cycles += OAM_DMA_CYCLES + (chip.cycles & 0x01)
+
+    def __request_nmi(self):
+        self.__nmi_pending = True
+
+    def __take_interrupt(self):
+        if self.__nmi_pending:
+            self.__nmi_pending = False
+            self.__chip.nmi()
+        elif any(device.irq for device in self.__devices):
+            self.__chip.irq()
+
+    def __next_event_cycle(self):
+        """
+        Predict the CPU cycle the CPU has to stop at for the next interrupt.
+        """
+        ppu = self.__ppu
+
+        if ppu.status & STATUS_VBLANK and not ppu.ctrl & CTRL_NMI:
+            # Turning NMIs on during vertical blank raises one straight away, so stop at the end of every line to take it
+            lines = 1
+        else:
+            lines = (VBLANK_SCANLINE - ppu.scanline) % SCANLINES_PER_FRAME + 1
+
+        event_cycle = self.__dot_cycle(self.__line_end_dot + (lines - 1) * DOTS_PER_SCANLINE)
+
+        for device in self.__devices:
+            device_cycle = device.next_event_cycle()
+
+            if device_cycle is not None and device_cycle < event_cycle:
+                event_cycle = device_cycle
+
+        return event_cycle
+
+    @staticmethod
+    def __dot_cycle(dot):
+        # The first CPU cycle at or after a PPU dot
+        return -(-dot // PPU_DOTS_PER_CYCLE)
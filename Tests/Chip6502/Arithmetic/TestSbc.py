@@ -34,13 +34,12 @@ class TestSbc(at.ArithmeticTests):
         self.assert_uses_carry_flag(self.clear_carry_flag, self.__init_accumulator)
 
     def test_sbc_sets_overflow_flag(self):
-        self.assert_overflow_flag(self.clear_overflow_flag, 0x80, 0x01, 0xFF)
+        self.assert_overflow_flag(self.clear_overflow_flag, 0x01, 0x01, 0x80)
 
     def test_sgc_clears_overflow_flag(self):
         self.assert_overflow_flag(self.set_overflow_flag, 0x01, 0x00, 0xFF)
 
-    def __do_immediate_subtraction(self, operand, accumulator_value=0x05):
-        self.set_accumulator(accumulator_value)
+    def __do_immediate_subtraction(self, operand):
         self.target.sbc_immediate(operand)
 
     def __do_absolute_subtraction(self, operand):
@@ -28,11 +28,17 @@ class BaseTest(unittest.TestCase):
             self.clear_zero_flag = flag.get_clear_zero_flag_func(self.target)
             self.get_zero_flag = flag.get_zero_flag_func(self.target)
 
-        self.memory = memory.NesMemory(0xFFFF)
+        self.memory = memory.NesMemory(0x10000)
         self.target = chip.Chip6502(self.memory)
+        self.program_start = 0x8000
         init_register_functions()
         init_flag_functions()
 
+    def load_program(self, program, address=None):
+        address = self.program_start if address is None else address
+        self.memory.write_block(address, bytes(program))
+        self.target.program_counter = address
+
     def prepare_absolute_operation(self, memory_value):
         self.memory.set_address(0x03, memory_value)
 
@@ -43,13 +49,11 @@ class BaseTest(unittest.TestCase):
     def prepare_indexed_indirect_operation(self, memory_value):
         self.set_x_register(0x02)
 
-        self.memory.set_address(0x05, 0x02)
-        self.memory.set_address(0x06, 0x03)
+        self.memory.write_block(0x05, bytes([0x02, 0x03]))
         self.memory.set_address(0x0302, memory_value)
 
     def prepare_indirect_indexed_operation(self, operand):
         self.set_y_register(0x02)
 
-        self.memory.set_address(0x03, 0x08)
-        self.memory.set_address(0x04, 0x0F)
+        self.memory.write_block(0x03, bytes([0x08, 0x0F]))
         self.memory.set_address(0x0F0A, operand)
@@ -0,0 +1,13 @@
+import Tests.Chip6502.BaseTest as base_test
+
+
+class ControlFlowBaseTest(base_test.BaseTest):
+
+    def setUp(self):
+        super().setUp()
+        # Where the reset sequence leaves the stack pointer
+        self.target.stack_pointer = 0xFD
+
+    def set_vector(self, vector, address):
+        self.memory.set_address(vector, address & 0xFF)
+        self.memory.set_address(vector + 1, address >> 8)
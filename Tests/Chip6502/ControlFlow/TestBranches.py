@@ -0,0 +1,58 @@
+import Tests.Chip6502.ControlFlow.ControlFlowBaseTest as control_flow_base_test
+
+import FlagTables as flag_tables
+
+# Each branch opcode, the flag it tests and whether it branches when the flag is set
+BRANCHES = {0x10: (flag_tables.NEGATIVE_FLAG, False),   # BPL
+            0x30: (flag_tables.NEGATIVE_FLAG, True),    # BMI
+            0x50: (flag_tables.OVERFLOW_FLAG, False),   # BVC
+            0x70: (flag_tables.OVERFLOW_FLAG, True),    # BVS
+            0x90: (flag_tables.CARRY_FLAG, False),      # BCC
+            0xB0: (flag_tables.CARRY_FLAG, True),       # BCS
+            0xD0: (flag_tables.ZERO_FLAG, False),       # BNE
+            0xF0: (flag_tables.ZERO_FLAG, True)}        # BEQ
+
+
+class TestBranches(control_flow_base_test.ControlFlowBaseTest):
+
+    def __branch(self, opcode, offset, status, address=None):
+        self.load_program([opcode, offset], address)
+        self.target.status = status
+        self.target.cycles = 0
+        self.target.step()
+
+    def test_branches_taken_when_condition_holds(self):
+        for opcode, (flag, branch_when_set) in BRANCHES.items():
+            self.__branch(opcode, 0x10, flag if branch_when_set else 0x00)
+
+            self.assertEqual(self.program_start + 0x12, self.target.program_counter,
+                             "Opcode {opcode} didn't branch".format(opcode=hex(opcode)))
+            self.assertEqual(3, self.target.cycles)
+
+    def test_branches_not_taken_when_condition_fails(self):
+        for opcode, (flag, branch_when_set) in BRANCHES.items():
+            self.__branch(opcode, 0x10, 0x00 if branch_when_set else flag)
+
+            self.assertEqual(self.program_start + 0x02, self.target.program_counter,
+                             "Opcode {opcode} branched".format(opcode=hex(opcode)))
+            self.assertEqual(2, self.target.cycles)
+
+    def test_negative_offset_branches_backwards(self):
+        self.__branch(0xD0, 0xFC, 0x00)  # BNE -4
+        self.assertEqual(self.program_start - 0x02, self.target.program_counter)
+
+    def test_branch_to_another_page_takes_extra_cycle(self):
+        self.__branch(0xD0, 0x7F, 0x00, 0x80F0)
+        self.assertEqual(0x8171, self.target.program_counter)
+        self.assertEqual(4, self.target.cycles)
+
+    def test_dex_bne_loop_counts_down(self):
+        self.load_program([0xA2, 0x05,  # LDX #$05
+                           0xCA,        # loop: DEX
+                           0xD0, 0xFD,  # BNE loop
+                           0xEA])       # NOP
+        self.target.run(11)
+
+        self.assertEqual(0x00, self.get_x_register())
+        self.assertEqual(self.program_start + 0x05, self.target.program_counter)
+        self.assertEqual(2 + 5 * 2 + 4 * 3 + 2, self.target.cycles)
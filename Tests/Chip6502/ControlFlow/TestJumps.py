@@ -0,0 +1,113 @@
+import Chip6502 as chip
+import Tests.Chip6502.ControlFlow.ControlFlowBaseTest as control_flow_base_test
+
+
+class TestJumps(control_flow_base_test.ControlFlowBaseTest):
+
+    def test_jmp_absolute(self):
+        self.load_program([0x4C, 0x34, 0x92])
+        self.target.step()
+
+        self.assertEqual(0x9234, self.target.program_counter)
+        self.assertEqual(3, self.target.cycles)
+
+    def test_jmp_indirect(self):
+        self.set_vector(0x0300, 0x9234)
+        self.load_program([0x6C, 0x00, 0x03])
+        self.target.step()
+
+        self.assertEqual(0x9234, self.target.program_counter)
+
+    def test_jmp_indirect_does_not_cross_page(self):
+        """
+        The 6502 reads the high byte of an indirect JMP's pointer from the start of the same page when the pointer is
+        at the end of a page.
+        """
+        self.memory.set_address(0x03FF, 0x34)
+        self.memory.set_address(0x0300, 0x92)
+        self.memory.set_address(0x0400, 0xFF)
+        self.load_program([0x6C, 0xFF, 0x03])
+        self.target.step()
+
+        self.assertEqual(0x9234, self.target.program_counter)
+
+    def test_jsr_pushes_return_address_minus_one(self):
+        self.load_program([0x20, 0x00, 0x90])
+        self.target.step()
+
+        self.assertEqual(0x9000, self.target.program_counter)
+        self.assertEqual(0xFB, self.target.stack_pointer)
+        self.assertEqual(0x80, self.memory.get_address(0x01FD))
+        self.assertEqual(0x02, self.memory.get_address(0x01FC))
+        self.assertEqual(6, self.target.cycles)
+
+    def test_rts_returns_after_jsr(self):
+        self.load_program([0x60], 0x9000)                   # RTS
+        self.load_program([0x20, 0x00, 0x90,                # JSR $9000
+                           0xA9, 0x01])                     # LDA #$01
+        self.target.run(3)
+
+        self.assertEqual(0x01, self.get_accumulator())
+        self.assertEqual(0xFD, self.target.stack_pointer)
+        self.assertEqual(self.program_start + 5, self.target.program_counter)
+
+    def test_brk_and_rti(self):
+        self.set_vector(chip.IRQ_VECTOR, 0x9000)
+        self.load_program([0x40], 0x9000)                   # RTI
+        self.load_program([0x38,                            # SEC
+                           0x00, 0xEA,                      # BRK (and its padding byte)
+                           0xE8])                           # INX
+        self.target.run(2)
+
+        self.assertEqual(0x9000, self.target.program_counter)
+        self.assertEqual(0x31, self.memory.get_address(0x01FB))
+        self.assertEqual(0x01, self.target.interrupt_disable_flag)
+
+        self.target.run(2)
+
+        self.assertEqual(0x01, self.get_x_register())
+        self.assertEqual(0x01, self.target.carry_flag)
+        self.assertEqual(0x00, self.target.interrupt_disable_flag)
+        self.assertEqual(0x00, self.target.break_flag)
+
+    def test_reset_starts_at_reset_vector(self):
+        self.set_vector(chip.RESET_VECTOR, 0xC000)
+        self.target.stack_pointer = 0x00
+        self.target.reset()
+
+        self.assertEqual(0xC000, self.target.program_counter)
+        self.assertEqual(0xFD, self.target.stack_pointer)
+        self.assertEqual(0x01, self.target.interrupt_disable_flag)
+
+    def test_reset_from_power_on(self):
+        self.set_vector(chip.RESET_VECTOR, 0xC000)
+        target = chip.Chip6502(self.memory)
+        target.reset()
+
+        self.assertEqual(0xFD, target.stack_pointer)
+        self.assertEqual(0x24, target.status)
+        self.assertEqual(0xC000, target.program_counter)
+        self.assertEqual(7, target.cycles)
+
+    def test_nmi_is_taken_with_interrupts_disabled(self):
+        self.set_vector(chip.NMI_VECTOR, 0xC100)
+        self.target.interrupt_disable_flag = 0x01
+        self.target.program_counter = 0x8123
+        self.target.nmi()
+
+        self.assertEqual(0xC100, self.target.program_counter)
+        self.assertEqual(0x81, self.memory.get_address(0x01FD))
+        self.assertEqual(0x23, self.memory.get_address(0x01FC))
+        self.assertEqual(0x00, self.memory.get_address(0x01FB) & 0x10)
+
+    def test_irq_is_ignored_with_interrupts_disabled(self):
+        self.set_vector(chip.IRQ_VECTOR, 0xC200)
+        self.target.program_counter = 0x8123
+        self.target.interrupt_disable_flag = 0x01
+
+        self.assertFalse(self.target.irq())
+        self.assertEqual(0x8123, self.target.program_counter)
+
+        self.target.interrupt_disable_flag = 0x00
+        self.assertTrue(self.target.irq())
+        self.assertEqual(0xC200, self.target.program_counter)
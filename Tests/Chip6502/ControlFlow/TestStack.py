@@ -0,0 +1,81 @@
+import Chip6502 as chip
+import Tests.Chip6502.ControlFlow.ControlFlowBaseTest as control_flow_base_test
+
+
+class TestStack(control_flow_base_test.ControlFlowBaseTest):
+
+    def test_stack_starts_at_top_of_page_one_after_reset(self):
+        target = chip.Chip6502(self.memory)
+        target.reset()
+        self.assertEqual(0xFD, target.stack_pointer)
+
+    def test_pha_pushes_accumulator_into_page_one(self):
+        self.set_accumulator(0x37)
+        self.load_program([0x48])
+        self.target.step()
+
+        self.assertEqual(0x37, self.memory.get_address(0x01FD))
+        self.assertEqual(0xFC, self.target.stack_pointer)
+        self.assertEqual(3, self.target.cycles)
+
+    def test_pla_pulls_accumulator_and_sets_flags(self):
+        self.load_program([0xA9, 0x80,  # LDA #$80
+                           0x48,        # PHA
+                           0xA9, 0x00,  # LDA #$00
+                           0x68])       # PLA
+        self.target.run(4)
+
+        self.assertEqual(0x80, self.get_accumulator())
+        self.assertEqual(0x01, self.get_negative_flag())
+        self.assertEqual(0x00, self.get_zero_flag())
+        self.assertEqual(0xFD, self.target.stack_pointer)
+
+    def test_stack_pointer_wraps_within_page_one(self):
+        self.target.stack_pointer = 0x00
+        self.target.push(0x0E)
+
+        self.assertEqual(0x0E, self.memory.get_address(0x0100))
+        self.assertEqual(0xFF, self.target.stack_pointer)
+        self.assertEqual(0x0E, self.target.pull())
+        self.assertEqual(0x00, self.target.stack_pointer)
+
+    def test_php_pushes_break_and_unused_bits(self):
+        self.target.status = 0xC1
+        self.load_program([0x08])
+        self.target.step()
+
+        self.assertEqual(0xF1, self.memory.get_address(0x01FD))
+        self.assertEqual(0xC1, self.target.status)
+
+    def test_plp_ignores_break_and_unused_bits(self):
+        self.target.push(0xFF)
+        self.target.status = 0x00
+        self.load_program([0x28])
+        self.target.step()
+
+        self.assertEqual(0xCF, self.target.status)
+
+    def test_tsx_and_txs(self):
+        self.load_program([0xA2, 0x80,  # LDX #$80
+                           0x9A,        # TXS
+                           0xA2, 0x00,  # LDX #$00
+                           0xBA])       # TSX
+        self.target.run(3)
+
+        self.assertEqual(0x80, self.target.stack_pointer)
+        self.assertEqual(0x01, self.get_zero_flag())
+
+        self.target.step()
+        self.assertEqual(0x80, self.get_x_register())
+        self.assertEqual(0x01, self.get_negative_flag())
+
+    def test_flag_instructions(self):
+        self.load_program([0x78, 0xF8, 0x58, 0xD8, 0xB8])  # SEI, SED, CLI, CLD, CLV
+        self.target.overflow_flag = 0x01
+        self.target.run(2)
+
+        self.assertEqual(0x01, self.target.interrupt_disable_flag)
+        self.assertEqual(0x01, self.target.decimal_flag)
+
+        self.target.run(3)
+        self.assertEqual(0x00, self.target.status)
@@ -0,0 +1,100 @@
+import Tests.Chip6502.BaseTest as base_test
+
+
+class TestLogic(base_test.BaseTest):
+
+    def test_and_immediate(self):
+        self.set_accumulator(0xF0)
+        self.load_program([0x29, 0x3C])  # AND #$3C
+        self.target.step()
+
+        self.assertEqual(0x30, self.get_accumulator())
+        self.assertEqual(0x00, self.get_zero_flag())
+        self.assertEqual(2, self.target.cycles)
+
+    def test_and_sets_zero_flag(self):
+        self.set_accumulator(0xF0)
+        self.load_program([0x29, 0x0F])  # AND #$0F
+        self.target.step()
+
+        self.assertEqual(0x00, self.get_accumulator())
+        self.assertEqual(0x01, self.get_zero_flag())
+
+    def test_ora_zero_page(self):
+        self.set_accumulator(0x01)
+        self.memory.set_address(0x10, 0x80)
+        self.load_program([0x05, 0x10])  # ORA $10
+        self.target.step()
+
+        self.assertEqual(0x81, self.get_accumulator())
+        self.assertEqual(0x01, self.get_negative_flag())
+        self.assertEqual(3, self.target.cycles)
+
+    def test_eor_indirect_indexed(self):
+        self.set_accumulator(0xFF)
+        self.set_y_register(0x01)
+        self.memory.set_address(0x20, 0x00)
+        self.memory.set_address(0x21, 0x03)
+        self.memory.set_address(0x0301, 0x0F)
+        self.load_program([0x51, 0x20])  # EOR ($20),Y
+        self.target.step()
+
+        self.assertEqual(0xF0, self.get_accumulator())
+        self.assertEqual(5, self.target.cycles)
+
+    def test_eor_absolute_x_takes_a_cycle_to_cross_a_page(self):
+        self.set_x_register(0x01)
+        self.load_program([0x5D, 0xFF, 0x02])  # EOR $02FF,X
+        self.target.step()
+
+        self.assertEqual(5, self.target.cycles)
+
+    def test_bit_copies_bits_seven_and_six(self):
+        self.set_accumulator(0x01)
+        self.memory.set_address(0x10, 0xC0)
+        self.load_program([0x24, 0x10])  # BIT $10
+        self.target.step()
+
+        self.assertEqual(0x01, self.get_negative_flag())
+        self.assertEqual(0x01, self.get_overflow_flag())
+        self.assertEqual(0x01, self.get_zero_flag())
+        self.assertEqual(0x01, self.get_accumulator())
+
+    def test_bit_clears_flags(self):
+        self.target.status = 0xC2
+        self.set_accumulator(0x01)
+        self.memory.set_address(0x0300, 0x01)
+        self.load_program([0x2C, 0x00, 0x03])  # BIT $0300
+        self.target.step()
+
+        self.assertEqual(0x00, self.target.status)
+        self.assertEqual(4, self.target.cycles)
+
+    def test_cmp_sets_carry_when_accumulator_is_not_less(self):
+        for accumulator, operand, carry, zero, negative in [(0x10, 0x10, 1, 1, 0),
+                                                            (0x20, 0x10, 1, 0, 0),
+                                                            (0x10, 0x20, 0, 0, 1)]:
+            self.set_accumulator(accumulator)
+            self.load_program([0xC9, operand])  # CMP #operand
+            self.target.step()
+
+            self.assertEqual((carry, zero, negative),
+                             (self.target.carry_flag, self.get_zero_flag(), self.get_negative_flag()),
+                             "CMP #{operand} with A={accumulator}".format(operand=hex(operand),
+                                                                        accumulator=hex(accumulator)))
+            self.assertEqual(accumulator, self.get_accumulator())
+
+    def test_cpx_and_cpy(self):
+        self.set_x_register(0x05)
+        self.set_y_register(0x05)
+        self.load_program([0xE0, 0x06,   # CPX #$06
+                           0xC0, 0x05])  # CPY #$05
+        self.target.step()
+
+        self.assertEqual(0x00, self.target.carry_flag)
+        self.assertEqual(0x01, self.get_negative_flag())
+
+        self.target.step()
+
+        self.assertEqual(0x01, self.target.carry_flag)
+        self.assertEqual(0x01, self.get_zero_flag())
@@ -0,0 +1,44 @@
+import Tests.Chip6502.BaseTest as base_test
+
+
+class TestShifts(base_test.BaseTest):
+
+    def test_asl_accumulator(self):
+        self.set_accumulator(0x81)
+        self.load_program([0x0A])  # ASL A
+        self.target.step()
+
+        self.assertEqual(0x02, self.get_accumulator())
+        self.assertEqual(0x01, self.target.carry_flag)
+        self.assertEqual(2, self.target.cycles)
+
+    def test_lsr_zero_page(self):
+        self.memory.set_address(0x10, 0x01)
+        self.load_program([0x46, 0x10])  # LSR $10
+        self.target.step()
+
+        self.assertEqual(0x00, self.memory.get_address(0x10))
+        self.assertEqual(0x01, self.target.carry_flag)
+        self.assertEqual(0x01, self.get_zero_flag())
+        self.assertEqual(5, self.target.cycles)
+
+    def test_rol_shifts_the_carry_in(self):
+        self.target.carry_flag = 0x01
+        self.set_accumulator(0x40)
+        self.load_program([0x2A])  # ROL A
+        self.target.step()
+
+        self.assertEqual(0x81, self.get_accumulator())
+        self.assertEqual(0x00, self.target.carry_flag)
+        self.assertEqual(0x01, self.get_negative_flag())
+
+    def test_ror_absolute_x(self):
+        self.target.carry_flag = 0x01
+        self.set_x_register(0x01)
+        self.memory.set_address(0x0301, 0x03)
+        self.load_program([0x7E, 0x00, 0x03])  # ROR $0300,X
+        self.target.step()
+
+        self.assertEqual(0x81, self.memory.get_address(0x0301))
+        self.assertEqual(0x01, self.target.carry_flag)
+        self.assertEqual(7, self.target.cycles)
@@ -0,0 +1,70 @@
+import Tests.Chip6502.BaseTest as base_test
+
+
+class TestAddressing(base_test.BaseTest):
+
+    def test_zero_page_x_wraps_in_zero_page(self):
+        self.set_x_register(0x20)
+        self.memory.set_address(0x10, 0x42)
+        self.load_program([0xB5, 0xF0])  # LDA $F0,X
+        self.target.step()
+
+        self.assertEqual(0x42, self.get_accumulator())
+
+    def test_zero_page_y_wraps_in_zero_page(self):
+        self.set_y_register(0x02)
+        self.set_x_register(0x99)
+        self.load_program([0x96, 0xFF])  # STX $FF,Y
+        self.target.step()
+
+        self.assertEqual(0x99, self.memory.get_address(0x01))
+
+    def test_absolute_x_and_y_wrap_at_top_of_memory(self):
+        self.memory.set_address(0x0001, 0x42)
+        self.set_x_register(0x02)
+        self.set_y_register(0x02)
+        self.load_program([0xBD, 0xFF, 0xFF,   # LDA $FFFF,X
+                           0xBE, 0xFF, 0xFF])  # LDX $FFFF,Y
+        self.target.run(2)
+
+        self.assertEqual(0x42, self.get_accumulator())
+        self.assertEqual(0x42, self.get_x_register())
+
+    def test_indexed_indirect_pointer_wraps_in_zero_page(self):
+        self.set_x_register(0x01)
+        self.memory.set_address(0xFF, 0x00)
+        self.memory.set_address(0x00, 0x03)
+        self.memory.set_address(0x0300, 0x42)
+        self.load_program([0xA1, 0xFE])  # LDA ($FE,X)
+        self.target.step()
+
+        self.assertEqual(0x42, self.get_accumulator())
+
+    def test_absolute_indexed_by_y_register(self):
+        self.set_y_register(0x03)
+        self.memory.set_address(0x0203, 0x42)
+        self.target.lda_absolute_indexed(0x0200, "Y")
+
+        self.assertEqual(0x42, self.get_accumulator())
+
+    def test_register_specific_methods_match_absolute_indexed(self):
+        self.set_x_register(0x01)
+        self.set_y_register(0x02)
+        self.memory.set_address(0x0201, 0x11)
+        self.memory.set_address(0x0202, 0x22)
+
+        for method, register, specific_method in [(self.target.lda_absolute_indexed, "X", self.target.lda_absolute_x),
+                                                  (self.target.lda_absolute_indexed, "Y", self.target.lda_absolute_y),
+                                                  (self.target.ldx_absolute_indexed, "Y", self.target.ldx_absolute_y),
+                                                  (self.target.ldy_absolute_indexed, "X", self.target.ldy_absolute_x),
+                                                  (self.target.adc_absolute_indexed, "X", self.target.adc_absolute_x),
+                                                  (self.target.adc_absolute_indexed, "Y", self.target.adc_absolute_y),
+                                                  (self.target.sbc_absolute_indexed, "X", self.target.sbc_absolute_x),
+                                                  (self.target.sbc_absolute_indexed, "Y", self.target.sbc_absolute_y)]:
+            start = self.target.snapshot()
+            method(0x0200, register)
+            expected = self.target.snapshot()
+
+            self.target.restore(start)
+            specific_method(0x0200)
+            self.assertEqual(expected, self.target.snapshot(), specific_method.__name__)
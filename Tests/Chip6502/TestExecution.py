@@ -0,0 +1,145 @@
+import Chip6502 as chip
+import Tests.Chip6502.BaseTest as base_test
+
+
+class TestExecution(base_test.BaseTest):
+
+    def test_step_executes_instruction_at_program_counter(self):
+        self.load_program([0xA9, 0x37])  # LDA #$37
+        self.target.step()
+        self.assertEqual(0x37, self.get_accumulator())
+
+    def test_step_moves_program_counter_past_operands(self):
+        """
+        The program counter should move on by the length of the instruction: one byte for implied addressing, two for
+        immediate and zero page addressing and three for absolute addressing.
+        """
+        instruction_lengths = {(0xE8,): 1,               # INX
+                               (0xA2, 0x01): 2,          # LDX #$01
+                               (0xA5, 0x10): 2,          # LDA $10
+                               (0x8D, 0x00, 0x02): 3}    # STA $0200
+
+        for program, length in instruction_lengths.items():
+            self.load_program(program)
+            self.target.step()
+            self.assertEqual(self.program_start + length,
+                             self.target.program_counter,
+                             "Wrong program counter after executing {program}".format(program=program))
+
+    def test_run_executes_a_program(self):
+        self.load_program([0xA9, 0x01,        # LDA #$01
+                           0x18,              # CLC
+                           0x69, 0x02,        # ADC #$02
+                           0x8D, 0x00, 0x03,  # STA $0300
+                           0xA2, 0x04,        # LDX #$04
+                           0xFE, 0xFC, 0x02,  # INC $02FC,X
+                           0xEE, 0x00, 0x03]) # INC $0300
+        self.target.run(7)
+
+        self.assertEqual(0x05, self.memory.get_address(0x0300))
+        self.assertEqual(self.program_start + 16, self.target.program_counter)
+
+    def test_addressing_modes_resolve_the_same_address(self):
+        """
+        Every addressing mode that LDA supports should be able to reach the same memory cell.
+        """
+        self.memory.set_address(0x0234, 0x5A)
+        self.memory.set_address(0x20, 0x30)
+        self.memory.set_address(0x21, 0x02)
+        self.memory.set_address(0x10, 0x34)
+        self.memory.set_address(0x11, 0x02)
+        self.set_x_register(0x04)
+        self.set_y_register(0x04)
+
+        programs = {'absolute': [0xAD, 0x34, 0x02],
+                    'absolute,X': [0xBD, 0x30, 0x02],
+                    'absolute,Y': [0xB9, 0x30, 0x02],
+                    '(indirect,X)': [0xA1, 0x0C],
+                    '(indirect),Y': [0xB1, 0x20]}
+
+        for mode, program in programs.items():
+            self.set_accumulator(0x00)
+            self.load_program(program)
+            self.target.step()
+            self.assertEqual(0x5A, self.get_accumulator(), "LDA {mode} loaded the wrong value".format(mode=mode))
+
+    def test_zero_page_indexed_addressing_wraps_around(self):
+        self.memory.set_address(0x03, 0x77)
+        self.set_x_register(0x04)
+        self.load_program([0xB5, 0xFF])  # LDA $FF,X
+        self.target.step()
+        self.assertEqual(0x77, self.get_accumulator())
+
+    def test_dex_wraps_around(self):
+        self.set_x_register(0x00)
+        self.load_program([0xCA])  # DEX
+        self.target.step()
+        self.assertEqual(0xFF, self.get_x_register())
+
+    def test_invalid_opcode_raises_invalid_opcode_exception(self):
+        self.load_program([0x02])
+        self.assertRaises(chip.InvalidOpcodeException, self.target.step)
+
+    def test_step_counts_cycles(self):
+        instruction_cycles = {(0xE8,): 2,               # INX
+                              (0xA5, 0x10): 3,          # LDA $10
+                              (0x8D, 0x00, 0x02): 4,    # STA $0200
+                              (0xA1, 0x10): 6,          # LDA ($10,X)
+                              (0xFE, 0x00, 0x02): 7}    # INC $0200,X
+
+        for program, cycles in instruction_cycles.items():
+            self.target.cycles = 0
+            self.load_program(program)
+            self.target.step()
+            self.assertEqual(cycles, self.target.cycles, "Wrong cycle count for {program}".format(program=program))
+
+    def test_indexed_reads_take_an_extra_cycle_when_crossing_a_page(self):
+        """
+        Adding the index register to an address can carry into its high byte. Reads pay an extra cycle when that
+        happens; writes pay it every time, so it's already in their base count.
+        """
+        self.memory.set_address(0x20, 0xF0)
+        self.memory.set_address(0x21, 0x02)
+        self.set_x_register(0x20)
+        self.set_y_register(0x20)
+
+        instruction_cycles = {(0xBD, 0x00, 0x02): 4,    # LDA $0200,X
+                              (0xBD, 0xF0, 0x02): 5,    # LDA $02F0,X
+                              (0x79, 0xF0, 0x02): 5,    # ADC $02F0,Y
+                              (0xB1, 0x20): 6,          # LDA ($20),Y
+                              (0x9D, 0x00, 0x02): 5,    # STA $0200,X
+                              (0x9D, 0xF0, 0x02): 5,    # STA $02F0,X
+                              (0x91, 0x20): 6}          # STA ($20),Y
+
+        for program, cycles in instruction_cycles.items():
+            self.target.cycles = 0
+            self.load_program(program)
+            self.target.step()
+            self.assertEqual(cycles, self.target.cycles, "Wrong cycle count for {program}".format(program=program))
+
+    def test_run_cycles_runs_whole_instructions_until_cycles_are_used(self):
+        self.load_program([0xE8] * 10)  # INX, two cycles each
+        self.assertEqual(6, self.target.run_cycles(5))
+        self.assertEqual(0x03, self.get_x_register())
+        self.assertEqual(6, self.target.cycles)
+
+    def test_program_counter_wraps_around_at_ffff(self):
+        self.memory.set_address(0xFFFF, 0xEA)  # NOP
+        self.memory.set_address(0x0000, 0xE8)  # INX
+        self.target.program_counter = 0xFFFF
+        self.target.run(2)
+        self.assertEqual(0x0001, self.target.program_counter)
+        self.assertEqual(0x01, self.get_x_register())
+
+    def test_operands_wrap_around_at_ffff(self):
+        self.load_program([0xA9, 0x37], 0xFFFE)  # LDA #$37
+        self.target.step()
+        self.assertEqual(0x0000, self.target.program_counter)
+
+        # LDA $0234, with the operand's high byte at 0x0000
+        self.memory.set_address(0x0234, 0x5A)
+        self.load_program([0xAD, 0x34], 0xFFFE)
+        self.memory.set_address(0x0000, 0x02)
+        self.target.step()
+        self.assertEqual(0x0001, self.target.program_counter)
+        self.assertEqual(0x5A, self.get_accumulator())
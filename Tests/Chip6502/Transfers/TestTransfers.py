@@ -0,0 +1,38 @@
+import Tests.Chip6502.BaseTest as base_test
+
+
+class TestTransfers(base_test.BaseTest):
+
+    def test_tax_and_tay(self):
+        self.set_accumulator(0x80)
+        self.load_program([0xAA,   # TAX
+                           0xA8])  # TAY
+        self.target.run(2)
+
+        self.assertEqual(0x80, self.get_x_register())
+        self.assertEqual(0x80, self.get_y_register())
+        self.assertEqual(0x01, self.get_negative_flag())
+        self.assertEqual(4, self.target.cycles)
+
+    def test_txa_and_tya(self):
+        self.set_x_register(0x00)
+        self.set_y_register(0x12)
+        self.load_program([0x8A])  # TXA
+        self.target.step()
+
+        self.assertEqual(0x00, self.get_accumulator())
+        self.assertEqual(0x01, self.get_zero_flag())
+
+        self.load_program([0x98])  # TYA
+        self.target.step()
+
+        self.assertEqual(0x12, self.get_accumulator())
+        self.assertEqual(0x00, self.get_zero_flag())
+
+    def test_stx_indexed_indirect(self):
+        self.set_x_register(0x07)
+        self.memory.set_address(0x09, 0x00)
+        self.memory.set_address(0x0A, 0x03)
+        self.target.stx_indexed_indirect(0x02)
+
+        self.assertEqual(0x07, self.memory.get_address(0x0300))
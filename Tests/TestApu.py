@@ -0,0 +1,214 @@
+import os
+import tempfile
+import unittest
+import wave
+
+import Chip6502 as chip
+import NesMemory as memory
+
+try:
+    import numpy
+    import Apu as apu
+    import Ppu as ppu
+    import Scheduler as scheduler
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, "NumPy isn't installed")
+class TestApu(unittest.TestCase):
+
+    def setUp(self):
+        self.__memory = memory.NesMemory(0x10000)
+        self.__output = apu.RingBuffer(apu.SAMPLE_RATE * 2)
+        self.__target = apu.Apu(self.__memory, self.__output)
+        self.__target.map_into(self.__memory)
+
+    def __write(self, writes):
+        for address, value in writes:
+            self.__memory.set_address(address, value)
+
+    def __play(self, cycles):
+        self.__target.catch_up(self.__target.cycles + cycles)
+        self.__target.flush()
+        return self.__output.read()
+
+    def __loudest_frequency(self, samples):
+        spectrum = numpy.abs(numpy.fft.rfft(samples - samples.mean()))
+        return numpy.argmax(spectrum) * apu.SAMPLE_RATE / len(samples)
+
+    def test_pulse_plays_its_period(self):
+        # 440Hz is a period of CPU_CLOCK / (16 * 440) - 1 = 253
+        self.__write([(0x4015, 0x01), (0x4000, 0xBF), (0x4002, 0xFD), (0x4003, 0x08)])
+        samples = self.__play(apu.CPU_CLOCK // 10)
+
+        self.assertAlmostEqual(4410, len(samples), delta=1)
+        self.assertAlmostEqual(440, self.__loudest_frequency(samples), delta=10)
+
+    def test_second_pulse_uses_its_own_registers(self):
+        self.__write([(0x4015, 0x02), (0x4004, 0xBF), (0x4006, 0xFD), (0x4007, 0x08)])
+        self.assertAlmostEqual(440, self.__loudest_frequency(self.__play(apu.CPU_CLOCK // 10)), delta=10)
+
+    def test_triangle_plays_its_period(self):
+        # 220Hz is a period of CPU_CLOCK / (32 * 220) - 1 = 253
+        self.__write([(0x4015, 0x04), (0x4008, 0xFF), (0x400A, 0xFD), (0x400B, 0x08)])
+        self.assertAlmostEqual(220, self.__loudest_frequency(self.__play(apu.CPU_CLOCK // 10)), delta=10)
+
+    def test_disabled_channels_are_silent(self):
+        self.__write([(0x4000, 0xBF), (0x4002, 0xFD), (0x4003, 0x08)])
+        samples = self.__play(apu.CPU_CLOCK // 10)
+        self.assertEqual(0.0, numpy.ptp(samples))
+
+    def test_noise_sequences_repeat_after_32767_and_93_steps(self):
+        self.assertEqual(32767, len(apu.NOISE_SEQUENCES[0][0]))
+        self.assertEqual(93, len(apu.NOISE_SEQUENCES[1][0]))
+
+    def test_noise_is_not_a_tone(self):
+        self.__write([(0x4015, 0x08), (0x400C, 0x3F), (0x400E, 0x04), (0x400F, 0x08)])
+        samples = self.__play(apu.CPU_CLOCK // 10)
+
+        self.assertGreater(samples.std(), 0.01)
+
+    def test_writes_take_effect_at_the_cycle_they_were_made(self):
+        self.__target.catch_up(10000)
+        self.__write([(0x4011, 0x7F)])
+        samples = self.__play(10000)
+
+        first_change = numpy.nonzero(samples - samples[0])[0][0]
+        self.assertAlmostEqual(10000 * apu.SAMPLE_RATE / apu.CPU_CLOCK, first_change, delta=apu.STEP_WIDTH)
+
+    def test_steps_are_band_limited_and_settle_at_full_height(self):
+        self.__write([(0x4011, 0x7F)])
+        samples = self.__play(10000)
+        samples -= samples[0]
+        final = 0x7F * apu.DMC_WEIGHT
+
+        self.assertGreater(len(numpy.nonzero((samples > 0.01 * final) & (samples < 0.99 * final))[0]), 2)
+        self.assertAlmostEqual(final, samples[-1], places=4)
+
+    def test_length_counter_silences_channel(self):
+        # Length index 3 is two half frames
+        self.__write([(0x4015, 0x01), (0x4000, 0x9F), (0x4002, 0xFD), (0x4003, 0x18)])
+        self.assertEqual(0x01, self.__memory.get_address(0x4015) & 0x01)
+
+        self.__play(30000)
+        self.assertEqual(0x00, self.__memory.get_address(0x4015) & 0x01)
+
+    def test_envelope_decays(self):
+        self.__write([(0x4015, 0x01), (0x4000, 0xA0), (0x4002, 0xFD), (0x4003, 0x08)])
+        samples = self.__play(apu.CPU_CLOCK // 4)
+
+        self.assertGreater(numpy.ptp(samples[:400]), numpy.ptp(samples[-400:]))
+
+    def test_sweep_changes_period(self):
+        # Sweep down every half frame, by period >> 1
+        self.__write([(0x4015, 0x01), (0x4000, 0xBF), (0x4001, 0x81), (0x4002, 0x00), (0x4003, 0x02)])
+        self.__play(30000)
+
+        self.assertGreater(self.__target.pulses[0].period, 0x200)
+
+    def test_frame_irq_in_four_step_mode(self):
+        self.assertEqual(29829, self.__target.next_event_cycle())
+        self.__target.catch_up(29828)
+        self.assertFalse(self.__target.irq)
+
+        self.__target.catch_up(29829)
+        self.assertTrue(self.__target.irq)
+        self.assertEqual(apu.STATUS_FRAME_IRQ, self.__memory.get_address(0x4015) & apu.STATUS_FRAME_IRQ)
+        self.assertFalse(self.__target.irq)
+
+    def test_no_frame_irq_in_five_step_mode_or_when_inhibited(self):
+        for value in [0x80, 0x40]:
+            self.__write([(0x4017, value)])
+            self.__target.catch_up(self.__target.cycles + 100000)
+
+            self.assertIsNone(self.__target.next_event_cycle())
+            self.assertFalse(self.__target.irq)
+
+    def test_dmc_plays_sample_from_memory_and_raises_irq(self):
+        # One byte of ones at 0xC040, played at the fastest rate with the IRQ on
+        self.__memory.set_address(0xC040, 0xFF)
+        self.__write([(0x4010, 0x8F), (0x4012, 0x01), (0x4013, 0x00), (0x4015, 0x10)])
+        self.assertEqual(apu.STATUS_DMC_ACTIVE, self.__memory.get_address(0x4015) & apu.STATUS_DMC_ACTIVE)
+
+        irq_cycle = self.__target.next_event_cycle()
+        self.__target.catch_up(irq_cycle)
+        self.assertTrue(self.__target.irq)
+
+        self.__play(1000)
+        self.assertEqual(16, self.__target.dmc.level)
+        self.assertEqual(apu.STATUS_DMC_IRQ, self.__memory.get_address(0x4015) & 0xD0)
+
+    def test_dmc_sample_is_heard(self):
+        # Four ones then four zeros, a triangle wave of a byte a cycle at the fastest rate
+        self.__memory.fill(0xC000, 0xC0FF, 0x0F)
+
+        self.__write([(0x4011, 0x40), (0x4010, 0x4F), (0x4012, 0x00), (0x4013, 0x0F), (0x4015, 0x10)])
+        # Skip the step up to the starting level, which would drown out the tone
+        samples = self.__play(apu.CPU_CLOCK // 10)[apu.SAMPLE_RATE // 100:]
+
+        # 54 CPU cycles a bit
+        self.assertAlmostEqual(apu.CPU_CLOCK / (54 * 8), self.__loudest_frequency(samples), delta=50)
+
+    def test_dmc_level_stays_between_0_and_127(self):
+        for address in range(0xC000, 0xC011):
+            self.__memory.set_address(address, 0xFF)
+
+        self.__write([(0x4011, 0x71), (0x4010, 0x0F), (0x4012, 0x00), (0x4013, 0x01), (0x4015, 0x10)])
+        self.__play(20000)
+
+        self.assertEqual(0x7F, self.__target.dmc.level)
+
+    def test_ring_buffer_drops_oldest_samples(self):
+        target = apu.RingBuffer(4)
+        target.write(numpy.arange(3))
+        target.write(numpy.arange(3, 6))
+
+        self.assertEqual(2, target.dropped)
+        self.assertEqual([2, 3], list(target.read(2)))
+        self.assertEqual([4, 5], list(target.read()))
+        self.assertEqual(0, target.available)
+
+    def test_wav_writer_writes_mono_16_bit(self):
+        path = os.path.join(tempfile.mkdtemp(), "out.wav")
+
+        with apu.WavWriter(path) as output:
+            target = apu.Apu(self.__memory, output)
+            target.write_register(0x4011, 0x7F)
+            target.catch_up(apu.CPU_CLOCK // 60)
+            target.flush()
+
+        with wave.open(path, "rb") as wav:
+            self.assertEqual(1, wav.getnchannels())
+            self.assertEqual(2, wav.getsampwidth())
+            self.assertEqual(apu.SAMPLE_RATE, wav.getframerate())
+            self.assertAlmostEqual(735, wav.getnframes(), delta=1)
+
+    def test_scheduler_keeps_the_apu_up_with_the_cpu(self):
+        # Turn on the frame IRQ and count the IRQs
+        program = [0x58,              # CLI
+                   0xA9, 0x00,        # LDA #$00
+                   0x8D, 0x17, 0x40,  # STA $4017
+                   0x4C, 0x06, 0x80]  # loop: JMP loop
+        handler = [0xE6, 0x10,        # INC $10
+                   0xAD, 0x15, 0x40,  # LDA $4015
+                   0x40]              # RTI
+
+        for offset, value in enumerate(program):
+            self.__memory.set_address(0x8000 + offset, value)
+
+        for offset, value in enumerate(handler):
+            self.__memory.set_address(0x9000 + offset, value)
+
+        self.__memory.set_address(chip.IRQ_VECTOR, 0x00)
+        self.__memory.set_address(chip.IRQ_VECTOR + 1, 0x90)
+        target = chip.Chip6502(self.__memory)
+        target.program_counter = 0x8000
+        target_scheduler = scheduler.Scheduler(target, ppu.Ppu(), [self.__target])
+        self.__target.map_into(target_scheduler)
+
+        target_scheduler.run_cycles(3 * apu.FOUR_STEP_PERIOD + 100)
+
+        self.assertEqual(3, self.__memory.get_address(0x10))
+        # Mostly the PPU's vertical blank lines, with NMIs off
+        self.assertLess(target_scheduler.syncs, 100)
@@ -0,0 +1,134 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import NesRom as nes_rom
+
+try:
+    import numpy
+    import BatchRunner as batch_runner
+except ImportError:
+    numpy = None
+
+
+def make_test_rom(program):
+    """
+    Make an NROM image that runs program from 0x8000, with the rest of the bank filled with NOPs.
+    """
+    prg_rom = bytearray([0xEA]) * nes_rom.PRG_BANK_SIZE
+    prg_rom[:len(program)] = program
+    prg_rom[0x3FFC:0x3FFE] = [0x00, 0x80]
+
+    header = bytes([0x4E, 0x45, 0x53, 0x1A, 1, 0, 0x00, 0x00]) + bytes(8)
+    return header + bytes(prg_rom)
+
+
+def report_result(result_code):
+    """
+    Make a program that reports result_code the way blargg's test ROMs do, then halts on an invalid opcode.
+    """
+    program = []
+
+    for address, value in [(0x6001, 0xDE), (0x6002, 0xB0), (0x6003, 0x61), (0x6000, result_code)]:
+        program += [0xA9, value, 0x8D, address & 0xFF, address >> 8]
+
+    return program + [0x02]
+
+
+@unittest.skipIf(numpy is None, "NumPy isn't installed")
+class TestBatchRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.__directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.__directory)
+
+    def __write_rom(self, name, image):
+        path = os.path.join(self.__directory, name)
+
+        with open(path, "wb") as rom_file:
+            rom_file.write(image)
+
+        return path
+
+    def test_passing_rom(self):
+        result = batch_runner.run_rom(self.__write_rom("pass.nes", make_test_rom(report_result(0x00))))
+
+        self.assertEqual(batch_runner.PASSED, result["status"])
+        self.assertEqual(0x00, result["result_code"])
+        self.assertEqual(0x00, result["accumulator"])
+        self.assertEqual(0x8015, result["program_counter"])
+        # The reset sequence's 7 cycles, then the program's 24
+        self.assertEqual(31, result["cycles"])
+
+    def test_rom_waiting_for_vertical_blank(self):
+        program = [0x2C, 0x02, 0x20,    # BIT $2002
+                   0x10, 0xFB]          # BPL to the BIT
+        result = batch_runner.run_rom(self.__write_rom("vblank.nes", make_test_rom(program + report_result(0x00))),
+                                      max_cycles=100000)
+
+        self.assertEqual(batch_runner.PASSED, result["status"])
+
+    def test_failing_rom(self):
+        result = batch_runner.run_rom(self.__write_rom("fail.nes", make_test_rom(report_result(0x03))))
+
+        self.assertEqual(batch_runner.FAILED, result["status"])
+        self.assertEqual(0x03, result["result_code"])
+
+    def test_rom_halting_without_result(self):
+        result = batch_runner.run_rom(self.__write_rom("halt.nes", make_test_rom([0xA2, 0x05, 0x02])))
+
+        self.assertEqual(batch_runner.HALTED, result["status"])
+        self.assertEqual(0x05, result["x_register"])
+        self.assertIsNotNone(result["message"])
+
+    def test_rom_running_out_of_cycles(self):
+        result = batch_runner.run_rom(self.__write_rom("loop.nes", make_test_rom([])), max_cycles=1000)
+
+        self.assertEqual(batch_runner.TIMEOUT, result["status"])
+        # The reset sequence takes 7 cycles, so the two-cycle NOPs run one past the budget
+        self.assertEqual(1001, result["cycles"])
+
+    def test_invalid_rom(self):
+        result = batch_runner.run_rom(self.__write_rom("invalid.nes", b"not a rom"))
+
+        self.assertEqual(batch_runner.ERROR, result["status"])
+
+    def test_machine_is_reset_between_roms(self):
+        first = batch_runner.run_rom(self.__write_rom("pass.nes", make_test_rom(report_result(0x00))))
+        batch_runner.run_rom(self.__write_rom("fail.nes", make_test_rom(report_result(0x03))))
+        second = batch_runner.run_rom(self.__write_rom("pass.nes", make_test_rom(report_result(0x00))))
+
+        self.assertEqual(first, second)
+
+    def test_batch_writes_json_in_order(self):
+        paths = [self.__write_rom("pass.nes", make_test_rom(report_result(0x00))),
+                 self.__write_rom("fail.nes", make_test_rom(report_result(0x03))),
+                 self.__write_rom("invalid.nes", b"not a rom")]
+        output_path = os.path.join(self.__directory, "results.json")
+
+        exit_code = batch_runner.main(paths + ["--workers", "2", "--output", output_path])
+
+        with open(output_path) as output:
+            report = json.load(output)
+
+        self.assertEqual(1, exit_code)
+        self.assertEqual(paths, [result["rom"] for result in report["results"]])
+        self.assertEqual([batch_runner.PASSED, batch_runner.FAILED, batch_runner.ERROR],
+                         [result["status"] for result in report["results"]])
+        self.assertEqual(3, report["summary"]["total"])
+        self.assertEqual(1, report["summary"][batch_runner.PASSED])
+
+    def test_rom_that_raises_is_reported_without_losing_the_batch(self):
+        paths = [self.__write_rom("pass.nes", make_test_rom(report_result(0x00))),
+                 self.__write_rom("empty.nes", b""),
+                 self.__write_rom("fail.nes", make_test_rom(report_result(0x03)))]
+
+        results = batch_runner.run_batch(paths, workers=2)
+
+        self.assertEqual([batch_runner.PASSED, batch_runner.ERROR, batch_runner.FAILED],
+                         [result["status"] for result in results])
+        self.assertIn("ValueError", results[1]["message"])
@@ -0,0 +1,158 @@
+import unittest
+
+import BlockCache as block_cache
+import Chip6502 as chip
+import NesMemory as memory
+
+
+class TestBlockCache(unittest.TestCase):
+
+    def setUp(self):
+        self.__memory = memory.NesMemory(0x10000)
+        self.__chip = chip.Chip6502(self.__memory)
+        self.__target = block_cache.BlockCache(self.__chip)
+        self.__program_start = 0x0300
+
+        self.__program = [0xA9, 0x01,        # LDA #$01
+                          0x18,              # CLC
+                          0x69, 0x02,        # ADC #$02
+                          0x8D, 0x00, 0x02,  # STA $0200
+                          0xE8,              # INX
+                          0xEE, 0x00, 0x02,  # INC $0200
+                          0x02]              # Not an instruction, so the block ends before it
+
+    def tearDown(self):
+        # use_profiler swaps Chip6502's methods for every chip, so don't leave a profiler in use for other tests
+        chip.Chip6502.use_profiler(None)
+
+    def __load_program(self, program):
+        for offset, value in enumerate(program):
+            self.__memory.set_address(self.__program_start + offset, value)
+
+        self.__chip.program_counter = self.__program_start
+
+    def test_run_gives_same_state_as_interpreting(self):
+        reference_memory = memory.NesMemory(0x10000)
+        reference_chip = chip.Chip6502(reference_memory)
+
+        for offset, value in enumerate(self.__program):
+            reference_memory.set_address(self.__program_start + offset, value)
+
+        reference_chip.program_counter = self.__program_start
+        reference_chip.run(6)
+
+        self.__load_program(self.__program)
+        self.__target.run(6)
+
+        for attribute in ['accumulator', 'x_register', 'status', 'program_counter', 'cycles']:
+            self.assertEqual(getattr(reference_chip, attribute), getattr(self.__chip, attribute),
+                             "{attribute} differs from interpreting".format(attribute=attribute))
+
+        self.assertEqual(reference_memory.get_address(0x0200), self.__memory.get_address(0x0200))
+
+    def test_second_run_of_a_block_is_a_hit(self):
+        self.__load_program(self.__program)
+        self.__target.run(6)
+        self.__chip.program_counter = self.__program_start
+        self.__target.run(6)
+
+        self.assertEqual(1, self.__target.misses)
+        self.assertEqual(1, self.__target.hits)
+        self.assertEqual(0.5, self.__target.hit_rate)
+
+    def test_run_executes_exactly_the_instructions_asked_for(self):
+        """
+        A block that doesn't fit in the instructions left should be stepped instead.
+        """
+        self.__load_program(self.__program)
+        self.__target.run(6)
+        self.__chip.program_counter = self.__program_start
+        self.__target.run(3)
+
+        self.assertEqual(self.__program_start + 5, self.__chip.program_counter)
+
+    def test_writing_to_a_block_invalidates_it(self):
+        self.__load_program(self.__program)
+        self.__target.run(6)
+
+        self.__memory.set_address(self.__program_start + 1, 0x10)  # LDA #$10
+        self.__chip.program_counter = self.__program_start
+        self.__chip.run(1)  # Keep the interpreter's view of memory the same, for comparison
+        self.assertEqual(0x10, self.__chip.accumulator)
+
+        self.__chip.program_counter = self.__program_start
+        self.__target.run(6)
+
+        self.assertEqual(1, self.__target.invalidations)
+        self.assertEqual(0x12, self.__chip.accumulator)
+
+    def test_writing_through_a_mirror_invalidates_a_block(self):
+        self.__load_program(self.__program)
+        self.__target.run(6)
+        self.__memory.set_address(self.__program_start + 0x1000, 0xA2)  # LDX #$01
+        self.assertEqual(1, self.__target.invalidations)
+
+    def test_writing_elsewhere_keeps_blocks(self):
+        self.__load_program(self.__program)
+        self.__target.run(6)
+        self.__memory.set_address(0x0500, 0xFF)
+        self.assertEqual(0, self.__target.invalidations)
+
+    def test_writes_to_rom_pages_are_not_watched(self):
+        self.__load_program(self.__program)
+        # Writes to the program's page are ignored, as they are for PRG ROM
+        self.__memory.map_region(0x0300, 0x03FF, write_func=lambda address, value: None)
+        self.__target.run(6)
+        self.__memory.set_address(self.__program_start + 1, 0x10)
+        self.__chip.program_counter = self.__program_start
+        self.__target.run(6)
+
+        self.assertEqual(0, self.__target.invalidations)
+        self.assertEqual(1, self.__target.hits)
+
+    def test_run_cycles_runs_whole_blocks(self):
+        self.__load_program(self.__program)
+        self.assertEqual(18, self.__target.run_cycles(1))
+
+    def test_invalid_opcode_is_stepped(self):
+        self.__load_program([0x02])
+        self.assertRaises(chip.InvalidOpcodeException, self.__target.run, 1)
+
+    def test_execution_watches_fire_inside_cached_code(self):
+        self.__load_program(self.__program)
+        self.__target.run(6)
+        fetched = []
+        self.__memory.watch_execution(self.__program_start + 3, self.__program_start + 3,
+                                      lambda address, opcode: fetched.append((address, opcode)))
+
+        self.__chip.program_counter = self.__program_start
+        self.__target.run(6)
+
+        self.assertEqual([(self.__program_start + 3, 0x69)], fetched)
+        self.assertEqual(0x03, self.__chip.accumulator)
+
+    def test_profiler_sees_every_instruction(self):
+        recorded = []
+
+        class Recorder(object):
+            def record(self, address, opcode, cycles, nanoseconds, next_address):
+                recorded.append(address)
+
+        self.__load_program(self.__program)
+        chip.Chip6502.use_profiler(Recorder())
+        self.__target.run(6)
+
+        self.assertEqual(6, len(recorded))
+
+    def test_blocks_are_still_invalidated_after_unmapping_their_page(self):
+        self.__load_program(self.__program)
+        self.__target.run(6)
+        self.__memory.unmap_region(0x0300, 0x03FF)
+        self.__chip.program_counter = self.__program_start
+        self.__target.run(6)
+
+        self.__memory.set_address(self.__program_start + 2, 0x38)  # SEC
+        self.__chip.program_counter = self.__program_start
+        self.__target.run(6)
+
+        self.assertEqual(0x04, self.__chip.accumulator)
@@ -395,3 +395,46 @@ class TestChip6502(unittest.TestCase):
                             self.__target.carry_flag,
                             """Carry flag not expected value of {ex} from starting state of {state}.
                             Instead it was {val}""".format(state=v, ex=expected_value, val=self.__target.carry_flag))   
+
+    def test_instructions_are_shared_by_every_chip(self):
+        """
+        Instructions are methods on the class, so a chip shouldn't need a per-instance dict to hold them.
+        """
+        self.assertFalse(hasattr(self.__target, '__dict__'))
+        self.assertIs(chip.Chip6502.lda_immediate, type(self.__target).lda_immediate)
+
+    def test_flags_are_views_of_the_status_register(self):
+        """
+        The processor status register is laid out NV-BDIZC, so each flag should set or clear exactly its own bit.
+        """
+        flag_bits = {'carry_flag': 0x01,
+                     'zero_flag': 0x02,
+                     'interrupt_disable_flag': 0x04,
+                     'decimal_flag': 0x08,
+                     'break_flag': 0x10,
+                     'overflow_flag': 0x40,
+                     'negative_flag': 0x80}
+
+        for flag_name, bit in flag_bits.items():
+            self.__target.status = 0x00
+            setattr(self.__target, flag_name, 0x1)
+            self.assertEqual(bit, self.__target.status, "{flag} set the wrong bit".format(flag=flag_name))
+
+            self.__target.status = 0xFF
+            setattr(self.__target, flag_name, 0x0)
+            self.assertEqual(0xFF & ~bit, self.__target.status, "{flag} cleared the wrong bit".format(flag=flag_name))
+
+    def test_setting_status_register_sets_flags(self):
+        self.__target.status = 0xC3
+        self.assertEqual((0x1, 0x1, 0x1, 0x1),
+                         (self.__target.carry_flag,
+                          self.__target.zero_flag,
+                          self.__target.overflow_flag,
+                          self.__target.negative_flag))
+        self.assertEqual(0x0, self.__target.interrupt_disable_flag)
+
+    def test_overflowing_status_register_raises_register_overflow_exception(self):
+        def overflow_status():
+            self.__target.status = 0x100
+
+        self.assertRaises(chip.RegisterOverflowException, overflow_status)
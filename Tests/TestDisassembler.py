@@ -0,0 +1,59 @@
+import unittest
+
+import Disassembler as disassembler
+import NesMemory as memory
+import OpcodeTable as op
+
+
+class TestDisassembler(unittest.TestCase):
+
+    def setUp(self):
+        self.__memory = memory.NesMemory(0x10000)
+
+    def __load(self, address, program):
+        for offset, value in enumerate(program):
+            self.__memory.set_address(address + offset, value)
+
+    def test_formats_every_addressing_mode(self):
+        for program, expected in [([0xEA], "NOP"),
+                                  ([0x0A], "ASL A"),
+                                  ([0xA9, 0x10], "LDA #$10"),
+                                  ([0xA5, 0x10], "LDA $10"),
+                                  ([0xB5, 0x10], "LDA $10,X"),
+                                  ([0xB6, 0x10], "LDX $10,Y"),
+                                  ([0xAD, 0x34, 0x12], "LDA $1234"),
+                                  ([0xBD, 0x34, 0x12], "LDA $1234,X"),
+                                  ([0xB9, 0x34, 0x12], "LDA $1234,Y"),
+                                  ([0x6C, 0x34, 0x12], "JMP ($1234)"),
+                                  ([0xA1, 0x10], "LDA ($10,X)"),
+                                  ([0xB1, 0x10], "LDA ($10),Y")]:
+            self.__load(0x8000, program)
+            self.assertEqual((expected, len(program)), disassembler.disassemble(self.__memory, 0x8000))
+
+    def test_branch_targets_are_absolute(self):
+        self.__load(0x8000, [0xD0, 0xFC])  # BNE back two bytes before itself
+        self.assertEqual(("BNE $7FFE", 2), disassembler.disassemble(self.__memory, 0x8000))
+
+    def test_unofficial_opcodes_are_written_as_bytes(self):
+        self.__load(0x8000, [0x02])
+        self.assertEqual((".byte $02", 1), disassembler.disassemble(self.__memory, 0x8000))
+
+    def test_every_opcode_has_its_mnemonic(self):
+        for opcode, instruction in op.OPCODES.items():
+            self.__memory.set_address(0x8000, opcode)
+            text, length = disassembler.disassemble(self.__memory, 0x8000)
+
+            self.assertEqual(instruction.mnemonic, text[:3])
+            self.assertEqual(instruction.length, length)
+
+    def test_format_listing(self):
+        self.__load(0xC000, [0x4C, 0xF5, 0xC5,  # JMP $C5F5
+                             0xA2, 0x00])       # LDX #$00
+
+        self.assertEqual("C000  4C F5 C5  JMP $C5F5\n"
+                         "C003  A2 00     LDX #$00",
+                         disassembler.format_listing(self.__memory, 0xC000, 0xC005))
+
+
+if __name__ == '__main__':
+    unittest.main()
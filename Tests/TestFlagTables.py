@@ -0,0 +1,95 @@
+import unittest
+
+import Chip6502 as chip
+import FlagTables as flag_tables
+import NesMemory as memory
+
+
+class TestFlagTables(unittest.TestCase):
+
+    def setUp(self):
+        self.__target = chip.Chip6502(memory.NesMemory(0xFFFF))
+
+    def test_nz_flags(self):
+        self.assertEqual(flag_tables.ZERO_FLAG, flag_tables.NZ_FLAGS[0x00])
+        self.assertEqual(0x00, flag_tables.NZ_FLAGS[0x7F])
+        self.assertEqual(flag_tables.NEGATIVE_FLAG, flag_tables.NZ_FLAGS[0x80])
+
+    def test_adc_result_is_packed_with_carry_and_overflow(self):
+        entry = flag_tables.ADC_RESULTS[flag_tables.arithmetic_index(0xFF, 0x01, 0x01)]
+        self.assertEqual(0x01, entry & 0xFF)
+        self.assertEqual(flag_tables.CARRY_FLAG, entry >> 8)
+
+    def test_overflow_is_signed_overflow(self):
+        # (table, accumulator, operand, carry flag, overflows). SBC subtracts the carry's complement, so a carry of 1
+        # is a plain subtraction.
+        cases = [(flag_tables.ADC_RESULTS, 0x7F, 0x01, 0, True),    # 127 + 1 = 128
+                 (flag_tables.ADC_RESULTS, 0x80, 0xFF, 0, True),    # -128 + -1 = -129
+                 (flag_tables.ADC_RESULTS, 0xFF, 0x01, 0, False),   # -1 + 1 = 0
+                 (flag_tables.ADC_RESULTS, 0x01, 0x01, 0, False),   # 1 + 1 = 2
+                 (flag_tables.SBC_RESULTS, 0x80, 0x01, 1, True),    # -128 - 1 = -129
+                 (flag_tables.SBC_RESULTS, 0x7F, 0xFF, 1, True),    # 127 - -1 = 128
+                 (flag_tables.SBC_RESULTS, 0xFF, 0x01, 1, False)]   # -1 - 1 = -2
+
+        for table, accumulator, operand, carry_flag, overflows in cases:
+            entry = table[flag_tables.arithmetic_index(accumulator, operand, carry_flag)]
+            self.assertEqual(overflows, bool((entry >> 8) & flag_tables.OVERFLOW_FLAG),
+                             "Wrong overflow flag for A={a}, M={m}, C={c}"
+                             .format(a=hex(accumulator), m=hex(operand), c=carry_flag))
+
+    def test_instructions_set_the_flags_comparisons_would(self):
+        """
+        ADC, SBC, INC and DEC should leave the same flags as working each one out with a comparison.
+        """
+        values = range(0x00, 0x100, 0x0F)
+
+        for accumulator in values:
+            for operand in values:
+                for carry_flag in [0x00, 0x01]:
+                    self.assertEqual(self.__expected_states(accumulator, operand, carry_flag),
+                                     self.__run_instructions(accumulator, operand, carry_flag),
+                                     "Wrong flags for A={a}, M={m}, C={c}"
+                                     .format(a=hex(accumulator), m=hex(operand), c=carry_flag))
+
+    def __run_instructions(self, accumulator, operand, carry_flag):
+        self.setUp()
+        state = []
+
+        for instruction in [self.__target.adc_immediate, self.__target.sbc_immediate]:
+            self.__target.accumulator = accumulator
+            self.__target.carry_flag = carry_flag
+            instruction(operand)
+            state.append((self.__target.accumulator, self.__target.status & 0xC3))
+
+        self.__target.memory.set_address(0x10, operand)
+
+        for instruction in [self.__target.inc_immediate, self.__target.dec_immediate]:
+            instruction(0x10)
+            state.append((self.__target.memory.get_address(0x10), self.__target.status & 0x82))
+
+        return state
+
+    @staticmethod
+    def __expected_states(accumulator, operand, carry_flag):
+        def nz(value):
+            return (flag_tables.ZERO_FLAG if value == 0 else 0x00) | (flag_tables.NEGATIVE_FLAG if value & 0x80 else 0x00)
+
+        state = []
+
+        def signed(value):
+            return value - 0x100 if value & 0x80 else value
+
+        for the_sum, signed_sum, carries in [(accumulator + operand + carry_flag,
+                                              signed(accumulator) + signed(operand) + carry_flag,
+                                              lambda the_sum: the_sum > 0xFF),
+                                             (accumulator - operand - (1 - carry_flag),
+                                              signed(accumulator) - signed(operand) - (1 - carry_flag),
+                                              lambda the_sum: the_sum >= 0)]:
+            result = the_sum & 0xFF
+            overflow = flag_tables.OVERFLOW_FLAG if not -0x80 <= signed_sum <= 0x7F else 0x00
+            state.append((result, nz(result) | overflow | (flag_tables.CARRY_FLAG if carries(the_sum) else 0x00)))
+
+        incremented = (operand + 1) & 0xFF
+        state.append((incremented, nz(incremented)))
+        state.append((operand, nz(operand)))
+        return state
@@ -0,0 +1,173 @@
+import unittest
+
+import Chip6502 as chip
+import NesMemory as memory
+
+try:
+    import numpy
+    import LockstepChip6502 as lockstep_chip
+except ImportError:
+    numpy = None
+
+PROGRAM_START = 0x8000
+
+
+@unittest.skipIf(numpy is None, "NumPy isn't installed")
+class TestLockstepChip6502(unittest.TestCase):
+    """
+    Run programs on every lane of a LockstepChip6502 and on a Chip6502 per lane, and check they agree. Chip6502's
+    instructions are tested in Tests/Chip6502, so agreeing with it covers the same semantics.
+    """
+
+    def __run_lanes(self, program, lane_setup, n_steps):
+        """
+        Args:
+            program: The program to load at PROGRAM_START
+            lane_setup: A list with one function per lane, taking a Chip6502 and setting up its starting state
+            n_steps: The number of steps to run the lockstep chip for
+        """
+        target = lockstep_chip.LockstepChip6502(len(lane_setup))
+        chips = []
+
+        for lane, setup in enumerate(lane_setup):
+            ram = memory.NesMemory(0x10000)
+
+            for offset, value in enumerate(program):
+                ram.set_address(PROGRAM_START + offset, value)
+
+            single_chip = chip.Chip6502(ram)
+            single_chip.program_counter = PROGRAM_START
+            setup(single_chip)
+            chips.append(single_chip)
+
+            target.accumulator[lane] = single_chip.accumulator
+            target.x_register[lane] = single_chip.x_register
+            target.y_register[lane] = single_chip.y_register
+            target.status[lane] = single_chip.status
+            target.program_counter[lane] = PROGRAM_START
+            target.memory[lane] = numpy.frombuffer(bytes(ram.ram), dtype=numpy.uint8)
+
+        target.run(n_steps)
+        return target, chips
+
+    def __assert_lanes_match(self, target, chips):
+        for lane, single_chip in enumerate(chips):
+            try:
+                while single_chip.program_counter < target.program_counter[lane]:
+                    single_chip.step()
+            except chip.InvalidOpcodeException:
+                self.assertTrue(target.halted[lane])
+                continue
+
+            self.assertEqual((single_chip.accumulator, single_chip.x_register, single_chip.y_register,
+                              single_chip.status, single_chip.program_counter, single_chip.cycles),
+                             (int(target.accumulator[lane]), int(target.x_register[lane]),
+                              int(target.y_register[lane]), int(target.status[lane]),
+                              int(target.program_counter[lane]), int(target.cycles[lane])),
+                             "Lane {lane} differs".format(lane=lane))
+            self.assertEqual(bytes(single_chip.memory.ram), target.memory[lane].tobytes(),
+                             "Lane {lane} memory differs".format(lane=lane))
+
+    def __accumulator_and_carry_lanes(self):
+        def setup(accumulator, carry):
+            def set_up_chip(single_chip):
+                single_chip.accumulator = accumulator
+                single_chip.carry_flag = carry
+
+            return set_up_chip
+
+        return [setup(accumulator, carry) for accumulator in range(0x100) for carry in range(2)]
+
+    def test_adc_matches_chip6502_for_every_accumulator_and_carry(self):
+        program = [0x69, 0x7F, 0x65, 0x10, 0x69, 0x01]
+        lanes = self.__accumulator_and_carry_lanes()
+
+        for lane, setup in enumerate(lanes):
+            lanes[lane] = lambda single_chip, setup=setup, lane=lane: (setup(single_chip),
+                                                                       single_chip.memory.set_address(0x10, lane & 0xFF))
+
+        self.__assert_lanes_match(*self.__run_lanes(program, lanes, 3))
+
+    def test_sbc_matches_chip6502_for_every_accumulator_and_carry(self):
+        program = [0xE9, 0x01, 0xE9, 0x80, 0xE9, 0xFF]
+        self.__assert_lanes_match(*self.__run_lanes(program, self.__accumulator_and_carry_lanes(), 3))
+
+    def test_loads_stores_and_increments_match_chip6502(self):
+        program = [0xA2, 0x02,              # LDX #$02
+                   0xB5, 0x10,              # LDA $10,X
+                   0x9D, 0xFF, 0x02,        # STA $02FF,X
+                   0xEE, 0x01, 0x03,        # INC $0301
+                   0xD6, 0x10,              # DEC $10,X
+                   0xB1, 0x20,              # LDA ($20),Y
+                   0x81, 0x1E,              # STA ($1E,X)
+                   0xBC, 0xFF, 0x02,        # LDY $02FF,X
+                   0xCA, 0x88, 0xE8, 0xC8,  # DEX, DEY, INX, INY
+                   0x38, 0x18, 0xEA]        # SEC, CLC, NOP
+
+        def setup(value):
+            def set_up_chip(single_chip):
+                single_chip.y_register = value
+                single_chip.memory.set_address(0x12, value)
+                single_chip.memory.set_address(0x20, 0xF0)
+                single_chip.memory.set_address(0x21, 0x04)
+                single_chip.memory.set_address(0x05F0 + value, value ^ 0xFF)
+
+            return set_up_chip
+
+        self.__assert_lanes_match(*self.__run_lanes(program, [setup(value) for value in range(0x100)], 14))
+
+    def test_lanes_with_different_code_run_in_groups(self):
+        program = [0xE8, 0xE8, 0xE8]
+
+        def setup(opcode):
+            return lambda single_chip: single_chip.memory.set_address(PROGRAM_START + 1, opcode)
+
+        target, chips = self.__run_lanes(program, [setup(0xE8), setup(0xC8), setup(0xCA)], 3)
+
+        self.assertEqual([3, 2, 1], list(target.x_register))
+        self.assertEqual([0, 1, 0], list(target.y_register))
+        self.__assert_lanes_match(target, chips)
+
+    def test_lanes_halt_on_unsupported_opcodes(self):
+        def setup(opcode):
+            return lambda single_chip: single_chip.memory.set_address(PROGRAM_START + 1, opcode)
+
+        target, chips = self.__run_lanes([0xE8, 0xE8, 0xE8], [setup(0xE8), setup(0x02)], 3)
+
+        self.assertEqual([False, True], list(target.halted))
+        self.assertEqual(0x01, target.x_register[1])
+
+    def test_branches_and_jumps_are_rejected(self):
+        for opcode in [0xD0, 0x4C, 0x20, 0x60]:  # BNE, JMP, JSR, RTS
+            target = lockstep_chip.LockstepChip6502(2)
+            target.load_program(PROGRAM_START, [0xE8, opcode, 0x00, 0x80])
+            target.memory[1, PROGRAM_START + 1] = 0xE8
+            target.program_counter[:] = PROGRAM_START
+            target.step()
+
+            self.assertRaises(lockstep_chip.UnsupportedInstructionException, target.step)
+            # Neither lane executed anything
+            self.assertEqual([PROGRAM_START + 1, PROGRAM_START + 1], list(target.program_counter))
+            self.assertEqual([0x01, 0x01], list(target.x_register))
+            self.assertEqual([False, False], list(target.halted))
+
+    def test_lagging_lanes_run_first(self):
+        target = lockstep_chip.LockstepChip6502(2)
+        target.load_program(PROGRAM_START, [0xE8, 0xE8, 0xE8])
+        target.program_counter[:] = [PROGRAM_START, PROGRAM_START + 1]
+
+        self.assertEqual(1, target.step())
+        self.assertEqual([PROGRAM_START + 1, PROGRAM_START + 1], list(target.program_counter))
+        self.assertEqual(2, target.step())
+
+    def test_program_counter_wraps_around_within_each_lane(self):
+        # A NOP at 0xFFFF, then INX in lane 0 and an unsupported opcode in lane 1 at 0x0000
+        target = lockstep_chip.LockstepChip6502(2)
+        target.load_program(0xFFFF, [0xEA])
+        target.memory[:, 0x0000] = [0xE8, 0x02]
+        target.program_counter[:] = 0xFFFF
+        target.run(2)
+
+        self.assertEqual([False, True], list(target.halted))
+        self.assertEqual([0x0001, 0x0000], list(target.program_counter))
+        self.assertEqual([0x01, 0x00], list(target.x_register))
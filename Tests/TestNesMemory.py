@@ -29,23 +29,34 @@ class TestNesMemory(unittest.TestCase):
 
     def test_set_lower_mirrored_address_sets_counterpart_higher_mirrored_address(self):
         """
-        If memory addresses 0x00 to 0x7FF are set, the value being set should be mirrored in the range 0x801 to 0x2000.
+        If memory addresses 0x00 to 0x7FF are set, the value being set should be mirrored in the range 0x800 to 0x1FFF.
+        """
+        self.__assert_address_is_mirrored(0x01, 0x800)
 
-        This leaves memory address 0x800 unmirrored. I haven't seen any docs saying 0x800 should be mirrored, but it's
-        something to bear in mind.
+    def test_set_lower_mirrored_address_sets_every_higher_mirrored_address(self):
+        """
+        The 0x800 bytes of internal RAM are mirrored three times, so all of the mirrors should see the value.
         """
-        self.__assert_address_is_mirrored(0x01, 0x801)
+        for offset in [0x800, 0x1000, 0x1800]:
+            self.__assert_address_is_mirrored(0x7FF, offset)
 
     def test_set_higher_mirrored_address_sets_counterpart_lower_mirrored_address(self):
         """
-        If a memory address of 0x801 <= address <= 0x2000 is set then the address - 0x801 should also be set
+        If a memory address of 0x800 <= address <= 0x1FFF is set then the address & 0x7FF should also be set
         to the same value
         """
-        self.__assert_address_is_mirrored(0x802, -0x801)
+        self.__assert_address_is_mirrored(0x802, -0x800)
+
+    def test_mirrored_addresses_share_one_cell_in_ram(self):
+        self.__target.set_address(0x1803, 0x0E)
+        self.assertEqual(0x0E, self.__target.ram[0x03])
+        self.assertEqual(0x00, self.__target.ram[0x1803])
 
     def test_set_address_above_lower_mirrored_range_does_not_set_higher_address(self):
         """
         If a memory address > 0x7FF is set, we do not want a memory address of address + 0x801 to be set.
+
+        0x800 and 0x1001 are mirrors of 0x00 and 0x01 respectively, so they are different cells.
         """
         self.__assert_set_address_is_not_mirrored(0x800, 0x801)
 
@@ -68,10 +79,218 @@ class TestNesMemory(unittest.TestCase):
         self.assertEqual(mirrored_value, offset_address_value)
 
     def test_get_absolute_indexed_address(self):
-        def get_offset():
-            return 0x01
-
         base_address = 0x02
-        self.assertEqual(0x03, self.__target.get_absolute_indexed_address(base_address, get_offset))
+        self.assertEqual(0x03, self.__target.get_absolute_indexed_address(base_address, 0x01))
+
+    def test_get_absolute_indexed_address_wraps_at_top_of_memory(self):
+        self.assertEqual(0x0001, self.__target.get_absolute_indexed_address(0xFFFF, 0x02))
+
+    def test_get_zero_page_indexed_address_wraps_in_zero_page(self):
+        self.assertEqual(0x10, self.__target.get_zero_page_indexed_address(0xF0, 0x20))
+
+    def test_get_indirect_address_does_not_carry_into_high_byte(self):
+        target = memory.NesMemory(0x10000)
+        target.set_address(0x10FF, 0x34)
+        target.set_address(0x1000, 0x12)
+        target.set_address(0x1100, 0x56)
+
+        self.assertEqual(0x1234, target.get_indirect_address(0x10FF))
+
+    def test_read_block_follows_internal_ram_mirrors(self):
+        self.__target.set_address(0x07FF, 0x0E)
+        self.__target.set_address(0x0000, 0x0F)
+
+        self.assertEqual(bytes([0x0E, 0x0F]), self.__target.read_block(0x0FFF, 2))
+
+    def test_read_block_reads_mapped_region_through_device(self):
+        self.__target.set_address(0x40FF, 0x0D)
+        self.__target.map_region(0x4100, 0x41FF, read_func=lambda address: address & 0xFF)
+
+        self.assertEqual(bytes([0x0D, 0x00, 0x01]), self.__target.read_block(0x40FF, 3))
+
+    def test_write_block_follows_internal_ram_mirrors(self):
+        self.__target.write_block(0x17FE, bytes([0x01, 0x02, 0x03, 0x04]))
+
+        self.assertEqual(bytes([0x03, 0x04]), self.__target.ram[0x0000:0x0002].tobytes())
+        self.assertEqual(bytes([0x01, 0x02]), self.__target.ram[0x07FE:0x0800].tobytes())
+
+    def test_write_block_sends_writes_to_devices_and_watches(self):
+        writes = []
+        self.__target.map_region(0x2000, 0x2007, write_func=lambda address, value: writes.append((address, value)))
+        self.__target.watch_writes(0x0301, 0x0301, lambda address, value: writes.append((address, value)))
+        self.__target.write_block(0x0300, bytes([0x01, 0x02]))
+        self.__target.write_block(0x1FFF, bytes([0x03, 0x04, 0x05]))
+
+        self.assertEqual([(0x0301, 0x02), (0x2000, 0x04), (0x2001, 0x05)], writes)
+        self.assertEqual(0x03, self.__target.get_address(0x07FF))
+
+    def test_write_block_marks_pages_dirty(self):
+        self.__target.snapshot()
+        self.__target.write_block(0x60FF, bytes([0x0E, 0x0F]))
+        pages = self.__target.snapshot()
+
+        self.assertEqual(0x0E, pages[0x60][0xFF])
+        self.assertEqual(0x0F, pages[0x61][0x00])
+
+    def test_fill_sets_every_address_in_range(self):
+        self.__target.fill(0x0200, 0x02FF, 0xFF)
+
+        self.assertEqual(bytes([0xFF]) * 0x100, self.__target.read_block(0x0200, 0x100))
+        self.assertEqual(0x00, self.__target.get_address(0x0300))
+
+    def test_fill_with_value_too_high_raises_memory_slot_overflow_exception(self):
+        self.assertRaises(memory.MemorySlotOverflowException, self.__target.fill, 0x0200, 0x02FF, 0x100)
+
+    def test_read_word_is_little_endian(self):
+        self.__target.set_address(0x0300, 0x02)
+        self.__target.set_address(0x0301, 0x22)
+        self.assertEqual(0x2202, self.__target.read_word(0x0300))
+
+    def test_read_word_wraps_around_zero_page(self):
+        self.__target.set_address(0xFF, 0x34)
+        self.__target.set_address(0x00, 0x12)
+        self.__target.set_address(0x100, 0x56)
+        self.assertEqual(0x1234, self.__target.read_word(0xFF))
+
+    def test_indexed_indirect_pointer_wraps_around_zero_page(self):
+        self.__target.set_address(0x01, 0x34)
+        self.__target.set_address(0x02, 0x12)
+        self.assertEqual(0x1234, self.__target.get_indexed_indirect_memory_address(0xFF, 0x02))
+
+    def test_mapped_region_reads_come_from_device(self):
+        self.__target.map_region(0x2000, 0x3FFF, read_func=lambda address: address & 0x07)
+        self.assertEqual(0x02, self.__target.get_address(0x2002))
+        self.assertEqual(0x07, self.__target.get_address(0x3FFF))
+
+    def test_mapped_region_writes_go_to_device(self):
+        writes = []
+        self.__target.map_region(0x2000, 0x3FFF, write_func=lambda address, value: writes.append((address, value)))
+        self.__target.set_address(0x2008, 0x0E)
+
+        self.assertEqual([(0x2008, 0x0E)], writes)
+        self.assertEqual(0x00, self.__target.ram[0x2008])
+
+    def test_mapped_region_leaves_plain_ram_alone(self):
+        self.__target.map_region(0x2000, 0x3FFF, lambda address: 0xFF, lambda address, value: None)
+        self.__target.set_address(0x4000, 0x0E)
+        self.__target.set_address(0x1FFF, 0x0D)
+
+        self.assertEqual(0x0E, self.__target.get_address(0x4000))
+        self.assertEqual(0x0D, self.__target.get_address(0x07FF))
+
+    def test_region_covering_part_of_a_page_only_handles_its_addresses(self):
+        """
+        The APU and I/O registers only cover 0x4000 to 0x401F, so the rest of their page should still be memory.
+        """
+        self.__target.map_region(0x4000, 0x401F, lambda address: 0xAA, lambda address, value: None)
+        self.__target.set_address(0x4020, 0x0E)
+
+        self.assertEqual(0xAA, self.__target.get_address(0x401F))
+        self.assertEqual(0x0E, self.__target.get_address(0x4020))
+
+    def test_region_without_read_func_reads_memory(self):
+        self.__target.set_address(0x6000, 0x0E)
+        self.__target.map_region(0x6000, 0x7FFF, write_func=lambda address, value: None)
+        self.assertEqual(0x0E, self.__target.get_address(0x6000))
+
+    def test_unmapped_region_is_plain_ram_again(self):
+        self.__target.map_region(0x6000, 0x7FFF, lambda address: 0xFF, lambda address, value: None)
+        self.__target.unmap_region(0x6000, 0x7FFF)
+        self.__target.set_address(0x6000, 0x0E)
+        self.assertEqual(0x0E, self.__target.get_address(0x6000))
+
+    def test_read_word_reads_through_mapped_region(self):
+        self.__target.map_region(0xFF00, 0xFFFE, read_func=lambda address: address & 0xFF)
+        self.assertEqual(0xFDFC, self.__target.read_word(0xFFFC))
+
+    def test_snapshot_copies_only_written_pages(self):
+        first = self.__target.snapshot()
+        self.__target.set_address(0x1903, 0x0E)
+        self.__target.watch_writes(0x6000, 0x6000, lambda address, value: None)
+        self.__target.set_address(0x6000, 0x0F)
+        second = self.__target.snapshot()
+
+        self.assertEqual(0x0E, second[0x01][0x03])
+        self.assertEqual(0x0F, second[0x60][0x00])
+        self.assertIs(first[0x02], second[0x02])
+        self.assertIs(first[0x19], second[0x19])
+
+    def test_snapshot_sees_direct_writes_marked_dirty(self):
+        self.__target.snapshot()
+        self.__target.ram[0x0304] = 0x0E
+        self.__target.mark_dirty(0x0B04, 0x0B04)
+
+        self.assertEqual(0x0E, self.__target.snapshot()[0x03][0x04])
+
+    def test_watch_reads_sees_value_read(self):
+        reads = []
+        self.__target.set_address(0x0304, 0x0E)
+        self.__target.watch_reads(0x0300, 0x0304, lambda address, value: reads.append((address, value)))
+
+        self.assertEqual(0x0E, self.__target.get_address(0x0B04))
+        self.__target.get_address(0x0305)
+        self.assertEqual([(0x0B04, 0x0E)], reads)
+
+    def test_peek_does_not_set_off_watches(self):
+        reads = []
+        self.__target.set_address(0x0304, 0x0E)
+        self.__target.map_region(0x8000, 0x80FF, lambda address: address & 0xFF)
+        self.__target.watch_reads(0x0300, 0x0304, lambda address, value: reads.append(address))
+        self.__target.watch_reads(0x8000, 0x80FF, lambda address, value: reads.append(address))
+
+        self.assertEqual(0x0E, self.__target.peek(0x0B04))
+        self.assertEqual(0x12, self.__target.peek(0x8012))
+        self.assertEqual([], reads)
+
+    def test_watches_stay_in_front_of_devices_mapped_later(self):
+        writes = []
+        self.__target.watch_writes(0x4000, 0x40FF, lambda address, value: writes.append(address))
+        self.__target.map_region(0x4000, 0x40FF, write_func=lambda address, value: None)
+        self.__target.set_address(0x4001, 0x0E)
+
+        self.assertEqual([0x4001], writes)
+
+    def test_removed_watch_is_not_called(self):
+        writes = []
+
+        def watch_func(address, value):
+            writes.append(address)
+
+        self.__target.watch_writes(0x0300, 0x0300, watch_func)
+        self.__target.remove_watch(watch_func)
+        self.__target.set_address(0x0300, 0x0E)
+
+        self.assertEqual([], writes)
+        self.assertEqual(0x0E, self.__target.get_address(0x0300))
+
+    def test_watch_changes_are_counted_and_execution_pages_listed(self):
+        version = self.__target.watch_version
+        self.__target.watch_execution(0x8000, 0x81FF, lambda address, opcode: None)
+
+        self.assertGreater(self.__target.watch_version, version)
+        self.assertEqual(frozenset([0x80, 0x81]), self.__target.execution_watched_pages())
+
+        version = self.__target.watch_version
+        self.__target.unmap_region(0x8000, 0x80FF)
+
+        self.assertGreater(self.__target.watch_version, version)
+        self.assertEqual(frozenset([0x81]), self.__target.execution_watched_pages())
+
+    def test_write_device_pages_leave_out_read_only_devices_and_watches(self):
+        self.__target.map_region(0x8000, 0x81FF, lambda address: 0x00, lambda address, value: None)
+        self.__target.map_region(0x2000, 0x20FF, read_func=lambda address: 0x00)
+        self.__target.watch_writes(0x0300, 0x03FF, lambda address, value: None)
+
+        self.assertEqual(frozenset([0x80, 0x81]), self.__target.write_device_pages())
+
+    def test_fetch_opcode_is_get_address_without_execution_watches(self):
+        self.assertEqual(self.__target.get_address, self.__target.fetch_opcode)
+
+        def watch_func(address, opcode):
+            pass
+
+        self.__target.watch_execution(0x8000, 0x8000, watch_func)
+        self.assertNotEqual(self.__target.get_address, self.__target.fetch_opcode)
 
-    
+        self.__target.remove_watch(watch_func)
+        self.assertEqual(self.__target.get_address, self.__target.fetch_opcode)
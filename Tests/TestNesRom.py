@@ -0,0 +1,115 @@
+import os
+import tempfile
+import unittest
+
+import NesMemory as memory
+import NesRom as nes_rom
+
+
+def make_rom_image(prg_banks=1, chr_banks=1, mapper=0, trainer=False, nes2=False):
+    """
+    Make an iNES image whose PRG banks are filled with their bank number and whose CHR banks are filled with 0xC0 plus
+    their bank number.
+    """
+    flags6 = ((mapper & 0x0F) << 4) | (0x04 if trainer else 0x00) | 0x01
+    flags7 = (mapper & 0xF0) | (0x08 if nes2 else 0x00)
+    header = bytes([0x4E, 0x45, 0x53, 0x1A, prg_banks, chr_banks, flags6, flags7]) + bytes(8)
+
+    image = bytearray(header)
+
+    if trainer:
+        image += bytes([0x7A]) * nes_rom.TRAINER_SIZE
+
+    for bank in range(prg_banks):
+        image += bytes([bank]) * nes_rom.PRG_BANK_SIZE
+
+    for bank in range(chr_banks):
+        image += bytes([0xC0 + bank]) * nes_rom.CHR_BANK_SIZE
+
+    return bytes(image)
+
+
+class TestNesRom(unittest.TestCase):
+
+    def setUp(self):
+        self.__memory = memory.NesMemory(0x10000)
+        self.__rom_file = tempfile.NamedTemporaryFile(suffix=".nes", delete=False)
+        self.__rom_file.close()
+
+    def tearDown(self):
+        os.remove(self.__rom_file.name)
+
+    def __load(self, image):
+        with open(self.__rom_file.name, "wb") as rom_file:
+            rom_file.write(image)
+
+        return nes_rom.NesRom.load(self.__rom_file.name)
+
+    def test_load_reads_header(self):
+        with self.__load(make_rom_image(prg_banks=2, chr_banks=1, mapper=0x21)) as rom:
+            self.assertEqual(0x21, rom.mapper)
+            self.assertTrue(rom.vertical_mirroring)
+            self.assertFalse(rom.is_nes2)
+            self.assertEqual(2, len(rom.prg_banks))
+            self.assertEqual(1, len(rom.chr_banks))
+
+    def test_banks_are_views_of_the_file(self):
+        """
+        Banks should be slices of the mapped file rather than copies of it.
+        """
+        with self.__load(make_rom_image(prg_banks=2, chr_banks=2)) as rom:
+            for bank in rom.prg_banks + rom.chr_banks:
+                self.assertIsInstance(bank, memoryview)
+                self.assertIs(rom.prg_rom.obj, bank.obj)
+
+            self.assertEqual(0x01, rom.prg_banks[1][0])
+            self.assertEqual(0xC1, rom.chr_banks[1][nes_rom.CHR_BANK_SIZE - 1])
+
+    def test_single_prg_bank_is_mirrored(self):
+        with self.__load(make_rom_image(prg_banks=1)) as rom:
+            rom.map_into(self.__memory)
+            self.assertEqual(0x00, self.__memory.get_address(0x8000))
+            self.assertEqual(0x00, self.__memory.get_address(0xFFFF))
+
+    def test_two_prg_banks_fill_the_upper_half_of_memory(self):
+        with self.__load(make_rom_image(prg_banks=2)) as rom:
+            rom.map_into(self.__memory)
+            self.assertEqual(0x00, self.__memory.get_address(0xBFFF))
+            self.assertEqual(0x01, self.__memory.get_address(0xC000))
+
+    def test_writes_to_prg_rom_are_ignored(self):
+        with self.__load(make_rom_image(prg_banks=2)) as rom:
+            rom.map_into(self.__memory)
+            self.__memory.set_address(0xC000, 0xFF)
+            self.assertEqual(0x01, self.__memory.get_address(0xC000))
+
+    def test_trainer_is_copied_into_prg_ram_at_7000(self):
+        with self.__load(make_rom_image(trainer=True)) as rom:
+            rom.map_into(self.__memory)
+            self.assertEqual(0x00, self.__memory.get_address(0x8000))
+
+        # The trainer stays after the ROM is closed, and is writable
+        self.assertEqual(0x7A, self.__memory.get_address(0x71FF))
+        self.__memory.set_address(0x7000, 0x12)
+        self.assertEqual(0x12, self.__memory.get_address(0x7000))
+
+    def test_nes2_header_is_recognised(self):
+        image = bytearray(make_rom_image(prg_banks=1, nes2=True))
+        image[8] = 0x01  # mapper bits 8-11
+
+        with self.__load(bytes(image)) as rom:
+            self.assertTrue(rom.is_nes2)
+            self.assertEqual(0x100, rom.mapper)
+
+    def test_unsupported_mapper_raises_unsupported_mapper_exception(self):
+        with self.__load(make_rom_image(mapper=0x01)) as rom:
+            self.assertRaises(nes_rom.UnsupportedMapperException, rom.map_into, self.__memory)
+
+    def test_nrom_with_other_prg_sizes_raises_invalid_rom_exception(self):
+        for prg_banks in [0, 3, 4]:
+            with self.__load(make_rom_image(prg_banks=prg_banks)) as rom:
+                self.assertRaises(nes_rom.InvalidRomException, rom.map_into, self.__memory)
+
+    def test_invalid_image_raises_invalid_rom_exception(self):
+        self.assertRaises(nes_rom.InvalidRomException, self.__load, b"not a rom")
+        self.assertRaises(nes_rom.InvalidRomException, self.__load, make_rom_image()[:0x100])
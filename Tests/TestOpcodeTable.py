@@ -0,0 +1,101 @@
+import random
+import unittest
+
+import Chip6502 as chip
+import NesMemory as memory
+import OpcodeTable as op
+
+
+class TestOpcodeTable(unittest.TestCase):
+
+    def tearDown(self):
+        chip.Chip6502.use_flag_tables(True)
+
+    def test_table_holds_every_official_opcode(self):
+        self.assertEqual(151, len(op.OPCODES))
+        self.assertEqual(56, len(set(instruction.mnemonic for instruction in op.OPCODES.values())))
+
+    def test_chip_decodes_opcodes_from_table(self):
+        for opcode in range(0x100):
+            instruction = op.OPCODES.get(opcode)
+            decoded = chip.Chip6502.decode_opcode(opcode)
+
+            if instruction is None:
+                self.assertIsNone(decoded, hex(opcode))
+                continue
+
+            handler, length, cycles = decoded
+            self.assertEqual((instruction.length, instruction.cycles), (length, cycles), hex(opcode))
+            self.assertEqual("{mnemonic}_{mode}".format(mnemonic=instruction.mnemonic.lower(), mode=instruction.mode),
+                             handler.__name__)
+
+    def test_instructions_take_base_cycles_and_move_past_operands(self):
+        for opcode, instruction in op.OPCODES.items():
+            if instruction.mode == op.RELATIVE or instruction.mnemonic in ("BRK", "JMP", "JSR", "RTI", "RTS"):
+                continue
+
+            target = chip.Chip6502(memory.NesMemory(0x10000))
+            target.memory.set_address(0x8000, opcode)
+            target.program_counter = 0x8000
+            target.step()
+
+            self.assertEqual(0x8000 + instruction.length, target.program_counter, instruction)
+            self.assertEqual(instruction.cycles, target.cycles, instruction)
+
+    def test_page_crossing_costs_a_cycle_where_the_table_says(self):
+        for opcode, instruction in op.OPCODES.items():
+            if instruction.mode not in op.PAGE_CROSSING_MODES:
+                continue
+
+            target = chip.Chip6502(memory.NesMemory(0x10000))
+            target.x_register = 0xFF
+            target.y_register = 0xFF
+            # Both the absolute operand and the zero page pointer hold 0x0201, so indexing crosses into page 0x03
+            for address, value in enumerate([opcode, 0x01, 0x02]):
+                target.memory.set_address(0x8000 + address, value)
+
+            target.memory.set_address(0x01, 0x01)
+            target.memory.set_address(0x02, 0x02)
+            target.program_counter = 0x8000
+            target.step()
+
+            self.assertEqual(instruction.cycles + instruction.page_penalty, target.cycles, instruction)
+
+    def test_flag_modes_agree_for_every_opcode(self):
+        randomiser = random.Random(6502)
+
+        for opcode in op.OPCODES:
+            for _ in range(20):
+                state = [randomiser.randrange(0x100) for _ in range(6)]
+                operands = [randomiser.randrange(0x100) for _ in range(2)]
+                self.assertEqual(self.__run_opcode(False, opcode, state, operands),
+                                 self.__run_opcode(True, opcode, state, operands),
+                                 "Flag modes disagree for {opcode} from {state}".format(opcode=hex(opcode),
+                                                                                      state=state))
+
+    def __run_opcode(self, flag_tables_enabled, opcode, state, operands):
+        chip.Chip6502.use_flag_tables(flag_tables_enabled)
+        ram = memory.NesMemory(0x10000)
+        accumulator, x_register, y_register, status, stack_pointer, value = state
+
+        # Every address an operand can point at holds value
+        ram.ram[:0x800] = bytes([value]) * 0x800
+
+        ram.set_address(0x0600, opcode)
+        ram.set_address(0x0601, operands[0])
+        ram.set_address(0x0602, operands[1] & 0x07)
+
+        target = chip.Chip6502(ram)
+        target.accumulator = accumulator
+        target.x_register = x_register
+        target.y_register = y_register
+        target.status = status
+        target.stack_pointer = stack_pointer
+        target.program_counter = 0x0600
+        target.step()
+
+        return target.snapshot(), bytes(ram.ram[:0x800])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,334 @@
+import unittest
+
+import NesMemory as memory
+
+try:
+    import numpy
+    import Ppu as ppu
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, "NumPy isn't installed")
+class TestPpu(unittest.TestCase):
+
+    def setUp(self):
+        self.__nmis = []
+        self.__target = ppu.Ppu(nmi_func=lambda: self.__nmis.append(self.__target.scanline))
+        self.__memory = memory.NesMemory(0x10000)
+        self.__target.map_into(self.__memory)
+
+    def __set_vram_address(self, address):
+        self.__memory.get_address(0x2002)
+        self.__memory.set_address(0x2006, address >> 8)
+        self.__memory.set_address(0x2006, address & 0xFF)
+
+    def __write_vram(self, address, values):
+        self.__set_vram_address(address)
+
+        for value in values:
+            self.__memory.set_address(0x2007, value)
+
+    def __set_tile(self, tile, low_plane, high_plane, pattern_table=0x0000):
+        # Every row of the tile gets the same planes
+        self.__write_vram(pattern_table + tile * 16, [low_plane] * 8 + [high_plane] * 8)
+
+    def __render_frame(self):
+        # v is only loaded from the scroll registers on the pre-render line, so the first frame may start elsewhere
+        self.__target.run_frame()
+        return self.__target.run_frame()
+
+    def __set_scroll(self, x, y):
+        # Writing PPUCTRL selects the first nametable, which PPUADDR writes leave changed
+        self.__memory.set_address(0x2000, self.__target.ctrl & 0xFC)
+        self.__memory.get_address(0x2002)
+        self.__memory.set_address(0x2005, x)
+        self.__memory.set_address(0x2005, y)
+
+    def test_ppudata_writes_and_buffered_reads(self):
+        self.__write_vram(0x2100, [0x11, 0x22])
+        self.__set_vram_address(0x2100)
+
+        # The first read gives the old buffer contents
+        self.__memory.get_address(0x2007)
+        self.assertEqual(0x11, self.__memory.get_address(0x2007))
+        self.assertEqual(0x22, self.__memory.get_address(0x2007))
+
+    def test_ppudata_increments_by_32(self):
+        self.__memory.set_address(0x2000, ppu.CTRL_INCREMENT_32)
+        self.__write_vram(0x2000, [0x01, 0x02])
+
+        self.assertEqual(0x01, self.__target.read_vram(0x2000))
+        self.assertEqual(0x02, self.__target.read_vram(0x2020))
+
+    def test_registers_are_mirrored(self):
+        self.__memory.set_address(0x3FF8, 0x80)
+        self.assertEqual(0x80, self.__target.ctrl)
+
+    def test_palette_reads_are_not_buffered_and_mirror_backdrop(self):
+        self.__write_vram(0x3F10, [0x2C])
+        self.__set_vram_address(0x3F00)
+
+        self.assertEqual(0x2C, self.__memory.get_address(0x2007))
+
+    def test_horizontal_and_vertical_mirroring(self):
+        self.__target.write_vram(0x2000, 0x42)
+        self.assertEqual(0x42, self.__target.read_vram(0x2400))
+        self.assertEqual(0x00, self.__target.read_vram(0x2800))
+
+        self.__target.set_mirroring(ppu.VERTICAL_MIRRORING)
+        self.assertEqual(0x42, self.__target.read_vram(0x2800))
+        self.assertEqual(0x00, self.__target.read_vram(0x2400))
+        self.assertEqual(0x42, self.__target.read_vram(0x3000))
+
+    def test_chr_rom_ignores_writes(self):
+        target = ppu.Ppu(bytes([0x55]) * 0x2000)
+        target.write_vram(0x0000, 0x00)
+
+        self.assertEqual(0x55, target.read_vram(0x0000))
+
+    def test_chr_ram_writes_replace_cached_tiles(self):
+        self.__target.palette[0x01:0x04] = [0x16, 0x2A, 0x12]
+        self.__memory.set_address(0x2001, ppu.MASK_BACKGROUND | ppu.MASK_LEFT_BACKGROUND)
+        self.__set_tile(0x00, 0xFF, 0x00)
+        self.assertEqual(0x16, self.__render_frame()[0, 0])
+
+        self.__set_tile(0x00, 0x00, 0xFF)
+
+        self.assertEqual(0x2A, self.__render_frame()[0, 0])
+        self.assertEqual(1, self.__target.tile_cache.invalidations)
+
+    def test_chr_rom_tiles_are_decoded_once(self):
+        target = ppu.Ppu(chr_memory=bytes(0x2000))
+        target.mask = ppu.MASK_BACKGROUND
+        target.run_frame()
+        target.run_frame()
+
+        self.assertEqual(1, target.tile_cache.misses)
+        self.assertGreater(target.tile_cache.hit_rate, 0.99)
+
+    def test_status_read_clears_vblank_and_write_toggle(self):
+        self.__target.run_scanlines(ppu.VBLANK_SCANLINE + 1)
+        self.__memory.set_address(0x2005, 0x00)
+
+        self.assertEqual(ppu.STATUS_VBLANK, self.__memory.get_address(0x2002) & 0xE0)
+        self.assertEqual(0x00, self.__memory.get_address(0x2002) & 0xE0)
+        self.assertFalse(self.__target.write_toggle)
+
+    def test_vblank_raises_nmi_when_enabled(self):
+        self.__target.run_frame()
+        self.assertEqual([], self.__nmis)
+
+        self.__memory.set_address(0x2000, ppu.CTRL_NMI)
+        self.__target.run_frame()
+        self.assertEqual([ppu.VBLANK_SCANLINE], self.__nmis)
+        self.assertEqual(2, self.__target.frame_count)
+
+    def test_enabling_nmi_during_vblank_raises_one(self):
+        self.__target.run_scanlines(ppu.VBLANK_SCANLINE + 1)
+        self.__memory.set_address(0x2000, ppu.CTRL_NMI)
+
+        self.assertEqual(1, len(self.__nmis))
+
+    def test_pre_render_line_clears_flags(self):
+        self.__target.status = 0xE0
+        self.__target.scanline = ppu.PRE_RENDER_SCANLINE
+        self.__target.run_scanlines(1)
+
+        self.assertEqual(0x00, self.__target.status)
+        self.assertEqual(0, self.__target.scanline)
+
+    def test_background_tiles_use_palette_and_attributes(self):
+        self.__set_tile(1, 0xFF, 0x00)                  # Every pixel is colour 1
+        self.__write_vram(0x2000, [0x01])               # Top left tile
+        self.__write_vram(0x23C0, [0x02])               # Top left 16x16 area uses background palette 2
+        self.__write_vram(0x3F00, [0x0F, 0, 0, 0, 0, 0, 0, 0, 0, 0x16])
+        self.__set_scroll(0, 0)
+        self.__memory.set_address(0x2001, ppu.MASK_BACKGROUND | ppu.MASK_LEFT_BACKGROUND)
+
+        frame = self.__render_frame()
+
+        self.assertTrue((frame[:8, :8] == 0x16).all())
+        self.assertTrue((frame[:8, 8:] == 0x0F).all())
+        self.assertTrue((frame[8:] == 0x0F).all())
+
+    def test_background_tile_rows_decode_both_planes(self):
+        self.__set_tile(1, 0b10100000, 0b11000000)
+        self.__write_vram(0x2000, [0x01])
+        self.__write_vram(0x3F00, [0x20, 0x21, 0x22, 0x23])
+        self.__set_scroll(0, 0)
+        self.__memory.set_address(0x2001, ppu.MASK_BACKGROUND | ppu.MASK_LEFT_BACKGROUND)
+
+        frame = self.__render_frame()
+
+        self.assertEqual([0x23, 0x22, 0x21, 0x20], list(frame[0, :4]))
+
+    def test_left_column_clipping(self):
+        self.__set_tile(1, 0xFF, 0x00)
+        self.__write_vram(0x2000, [0x01, 0x01])
+        self.__write_vram(0x3F00, [0x0F, 0x16])
+        self.__set_scroll(0, 0)
+        self.__memory.set_address(0x2001, ppu.MASK_BACKGROUND)
+
+        frame = self.__render_frame()
+
+        self.assertTrue((frame[0, :8] == 0x0F).all())
+        self.assertTrue((frame[0, 8:16] == 0x16).all())
+
+    def test_fine_x_scroll_moves_background_left(self):
+        self.__set_tile(1, 0xFF, 0x00)
+        self.__write_vram(0x2001, [0x01])               # The second tile
+        self.__write_vram(0x3F00, [0x0F, 0x16])
+        self.__set_scroll(3, 0)
+        self.__memory.set_address(0x2001, ppu.MASK_BACKGROUND | ppu.MASK_LEFT_BACKGROUND)
+
+        frame = self.__render_frame()
+
+        self.assertEqual(list(range(5, 13)), list(numpy.nonzero(frame[0] == 0x16)[0]))
+
+    def test_vertical_scroll_wraps_into_next_nametable(self):
+        self.__set_tile(1, 0xFF, 0x00)
+        self.__write_vram(0x2800, [0x01])               # Top left of the nametable below
+        self.__write_vram(0x3F00, [0x0F, 0x16])
+        self.__set_scroll(0, 232)                       # Row 29 of the first nametable is at the top of the screen
+        self.__memory.set_address(0x2001, ppu.MASK_BACKGROUND | ppu.MASK_LEFT_BACKGROUND)
+
+        frame = self.__render_frame()
+
+        self.assertTrue((frame[8:16, :8] == 0x16).all())
+
+    def test_scroll_changes_take_effect_on_the_next_scanline(self):
+        self.__set_tile(1, 0xFF, 0x00)
+        self.__write_vram(0x2000, [0x01])
+        self.__write_vram(0x3F00, [0x0F, 0x16])
+        self.__set_scroll(0, 0)
+        self.__memory.set_address(0x2001, ppu.MASK_BACKGROUND | ppu.MASK_LEFT_BACKGROUND)
+        self.__target.run_frame()
+        self.__target.run_scanlines(4)
+
+        self.__set_scroll(8, 0)
+        self.__target.run_scanlines(ppu.SCANLINES_PER_FRAME - 4)
+        frame = self.__target.frame
+
+        self.assertTrue((frame[:4, :8] == 0x16).all())
+        self.assertTrue((frame[4:8, :8] == 0x0F).all())
+
+    def test_sprites_drawn_with_flip_and_palette(self):
+        self.__set_tile(2, 0xF0, 0x00)                  # Left half opaque
+        self.__write_vram(0x3F00, [0x0F])
+        self.__write_vram(0x3F11, [0x30])
+        self.__target.oam[0:8] = [9, 2, 0x40, 20,       # Flipped horizontally at (20, 10)
+                                  49, 2, 0x00, 100]     # At (100, 50)
+        self.__memory.set_address(0x2001, ppu.MASK_SPRITES | ppu.MASK_LEFT_SPRITES)
+
+        frame = self.__render_frame()
+
+        self.assertTrue((frame[10:18, 24:28] == 0x30).all())
+        self.assertTrue((frame[10:18, 20:24] == 0x0F).all())
+        self.assertTrue((frame[50:58, 100:104] == 0x30).all())
+        self.assertTrue((frame[9] == 0x0F).all())
+
+    def test_lower_numbered_sprites_are_in_front(self):
+        self.__set_tile(2, 0xFF, 0x00)
+        self.__write_vram(0x3F11, [0x30])
+        self.__write_vram(0x3F15, [0x16])
+        self.__target.oam[0:8] = [9, 2, 0x01, 20,
+                                  9, 2, 0x00, 24]
+        self.__memory.set_address(0x2001, ppu.MASK_SPRITES | ppu.MASK_LEFT_SPRITES)
+
+        frame = self.__render_frame()
+
+        self.assertTrue((frame[10, 20:28] == 0x16).all())
+        self.assertTrue((frame[10, 28:32] == 0x30).all())
+
+    def test_sprites_behind_background_show_only_through_transparent_pixels(self):
+        self.__set_tile(1, 0xF0, 0x00)                  # Background: left half opaque
+        self.__set_tile(2, 0xFF, 0x00)
+        self.__write_vram(0x2000, [0x01])
+        self.__write_vram(0x3F00, [0x0F, 0x16])
+        self.__write_vram(0x3F11, [0x30])
+        self.__set_scroll(0, 0)
+        self.__target.oam[0:4] = [0xFF, 2, 0x20, 0]
+        self.__target.oam[4:8] = [0, 2, 0x20, 0]        # On lines 1 to 8, behind the background
+        self.__memory.set_address(0x2001, 0x1E)
+
+        frame = self.__render_frame()
+
+        self.assertTrue((frame[1, :4] == 0x16).all())
+        self.assertTrue((frame[1, 4:8] == 0x30).all())
+
+    def test_tall_sprites_use_two_tiles(self):
+        self.__set_tile(4, 0xFF, 0x00, pattern_table=0x1000)
+        self.__set_tile(5, 0x00, 0xFF, pattern_table=0x1000)
+        self.__write_vram(0x3F11, [0x30, 0x31])
+        self.__target.oam[0:4] = [0, 5, 0x00, 40]      # Odd tile numbers come from the second pattern table
+        self.__memory.set_address(0x2000, ppu.CTRL_TALL_SPRITES)
+        self.__memory.set_address(0x2001, ppu.MASK_SPRITES | ppu.MASK_LEFT_SPRITES)
+
+        frame = self.__render_frame()
+
+        self.assertTrue((frame[1:9, 40:48] == 0x30).all())
+        self.assertTrue((frame[9:17, 40:48] == 0x31).all())
+
+    def test_sprite_zero_hit(self):
+        self.__set_tile(1, 0xFF, 0x00)
+        self.__write_vram(0x2000 + 32 * 4 + 4, [0x01])  # The tile at (32, 32)
+        self.__set_scroll(0, 0)
+        self.__target.oam[0:4] = [35, 1, 0x00, 36]
+        self.__memory.set_address(0x2001, 0x1E)
+        self.__target.run_frame()
+
+        self.__target.run_scanlines(30)
+        self.assertFalse(self.__target.status & ppu.STATUS_SPRITE_ZERO_HIT)
+
+        self.__target.run_scanlines(10)
+        self.assertTrue(self.__target.status & ppu.STATUS_SPRITE_ZERO_HIT)
+
+    def test_sprite_overflow(self):
+        self.__target.oam[:4 * 9:4] = 50
+        self.__memory.set_address(0x2001, ppu.MASK_SPRITES)
+        self.__target.run_scanlines(60)
+
+        self.assertTrue(self.__target.status & ppu.STATUS_SPRITE_OVERFLOW)
+
+    def test_oam_dma_starts_at_oamaddr_and_wraps(self):
+        self.__memory.set_address(0x2003, 0xFE)
+        self.__target.oam_dma(bytes(range(0x100)))
+
+        self.assertEqual([0x02, 0x03, 0x04], list(self.__target.oam[[0x00, 0x01, 0x02]]))
+        self.assertEqual(0x00, self.__target.oam[0xFE])
+
+    def test_oam_writes_through_oamdata(self):
+        self.__memory.set_address(0x2003, 0x10)
+        self.__memory.set_address(0x2004, 0x42)
+
+        self.assertEqual(0x42, self.__target.oam[0x10])
+        self.assertEqual(0x11, self.__target.oam_address)
+
+    def test_rendering_scanline_by_scanline_matches_whole_frame(self):
+        randomiser = numpy.random.RandomState(2)
+        targets = []
+
+        for _ in range(2):
+            target = ppu.Ppu()
+            target.pattern_tables[:] = randomiser.randint(0, 0x100, 0x2000)
+            target.nametables[:] = randomiser.randint(0, 0x100, 0x1000)
+            target.oam[:] = randomiser.randint(0, 0x100, 0x100)
+            target.palette[:] = numpy.arange(0x20)
+            target.mask = 0x1E
+            target.write_register(0x2005, 13)
+            target.write_register(0x2005, 100)
+            targets.append(target)
+            randomiser = numpy.random.RandomState(2)
+
+        targets[0].run_frame()
+
+        for _ in range(ppu.SCANLINES_PER_FRAME):
+            targets[1].run_scanlines(1)
+
+        self.assertTrue((targets[0].frame == targets[1].frame).all())
+        self.assertEqual(targets[0].status, targets[1].status)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import io
+import unittest
+
+import Chip6502 as chip
+import NesMemory as memory
+import Profiler as profiler
+
+PROGRAM_START = 0x8000
+
+
+class TestProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.__memory = memory.NesMemory(0x10000)
+        self.__chip = chip.Chip6502(self.__memory)
+        self.__target = profiler.Profiler()
+
+        program = [0xA9, 0x01,        # LDA #$01
+                   0xE8,              # INX
+                   0xE8,              # INX
+                   0xBD, 0xFF, 0x02]  # LDA $02FF,X (crosses a page)
+
+        for offset, value in enumerate(program):
+            self.__memory.set_address(PROGRAM_START + offset, value)
+
+        self.__chip.program_counter = PROGRAM_START
+
+    def tearDown(self):
+        chip.Chip6502.use_profiler(None)
+
+    def test_counts_executions_and_cycles_per_opcode(self):
+        with self.__target:
+            self.__chip.run(4)
+
+        self.assertEqual(2, self.__target.opcode_counts[0xE8])
+        self.assertEqual(4, self.__target.opcode_cycles[0xE8])
+        self.assertEqual(5, self.__target.opcode_cycles[0xBD])
+        self.assertEqual(0, self.__target.opcode_counts[0xEA])
+
+    def test_counts_executions_and_cycles_per_address(self):
+        with self.__target:
+            self.__chip.step()
+            self.__chip.run_cycles(4)
+            self.__chip.program_counter = PROGRAM_START
+            self.__chip.step()
+
+        self.assertEqual({PROGRAM_START: 2, PROGRAM_START + 2: 1, PROGRAM_START + 3: 1}, self.__target.address_counts)
+        self.assertEqual(4, self.__target.address_cycles[PROGRAM_START])
+
+    def test_profiling_does_not_change_execution(self):
+        with self.__target:
+            self.__chip.run(4)
+
+        self.assertEqual((0x00, 0x02, 11, PROGRAM_START + 7),
+                         (self.__chip.accumulator, self.__chip.x_register, self.__chip.cycles,
+                          self.__chip.program_counter))
+
+    def test_stopping_puts_unprofiled_methods_back(self):
+        run = chip.Chip6502.run
+
+        with self.__target:
+            self.assertIsNot(run, chip.Chip6502.run)
+
+        self.assertIs(run, chip.Chip6502.run)
+        self.__chip.run(4)
+        self.assertEqual(0, sum(self.__target.opcode_counts))
+
+    def test_opcode_table_is_sorted(self):
+        with self.__target:
+            self.__chip.run(4)
+
+        table = self.__target.opcode_table(profiler.CYCLES)
+
+        self.assertEqual([0xBD, 0xE8, 0xA9], [row[0] for row in table])
+        self.assertEqual("lda_absolute_x", table[0][1])
+        self.assertEqual([2, 1, 1], [row[2] for row in self.__target.opcode_table(profiler.COUNT)])
+        self.assertIn("$80", self.__target.format_table())
+
+    def test_collapsed_stacks_have_one_line_per_handler(self):
+        with self.__target:
+            self.__chip.run(4)
+
+        collapsed_file = io.StringIO()
+        self.__target.write_collapsed(collapsed_file)
+        lines = collapsed_file.getvalue().splitlines()
+
+        self.assertEqual(["inx_implied", "lda_absolute_x", "lda_immediate"],
+                         sorted(line.split(" ")[0] for line in lines))
+        self.assertTrue(all(line.split(" ")[1].isdigit() for line in lines))
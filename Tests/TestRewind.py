@@ -0,0 +1,78 @@
+import unittest
+
+import Chip6502 as chip
+import NesMemory as memory
+import Rewind as rewind
+
+
+class TestRewind(unittest.TestCase):
+
+    def setUp(self):
+        self.__memory = memory.NesMemory(0xFFFF)
+        self.__chip = chip.Chip6502(self.__memory)
+        self.__target = rewind.RewindBuffer(self.__chip, max_frames=10)
+
+    def __get_state(self):
+        return self.__chip.snapshot(), bytes(self.__memory.ram)
+
+    def __record_frames(self, n_frames):
+        states = []
+
+        for frame in range(n_frames):
+            self.__chip.accumulator = frame
+            self.__chip.cycles += 100
+            self.__memory.set_address(0x0010, frame)
+            self.__memory.set_address(0x0810 + frame, 0xFF)
+            self.__memory.set_address(0x6000 + frame * 0x101, frame)
+            self.__target.record()
+            states.append(self.__get_state())
+
+        return states
+
+    def test_rewind_steps_back_one_frame(self):
+        states = self.__record_frames(5)
+
+        self.assertEqual(1, self.__target.rewind())
+        self.assertEqual(states[3], self.__get_state())
+        self.assertEqual(1, self.__target.rewind())
+        self.assertEqual(states[2], self.__get_state())
+
+    def test_rewind_steps_back_several_frames(self):
+        states = self.__record_frames(5)
+
+        self.assertEqual(4, self.__target.rewind(4))
+        self.assertEqual(states[0], self.__get_state())
+
+    def test_rewind_discards_unrecorded_changes(self):
+        states = self.__record_frames(2)
+        self.__memory.set_address(0x0300, 0x01)
+
+        self.__target.rewind(0)
+        self.assertEqual(states[1], self.__get_state())
+
+    def test_recording_after_rewind_continues_from_restored_frame(self):
+        states = self.__record_frames(5)
+        self.__target.rewind(2)
+        self.__memory.set_address(0x0400, 0x01)
+        self.__target.record()
+
+        self.assertEqual(3, len(self.__target))
+        self.__target.rewind()
+        self.assertEqual(states[2], self.__get_state())
+
+    def test_oldest_frames_are_dropped_past_max_frames(self):
+        states = self.__record_frames(15)
+
+        self.assertEqual(10, len(self.__target))
+        self.assertEqual(10, self.__target.rewind(20))
+        self.assertEqual(states[4], self.__get_state())
+
+    def test_oldest_frames_are_dropped_past_max_bytes(self):
+        self.__target.max_bytes = 100
+        self.__record_frames(10)
+
+        self.assertLessEqual(self.__target.size_bytes, 100)
+        self.assertLess(len(self.__target), 9)
+
+    def test_rewinding_empty_buffer_does_nothing(self):
+        self.assertEqual(0, self.__target.rewind())
@@ -0,0 +1,78 @@
+import unittest
+
+import Chip6502 as chip
+import NesMemory as memory
+import SaveState as save_state
+
+
+class TestSaveState(unittest.TestCase):
+
+    def setUp(self):
+        self.__memory = memory.NesMemory(0xFFFF)
+        self.__chip = chip.Chip6502(self.__memory)
+
+        self.__chip.accumulator = 0x12
+        self.__chip.x_register = 0x34
+        self.__chip.y_register = 0x56
+        self.__chip.status = 0xC3
+        self.__chip.program_counter = 0x8000
+        self.__chip.cycles = 0x123456789
+        self.__memory.set_address(0x0010, 0x0E)
+        self.__memory.set_address(0xFFFE, 0x0F)
+
+    def __get_state(self):
+        return (self.__chip.accumulator,
+                self.__chip.x_register,
+                self.__chip.y_register,
+                self.__chip.status,
+                self.__chip.program_counter,
+                self.__chip.cycles,
+                bytes(self.__memory.ram))
+
+    def __change_state(self):
+        self.__chip.accumulator = 0x00
+        self.__chip.status = 0x00
+        self.__chip.program_counter = 0x9000
+        self.__chip.cycles = 0
+        self.__memory.set_address(0x0010, 0x00)
+        self.__memory.set_address(0x2345, 0x01)
+
+    def test_restore_puts_chip_and_memory_back(self):
+        expected_state = self.__get_state()
+        state = save_state.SaveState.take(self.__chip)
+
+        self.__change_state()
+        state.restore_into(self.__chip)
+
+        self.assertEqual(expected_state, self.__get_state())
+
+    def test_unchanged_pages_are_shared_between_snapshots(self):
+        first = save_state.SaveState.take(self.__chip)
+        self.__memory.set_address(0x0210, 0x01)
+        second = save_state.SaveState.take(self.__chip)
+
+        self.assertIsNot(first.memory_pages[0x02], second.memory_pages[0x02])
+
+        for page in [0x00, 0x01, 0x80, 0xFF]:
+            self.assertIs(first.memory_pages[page], second.memory_pages[page])
+
+    def test_pages_are_shared_after_restoring(self):
+        first = save_state.SaveState.take(self.__chip)
+        self.__change_state()
+        first.restore_into(self.__chip)
+        second = save_state.SaveState.take(self.__chip)
+
+        self.assertIs(first.memory_pages[0x00], second.memory_pages[0x00])
+
+    def test_serialised_state_round_trips(self):
+        state = save_state.SaveState.take(self.__chip)
+        blob = state.to_bytes()
+
+        self.assertIsInstance(blob, bytes)
+        self.assertEqual(state, save_state.SaveState.from_bytes(blob))
+
+    def test_equal_machines_have_equal_states(self):
+        self.assertEqual(save_state.SaveState.take(self.__chip), save_state.SaveState.take(self.__chip))
+        first = save_state.SaveState.take(self.__chip)
+        self.__chip.x_register = 0x00
+        self.assertNotEqual(first, save_state.SaveState.take(self.__chip))
@@ -0,0 +1,195 @@
+import unittest
+
+import Chip6502 as chip
+import NesMemory as memory
+
+try:
+    import numpy
+    import Ppu as ppu
+    import Scheduler as scheduler
+except ImportError:
+    numpy = None
+
+PROGRAM_START = 0x8000
+NMI_HANDLER = 0x9000
+
+# Turn on NMIs and rendering, then count in a loop
+PROGRAM = [
+    0xA9, 0x80,        # LDA #$80
+    0x8D, 0x00, 0x20,  # STA $2000
+    0xA9, 0x1E,        # LDA #$1E
+    0x8D, 0x01, 0x20,  # STA $2001
+    0xE8,              # loop: INX
+    0xC8,              # INY
+    0x65, 0x00,        # ADC $00
+    0x4C, 0x0A, 0x80,  # JMP loop
+]
+
+# Count the NMI and use the count as the horizontal scroll
+NMI_PROGRAM = [
+    0xE6, 0x10,        # INC $10
+    0xAD, 0x02, 0x20,  # LDA $2002
+    0xA5, 0x10,        # LDA $10
+    0x8D, 0x05, 0x20,  # STA $2005
+    0x8D, 0x05, 0x20,  # STA $2005
+    0x40,              # RTI
+]
+
+# Wait for $20 to be set, then turn on NMIs
+WAIT_PROGRAM = [
+    0xA5, 0x20,        # loop: LDA $20
+    0xF0, 0xFC,        # BEQ loop
+    0xA9, 0x80,        # LDA #$80
+    0x8D, 0x00, 0x20,  # STA $2000
+    0x4C, 0x09, 0x80,  # done: JMP done
+]
+
+
+class FakeDevice(object):
+    """
+    A device that asks for an IRQ from a set cycle on.
+    """
+
+    def __init__(self, irq_cycle):
+        self.irq_cycle = irq_cycle
+        self.irq = False
+        self.catch_ups = []
+
+    def catch_up(self, cycles):
+        self.catch_ups.append(cycles)
+        self.irq = cycles >= self.irq_cycle
+
+    def next_event_cycle(self):
+        return None if self.irq else self.irq_cycle
+
+
+@unittest.skipIf(numpy is None, "NumPy isn't installed")
+class TestScheduler(unittest.TestCase):
+
+    def __make_machine(self, program=PROGRAM):
+        ram = memory.NesMemory(0x10000)
+
+        for offset, value in enumerate(program):
+            ram.set_address(PROGRAM_START + offset, value)
+
+        for offset, value in enumerate(NMI_PROGRAM):
+            ram.set_address(NMI_HANDLER + offset, value)
+
+        ram.set_address(chip.NMI_VECTOR, NMI_HANDLER & 0xFF)
+        ram.set_address(chip.NMI_VECTOR + 1, NMI_HANDLER >> 8)
+
+        target = chip.Chip6502(ram)
+        target.program_counter = PROGRAM_START
+        target_ppu = ppu.Ppu()
+        target_ppu.nametables[:] = numpy.arange(0x1000) & 0xFF
+        target_ppu.pattern_tables[:] = numpy.arange(0x2000) * 7 & 0xFF
+        target_ppu.palette[:] = numpy.arange(0x20)
+        return target, target_ppu
+
+    @staticmethod
+    def __run_lockstep(target, target_ppu, n_cycles):
+        """
+        Run the PPU after every instruction, taking NMIs between instructions.
+        """
+        nmis = []
+        target_ppu.nmi_func = lambda: nmis.append(True)
+        target_ppu.map_into(target.memory)
+        line_end_dot = target.cycles * 3 + ppu.DOTS_PER_SCANLINE
+        end_cycles = target.cycles + n_cycles
+
+        while target.cycles < end_cycles:
+            if nmis:
+                nmis.pop()
+                target.nmi()
+
+            target.step()
+
+            while target.cycles * 3 >= line_end_dot:
+                target_ppu.run_scanlines(1)
+                line_end_dot += ppu.DOTS_PER_SCANLINE
+
+    def test_matches_running_the_ppu_after_every_instruction(self):
+        n_cycles = 3 * 29781 + 500
+        expected, expected_ppu = self.__make_machine()
+        self.__run_lockstep(expected, expected_ppu, n_cycles)
+
+        target, target_ppu = self.__make_machine()
+        scheduler.Scheduler(target, target_ppu).run_cycles(n_cycles)
+
+        self.assertEqual(expected.snapshot(), target.snapshot())
+        self.assertEqual(3, target.memory.get_address(0x10))
+        self.assertEqual(expected_ppu.frame_count, target_ppu.frame_count)
+        self.assertEqual(expected_ppu.scanline, target_ppu.scanline)
+        self.assertTrue((expected_ppu.frame == target_ppu.frame).all())
+
+    def test_syncs_are_a_few_per_frame(self):
+        target, target_ppu = self.__make_machine()
+        target_scheduler = scheduler.Scheduler(target, target_ppu)
+
+        for _ in range(5):
+            target_scheduler.run_frame()
+
+        self.assertEqual(5, target_scheduler.frames)
+        self.assertEqual(0, target_ppu.scanline)
+        # The start of run_frame, the vblank NMI, the handler's three register accesses and the end of the frame
+        self.assertEqual(6, target_scheduler.frame_syncs)
+        self.assertLess(target_scheduler.syncs_per_frame, 10)
+
+    def test_register_reads_see_the_ppu_caught_up(self):
+        target, target_ppu = self.__make_machine(WAIT_PROGRAM)
+        target_scheduler = scheduler.Scheduler(target, target_ppu)
+        target_scheduler.run_cycles(242 * 114)
+
+        self.assertEqual(ppu.STATUS_VBLANK, target.memory.get_address(0x2002) & ppu.STATUS_VBLANK)
+        self.assertEqual(242, target_ppu.scanline)
+
+    def test_nmi_turned_on_during_vblank_is_taken_within_a_scanline(self):
+        target, target_ppu = self.__make_machine(WAIT_PROGRAM)
+        target_scheduler = scheduler.Scheduler(target, target_ppu)
+        target_scheduler.run_cycles(245 * 114)
+        target.memory.set_address(0x20, 0x01)
+        target_scheduler.run_cycles(200)
+
+        self.assertEqual(1, target.memory.get_address(0x10))
+
+    def test_device_event_stops_the_cpu_and_raises_irq(self):
+        target, target_ppu = self.__make_machine()
+        target.memory.set_address(chip.IRQ_VECTOR, NMI_HANDLER & 0xFF)
+        target.memory.set_address(chip.IRQ_VECTOR + 1, NMI_HANDLER >> 8)
+        target.interrupt_disable_flag = 0
+        device = FakeDevice(1000)
+        target_scheduler = scheduler.Scheduler(target, target_ppu, [device])
+        target_scheduler.run_cycles(1100)
+
+        # The CPU stopped within an instruction of the event, then took the IRQ
+        caught_up = [cycles for cycles in device.catch_ups if cycles >= 1000][0]
+        self.assertLess(caught_up, 1007)
+        self.assertEqual(1, target.memory.get_address(0x10))
+
+    def test_oam_dma_copies_a_page_and_halts_the_cpu(self):
+        # STA $4014 with A = 2, on an even and then an odd cycle
+        program = [0x8D, 0x14, 0x40,  # STA $4014
+                   0xEA,              # NOP
+                   0x8D, 0x14, 0x40]  # STA $4014
+        target, target_ppu = self.__make_machine(program)
+        target.memory.write_block(0x0200, bytes(range(0x100)))
+        target.accumulator = 0x02
+        target_scheduler = scheduler.Scheduler(target, target_ppu)
+
+        target_scheduler.run_cycles(1)
+        self.assertEqual(4 + 513, target.cycles)
+        self.assertEqual(list(range(0x100)), list(target_ppu.oam))
+
+        target_scheduler.run_cycles(1)
+        target_scheduler.run_cycles(1)
+        self.assertEqual(4 + 513 + 2 + 4 + 514, target.cycles)
+
+    def test_mapped_region_catches_devices_up(self):
+        target, target_ppu = self.__make_machine()
+        device = FakeDevice(100000)
+        target_scheduler = scheduler.Scheduler(target, target_ppu, [device])
+        target_scheduler.map_region(0x4000, 0x4017, read_func=lambda address: 0x0E)
+        target.cycles = 500
+
+        self.assertEqual(0x0E, target.memory.get_address(0x4015))
+        self.assertEqual([500], device.catch_ups)
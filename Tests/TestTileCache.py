@@ -0,0 +1,67 @@
+import unittest
+
+try:
+    import numpy
+    import TileCache as tile_cache
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, "NumPy isn't installed")
+class TestTileCache(unittest.TestCase):
+
+    def setUp(self):
+        self.__pattern_tables = numpy.zeros(0x2000, dtype=numpy.uint8)
+        self.__target = tile_cache.TileCache(self.__pattern_tables)
+
+    def __lookup(self, *tile_numbers):
+        return self.__target.lookup(numpy.array(tile_numbers))
+
+    def test_tile_is_decoded_from_both_planes(self):
+        # Tile 0x101's first row: low plane 0b11000011, high plane 0b10100101
+        self.__pattern_tables[0x1010] = 0xC3
+        self.__pattern_tables[0x1018] = 0xA5
+
+        tiles = self.__lookup(0x101)
+
+        self.assertEqual([3, 1, 2, 0, 0, 2, 1, 3], list(tiles[0x101, 0]))
+        self.assertEqual([0] * 8, list(tiles[0x101, 1]))
+
+    def test_repeated_lookups_are_hits(self):
+        self.__lookup(0x01, 0x01, 0x02)
+        self.__lookup(0x01, 0x02)
+
+        self.assertEqual(2, self.__target.misses)
+        self.assertEqual(3, self.__target.hits)
+        self.assertAlmostEqual(0.6, self.__target.hit_rate)
+
+    def test_hit_rate_is_zero_before_any_lookups(self):
+        self.assertEqual(0.0, self.__target.hit_rate)
+
+    def test_invalidated_tile_is_decoded_again(self):
+        self.__lookup(0x03, 0x04)
+        self.__pattern_tables[0x003F] = 0x80
+        self.__target.invalidate(0x003F)
+
+        tiles = self.__lookup(0x03, 0x04)
+
+        self.assertEqual(2, tiles[0x03, 7, 0])
+        self.assertEqual(3, self.__target.misses)
+        self.assertEqual(1, self.__target.invalidations)
+
+    def test_stale_tile_is_kept_until_invalidated(self):
+        self.__lookup(0x05)
+        self.__pattern_tables[0x0050] = 0xFF
+
+        self.assertEqual(0, self.__lookup(0x05)[0x05, 0, 0])
+
+    def test_invalidating_a_tile_never_decoded_is_not_counted(self):
+        self.__target.invalidate(0x1FFF)
+        self.assertEqual(0, self.__target.invalidations)
+
+    def test_clear_forgets_every_tile(self):
+        self.__lookup(0x06, 0x07)
+        self.__target.clear()
+        self.__lookup(0x06, 0x07)
+
+        self.assertEqual(4, self.__target.misses)
@@ -0,0 +1,145 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+import Chip6502 as chip
+import NesMemory as memory
+import Trace as trace
+
+PROGRAM_START = 0x8000
+
+NESTEST_LOG = """C000  4C F5 C5  JMP $C5F5                       A:00 X:00 Y:00 P:24 SP:FD PPU:  0, 21 CYC:7
+C5F5  A2 00     LDX #$00                        A:00 X:00 Y:00 P:24 SP:FD PPU:  0, 30 CYC:10
+"""
+
+
+class TestTrace(unittest.TestCase):
+
+    def setUp(self):
+        self.__memory = memory.NesMemory(0x10000)
+        self.__chip = chip.Chip6502(self.__memory)
+        self.__directory = tempfile.mkdtemp()
+
+        program = [0xA9, 0x80,  # LDA #$80
+                   0xE8,        # INX
+                   0x38,        # SEC
+                   0xC8]        # INY
+
+        for offset, value in enumerate(program):
+            self.__memory.set_address(PROGRAM_START + offset, value)
+
+        self.__chip.program_counter = PROGRAM_START
+        self.__start_state = self.__chip.snapshot()
+
+    def tearDown(self):
+        shutil.rmtree(self.__directory)
+
+    def __record_trace(self, name, n_instructions):
+        path = os.path.join(self.__directory, name)
+        self.__chip.restore(self.__start_state)
+
+        with open(path, "wb") as trace_file, trace.TraceRecorder(self.__chip, trace_file, capacity=3) as recorder:
+            recorder.run(n_instructions)
+
+        return path
+
+    def test_records_state_before_each_instruction(self):
+        recorder = trace.TraceRecorder(self.__chip)
+        recorder.run(3)
+
+        self.assertEqual([trace.TraceRecord(0x8000, 0xA9, 0x00, 0x00, 0x00, 0x00, 0x00, 0),
+                          trace.TraceRecord(0x8002, 0xE8, 0x80, 0x00, 0x00, 0x80, 0x00, 2),
+                          trace.TraceRecord(0x8003, 0x38, 0x80, 0x01, 0x00, 0x00, 0x00, 4)],
+                         recorder.records())
+
+    def test_recording_does_not_set_off_read_watches(self):
+        reads = []
+        self.__memory.watch_reads(PROGRAM_START, PROGRAM_START + 0xFF, lambda address, value: reads.append(address))
+        trace.TraceRecorder(self.__chip).run(3)
+
+        # Only the chip's own fetches of the opcodes and LDA's operand
+        self.assertEqual([0x8000, 0x8001, 0x8002, 0x8003], reads)
+
+    def test_ring_keeps_most_recent_records(self):
+        recorder = trace.TraceRecorder(self.__chip, capacity=2)
+        recorder.run(3)
+
+        self.assertEqual(3, recorder.records_recorded)
+        self.assertEqual([0x8002, 0x8003], [record.program_counter for record in recorder.records()])
+
+    def test_records_are_flushed_to_file(self):
+        path = self.__record_trace("program.trace", 4)
+
+        with open(path, "rb") as trace_file:
+            records = list(trace.read_records(trace_file))
+
+        self.assertEqual([0x8000, 0x8002, 0x8003, 0x8004], [record.program_counter for record in records])
+        self.assertEqual(4 * trace.RECORD_FORMAT.size, os.path.getsize(path))
+
+    def test_reads_records_split_across_short_reads(self):
+        path = self.__record_trace("program.trace", 4)
+
+        with open(path, "rb") as trace_file:
+            data = trace_file.read()
+
+        class ShortReads(io.BytesIO):
+            # Returns at most 7 bytes a read, as a pipe can
+            def read(self, size=-1):
+                return super().read(7)
+
+        records = list(trace.read_records(ShortReads(data + data[:5])))
+        self.assertEqual([0x8000, 0x8002, 0x8003, 0x8004], [record.program_counter for record in records])
+
+    def test_run_cycles_records_every_instruction(self):
+        recorder = trace.TraceRecorder(self.__chip)
+        self.assertEqual(6, recorder.run_cycles(5))
+        self.assertEqual(3, len(recorder.records()))
+
+    def test_formats_records_as_nestest_log(self):
+        record = trace.TraceRecord(0xC000, 0x4C, 0x00, 0x01, 0x02, 0x24, 0xFD, 7)
+
+        self.assertEqual("C000  4C" + " " * 40 + "A:00 X:01 Y:02 P:24 SP:FD CYC:7", trace.format_nestest(record))
+
+    def test_reads_nestest_log(self):
+        records = list(trace.read_nestest_log(io.StringIO(NESTEST_LOG)))
+
+        self.assertEqual([trace.TraceRecord(0xC000, 0x4C, 0x00, 0x00, 0x00, 0x24, 0xFD, 7),
+                          trace.TraceRecord(0xC5F5, 0xA2, 0x00, 0x00, 0x00, 0x24, 0xFD, 10)], records)
+
+    def test_decoded_records_read_back_as_nestest_log(self):
+        recorder = trace.TraceRecorder(self.__chip)
+        recorder.run(4)
+        log = "\n".join(trace.format_nestest(record) for record in recorder.records())
+
+        self.assertEqual(recorder.records(), list(trace.read_nestest_log(io.StringIO(log))))
+
+    def test_identical_traces_have_no_divergence(self):
+        path = self.__record_trace("first.trace", 4)
+        reference_path = self.__record_trace("second.trace", 4)
+
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            self.assertEqual(0, trace.main(["diff", path, reference_path]))
+
+        self.assertEqual("The traces match\n", output.getvalue())
+
+    def test_finds_first_divergent_record(self):
+        records = [trace.TraceRecord(0x8000, 0xA9, 0, 0, 0, 0, 0, 0), trace.TraceRecord(0x8002, 0xE8, 1, 0, 0, 0, 0, 2)]
+        reference = [records[0], records[1]._replace(accumulator=2)]
+
+        self.assertEqual((1, records[1], reference[1]), trace.first_divergence(records, reference))
+        self.assertIsNone(trace.first_divergence(records, reference, ignore=["accumulator"]))
+
+    def test_shorter_trace_diverges_where_it_ends(self):
+        path = self.__record_trace("short.trace", 2)
+        reference_path = self.__record_trace("long.trace", 4)
+
+        with open(path, "rb") as trace_file, open(reference_path, "rb") as reference_file:
+            index, record, reference = trace.first_divergence(trace.read_records(trace_file),
+                                                              trace.read_records(reference_file))
+
+        self.assertEqual(2, index)
+        self.assertIsNone(record)
+        self.assertEqual(0x8003, reference.program_counter)
@@ -0,0 +1,80 @@
+import unittest
+
+import Chip6502 as chip
+import NesMemory as memory
+import Watchpoints as watchpoints
+
+PROGRAM_START = 0x8000
+
+
+class StopException(Exception):
+    pass
+
+
+class TestWatchpoints(unittest.TestCase):
+
+    def setUp(self):
+        self.__memory = memory.NesMemory(0x10000)
+        self.__chip = chip.Chip6502(self.__memory)
+        self.__target = watchpoints.Watchpoints(self.__chip)
+        self.__hits = []
+
+        program = [0xA5, 0x10,        # LDA $10
+                   0x8D, 0x00, 0x03,  # STA $0300
+                   0xE8,              # INX
+                   0xE8]              # INX
+
+        for offset, value in enumerate(program):
+            self.__memory.set_address(PROGRAM_START + offset, value)
+
+        self.__memory.set_address(0x10, 0x0E)
+        self.__chip.program_counter = PROGRAM_START
+
+    def __record(self, *hit):
+        self.__hits.append(hit)
+
+    def test_read_watchpoint_gets_program_counter_and_value(self):
+        self.__target.watch_reads(0x10, 0x10, self.__record)
+        self.__chip.run(4)
+
+        self.assertEqual([(PROGRAM_START + 2, 0x10, 0x0E)], self.__hits)
+
+    def test_write_watchpoint_gets_program_counter_and_value(self):
+        self.__target.watch_writes(0x0300, 0x0300, self.__record)
+        self.__chip.run(4)
+
+        self.assertEqual([(PROGRAM_START + 5, 0x0300, 0x0E)], self.__hits)
+        self.assertEqual(0x0E, self.__memory.get_address(0x0300))
+
+    def test_execution_watchpoint_fires_before_instruction(self):
+        self.__target.watch_execution(PROGRAM_START + 5, PROGRAM_START + 6, self.__record)
+        self.__chip.run(4)
+
+        self.assertEqual([(PROGRAM_START + 5, 0xE8), (PROGRAM_START + 6, 0xE8)], self.__hits)
+
+    def test_execution_watchpoint_ignores_operand_fetches(self):
+        self.__target.watch_execution(PROGRAM_START + 1, PROGRAM_START + 4, self.__record)
+        self.__chip.run(4)
+
+        self.assertEqual([(PROGRAM_START + 2, 0x8D)], self.__hits)
+
+    def test_breakpoint_stops_before_instruction(self):
+        def stop(program_counter, opcode):
+            raise StopException
+
+        self.__target.watch_execution(PROGRAM_START + 5, PROGRAM_START + 5, stop)
+
+        with self.assertRaises(StopException):
+            self.__chip.run(4)
+
+        self.assertEqual(PROGRAM_START + 5, self.__chip.program_counter)
+        self.assertEqual(0x00, self.__chip.x_register)
+
+    def test_cleared_watchpoints_do_not_fire(self):
+        self.__target.watch_reads(0x10, 0x10, self.__record)
+        self.__target.watch_execution(PROGRAM_START, PROGRAM_START, self.__record)
+        self.__target.clear()
+        self.__chip.run(4)
+
+        self.assertEqual([], self.__hits)
+        self.assertEqual(self.__memory.get_address, self.__memory.fetch_opcode)
@@ -0,0 +1,123 @@
+"""
+Decoded pattern table tiles, kept until the CHR memory behind them changes.
+"""
+import numpy
+
+TILE_COUNT = 0x200
+TILE_SIZE = 16
+
+
+def _build_tile_row_pixels():
+    """
+    Build the table that decodes one row of a 2bpp tile.
+
+    Returns:
+        A 0x10000 x 8 array. Row (low plane byte << 8) | high plane byte holds the row's eight two-bit pixels, left
+        to right.
+    """
+    planes = numpy.arange(0x10000)
+    bits = numpy.arange(7, -1, -1)
+    low = (planes[:, None] >> 8 >> bits) & 0x01
+    high = (planes[:, None] >> bits) & 0x01
+    return (low | high << 1).astype(numpy.uint8)
+
+
+TILE_ROW_PIXELS = _build_tile_row_pixels()
+
+_TILE_ROWS = numpy.arange(8)
+
+
+class TileCache(object):
+    """
+    The 512 tiles of the two pattern tables, each decoded into an 8x8 array of two-bit pixels ready to copy into a
+    frame.
+
+    Tiles are decoded the first time they're looked up and kept until invalidate is told their bytes changed, so with
+    CHR ROM each tile is decoded once. Tiles are numbered by pattern table address / 16: 0x000 to 0x0FF are the first
+    pattern table and 0x100 to 0x1FF the second.
+    """
+
+    def __init__(self, pattern_tables):
+        """
+        Args:
+            pattern_tables: The 8KB of CHR memory, as a NumPy uint8 array. The cache reads it as tiles are decoded, so
+                            later writes are seen once the tiles they touch are invalidated.
+        """
+        self.__pattern_tables = pattern_tables
+        self.tiles = numpy.zeros((TILE_COUNT, 8, 8), dtype=numpy.uint8)
+        # The same tiles one row after another, so row (tile number * 8) + y is a tile's row y
+        self.rows = self.tiles.reshape(TILE_COUNT * 8, 8)
+        self.__decoded = numpy.zeros(TILE_COUNT, dtype=bool)
+        # Set once every tile is decoded, to skip checking which tiles a lookup needs
+        self.__all_decoded = False
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def lookup(self, tile_numbers):
+        """
+        Make sure tiles are decoded before they're read out of self.tiles or self.rows.
+
+        Every tile number counts as a lookup. Each tile that had to be decoded is a miss, however many times it
+        appears; the rest are hits.
+
+        Args:
+            tile_numbers: An array of tile numbers, of any shape
+
+        Returns:
+            self.tiles, the (512, 8, 8) array of decoded tiles
+        """
+        if self.__all_decoded:
+            self.hits += tile_numbers.size
+            return self.tiles
+
+        decoded = self.__decoded[tile_numbers]
+
+        if decoded.all():
+            self.hits += decoded.size
+            return self.tiles
+
+        missing = numpy.unique(tile_numbers[~decoded])
+        self.__decode(missing)
+        self.misses += len(missing)
+        self.hits += decoded.size - len(missing)
+        self.__all_decoded = bool(self.__decoded.all())
+        return self.tiles
+
+    def __decode(self, tile_numbers):
+        plane_addresses = (tile_numbers[:, None] * TILE_SIZE) + _TILE_ROWS
+        planes = (self.__pattern_tables[plane_addresses].astype(numpy.intp) << 8
+                  | self.__pattern_tables[plane_addresses + 8])
+        self.tiles[tile_numbers] = TILE_ROW_PIXELS[planes]
+        self.__decoded[tile_numbers] = True
+
+    def invalidate(self, address):
+        """
+        Forget the decoded tile holding a pattern table byte. Call this after writing CHR RAM.
+
+        Args:
+            address: The address written, from 0x0000 to 0x1FFF
+        """
+        tile_number = address // TILE_SIZE
+
+        if self.__decoded[tile_number]:
+            self.__decoded[tile_number] = False
+            self.__all_decoded = False
+            self.invalidations += 1
+
+    def clear(self):
+        """
+        Forget every decoded tile. Call this after changing the pattern tables without invalidate, such as switching
+        CHR banks.
+        """
+        self.__decoded[:] = False
+        self.__all_decoded = False
+
+    @property
+    def hit_rate(self):
+        """
+        The fraction of tile lookups that found the tile already decoded
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
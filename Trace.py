@@ -0,0 +1,294 @@
+"""
+Record Chip6502 execution traces as fixed-width binary records, convert them to nestest log format and find where two
+traces diverge.
+
+Run with:
+    python Trace.py decode game.trace
+    python Trace.py diff game.trace nestest.log --ignore cycles
+
+Traces whose names end in .log or .txt are read as nestest-style text logs. Anything else is read as a binary trace.
+"""
+import argparse
+import collections
+import itertools
+import re
+import struct
+import sys
+
+# One record per instruction, taken before it executes: PC, opcode, A, X, Y, P, SP, cycles
+RECORD_FORMAT = struct.Struct("<HBBBBBBQ")
+
+TraceRecord = collections.namedtuple("TraceRecord", ["program_counter", "opcode", "accumulator", "x_register",
+                                                     "y_register", "status", "stack_pointer", "cycles"])
+
+# The number of records read from a binary trace at a time
+READ_CHUNK_RECORDS = 4096
+
+# The column of a nestest log line the registers start at
+NESTEST_REGISTERS_COLUMN = 48
+
+_NESTEST_LINE = re.compile(r"^([0-9A-Fa-f]{4})\s+([0-9A-Fa-f]{2})"
+                           r".*A:([0-9A-Fa-f]{2}) X:([0-9A-Fa-f]{2}) Y:([0-9A-Fa-f]{2}) P:([0-9A-Fa-f]{2})"
+                           r" SP:([0-9A-Fa-f]{2}).*?(?:CYC:\s*(\d+))?\s*$")
+
+
+class TraceRecorder(object):
+    """
+    Runs a Chip6502, recording its state before every instruction.
+
+    Records are packed into a preallocated bytearray. When it fills up it's written to trace_file in one go, or if
+    there's no file it wraps around, keeping the most recent capacity records, which is enough to see what led up to
+    a crash.
+    """
+
+    def __init__(self, target, trace_file=None, capacity=65536):
+        """
+        Args:
+            target: The Chip6502 to run
+            trace_file: A file opened for writing bytes, or None to keep the records in memory
+            capacity: The number of records the buffer holds
+        """
+        self.__chip = target
+        self.__trace_file = trace_file
+        self.__buffer = bytearray(RECORD_FORMAT.size * capacity)
+        self.__position = 0
+        self.__wrapped = False
+
+        self.records_recorded = 0
+
+    def step(self):
+        """
+        Record the chip's state, then execute one instruction.
+        """
+        self.run(1)
+
+    def run(self, n_instructions):
+        """
+        Record and execute n_instructions instructions.
+        """
+        target = self.__chip
+        # Peek, so tracing doesn't set off read watches on the code it records
+        peek = target.memory.peek
+        step = target.step
+        pack_into = RECORD_FORMAT.pack_into
+        record_size = RECORD_FORMAT.size
+        buffer = self.__buffer
+        buffer_size = len(buffer)
+
+        for _ in range(n_instructions):
+            program_counter = target.program_counter
+            pack_into(buffer, self.__position, program_counter, peek(program_counter), target.accumulator,
+                      target.x_register, target.y_register, target.status, target.stack_pointer, target.cycles)
+            self.records_recorded += 1
+            self.__position += record_size
+
+            if self.__position == buffer_size:
+                self.__buffer_full()
+
+            step()
+
+    def run_cycles(self, n_cycles):
+        """
+        Record and execute instructions until at least n_cycles cycles have passed.
+
+        Returns:
+            The number of cycles that were actually run
+        """
+        target = self.__chip
+        start_cycles = target.cycles
+        end_cycles = start_cycles + n_cycles
+
+        while target.cycles < end_cycles:
+            self.run(1)
+
+        return target.cycles - start_cycles
+
+    def __buffer_full(self):
+        if self.__trace_file is None:
+            self.__wrapped = True
+        else:
+            self.__trace_file.write(self.__buffer)
+
+        self.__position = 0
+
+    def flush(self):
+        """
+        Write the records buffered so far to the trace file.
+        """
+        if self.__trace_file is not None and self.__position:
+            self.__trace_file.write(memoryview(self.__buffer)[:self.__position])
+            self.__position = 0
+
+    def close(self):
+        """
+        Flush the buffer. The trace file itself is left open.
+        """
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def records(self):
+        """
+        Get the records held in memory, oldest first. With a trace file these are the records not yet flushed.
+
+        Returns:
+            A list of TraceRecords
+        """
+        if self.__wrapped and self.__trace_file is None:
+            data = self.__buffer[self.__position:] + self.__buffer[:self.__position]
+        else:
+            data = self.__buffer[:self.__position]
+
+        return [TraceRecord._make(fields) for fields in RECORD_FORMAT.iter_unpack(data)]
+
+
+def read_records(trace_file):
+    """
+    Read the records of a binary trace a chunk at a time.
+
+    A read can stop partway through a record, as reads from a pipe do. The partial record is kept and finished by the
+    next read. A partial record left at the end of the file, such as the one a recorder killed mid-write leaves, is
+    dropped.
+
+    Args:
+        trace_file: A file opened for reading bytes
+
+    Yields:
+        TraceRecords
+    """
+    chunk_size = RECORD_FORMAT.size * READ_CHUNK_RECORDS
+    leftover = b""
+
+    while True:
+        chunk = trace_file.read(chunk_size)
+
+        if not chunk:
+            return
+
+        chunk = leftover + chunk
+        complete = len(chunk) - len(chunk) % RECORD_FORMAT.size
+        leftover = chunk[complete:]
+
+        for fields in RECORD_FORMAT.iter_unpack(chunk[:complete]):
+            yield TraceRecord._make(fields)
+
+
+def read_nestest_log(log_file):
+    """
+    Read the records of a nestest-style text log, such as the one published for nestest.nes or one written by
+    format_nestest. Lines that don't hold a record are skipped. Logs without cycle counts give cycles of None.
+
+    Args:
+        log_file: A file opened for reading text
+
+    Yields:
+        TraceRecords
+    """
+    for line in log_file:
+        match = _NESTEST_LINE.match(line)
+
+        if match is None:
+            continue
+
+        fields = [int(field, 16) for field in match.groups()[:7]]
+        cycles = match.group(8)
+        yield TraceRecord(*fields, cycles=int(cycles) if cycles is not None else None)
+
+
+def format_nestest(record):
+    """
+    Format a record as a nestest log line.
+
+    Records only hold the opcode, so the operand bytes and disassembly columns are left blank.
+    """
+    line = "{program_counter:04X}  {opcode:02X}".format(program_counter=record.program_counter, opcode=record.opcode)
+
+    line = ("{line:<{column}}A:{accumulator:02X} X:{x_register:02X} Y:{y_register:02X} P:{status:02X} "
+            "SP:{stack_pointer:02X}".format(line=line, column=NESTEST_REGISTERS_COLUMN, **record._asdict()))
+
+    if record.cycles is not None:
+        line += " CYC:{cycles}".format(cycles=record.cycles)
+
+    return line
+
+
+def first_divergence(records, reference_records, ignore=()):
+    """
+    Find the first record where two traces differ. Both traces are read as they're compared, so neither has to fit in
+    memory.
+
+    Args:
+        records: An iterable of TraceRecords
+        reference_records: An iterable of TraceRecords to compare against
+        ignore: The names of TraceRecord fields not to compare
+
+    Returns:
+        A tuple of (the index of the first differing record, the record, the reference record), or None if the traces
+        are the same. If one trace is longer, the index is the length of the shorter and its record is None.
+    """
+    fields = [index for index, name in enumerate(TraceRecord._fields) if name not in ignore]
+
+    for index, (record, reference) in enumerate(itertools.zip_longest(records, reference_records)):
+        if record is None or reference is None:
+            return index, record, reference
+
+        if any(record[field] != reference[field] for field in fields):
+            return index, record, reference
+
+    return None
+
+
+def _open_records(path):
+    if path.endswith((".log", ".txt")):
+        trace_file = open(path, "r")
+        return trace_file, read_nestest_log(trace_file)
+
+    trace_file = open(path, "rb")
+    return trace_file, read_records(trace_file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Decode and compare Chip6502 execution traces.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    decode_parser = commands.add_parser("decode", help="Print a binary trace as a nestest log")
+    decode_parser.add_argument("trace")
+
+    diff_parser = commands.add_parser("diff", help="Find the first record where two traces differ")
+    diff_parser.add_argument("trace")
+    diff_parser.add_argument("reference")
+    diff_parser.add_argument("--ignore", action="append", default=[], choices=TraceRecord._fields,
+                             help="A field not to compare. Can be given more than once.")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "decode":
+        with open(args.trace, "rb") as trace_file:
+            for record in read_records(trace_file):
+                print(format_nestest(record))
+
+        return 0
+
+    trace_file, records = _open_records(args.trace)
+    reference_file, reference_records = _open_records(args.reference)
+
+    with trace_file, reference_file:
+        divergence = first_divergence(records, reference_records, args.ignore)
+
+    if divergence is None:
+        print("The traces match")
+        return 0
+
+    index, record, reference = divergence
+    print("The traces differ at record {index}".format(index=index))
+    print("  trace:     " + (format_nestest(record) if record is not None else "(ended)"))
+    print("  reference: " + (format_nestest(reference) if reference is not None else "(ended)"))
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
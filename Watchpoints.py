@@ -0,0 +1,71 @@
+class Watchpoints(object):
+    """
+    Read, write and execution watchpoints on the memory a Chip6502 runs in.
+
+    Watchpoints are NesMemory watches, so they're looked up by page: only accesses to watched pages pay for them, and
+    a chip with no execution watchpoints fetches opcodes without checking for any.
+
+    Callbacks are given the chip's program counter. For reads and writes it's the program counter while the
+    instruction making the access runs, which is just past the instruction's operands. For execution it's the address of
+    the instruction, which hasn't run yet. A callback can raise an exception to stop Chip6502.run; an execution
+    callback that does so leaves the chip ready to run the instruction it stopped at.
+
+    e.g. Stop when the game writes to the sprite table:
+
+        watchpoints = Watchpoints(target)
+        watchpoints.watch_writes(0x0200, 0x02FF, lambda program_counter, address, value: print(hex(program_counter)))
+    """
+
+    def __init__(self, target):
+        """
+        Args:
+            target: The Chip6502 to watch
+        """
+        self.__chip = target
+        self.__memory = target.memory
+        self.__watch_funcs = []
+
+    def watch_reads(self, start_address, end_address, callback):
+        """
+        Call callback(program_counter, address, value) after every read of an address from start_address to
+        end_address.
+        """
+        self.__watch(self.__memory.watch_reads, start_address, end_address, callback)
+
+    def watch_writes(self, start_address, end_address, callback):
+        """
+        Call callback(program_counter, address, value) before every write to an address from start_address to
+        end_address.
+        """
+        self.__watch(self.__memory.watch_writes, start_address, end_address, callback)
+
+    def watch_execution(self, start_address, end_address, callback):
+        """
+        Call callback(program_counter, opcode) before the chip executes an instruction at an address from start_address
+        to end_address.
+        """
+        target = self.__chip
+
+        def watch_func(address, opcode):
+            callback(target.program_counter, opcode)
+
+        self.__memory.watch_execution(start_address, end_address, watch_func)
+        self.__watch_funcs.append(watch_func)
+
+    def clear(self):
+        """
+        Remove every watchpoint set through this object.
+        """
+        for watch_func in self.__watch_funcs:
+            self.__memory.remove_watch(watch_func)
+
+        self.__watch_funcs = []
+
+    def __watch(self, add_watch, start_address, end_address, callback):
+        target = self.__chip
+
+        def watch_func(address, value):
+            callback(target.program_counter, address, value)
+
+        add_watch(start_address, end_address, watch_func)
+        self.__watch_funcs.append(watch_func)